@@ -0,0 +1,36 @@
+"""Index restaurant addresses by latitude/longitude
+
+Supports the bounding-box prefilter used by restaurant discovery
+(/customer/restaurants/discover).
+
+Revision ID: add_address_lat_lng_index
+Revises: partition_delivery_partner_locations
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_address_lat_lng_index'
+down_revision = 'partition_delivery_partner_locations'
+branch_labels = None
+depends_on = None
+
+INDEX = 'ix_addresses_latitude_longitude'
+
+
+def _has_index(inspector):
+    return any(index['name'] == INDEX for index in inspector.get_indexes('addresses'))
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('addresses') and not _has_index(inspector):
+        op.create_index(INDEX, 'addresses', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('addresses') and _has_index(inspector):
+        op.drop_index(INDEX, table_name='addresses')
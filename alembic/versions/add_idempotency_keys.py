@@ -0,0 +1,44 @@
+"""Add idempotency_keys table for order placement
+
+Revision ID: add_idempotency_keys
+Revises: add_pricing_rules
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_idempotency_keys'
+down_revision = 'add_pricing_rules'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('idempotency_keys'):
+        op.create_table(
+            'idempotency_keys',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('customer_id', sa.Integer(), nullable=False),
+            sa.Column('key', sa.String(length=255), nullable=False),
+            sa.Column('request_hash', sa.String(length=64), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=False),
+            sa.Column('order_number', sa.String(length=50), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['customer_id'], ['customers.id']),
+            sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('customer_id', 'key', name='uq_idempotency_keys_customer_key')
+        )
+        op.create_index(op.f('ix_idempotency_keys_id'), 'idempotency_keys', ['id'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('idempotency_keys'):
+        op.drop_index(op.f('ix_idempotency_keys_id'), table_name='idempotency_keys')
+        op.drop_table('idempotency_keys')
@@ -0,0 +1,68 @@
+"""Composite indexes for the hot order queries
+
+- (restaurant_id, status, created_at): restaurant order lists, dashboard
+- (delivery_partner_id, status, delivered_at): rider active / completed lists
+- (customer_id, created_at): customer order history
+- (status, delivery_partner_id): available orders (ready, no partner yet)
+
+Checked by index_advisor.py / tests/test_index_advisor.py.
+
+Revision ID: add_order_composite_indexes
+Revises: add_restaurant_daily_stats
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_order_composite_indexes'
+down_revision = 'add_restaurant_daily_stats'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_orders_restaurant_id_status_created_at': ['restaurant_id', 'status', 'created_at'],
+    'ix_orders_delivery_partner_id_status_delivered_at': ['delivery_partner_id', 'status', 'delivered_at'],
+    'ix_orders_customer_id_created_at': ['customer_id', 'created_at'],
+    'ix_orders_status_delivery_partner_id': ['status', 'delivery_partner_id'],
+}
+
+
+def _existing(inspector):
+    return {index['name']: index['column_names'] for index in inspector.get_indexes('orders')}
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('orders'):
+        return
+    existing = _existing(inspector)
+    for name, columns in INDEXES.items():
+        if name not in existing:
+            op.create_index(name, 'orders', columns, unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('orders'):
+        return
+    existing = _existing(inspector)
+
+    if bind.dialect.name == 'mysql':
+        # MySQL dropped the implicit foreign key indexes on restaurant_id,
+        # delivery_partner_id and customer_id once the composites could serve
+        # the foreign keys; dropping the composites would fail (error 1553)
+        # unless another index leads with the column
+        remaining = [columns for name, columns in existing.items() if name not in INDEXES]
+        fk_columns = {column for fk in inspector.get_foreign_keys('orders') for column in fk['constrained_columns']}
+        for columns in INDEXES.values():
+            column = columns[0]
+            if column in fk_columns and not any(other[0] == column for other in remaining if other):
+                op.create_index(f'ix_orders_{column}', 'orders', [column], unique=False)
+                remaining.append([column])
+
+    for name in INDEXES:
+        if name in existing:
+            op.drop_index(name, table_name='orders')
@@ -0,0 +1,49 @@
+"""Add outbox_events table for order side effects
+
+Revision ID: add_outbox_events
+Revises: add_idempotency_keys
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_outbox_events'
+down_revision = 'add_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('outbox_events'):
+        op.create_table(
+            'outbox_events',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('event_type', sa.String(length=50), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=True),
+            sa.Column('payload', sa.JSON(), nullable=True),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('available_at', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_outbox_events_id'), 'outbox_events', ['id'], unique=False)
+        op.create_index(op.f('ix_outbox_events_order_id'), 'outbox_events', ['order_id'], unique=False)
+        op.create_index('ix_outbox_events_status_available_at', 'outbox_events', ['status', 'available_at'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('outbox_events'):
+        op.drop_index('ix_outbox_events_status_available_at', table_name='outbox_events')
+        op.drop_index(op.f('ix_outbox_events_order_id'), table_name='outbox_events')
+        op.drop_index(op.f('ix_outbox_events_id'), table_name='outbox_events')
+        op.drop_table('outbox_events')
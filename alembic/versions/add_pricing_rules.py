@@ -0,0 +1,107 @@
+"""Add pricing rule tables (delivery fee slabs, surge windows, promo codes)
+
+Empty tables keep the built-in pricing: 40 base + 7/km above 3 km, no surge.
+
+Revision ID: add_pricing_rules
+Revises: add_address_lat_lng_index
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_pricing_rules'
+down_revision = 'add_address_lat_lng_index'
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    ]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('delivery_fee_slabs'):
+        op.create_table(
+            'delivery_fee_slabs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('restaurant_id', sa.Integer(), nullable=True),
+            sa.Column('city', sa.String(length=100), nullable=True),
+            sa.Column('min_km', sa.Float(), nullable=False),
+            sa.Column('max_km', sa.Float(), nullable=True),
+            sa.Column('base_fee', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('per_km_fee', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_delivery_fee_slabs_id'), 'delivery_fee_slabs', ['id'], unique=False)
+        op.create_index(op.f('ix_delivery_fee_slabs_restaurant_id'), 'delivery_fee_slabs', ['restaurant_id'], unique=False)
+        op.create_index(op.f('ix_delivery_fee_slabs_city'), 'delivery_fee_slabs', ['city'], unique=False)
+
+    if not inspector.has_table('surge_windows'):
+        op.create_table(
+            'surge_windows',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('restaurant_id', sa.Integer(), nullable=True),
+            sa.Column('city', sa.String(length=100), nullable=True),
+            sa.Column('days', sa.String(length=7), nullable=False),
+            sa.Column('start_time', sa.String(length=5), nullable=False),
+            sa.Column('end_time', sa.String(length=5), nullable=False),
+            sa.Column('multiplier', sa.DECIMAL(precision=4, scale=2), nullable=False),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_surge_windows_id'), 'surge_windows', ['id'], unique=False)
+        op.create_index(op.f('ix_surge_windows_restaurant_id'), 'surge_windows', ['restaurant_id'], unique=False)
+        op.create_index(op.f('ix_surge_windows_city'), 'surge_windows', ['city'], unique=False)
+
+    if not inspector.has_table('promo_codes'):
+        op.create_table(
+            'promo_codes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('code', sa.String(length=50), nullable=False),
+            sa.Column('description', sa.String(length=255), nullable=True),
+            sa.Column('discount_type', sa.String(length=20), nullable=False),
+            sa.Column('discount_value', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('max_discount', sa.DECIMAL(precision=10, scale=2), nullable=True),
+            sa.Column('min_order_amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+            sa.Column('restaurant_id', sa.Integer(), nullable=True),
+            sa.Column('city', sa.String(length=100), nullable=True),
+            sa.Column('valid_from', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('valid_until', sa.DateTime(timezone=True), nullable=True),
+            *_timestamps(),
+            sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_promo_codes_id'), 'promo_codes', ['id'], unique=False)
+        op.create_index(op.f('ix_promo_codes_code'), 'promo_codes', ['code'], unique=True)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('promo_codes'):
+        op.drop_index(op.f('ix_promo_codes_code'), table_name='promo_codes')
+        op.drop_index(op.f('ix_promo_codes_id'), table_name='promo_codes')
+        op.drop_table('promo_codes')
+
+    if inspector.has_table('surge_windows'):
+        op.drop_index(op.f('ix_surge_windows_city'), table_name='surge_windows')
+        op.drop_index(op.f('ix_surge_windows_restaurant_id'), table_name='surge_windows')
+        op.drop_index(op.f('ix_surge_windows_id'), table_name='surge_windows')
+        op.drop_table('surge_windows')
+
+    if inspector.has_table('delivery_fee_slabs'):
+        op.drop_index(op.f('ix_delivery_fee_slabs_city'), table_name='delivery_fee_slabs')
+        op.drop_index(op.f('ix_delivery_fee_slabs_restaurant_id'), table_name='delivery_fee_slabs')
+        op.drop_index(op.f('ix_delivery_fee_slabs_id'), table_name='delivery_fee_slabs')
+        op.drop_table('delivery_fee_slabs')
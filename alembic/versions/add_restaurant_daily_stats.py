@@ -0,0 +1,49 @@
+"""Add restaurant_daily_stats rollup table
+
+The table starts empty. Once the release is live, fill it from existing
+orders with `python backfill_restaurant_stats.py`; until then the dashboard
+totals (GET /dashboard/overview) count only new orders.
+
+Revision ID: add_restaurant_daily_stats
+Revises: add_rider_earnings_daily
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_restaurant_daily_stats'
+down_revision = 'add_rider_earnings_daily'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('restaurant_daily_stats'):
+        op.create_table(
+            'restaurant_daily_stats',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('restaurant_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('orders', sa.Integer(), nullable=False),
+            sa.Column('delivered', sa.Integer(), nullable=False),
+            sa.Column('rejected', sa.Integer(), nullable=False),
+            sa.Column('cancelled', sa.Integer(), nullable=False),
+            sa.Column('delivered_amount', sa.DECIMAL(precision=14, scale=2), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('restaurant_id', 'day', name='uq_restaurant_daily_stats_restaurant_day')
+        )
+        op.create_index(op.f('ix_restaurant_daily_stats_id'), 'restaurant_daily_stats', ['id'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('restaurant_daily_stats'):
+        op.drop_index(op.f('ix_restaurant_daily_stats_id'), table_name='restaurant_daily_stats')
+        op.drop_table('restaurant_daily_stats')
@@ -0,0 +1,42 @@
+"""Add rider_earnings_daily rollup table
+
+Revision ID: add_rider_earnings_daily
+Revises: add_outbox_events
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rider_earnings_daily'
+down_revision = 'add_outbox_events'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table('rider_earnings_daily'):
+        op.create_table(
+            'rider_earnings_daily',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('delivery_partner_id', sa.Integer(), nullable=False),
+            sa.Column('day', sa.Date(), nullable=False),
+            sa.Column('deliveries', sa.Integer(), nullable=False),
+            sa.Column('earnings', sa.DECIMAL(precision=12, scale=2), nullable=False),
+            sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['delivery_partner_id'], ['delivery_partners.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('delivery_partner_id', 'day', name='uq_rider_earnings_daily_partner_day')
+        )
+        op.create_index(op.f('ix_rider_earnings_daily_id'), 'rider_earnings_daily', ['id'], unique=False)
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+
+    if inspector.has_table('rider_earnings_daily'):
+        op.drop_index(op.f('ix_rider_earnings_daily_id'), table_name='rider_earnings_daily')
+        op.drop_table('rider_earnings_daily')
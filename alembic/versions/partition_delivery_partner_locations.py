@@ -0,0 +1,108 @@
+"""Add delivery route summaries and partition breadcrumbs by day
+
+This migration:
+1. Creates the delivery_route_summaries table
+2. On MySQL, partitions delivery_partner_locations by day on created_at
+   (MySQL requires the partition column in the primary key and does not allow
+   foreign keys on partitioned tables, so the PK becomes (id, created_at) and
+   the two foreign keys are dropped)
+
+Daily partitions are added/dropped by location_retention.py.
+
+Revision ID: partition_delivery_partner_locations
+Revises: 2c49743f3d84
+Create Date: 2026-10-18
+"""
+from datetime import timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.timezone import get_ist_now
+
+
+# revision identifiers, used by Alembic.
+revision = 'partition_delivery_partner_locations'
+down_revision = '2c49743f3d84'
+branch_labels = None
+depends_on = None
+
+TABLE = 'delivery_partner_locations'
+DAYS_AHEAD = 3
+
+
+def _is_partitioned(bind):
+    return bind.execute(sa.text(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+    ), {"table": TABLE}).scalar() > 0
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # 1. Route summaries
+    if not inspector.has_table('delivery_route_summaries'):
+        op.create_table(
+            'delivery_route_summaries',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('order_id', sa.Integer(), nullable=False),
+            sa.Column('delivery_partner_id', sa.Integer(), nullable=True),
+            sa.Column('polyline', sa.Text(), nullable=False),
+            sa.Column('raw_point_count', sa.Integer(), nullable=False),
+            sa.Column('point_count', sa.Integer(), nullable=False),
+            sa.Column('distance_km', sa.Float(), nullable=True),
+            sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('ended_at', sa.DateTime(timezone=True), nullable=True),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+            sa.ForeignKeyConstraint(['delivery_partner_id'], ['delivery_partners.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f('ix_delivery_route_summaries_id'), 'delivery_route_summaries', ['id'], unique=False)
+        op.create_index(op.f('ix_delivery_route_summaries_order_id'), 'delivery_route_summaries', ['order_id'], unique=True)
+        op.create_index(op.f('ix_delivery_route_summaries_delivery_partner_id'), 'delivery_route_summaries', ['delivery_partner_id'], unique=False)
+
+    # 2. Daily partitions (MySQL only; SQLite/dev use batched purges)
+    if bind.dialect.name != 'mysql' or not inspector.has_table(TABLE) or _is_partitioned(bind):
+        return
+
+    for fk in inspector.get_foreign_keys(TABLE):
+        if fk.get('name'):
+            op.drop_constraint(fk['name'], TABLE, type_='foreignkey')
+
+    op.execute(f"UPDATE {TABLE} SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.execute(f"ALTER TABLE {TABLE} MODIFY created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP")
+    op.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+
+    # Same IST day boundaries as LocationRetentionService.maintain_partitions
+    today = get_ist_now().date()
+    partitions = [f"PARTITION p_history VALUES LESS THAN (TO_DAYS('{today}'))"]
+    for offset in range(DAYS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        partitions.append(
+            f"PARTITION p{day:%Y%m%d} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1)}'))"
+        )
+    partitions.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+    op.execute(
+        f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(created_at)) ({', '.join(partitions)})"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if bind.dialect.name == 'mysql' and inspector.has_table(TABLE) and _is_partitioned(bind):
+        op.execute(f"ALTER TABLE {TABLE} REMOVE PARTITIONING")
+        op.execute(f"ALTER TABLE {TABLE} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        op.execute(f"ALTER TABLE {TABLE} MODIFY created_at DATETIME NULL DEFAULT CURRENT_TIMESTAMP")
+        op.create_foreign_key(None, TABLE, 'delivery_partners', ['delivery_partner_id'], ['id'])
+        op.create_foreign_key(None, TABLE, 'orders', ['order_id'], ['id'])
+
+    if inspector.has_table('delivery_route_summaries'):
+        op.drop_index(op.f('ix_delivery_route_summaries_delivery_partner_id'), table_name='delivery_route_summaries')
+        op.drop_index(op.f('ix_delivery_route_summaries_order_id'), table_name='delivery_route_summaries')
+        op.drop_index(op.f('ix_delivery_route_summaries_id'), table_name='delivery_route_summaries')
+        op.drop_table('delivery_route_summaries')
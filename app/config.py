@@ -24,6 +24,58 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Live order WebSocket fan-out across workers ("redis" or "memory")
+    LIVE_ORDERS_PUBSUB: str = "redis"
+    LIVE_ORDERS_CHANNEL: str = "orders:live"
+    LIVE_SEND_TIMEOUT_SECONDS: float = 5.0
+    LIVE_MAX_PENDING_MESSAGES: int = 50
+    
+    # Delivery partner matching
+    PARTNER_INDEX_REFRESH_SECONDS: int = 60
+    # Per-process memory of taken orders; a released order can be refused by other workers this long
+    ASSIGNMENT_TAKEN_TTL_SECONDS: int = 3
+    AVAILABLE_ORDERS_CELL_KM: float = 1.0
+    AVAILABLE_ORDERS_CACHE_SECONDS: float = 5.0
+    
+    # Delivery partner GPS ingestion (write-behind buffer)
+    LOCATION_FLUSH_INTERVAL_MS: int = 1000
+    LOCATION_FLUSH_BATCH_SIZE: int = 500
+    LOCATION_BUFFER_LIMIT: int = 50000
+    LOCATION_STORE_REDIS_MIRROR: bool = False
+    LOCATION_STORE_TTL_SECONDS: int = 3600
+    
+    # Restaurant discovery (/customer/restaurants/discover)
+    DISCOVERY_RADIUS_KM: float = 10.0
+    DISCOVERY_GRID_INDEX: bool = True
+    RESTAURANT_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Cart pricing rules (delivery_fee_slabs, surge_windows, promo_codes)
+    PRICING_TAX_RATE: float = 0.05
+    PRICING_RULES_REFRESH_SECONDS: int = 30
+    
+    # Order side effects (outbox_events)
+    OUTBOX_POLL_INTERVAL_MS: int = 1000
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_LEASE_SECONDS: int = 60
+    OUTBOX_RETRY_BASE_SECONDS: float = 2.0
+    
+    # Customer /home feed snapshot
+    HOME_FEED_TTL_SECONDS: int = 60
+    HOME_FEED_MAX_VERSIONS: int = 4
+    
+    # Per-restaurant menu snapshots (restaurant details)
+    MENU_SNAPSHOT_TTL_SECONDS: int = 300
+    MENU_SNAPSHOT_CACHE_SIZE: int = 500
+    
+    # Menu categories (process-wide cache)
+    CATEGORY_CACHE_TTL_SECONDS: int = 300
+    
+    # Breadcrumb retention (delivery_partner_locations)
+    LOCATION_RETENTION_DAYS: int = 7
+    LOCATION_PARTITION_DAYS_AHEAD: int = 3
+    ROUTE_SUMMARY_MIN_STEP_METERS: int = 25
+    
     # Environment
     ENVIRONMENT: str = "development"
     
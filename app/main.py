@@ -60,6 +60,71 @@ for router in routers:
     app.include_router(router)
     app.include_router(router, prefix="/api/v1")
 
+@app.on_event("startup")
+async def start_live_orders_bus():
+    await orders.manager.bus.start()
+
+@app.on_event("shutdown")
+async def stop_live_orders_bus():
+    await orders.manager.bus.stop()
+
+@app.on_event("startup")
+async def start_location_ingestor():
+    from app.services.location_ingest import location_ingestor
+    await location_ingestor.start()
+
+@app.on_event("shutdown")
+async def flush_location_ingestor():
+    """Write buffered GPS pings before the worker exits"""
+    from app.services.location_ingest import location_ingestor
+    await location_ingestor.stop()
+
+@app.on_event("startup")
+async def start_outbox_dispatcher():
+    """Deliver queued order notifications and live broadcasts in the background"""
+    from app.services import order_events  # registers the outbox handlers
+    from app.services.outbox import outbox_dispatcher
+    await outbox_dispatcher.start()
+
+@app.on_event("shutdown")
+async def stop_outbox_dispatcher():
+    """Undelivered events stay in outbox_events for the next worker"""
+    from app.services.outbox import outbox_dispatcher
+    await outbox_dispatcher.stop()
+
+@app.on_event("startup")
+def load_pricing_rules():
+    """Compile delivery fee, surge and promo rules before the first cart is priced"""
+    from app.database import SessionLocal
+    from app.services.pricing_rules import pricing_rules
+    db = SessionLocal()
+    try:
+        pricing_rules.load(db)
+    except Exception as e:
+        logger.error(f"Failed to load pricing rules, using defaults: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def seed_menu_categories():
+    """Give a fresh database its default menu categories (no longer done on the read path)"""
+    from app.database import SessionLocal
+    from app.services.category_cache import category_cache, seed_default_categories
+    db = SessionLocal()
+    try:
+        seed_default_categories(db)
+        category_cache.all(db)
+    except Exception as e:
+        logger.error(f"Failed to seed menu categories: {e}")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def drain_push_queue():
+    """Let queued FCM pushes go out before the worker exits"""
+    from app.services.push_dispatcher import push_dispatcher
+    push_dispatcher.shutdown(wait=True)
+
 @app.get("/")
 def read_root():
     return {
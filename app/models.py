@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Float, DECIMAL, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Enum, Float, DECIMAL, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 import enum
-from app.models_location import CustomerLocation, DeliveryPartnerLocation
+from app.models_location import CustomerLocation, DeliveryPartnerLocation, DeliveryRouteSummary
+from app.models_pricing import DeliveryFeeSlab, PromoCode, SurgeWindow
+from app.models_orders import IdempotencyKey, OutboxEvent, RestaurantDailyStats, RiderEarningsDaily
+
+# Shown when a restaurant has not uploaded a restaurant_photo document
+DEFAULT_RESTAURANT_IMAGE_URL = "https://images.unsplash.com/photo-1517248135467-4c7edcad34c4?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
 
 
 
@@ -126,7 +131,7 @@ class Restaurant(Base):
         for doc in self.documents:
             if doc.document_type == 'restaurant_photo':
                 return doc.file_url
-        return "https://images.unsplash.com/photo-1517248135467-4c7edcad34c4?ixlib=rb-1.2.1&auto=format&fit=crop&w=800&q=80"
+        return DEFAULT_RESTAURANT_IMAGE_URL
 
     @property
     def coverImage(self):
@@ -210,6 +215,11 @@ class Address(Base):
     
     # Relationships
     restaurant = relationship("Restaurant", back_populates="address")
+    
+    __table_args__ = (
+        # Bounding-box prefilter for restaurant discovery
+        Index("ix_addresses_latitude_longitude", "latitude", "longitude"),
+    )
 
 
 class CustomerAddress(Base):
@@ -424,6 +434,17 @@ class Order(Base):
     delivery_partner = relationship("DeliveryPartner", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
 
+    __table_args__ = (
+        # Restaurant order lists and dashboard counts (see app/services/index_advisor.py)
+        Index("ix_orders_restaurant_id_status_created_at", "restaurant_id", "status", "created_at"),
+        # Rider active / completed lists, newest delivery first
+        Index("ix_orders_delivery_partner_id_status_delivered_at", "delivery_partner_id", "status", "delivered_at"),
+        # Customer order history
+        Index("ix_orders_customer_id_created_at", "customer_id", "created_at"),
+        # Available orders: ready and not yet taken (delivery_partner_id IS NULL)
+        Index("ix_orders_status_delivery_partner_id", "status", "delivery_partner_id"),
+    )
+
 
 
 
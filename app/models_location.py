@@ -1,16 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, ForeignKeyConstraint, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.database import Base
+from app.database import Base, engine
+
+# On MySQL delivery_partner_locations is partitioned by day (see the
+# partition_delivery_partner_locations migration): the partition column is part
+# of the primary key and the table has no foreign keys
+PARTITIONED_LOCATIONS = engine.dialect.name == "mysql"
 
 
 class DeliveryPartnerLocation(Base):
     """Track real-time location of delivery partners"""
     __tablename__ = "delivery_partner_locations"
+    __table_args__ = () if PARTITIONED_LOCATIONS else (
+        ForeignKeyConstraint(["delivery_partner_id"], ["delivery_partners.id"]),
+        ForeignKeyConstraint(["order_id"], ["orders.id"]),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    delivery_partner_id = Column(Integer, ForeignKey("delivery_partners.id"), nullable=False, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True, index=True)  # Active order being delivered
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    delivery_partner_id = Column(Integer, nullable=False, index=True)
+    order_id = Column(Integer, nullable=True, index=True)  # Active order being delivered
     
     latitude = Column(Float, nullable=False)
     longitude = Column(Float, nullable=False)
@@ -21,12 +30,37 @@ class DeliveryPartnerLocation(Base):
     # Address details (reverse geocoded)
     address = Column(Text, nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True,
+                        primary_key=PARTITIONED_LOCATIONS, nullable=not PARTITIONED_LOCATIONS)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
-    # Relationships
-    delivery_partner = relationship("DeliveryPartner", backref="location_history")
-    order = relationship("Order", backref="delivery_tracking")
+    # Relationships (joined explicitly: the partitioned table has no foreign keys)
+    delivery_partner = relationship(
+        "DeliveryPartner", backref="location_history",
+        primaryjoin="DeliveryPartner.id == foreign(DeliveryPartnerLocation.delivery_partner_id)"
+    )
+    order = relationship(
+        "Order", backref="delivery_tracking",
+        primaryjoin="Order.id == foreign(DeliveryPartnerLocation.order_id)"
+    )
+
+
+class DeliveryRouteSummary(Base):
+    """Downsampled route of a delivered order, kept after raw breadcrumbs are purged"""
+    __tablename__ = "delivery_route_summaries"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, unique=True, index=True)
+    delivery_partner_id = Column(Integer, ForeignKey("delivery_partners.id"), nullable=True, index=True)
+    
+    polyline = Column(Text, nullable=False)  # Google encoded polyline
+    raw_point_count = Column(Integer, nullable=False, default=0)
+    point_count = Column(Integer, nullable=False, default=0)
+    distance_km = Column(Float, nullable=True)
+    
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    ended_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class CustomerLocation(Base):
@@ -0,0 +1,87 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, DECIMAL, ForeignKey, Index, JSON, Text, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    """
+    Client-supplied Idempotency-Key of a placed order.
+    Written in the same transaction as the order, so a retry either finds the
+    key (and gets the same order back) or finds the cart untouched.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("customer_id", "key", name="uq_idempotency_keys_customer_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_number = Column(String(50), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class OutboxEvent(Base):
+    """
+    Side effect of an order write (push, live broadcast), stored in the same
+    transaction as the write and carried out later by the outbox dispatcher.
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_status_available_at", "status", "available_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_type = Column(String(50), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=True, index=True)
+    payload = Column(JSON, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=False)  # Next attempt (or lease expiry while claimed)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class RiderEarningsDaily(Base):
+    """
+    Per delivery partner, per (IST) day totals of delivered orders.
+    Incremented by the delivered transition in the same transaction as the
+    status change; rebuilt from orders with backfill_rider_earnings.py.
+    """
+    __tablename__ = "rider_earnings_daily"
+    __table_args__ = (
+        UniqueConstraint("delivery_partner_id", "day", name="uq_rider_earnings_daily_partner_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    delivery_partner_id = Column(Integer, ForeignKey("delivery_partners.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    deliveries = Column(Integer, nullable=False, default=0)
+    earnings = Column(DECIMAL(12, 2), nullable=False, default=0)  # Sum of delivery_fee
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RestaurantDailyStats(Base):
+    """
+    Per restaurant, per (IST) day order counters for the dashboard: orders
+    placed that day and orders that reached a final status that day.
+    Maintained by order placement and the state machine in the same
+    transaction as the order write.
+    """
+    __tablename__ = "restaurant_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("restaurant_id", "day", name="uq_restaurant_daily_stats_restaurant_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    orders = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    delivered_amount = Column(DECIMAL(14, 2), nullable=False, default=0)  # Sum of total_amount of delivered orders
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Float, DECIMAL
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class DeliveryFeeSlab(Base):
+    """
+    Delivery fee for a distance band: base_fee + per_km_fee for every km above min_km.
+    The most specific scope with slabs wins: restaurant, then city, then default (both NULL).
+    """
+    __tablename__ = "delivery_fee_slabs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True, index=True)
+    city = Column(String(100), nullable=True, index=True)
+    
+    min_km = Column(Float, nullable=False, default=0)
+    max_km = Column(Float, nullable=True)  # NULL = open-ended
+    base_fee = Column(DECIMAL(10, 2), nullable=False)
+    per_km_fee = Column(DECIMAL(10, 2), nullable=False, default=0)
+    
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class SurgeWindow(Base):
+    """Delivery fee multiplier for a recurring time window (IST); the highest matching multiplier applies"""
+    __tablename__ = "surge_windows"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True, index=True)
+    city = Column(String(100), nullable=True, index=True)
+    
+    days = Column(String(7), nullable=False, default="0123456")  # Weekdays, Monday = 0
+    start_time = Column(String(5), nullable=False)  # HH:MM
+    end_time = Column(String(5), nullable=False)  # HH:MM, may wrap past midnight
+    multiplier = Column(DECIMAL(4, 2), nullable=False)
+    
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class PromoCode(Base):
+    """Customer promo code, applied to the cart's discount_amount"""
+    __tablename__ = "promo_codes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(50), unique=True, nullable=False, index=True)
+    description = Column(String(255), nullable=True)
+    
+    discount_type = Column(String(20), nullable=False, default="percent")  # percent, flat, free_delivery
+    discount_value = Column(DECIMAL(10, 2), nullable=False, default=0)
+    max_discount = Column(DECIMAL(10, 2), nullable=True)
+    min_order_amount = Column(DECIMAL(10, 2), nullable=False, default=0)
+    
+    # Optional scope
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True)
+    city = Column(String(100), nullable=True)
+    
+    valid_from = Column(DateTime(timezone=True), nullable=True)
+    valid_until = Column(DateTime(timezone=True), nullable=True)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
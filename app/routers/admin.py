@@ -1,12 +1,15 @@
 import os
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
+from decimal import Decimal
 from app.database import get_db
+from app.services import catalog_events
 from app.schemas import APIResponse
-from app.models import Restaurant, VerificationStatusEnum, Cuisine
+from app.models import Restaurant, VerificationStatusEnum, Cuisine, DeliveryFeeSlab, SurgeWindow, PromoCode
 from app.services.verification_service import VerificationService
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -17,6 +20,39 @@ class UpdateVerificationRequest(BaseModel):
     notes: str = None
 
 
+class FeeSlabRequest(BaseModel):
+    """Delivery fee slab; leave restaurant_id and city empty for the default slabs"""
+    restaurant_id: Optional[int] = None
+    city: Optional[str] = None
+    min_km: float = Field(0, ge=0)
+    max_km: Optional[float] = Field(None, gt=0)
+    base_fee: Decimal = Field(..., ge=0)
+    per_km_fee: Decimal = Field(Decimal("0"), ge=0)
+
+
+class SurgeWindowRequest(BaseModel):
+    """Surge multiplier for a recurring IST time window"""
+    restaurant_id: Optional[int] = None
+    city: Optional[str] = None
+    days: str = Field("0123456", pattern=r'^[0-6]{1,7}$')  # Monday = 0
+    start_time: str = Field(..., pattern=r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$')
+    end_time: str = Field(..., pattern=r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]$')
+    multiplier: Decimal = Field(..., gt=0, le=5)
+
+
+class PromoCodeRequest(BaseModel):
+    code: str = Field(..., min_length=3, max_length=50)
+    description: Optional[str] = None
+    discount_type: str = Field("percent", pattern=r'^(percent|flat|free_delivery)$')
+    discount_value: Decimal = Field(Decimal("0"), ge=0)
+    max_discount: Optional[Decimal] = Field(None, ge=0)
+    min_order_amount: Decimal = Field(Decimal("0"), ge=0)
+    restaurant_id: Optional[int] = None
+    city: Optional[str] = None
+    valid_from: Optional[datetime] = None
+    valid_until: Optional[datetime] = None
+
+
 @router.get("/restaurants/pending", response_model=APIResponse)
 def get_pending_restaurants(db: Session = Depends(get_db)):
     """Get all restaurants pending verification (Admin only)"""
@@ -151,6 +187,8 @@ def update_verification_status(
                 detail="Restaurant not found"
             )
         
+        catalog_events.restaurant_changed(restaurant_id)
+        
         # Get updated restaurant
         restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
         
@@ -577,3 +615,243 @@ def get_seed_status(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to check seed status: {str(e)}"
         )
+
+
+@router.get("/location-ingest/stats", response_model=APIResponse)
+def get_location_ingest_stats(
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Backpressure metrics for the GPS ping write-behind buffer of this worker.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.location_ingest import location_ingestor
+    
+    return APIResponse(
+        success=True,
+        message="Location ingest stats retrieved",
+        data=location_ingestor.stats()
+    )
+
+
+@router.get("/home-feed/stats", response_model=APIResponse)
+def get_home_feed_stats(
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Hit/rebuild counters and retained versions of this worker's /home feed snapshot.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.home_feed import home_feed_cache
+    
+    return APIResponse(
+        success=True,
+        message="Home feed stats retrieved",
+        data=home_feed_cache.stats()
+    )
+
+
+@router.get("/menu-snapshots/stats", response_model=APIResponse)
+def get_menu_snapshot_stats(
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Hit/build/eviction counters of this worker's restaurant menu snapshots.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.menu_snapshot import menu_snapshot_cache
+    
+    return APIResponse(
+        success=True,
+        message="Menu snapshot stats retrieved",
+        data=menu_snapshot_cache.stats()
+    )
+
+
+@router.get("/outbox/stats", response_model=APIResponse)
+def get_outbox_stats(
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Pending/done/failed order side effects and this worker's dispatch counters.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.outbox import outbox_dispatcher
+    
+    return APIResponse(
+        success=True,
+        message="Outbox stats retrieved",
+        data=outbox_dispatcher.stats()
+    )
+
+
+@router.get("/eta/active-orders", response_model=APIResponse)
+def get_active_order_etas(
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    ETAs for every order currently out with a delivery partner.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.eta_service import EtaService
+    
+    etas = EtaService.for_active_orders(db)
+    return APIResponse(
+        success=True,
+        message="Active order ETAs computed",
+        data={
+            "count": len(etas),
+            "orders": etas
+        }
+    )
+
+
+# ============= Pricing Rules =============
+
+PRICING_RULE_MODELS = {
+    "fee-slabs": DeliveryFeeSlab,
+    "surge-windows": SurgeWindow,
+    "promo-codes": PromoCode
+}
+
+
+def _pricing_model(rule_type: str):
+    if rule_type not in PRICING_RULE_MODELS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown rule type. Must be one of: {list(PRICING_RULE_MODELS)}"
+        )
+    return PRICING_RULE_MODELS[rule_type]
+
+
+def _rule_dict(row) -> dict:
+    return {column.name: getattr(row, column.name) for column in row.__table__.columns}
+
+
+def _create_pricing_rule(db: Session, rule_type: str, values: dict, message: str) -> APIResponse:
+    from app.services.pricing_rules import pricing_rules
+    
+    try:
+        rule = _pricing_model(rule_type)(**values)
+        db.add(rule)
+        db.commit()
+        db.refresh(rule)
+        rulebook = pricing_rules.load(db)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to save pricing rule: {str(e)}"
+        )
+    
+    return APIResponse(
+        success=True,
+        message=message,
+        data={"rule": _rule_dict(rule), "rulebook": rulebook.summary()}
+    )
+
+
+@router.get("/pricing/rules", response_model=APIResponse)
+def list_pricing_rules(
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    All delivery fee slabs, surge windows and promo codes, plus the rulebook compiled by this worker.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.pricing_rules import pricing_rules
+    
+    data = {
+        rule_type: [_rule_dict(row) for row in db.query(_pricing_model(rule_type)).all()]
+        for rule_type in PRICING_RULE_MODELS
+    }
+    data["rulebook"] = pricing_rules.rulebook.summary()
+    return APIResponse(
+        success=True,
+        message="Pricing rules retrieved",
+        data=data
+    )
+
+
+@router.post("/pricing/fee-slabs", response_model=APIResponse)
+def create_fee_slab(
+    slab: FeeSlabRequest,
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Add a delivery fee slab (per restaurant, per city or default).
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    return _create_pricing_rule(db, "fee-slabs", slab.dict(), "Delivery fee slab added")
+
+
+@router.post("/pricing/surge-windows", response_model=APIResponse)
+def create_surge_window(
+    window: SurgeWindowRequest,
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Add a surge window for the delivery fee.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    return _create_pricing_rule(db, "surge-windows", window.dict(), "Surge window added")
+
+
+@router.post("/pricing/promo-codes", response_model=APIResponse)
+def create_promo_code(
+    promo: PromoCodeRequest,
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Add a promo code.
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    values = promo.dict()
+    values["code"] = values["code"].strip().upper()
+    return _create_pricing_rule(db, "promo-codes", values, "Promo code added")
+
+
+@router.delete("/pricing/{rule_type}/{rule_id}", response_model=APIResponse)
+def deactivate_pricing_rule(
+    rule_type: str,
+    rule_id: int,
+    db: Session = Depends(get_db),
+    admin_key: str = Depends(verify_admin_key)
+):
+    """
+    Deactivate a pricing rule (rule_type: fee-slabs, surge-windows or promo-codes).
+    
+    **Protected endpoint** - Requires X-Admin-Key header
+    """
+    from app.services.pricing_rules import pricing_rules
+    
+    rule = db.query(_pricing_model(rule_type)).filter_by(id=rule_id).first()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pricing rule not found"
+        )
+    
+    rule.is_active = False
+    db.commit()
+    rulebook = pricing_rules.load(db)
+    
+    return APIResponse(
+        success=True,
+        message="Pricing rule deactivated",
+        data={"rule_type": rule_type, "rule_id": rule_id, "rulebook": rulebook.summary()}
+    )
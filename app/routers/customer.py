@@ -1,21 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas import (
     CustomerUpdate, CustomerResponse, APIResponse, RestaurantResponse, 
     CategoryResponse, AddressResponse, CuisineResponse, MenuItemResponse, 
     ReviewResponse, AddToCartRequest, UpdateCartItemRequest, CartResponse, CartItemResponse,
-    OrderCreateRequest, OrderResponse, OrderItemResponse, CustomerAddressCreate, CustomerAddressResponse,
+    OrderCreateRequest, OrderResponse, OrderHistoryResponse, OrderItemResponse, CustomerAddressCreate, CustomerAddressResponse,
     OrderTrackingResponse, OrderTrackingTimelineStep, DeliveryPartnerResponse,
     CustomerLocationUpdate, CustomerLocationResponse
 )
 from app.models import Customer, Restaurant, Category, MenuItem, Review, Cart, CartItem, Order, OrderItem, Address, CustomerAddress, DeliveryPartner, OrderStatusEnum, CustomerLocation
 from app.dependencies import get_current_customer
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
 from app.utils.timezone import get_ist_now
-from app.services.notification_service import NotificationService
+from app.services.location_store import location_store
+from app.services.cart_pricing import CartPricingService
+from app.services.order_placement import OrderPlacementService
+from app.services.outbox import outbox_dispatcher
+from app.services.home_feed import home_feed_cache
+from app.services.menu_snapshot import menu_snapshot_cache
+from app.services.restaurant_discovery import RestaurantDiscoveryService
+from app.services.eta_service import EtaService
+from app.services.order_projections import customer_order_page
+from app.models_location import DeliveryRouteSummary
+from app.utils.geo import decode_polyline
+from app.utils.http_cache import etag_matches
 
 
 router = APIRouter(prefix="/customer", tags=["Customer"])
@@ -48,33 +59,71 @@ def get_profile(current_customer: Customer = Depends(get_current_customer)):
 
 @router.get("/home", response_model=APIResponse)
 def get_home_data(
+    request: Request,
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
-    """Get home screen data"""
-    # Get categories
-    categories = db.query(Category).filter(Category.is_active == True).order_by(Category.display_order).all()
+    """Get home screen data (categories, all active restaurants, offers)"""
+    # Served from the precomputed snapshot; write endpoints invalidate the affected cards
+    snapshot = home_feed_cache.get(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
     
-    # Get restaurants (return all active to allow frontend to show 'Closed' state)
-    restaurants = db.query(Restaurant).filter(Restaurant.is_active == True).all()
-    # Construct response
-    data = {
-        "categories": [CategoryResponse.from_orm(c).dict() for c in categories],
-        "restaurants": [RestaurantResponse.from_orm(r).dict() for r in restaurants],
-        "offers": [
-            {
-                "id": 1,
-                "title": "Weekend Special",
-                "description": "Flat 30% off on all orders",
-                "image_url": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
-                "code": "WEEKEND30"
-            }
-        ]
-    }
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/restaurants/discover", response_model=APIResponse)
+def discover_restaurants(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    address_id: Optional[int] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=50),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_customer: Customer = Depends(get_current_customer)
+):
+    """
+    Active restaurants within radius_km of the customer, nearest first.
+    
+    Locate the customer with lat/lng or one of their saved address ids.
+    Pass next_cursor from the previous page to continue.
+    """
+    if address_id is not None:
+        address = db.query(CustomerAddress).filter(
+            CustomerAddress.id == address_id,
+            CustomerAddress.customer_id == current_customer.id
+        ).first()
+        if not address:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Address not found"
+            )
+        lat, lng = float(address.latitude), float(address.longitude)
+    elif lat is None or lng is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide lat and lng, or address_id"
+        )
+    
+    try:
+        data = RestaurantDiscoveryService.discover(
+            db, lat, lng,
+            radius_km=radius_km,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     return APIResponse(
         success=True,
-        message="Home data fetched successfully",
+        message="Nearby restaurants fetched successfully",
         data=data
     )
 
@@ -82,53 +131,27 @@ def get_home_data(
 @router.get("/restaurants/{restaurant_id}", response_model=APIResponse)
 def get_restaurant_details(
     restaurant_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
     """Get restaurant details, menu, and reviews"""
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    
-    if not restaurant:
+    # Served from the restaurant's menu snapshot; catalog writes bump its version
+    snapshot = menu_snapshot_cache.get(db, restaurant_id)
+    if snapshot is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restaurant not found"
         )
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
     
-    # Construct response with all details
-    # Note: In a real app, you might want to paginate reviews or menu items if there are many
-    
-    # Serialize basic info
-    restaurant_data = RestaurantResponse.from_orm(restaurant).dict()
-    
-    # Address
-    if restaurant.address:
-        restaurant_data["address"] = AddressResponse.from_orm(restaurant.address).dict()
-    else:
-        restaurant_data["address"] = None
-        
-    # Cuisines
-    restaurant_data["cuisines"] = [rc.cuisine.name for rc in restaurant.cuisines_rel if rc.cuisine]
-    
-    # Menu Items
-    # Grouping logic can be done here or in frontend. For now, sending flat list.
-    restaurant_data["menu"] = [MenuItemResponse.from_orm(item).dict() for item in restaurant.menu_items if item.is_available]
-    
-    # Reviews
-    # Fetch recent reviews
-    reviews = db.query(Review).filter(Review.restaurant_id == restaurant_id).order_by(Review.created_at.desc()).limit(5).all()
-    review_list = []
-    for review in reviews:
-        review_dict = ReviewResponse.from_orm(review).dict()
-        if review.customer:
-            review_dict["customer_name"] = review.customer.full_name or "Anonymous"
-        review_list.append(review_dict)
-        
-    restaurant_data["reviews"] = review_list
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    return APIResponse(
-        success=True,
-        message="Restaurant details fetched successfully",
-        data=restaurant_data
+    return Response(
+        content=snapshot.body("Restaurant details fetched successfully"),
+        media_type="application/json",
+        headers=headers
     )
 
 
@@ -143,104 +166,9 @@ def get_or_create_cart(db: Session, customer_id: int) -> Cart:
         db.refresh(cart)
     return cart
 
-def calculate_cart_totals(cart: Cart, db: Session = None, address_id: int = None) -> CartResponse:
-    item_total = Decimal("0.0")
-    items_response = []
-    
-    for item in cart.items:
-        # Ensure menu item price is used
-        price = item.menu_item.discount_price if item.menu_item.discount_price and item.menu_item.discount_price > 0 else item.menu_item.price
-        item_total += price * item.quantity
-        
-        # Create item response with calculated price
-        item_resp = CartItemResponse(
-            id=item.id,
-            menu_item_id=item.menu_item_id,
-            menu_item=MenuItemResponse.from_orm(item.menu_item),
-            quantity=item.quantity,
-            price=price
-        )
-        items_response.append(item_resp)
-        
-    # Calculate distance-based delivery fee
-    distance_km = None
-    if db and cart.restaurant_id and cart.customer_id:
-        # Get restaurant coordinates
-        restaurant = db.query(Restaurant).filter(Restaurant.id == cart.restaurant_id).first()
-        if restaurant and restaurant.address and restaurant.address.latitude is not None and restaurant.address.longitude is not None:
-            r_lat = float(restaurant.address.latitude)
-            r_lng = float(restaurant.address.longitude)
-            
-            # Find customer coordinates
-            c_lat = None
-            c_lng = None
-            
-            if address_id:
-                addr = db.query(CustomerAddress).filter(
-                    CustomerAddress.id == address_id,
-                    CustomerAddress.customer_id == cart.customer_id
-                ).first()
-                if addr and addr.latitude is not None and addr.longitude is not None:
-                    c_lat = float(addr.latitude)
-                    c_lng = float(addr.longitude)
-            else:
-                addr = db.query(CustomerAddress).filter(
-                    CustomerAddress.customer_id == cart.customer_id,
-                    CustomerAddress.is_default == True
-                ).first()
-                if not addr:
-                    addr = db.query(CustomerAddress).filter(
-                        CustomerAddress.customer_id == cart.customer_id
-                    ).first()
-                
-                if addr and addr.latitude is not None and addr.longitude is not None:
-                    c_lat = float(addr.latitude)
-                    c_lng = float(addr.longitude)
-                else:
-                    # Fallback to latest CustomerLocation
-                    loc = db.query(CustomerLocation).filter(
-                        CustomerLocation.customer_id == cart.customer_id
-                    ).order_by(CustomerLocation.created_at.desc()).first()
-                    if loc and loc.latitude is not None and loc.longitude is not None:
-                        c_lat = float(loc.latitude)
-                        c_lng = float(loc.longitude)
-            
-            if c_lat is not None and c_lng is not None:
-                import math
-                dlat = math.radians(c_lat - r_lat)
-                dlon = math.radians(c_lng - r_lng)
-                a = math.sin(dlat / 2)**2 + math.cos(math.radians(r_lat)) * math.cos(math.radians(c_lat)) * math.sin(dlon / 2)**2
-                c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-                distance_km = 6371.0 * c
-
-    if item_total > 0:
-        if distance_km is None:
-            delivery_fee = Decimal("40.0")
-        elif distance_km < 3.0:
-            delivery_fee = Decimal("40.0")
-        else:
-            # 40 base + 7 per km above 3 km
-            extra_km = distance_km - 3.0
-            delivery_fee = Decimal("40.0") + Decimal(str(round(extra_km * 7.0, 2)))
-    else:
-        delivery_fee = Decimal("0.0")
-        
-    tax_amount = item_total * Decimal("0.05") # 5% tax
-    discount_amount = Decimal("0.0") # Placeholder for promo code
-    
-    total_amount = item_total + delivery_fee + tax_amount - discount_amount
-    
-    return CartResponse(
-        id=cart.id,
-        restaurant_id=cart.restaurant_id,
-        restaurant_name=cart.restaurant.restaurant_name if cart.restaurant else None,
-        items=items_response,
-        item_total=item_total,
-        delivery_fee=delivery_fee,
-        tax_amount=tax_amount,
-        discount_amount=discount_amount,
-        total_amount=total_amount
-    )
+def calculate_cart_totals(cart: Cart, db: Session, address_id: int = None, promo_code: str = None) -> CartResponse:
+    # Lines, menu items and restaurant address load in one query; fee/surge/promo rules are in memory
+    return CartPricingService.price(db, cart, address_id, promo_code)
 
 @router.post("/cart/add", response_model=APIResponse)
 def add_to_cart(
@@ -284,7 +212,6 @@ def add_to_cart(
         db.add(cart_item)
         
     db.commit()
-    db.refresh(cart)
     
     return APIResponse(
         success=True,
@@ -294,15 +221,16 @@ def add_to_cart(
 
 @router.get("/cart", response_model=APIResponse)
 def get_cart(
+    promo_code: Optional[str] = None,
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
-    """Get cart details"""
+    """Get cart details (pass promo_code to preview a discount)"""
     cart = get_or_create_cart(db, current_customer.id)
     return APIResponse(
         success=True,
         message="Cart fetched successfully",
-        data=calculate_cart_totals(cart, db).dict()
+        data=calculate_cart_totals(cart, db, promo_code=promo_code).dict()
     )
 
 
@@ -321,7 +249,6 @@ def clear_cart(
     cart.restaurant_id = None
     
     db.commit()
-    db.refresh(cart)
     
     return APIResponse(
         success=True,
@@ -352,7 +279,6 @@ def update_cart_item(
         cart_item.quantity = request.quantity
         
     db.commit()
-    db.refresh(cart)
     
     return APIResponse(
         success=True,
@@ -376,7 +302,6 @@ def remove_cart_item(
     if cart_item:
         db.delete(cart_item)
         db.commit()
-        db.refresh(cart)
         
     return APIResponse(
         success=True,
@@ -386,106 +311,35 @@ def remove_cart_item(
 
 # ============= Order Endpoints =============
 
-import random
-import string
-
-def generate_order_number():
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))
-
 @router.post("/orders", response_model=APIResponse)
-async def create_order(
+def create_order(
     request: OrderCreateRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
-    """Create new order"""
-    try:
-        # 1. Validate Cart/Items
-        cart = get_or_create_cart(db, current_customer.id)
-        if not cart.items:
-            raise HTTPException(status_code=400, detail="Cart is empty")
-            
-        if cart.restaurant_id != request.restaurant_id:
-             raise HTTPException(status_code=400, detail="Cart restaurant mismatch")
-             
-        # Verify restaurant is still open
-        restaurant = db.query(Restaurant).filter(Restaurant.id == request.restaurant_id).first()
-        if not restaurant or not restaurant.is_active or not restaurant.is_open:
-            raise HTTPException(status_code=400, detail="Restaurant is currently offline and not accepting orders")
-
-        # 2. Get Address
-        address = db.query(CustomerAddress).filter(
-            CustomerAddress.id == request.address_id,
-            CustomerAddress.customer_id == current_customer.id
-        ).first()
-        
-        if not address:
-            delivery_address_str = "123 MG Road, Bangalore, Karnataka 560001"
-        else:
-            delivery_address_str = f"{address.address_line_1}, {address.city}, {address.pincode}"
+    """
+    Create new order from the cart
 
-        # 3. Calculate Totals
-        cart_totals = calculate_cart_totals(cart, db, request.address_id)
-        
-        # 4. Create Order
-        order = Order(
-            order_number=generate_order_number(),
-            restaurant_id=request.restaurant_id,
-            customer_id=current_customer.id,
-            customer_name=current_customer.full_name or "Guest",
-            customer_phone=current_customer.phone_number,
-            delivery_address=delivery_address_str,
-            status=OrderStatusEnum.PENDING.value,
-            total_amount=cart_totals.total_amount,
-            delivery_fee=cart_totals.delivery_fee,
-            tax_amount=cart_totals.tax_amount,
-            discount_amount=cart_totals.discount_amount,
-            payment_method=request.payment_method,
-            payment_status="success"
-        )
-        db.add(order)
-        db.flush() # Get order ID without committing yet
-        
-        # 5. Create Order Items
-        for item in cart.items:
-            price = item.menu_item.discount_price if item.menu_item.discount_price and item.menu_item.discount_price > 0 else item.menu_item.price
-            order_item = OrderItem(
-                order_id=order.id,
-                menu_item_id=item.menu_item_id,
-                quantity=item.quantity,
-                price=price
+    Send an `Idempotency-Key` header to make retries safe: repeating the
+    request with the same key returns the original order instead of placing
+    a second one (`Idempotent-Replayed: true` response header).
+    """
+    try:
+        placed = OrderPlacementService.place(db, current_customer, request, idempotency_key)
+        res_order_id = placed.order_id
+        res_order_number = placed.order_number
+        if placed.replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+            return APIResponse(
+                success=True,
+                message="Order placed successfully",
+                data={"order_id": res_order_id, "order_number": res_order_number}
             )
-            db.add(order_item)
-            
-        # 6. Clear Cart
-        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
-        cart.restaurant_id = None
-        
-        # Save order ID and number before commit to avoid expiration issues
-        res_order_id = order.id
-        res_order_number = order.order_number
-        
-        db.commit()
         
-        # Notify relevant parties about new order
-        try:
-            restaurant = db.query(Restaurant).filter(Restaurant.id == request.restaurant_id).first()
-            if restaurant:
-                # Use the comprehensive helper that notifies owner and delivery partners
-                await NotificationService.send_order_update(
-                    db=db,
-                    order_id=res_order_id,
-                    status="new",
-                    owner_id=restaurant.owner_id
-                )
-        except Exception as ne:
-            print(f"Notification error: {ne}")
-        
-        # Broadcast to Socket.IO
-        # from app.socket_manager import emit_new_order
-        # from app.schemas import OrderResponse
-        # order_data = OrderResponse.from_orm(order).dict()
-        # await emit_new_order(order_data)
+        # Notifications and the live broadcast were queued with the order
+        outbox_dispatcher.wake()
         
         return APIResponse(
             success=True,
@@ -609,28 +463,30 @@ def delete_address(
 
 @router.get("/orders", response_model=APIResponse)
 def get_order_history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
-    """Get customer order history"""
-    orders = db.query(Order).filter(
-        Order.customer_id == current_customer.id
-    ).order_by(Order.created_at.desc()).all()
-    
-    # Manually construct response to ensure restaurant details are included
-    # Pydantic's from_orm should handle the relationship if loaded, but let's be explicit
-    orders_data = []
-    for order in orders:
-        order_dict = OrderResponse.from_orm(order).dict()
-        # Ensure restaurant is populated
-        if order.restaurant:
-            order_dict['restaurant'] = RestaurantResponse.from_orm(order.restaurant).dict()
-        orders_data.append(order_dict)
+    """
+    Get customer order history, newest first, with a compact restaurant summary.
+    When there are more results, pass the X-Next-Cursor response header back as `cursor`.
+    """
+    try:
+        orders, next_cursor = customer_order_page(db, current_customer.id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return APIResponse(
         success=True,
         message="Order history fetched successfully",
-        data=orders_data
+        data=[OrderHistoryResponse(**order).dict() for order in orders]
     )
 
 @router.get("/orders/{order_id}", response_model=APIResponse)
@@ -722,7 +578,6 @@ def repeat_order(
             db.add(cart_item)
             
     db.commit()
-    db.refresh(cart)
     
     return APIResponse(
         success=True,
@@ -880,15 +735,18 @@ def track_order(
 @router.get("/orders/{order_id}/track-location", response_model=APIResponse)
 def track_delivery_partner_location(
     order_id: int,
+    include_history: bool = False,
+    history_limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
     current_customer: Customer = Depends(get_current_customer)
 ):
     """
     Track delivery partner's real-time location for an active order.
     Returns the current GPS location of the delivery partner assigned to this order.
+    The position comes from the latest-location store; the breadcrumb table is
+    only queried when include_history=true.
     """
     from sqlalchemy import text
-    from math import radians, sin, cos, sqrt, atan2
     
     # Get order
     order = db.query(Order).filter(
@@ -910,89 +768,103 @@ def track_delivery_partner_location(
             }
         )
     
-    # Get delivery partner's latest location
-    try:
-        query = text("""
-            SELECT latitude, longitude, accuracy, bearing, speed, created_at
-            FROM delivery_partner_locations
-            WHERE delivery_partner_id = :partner_id
-            AND (order_id = :order_id OR order_id IS NULL)
-            ORDER BY created_at DESC
-            LIMIT 1
-        """)
-        
-        result = db.execute(query, {
-            "partner_id": order.delivery_partner_id,
-            "order_id": order_id
-        }).fetchone()
-        
-        if result:
-            partner_lat, partner_lng, accuracy, bearing, speed, updated_at = result
-            
-            # Calculate distance if customer address has coordinates
-            # For now, return basic location data
-            # In production, you'd geocode the delivery address
-            
-            # Simple ETA estimation (very basic)
-            avg_speed_kmh = (speed * 3.6) if speed and speed > 0 else 20  # Convert m/s to km/h, default 20 km/h
-            estimated_distance_km = 2.0  # Mock distance, should calculate from addresses
-            eta_minutes = int((estimated_distance_km / avg_speed_kmh) * 60)
-            
-            return APIResponse(
-                success=True,
-                message="Delivery partner location retrieved",
-                data={
-                    "tracking_available": True,
-                    "delivery_partner": {
-                        "id": order.delivery_partner.id,
-                        "name": order.delivery_partner.full_name,
-                        "phone": order.delivery_partner.phone_number,
-                        "vehicle_type": order.delivery_partner.vehicle_type,
-                        "vehicle_number": order.delivery_partner.vehicle_number,
-                        "rating": float(order.delivery_partner.rating) if order.delivery_partner.rating else 5.0
-                    },
-                    "location": {
-                        "latitude": partner_lat,
-                        "longitude": partner_lng,
-                        "accuracy": accuracy,
-                        "bearing": bearing,
-                        "speed_mps": speed,
-                        "speed_kmh": round(speed * 3.6, 2) if speed else None,
-                        "last_updated": updated_at.isoformat() if updated_at else None
-                    },
-                    "eta_minutes": eta_minutes,
-                    "order_status": order.status
-                }
-            )
-        else:
-            return APIResponse(
-                success=True,
-                message="Delivery partner location not available",
-                data={
-                    "tracking_available": False,
-                    "delivery_partner": {
-                        "id": order.delivery_partner.id,
-                        "name": order.delivery_partner.full_name,
-                        "phone": order.delivery_partner.phone_number
-                    },
-                    "message": "Location will be available once delivery starts"
-                }
-            )
-    except Exception as e:
-        # Table doesn't exist yet or other error
+    partner = order.delivery_partner
+    
+    # Latest position: O(1) store lookup, falling back to the partner row
+    fix = location_store.get(order.delivery_partner_id)
+    if fix:
+        partner_lat, partner_lng = fix["latitude"], fix["longitude"]
+        accuracy, bearing, speed = fix.get("accuracy"), fix.get("bearing"), fix.get("speed")
+        updated_at = fix.get("created_at")
+    elif partner.latitude is not None and partner.longitude is not None:
+        partner_lat, partner_lng = float(partner.latitude), float(partner.longitude)
+        accuracy = bearing = speed = None
+        updated_at = partner.updated_at
+    else:
         return APIResponse(
             success=True,
-            message="Location tracking will be available soon",
+            message="Delivery partner location not available",
             data={
                 "tracking_available": False,
                 "delivery_partner": {
-                    "id": order.delivery_partner.id,
-                    "name": order.delivery_partner.full_name,
-                    "phone": order.delivery_partner.phone_number
-                } if order.delivery_partner else None,
-                "note": "Location tracking feature coming soon"
+                    "id": partner.id,
+                    "name": partner.full_name,
+                    "phone": partner.phone_number
+                },
+                "message": "Location will be available once delivery starts"
             }
         )
+    
+    # ETA for the current leg (restaurant before pickup, customer after)
+    eta = EtaService.for_order(db, order_id, fix=fix)
+    if eta:
+        eta_minutes = eta["delivery_eta_minutes"] if eta["delivery_eta_minutes"] is not None else eta["eta_minutes"]
+    else:
+        eta_minutes = None
+    
+    data = {
+        "tracking_available": True,
+        "delivery_partner": {
+            "id": partner.id,
+            "name": partner.full_name,
+            "phone": partner.phone_number,
+            "vehicle_type": partner.vehicle_type,
+            "vehicle_number": partner.vehicle_number,
+            "rating": float(partner.rating) if partner.rating else 5.0
+        },
+        "location": {
+            "latitude": partner_lat,
+            "longitude": partner_lng,
+            "accuracy": accuracy,
+            "bearing": bearing,
+            "speed_mps": speed,
+            "speed_kmh": round(speed * 3.6, 2) if speed else None,
+            "last_updated": updated_at.isoformat() if updated_at else None
+        },
+        "eta_minutes": eta_minutes,
+        "eta": eta,
+        "order_status": order.status
+    }
+    
+    if include_history:
+        # Breadcrumbs recorded for this order, newest first (uses the order_id index)
+        rows = db.execute(text("""
+            SELECT latitude, longitude, speed, created_at
+            FROM delivery_partner_locations
+            WHERE order_id = :order_id AND delivery_partner_id = :partner_id
+            ORDER BY created_at DESC
+            LIMIT :limit
+        """), {
+            "order_id": order_id,
+            "partner_id": order.delivery_partner_id,
+            "limit": history_limit
+        }).fetchall()
+        data["history"] = [
+            {
+                "latitude": row[0],
+                "longitude": row[1],
+                "speed_mps": row[2],
+                "timestamp": row[3].isoformat() if hasattr(row[3], "isoformat") else row[3]
+            }
+            for row in rows
+        ]
+        
+        # Breadcrumbs of delivered orders are compacted into a route summary
+        if not rows:
+            summary = db.query(DeliveryRouteSummary).filter(
+                DeliveryRouteSummary.order_id == order_id
+            ).first()
+            if summary:
+                data["history"] = [
+                    {"latitude": lat, "longitude": lng, "speed_mps": None, "timestamp": None}
+                    for lat, lng in reversed(decode_polyline(summary.polyline))
+                ][:history_limit]
+    
+    return APIResponse(
+        success=True,
+        message="Delivery partner location retrieved",
+        data=data
+    )
 
 
 @router.post("/orders/{order_id}/location", response_model=APIResponse)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app.services import catalog_events
 from app.dependencies import get_current_restaurant
 from app.schemas import APIResponse, DashboardResponse, DashboardSummary, QuickAction
 from app.models import Restaurant
@@ -97,6 +98,7 @@ def toggle_restaurant_status(
         restaurant.is_open = not restaurant.is_open
         db.commit()
         db.refresh(restaurant)
+        catalog_events.restaurant_changed(restaurant.id)
         
         status_text = "online" if restaurant.is_open else "offline"
         
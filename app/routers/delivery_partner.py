@@ -1,9 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, desc
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.routers.orders import broadcast_new_order
 from decimal import Decimal
 import os
 from app.utils.timezone import get_ist_now
@@ -21,7 +20,13 @@ from app.schemas import (
 )
 from app.services.otp_service import create_otp, verify_otp, send_otp_sms
 from app.services.jwt_service import create_access_token
-from app.services.notification_service import NotificationService
+from app.services.spatial_index import partner_index
+from app.services.location_ingest import location_ingestor
+from app.services.order_state_machine import OrderStateMachine, TRANSITIONS
+from app.services.assignment_service import assignment_service
+from app.services.available_orders import available_order_pool
+from app.services.order_projections import keyset_page, order_list_query, to_order_list_item
+from app.services.rider_earnings import RiderEarningsService
 from app.dependencies import get_current_delivery_partner
 # from app.socket_manager import emit_order_update
 from pydantic import BaseModel, Field
@@ -77,6 +82,7 @@ class OrderListResponse(BaseModel):
     status: str
     created_at: datetime
     estimated_delivery_time: Optional[datetime]
+    distance_km: Optional[float] = None
 
 
 class EarningsResponse(BaseModel):
@@ -351,6 +357,7 @@ async def toggle_online_status(
     
     db.commit()
     db.refresh(current_delivery_partner)
+    partner_index.sync_partner(current_delivery_partner)
     
     status_message = "You are now online and can receive orders" if status_data.is_online else "You are now offline"
     
@@ -372,10 +379,14 @@ async def update_location(
     db: Session = Depends(get_db)
 ):
     """Update current location coordinates of the delivery partner."""
-    current_delivery_partner.latitude = location_data.latitude
-    current_delivery_partner.longitude = location_data.longitude
+    location_ingestor.record(
+        current_delivery_partner.id,
+        location_data.latitude,
+        location_data.longitude
+    )
     
-    db.commit()
+    if current_delivery_partner.is_online and current_delivery_partner.is_active:
+        partner_index.set_online(current_delivery_partner.id, location_data.latitude, location_data.longitude)
     
     return APIResponse(
         success=True,
@@ -443,36 +454,30 @@ async def register_delivery_partner_device_token(
 # ============= Orders APIs =============
 @router.get("/orders/available", response_model=List[OrderListResponse])
 async def get_available_orders(
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_delivery_partner: DeliveryPartner = Depends(get_current_delivery_partner),
     db: Session = Depends(get_db)
 ):
     """
-    Get all orders that are ready for delivery pickup.
-    Available orders are in READY status and have no delivery partner assigned.
-    These are within 5km proximity of the delivery partner.
+    Get orders that are ready for delivery pickup, nearest first.
+    Available orders are in READY/HANDED_OVER status and have no delivery partner assigned.
+    These are within 5km of the delivery partner's last known location
+    (all available orders, newest first, if the location is unknown).
+    When there are more results, pass the X-Next-Cursor response header back as `cursor`.
     """
-    orders = db.query(Order).filter(
-        Order.status.in_([OrderStatusEnum.READY.value, OrderStatusEnum.HANDED_OVER.value]),
-        Order.delivery_partner_id == None
-    ).order_by(desc(Order.created_at)).all()
-    
-    result = []
-    for order in orders:
-        restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-        result.append(OrderListResponse(
-            id=order.id,
-            order_number=order.order_number,
-            restaurant_name=restaurant.restaurant_name if restaurant else "Unknown",
-            customer_name=order.customer_name,
-            customer_phone=order.customer_phone,
-            delivery_address=order.delivery_address,
-            total_amount=order.total_amount,
-            status=order.status,
-            created_at=order.created_at,
-            estimated_delivery_time=order.estimated_delivery_time
-        ))
+    try:
+        orders, next_cursor = available_order_pool.for_partner(db, current_delivery_partner, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return result
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [OrderListResponse(**order) for order in orders]
 
 
 @router.get("/orders/active", response_model=List[OrderListResponse])
@@ -484,7 +489,7 @@ async def get_active_orders(
     Get all active orders assigned to this delivery partner.
     Statuses: ASSIGNED (accepted), REACH ED_RESTAURANT (at hotel), PICKED_UP (on the way)
     """
-    orders = db.query(Order).filter(
+    rows = order_list_query(db).filter(
         Order.delivery_partner_id == current_delivery_partner.id,
         Order.status.in_([
             OrderStatusEnum.ASSIGNED.value,
@@ -497,56 +502,36 @@ async def get_active_orders(
         ])
     ).order_by(desc(Order.created_at)).all()
     
-    result = []
-    for order in orders:
-        restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-        result.append(OrderListResponse(
-            id=order.id,
-            order_number=order.order_number,
-            restaurant_name=restaurant.restaurant_name if restaurant else "Unknown",
-            customer_name=order.customer_name,
-            customer_phone=order.customer_phone,
-            delivery_address=order.delivery_address,
-            total_amount=order.total_amount,
-            status=order.status,
-            created_at=order.created_at,
-            estimated_delivery_time=order.estimated_delivery_time
-        ))
-    
-    return result
+    return [OrderListResponse(**to_order_list_item(row)) for row in rows]
 
 
 @router.get("/orders/completed", response_model=List[OrderListResponse])
 async def get_completed_orders(
-    limit: int = 50,
+    response: Response,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_delivery_partner: DeliveryPartner = Depends(get_current_delivery_partner),
     db: Session = Depends(get_db)
 ):
     """
-    Get delivery history - all completed deliveries.
+    Get delivery history - all completed deliveries, most recent first.
+    When there are more results, pass the X-Next-Cursor response header back as `cursor`.
     """
-    orders = db.query(Order).filter(
+    query = order_list_query(db).filter(
         Order.delivery_partner_id == current_delivery_partner.id,
         Order.status == OrderStatusEnum.DELIVERED.value
-    ).order_by(desc(Order.delivered_at)).limit(limit).all()
-    
-    result = []
-    for order in orders:
-        restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-        result.append(OrderListResponse(
-            id=order.id,
-            order_number=order.order_number,
-            restaurant_name=restaurant.restaurant_name if restaurant else "Unknown",
-            customer_name=order.customer_name,
-            customer_phone=order.customer_phone,
-            delivery_address=order.delivery_address,
-            total_amount=order.total_amount,
-            status=order.status,
-            created_at=order.created_at,
-            estimated_delivery_time=order.estimated_delivery_time
-        ))
+    )
+    try:
+        orders, next_cursor = keyset_page(query, Order.delivered_at, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return result
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [OrderListResponse(**order) for order in orders]
 
 
 @router.get("/orders/{order_id}", response_model=OrderDetailForDeliveryResponse)
@@ -616,6 +601,21 @@ async def get_order_details(
     )
 
 
+def _partner_transition(db: Session, name: str, order_id: int, partner: DeliveryPartner) -> APIResponse:
+    """Apply a delivery partner transition (one conditional UPDATE, see order_state_machine)"""
+    if name in ("partner_accept", "partner_reached"):
+        result = assignment_service.accept(db, order_id, partner.id, name)
+    elif name == "partner_release":
+        result = assignment_service.release(db, order_id, partner.id)
+    else:
+        result = OrderStateMachine.apply(db, name, order_id, partner_id=partner.id)
+    return APIResponse(
+        success=True,
+        message=TRANSITIONS[name].message,
+        data={"order_id": result.order_id, "status": result.status}
+    )
+
+
 @router.post("/orders/accept", response_model=APIResponse)
 @router.put("/orders/accept", response_model=APIResponse)
 async def accept_order_for_delivery_json(
@@ -638,55 +638,10 @@ async def accept_order_for_delivery(
     Step 1: Accept an order for delivery.
     Order must be in READY status (food is ready for pickup).
     This assigns the delivery partner and changes status to ASSIGNED.
+    The first partner to accept wins; everyone else gets 409 and the order
+    is retracted from their available list.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.status not in [OrderStatusEnum.READY.value, OrderStatusEnum.HANDED_OVER.value]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Order is not ready for pickup. Current status: {order.status}"
-        )
-    
-    if order.delivery_partner_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Order has already been accepted by another delivery partner"
-        )
-    
-    # Assign delivery partner and set status to ASSIGNED if not already handed over
-    order.delivery_partner_id = current_delivery_partner.id
-    if order.status != OrderStatusEnum.HANDED_OVER.value:
-        order.status = OrderStatusEnum.ASSIGNED.value
-    order.assigned_at = get_ist_now()
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Send notifications to Customer and Restaurant Owner
-    restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status=order.status,
-        customer_id=order.customer_id,
-        owner_id=restaurant.owner_id if restaurant else None,
-        delivery_partner_id=order.delivery_partner_id
-    )
-    
-    # Trigger Socket.IO broadcast for restaurant app
-    await broadcast_new_order(order.restaurant_id, order)
-    
-    return APIResponse(
-        success=True,
-        message="Order accepted for delivery successfully",
-        data={"order_id": order.id, "status": order.status}
-    )
+    return _partner_transition(db, "partner_accept", order_id, current_delivery_partner)
 
 
 @router.post("/orders/reached", response_model=APIResponse)
@@ -720,68 +675,7 @@ async def mark_reached_restaurant(
     
     This allows delivery partners to reach the restaurant and accept the order in one step.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Handle different status scenarios
-    if order.status in [OrderStatusEnum.READY.value, OrderStatusEnum.HANDED_OVER.value]:
-        # New flow: Delivery partner is at restaurant and accepting order
-        # Check if order is already assigned to someone else
-        if order.delivery_partner_id and order.delivery_partner_id != current_delivery_partner.id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Order has already been accepted by another delivery partner"
-            )
-        
-        # Assign the delivery partner
-        order.delivery_partner_id = current_delivery_partner.id
-        order.assigned_at = get_ist_now()
-        
-    elif order.status == OrderStatusEnum.ASSIGNED.value:
-        # Existing flow: Partner already accepted, now reached restaurant
-        if order.delivery_partner_id != current_delivery_partner.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="This order is not assigned to you"
-            )
-    else:
-        # Invalid status
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Cannot mark reached from current status: {order.status}. Order must be READY, HANDED_OVER or ASSIGNED."
-        )
-    
-    # Update status to REACHED_RESTAURANT
-    order.status = OrderStatusEnum.REACHED_RESTAURANT.value
-    order.reached_restaurant_at = get_ist_now()
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Send notifications
-    restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status="delivery_partner_reached",
-        customer_id=order.customer_id,
-        owner_id=restaurant.owner_id if restaurant else None,
-        delivery_partner_id=order.delivery_partner_id
-    )
-    
-    # Trigger Socket.IO broadcast for restaurant app
-    await broadcast_new_order(order.restaurant_id, order)
-    
-    return APIResponse(
-        success=True,
-        message="Reached restaurant successfully",
-        data={"order_id": order.id, "status": order.status}
-    )
+    return _partner_transition(db, "partner_reached", order_id, current_delivery_partner)
 
 
 @router.post("/orders/pickup", response_model=APIResponse)
@@ -808,53 +702,9 @@ async def mark_order_picked_up(
 ):
     """
     Step 3: Mark order as picked up from restaurant.
-    Order must be in REACHED_RESTAURANT status.
+    Order must be ASSIGNED, REACHED_RESTAURANT or HANDED_OVER and assigned to this partner.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.delivery_partner_id != current_delivery_partner.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This order is not assigned to you"
-        )
-    
-    if order.status not in [OrderStatusEnum.REACHED_RESTAURANT.value, OrderStatusEnum.HANDED_OVER.value, OrderStatusEnum.ASSIGNED.value]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid order status. Current status: {order.status}. Order must be ASSIGNED, REACHED_RESTAURANT or HANDED_OVER."
-        )
-    
-    # Update status to PICKED_UP
-    order.status = OrderStatusEnum.PICKED_UP.value
-    order.pickedup_at = get_ist_now()
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Send notifications
-    restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status="order_picked_up",
-        customer_id=order.customer_id,
-        owner_id=restaurant.owner_id if restaurant else None,
-        delivery_partner_id=order.delivery_partner_id
-    )
-    # Trigger Socket.IO broadcast for restaurant app
-    await broadcast_new_order(order.restaurant_id, order)
-    
-    return APIResponse(
-        success=True,
-        message="Order picked up successfully",
-        data={"order_id": order.id, "status": order.status}
-    )
+    return _partner_transition(db, "partner_picked_up", order_id, current_delivery_partner)
 
 
 # Alias endpoint for backward compatibility
@@ -891,53 +741,11 @@ async def cancel_order_delivery(
 ):
     """
     Cancel/Reject an order assigned to the delivery partner.
-    The order will be released and made available for other partners.
+    The order will be released and made available for other partners
+    (ASSIGNED / REACHED_RESTAURANT go back to READY).
     Order can only be cancelled if it hasn't been PICKED_UP yet.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.delivery_partner_id != current_delivery_partner.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This order is not assigned to you"
-        )
-    
-    if order.status == OrderStatusEnum.PICKED_UP.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Cannot cancel order after it has been picked up"
-        )
-    
-    # Release the order
-    order.delivery_partner_id = None
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Notify restaurant that delivery partner has released the order
-    restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status="partner_released",
-        customer_id=order.customer_id,
-        owner_id=restaurant.owner_id if restaurant else None
-    )
-    
-    # Trigger Socket.IO broadcast for restaurant app
-    await broadcast_new_order(order.restaurant_id, order)
-    
-    return APIResponse(
-        success=True,
-        message="Order released successfully. Other partners can now accept it.",
-        data={"order_id": order.id, "status": order.status}
-    )
+    return _partner_transition(db, "partner_release", order_id, current_delivery_partner)
 
 
 @router.post("/orders/complete", response_model=APIResponse)
@@ -966,53 +774,7 @@ async def mark_order_as_delivered(
     Step 4: Mark order as delivered (Final step - Delivery Partner Done).
     Order must be in PICKED_UP status and assigned to this delivery partner.
     """
-    order = db.query(Order).filter(Order.id == order_id).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    if order.delivery_partner_id != current_delivery_partner.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="This order is not assigned to you"
-        )
-    
-    if order.status != OrderStatusEnum.PICKED_UP.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Order is not out for delivery. Current status: {order.status}"
-        )
-    
-    # Update order status to DELIVERED
-    order.status = OrderStatusEnum.DELIVERED.value
-    order.delivered_at = get_ist_now()
-    order.completed_at = get_ist_now()
-    
-    db.commit()
-    db.refresh(order)
-    
-    # Send notifications to all parties
-    restaurant = db.query(Restaurant).filter(Restaurant.id == order.restaurant_id).first()
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status="delivered",
-        customer_id=order.customer_id,
-        owner_id=restaurant.owner_id if restaurant else None,
-        delivery_partner_id=order.delivery_partner_id
-    )
-    
-    # Trigger Socket.IO broadcast for restaurant app
-    await broadcast_new_order(order.restaurant_id, order)
-    
-    return APIResponse(
-        success=True,
-        message="Order marked as delivered successfully",
-        data={"order_id": order.id, "status": order.status}
-    )
+    return _partner_transition(db, "partner_delivered", order_id, current_delivery_partner)
 
 
 # ============= Earnings & Stats =============
@@ -1021,44 +783,9 @@ async def get_delivery_partner_earnings(
     current_delivery_partner: DeliveryPartner = Depends(get_current_delivery_partner),
     db: Session = Depends(get_db)
 ):
-    """Get earnings statistics for the delivery partner."""
-    now = get_ist_now()
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = today_start - timedelta(days=now.weekday())
-    month_start = today_start.replace(day=1)
-    
-    # Today's earnings
-    today_orders = db.query(func.sum(Order.delivery_fee)).filter(
-        Order.delivery_partner_id == current_delivery_partner.id,
-        Order.status == OrderStatusEnum.DELIVERED.value,
-        Order.delivered_at >= today_start
-    ).scalar() or Decimal("0.00")
-    
-    # Week's earnings
-    week_orders = db.query(func.sum(Order.delivery_fee)).filter(
-        Order.delivery_partner_id == current_delivery_partner.id,
-        Order.status == OrderStatusEnum.DELIVERED.value,
-        Order.delivered_at >= week_start
-    ).scalar() or Decimal("0.00")
-    
-    # Month's earnings
-    month_orders = db.query(func.sum(Order.delivery_fee)).filter(
-        Order.delivery_partner_id == current_delivery_partner.id,
-        Order.status == OrderStatusEnum.DELIVERED.value,
-        Order.delivered_at >= month_start
-    ).scalar() or Decimal("0.00")
-    
-    # Total deliveries
-    total_deliveries = db.query(func.count(Order.id)).filter(
-        Order.delivery_partner_id == current_delivery_partner.id,
-        Order.status == OrderStatusEnum.DELIVERED.value
-    ).scalar() or 0
-    
+    """Get earnings statistics for the delivery partner (from the daily earnings rollup)."""
     return EarningsResponse(
-        today_earnings=today_orders,
-        week_earnings=week_orders,
-        month_earnings=month_orders,
-        total_deliveries=total_deliveries,
+        **RiderEarningsService.summary(db, current_delivery_partner.id),
         avg_rating=current_delivery_partner.rating
     )
 
@@ -1116,57 +843,30 @@ async def update_delivery_partner_location(
     """
     Update delivery partner's current location.
     Should be called periodically (every 5-10 seconds) when partner is delivering an order.
+    The ping is buffered and written to the database in batches.
     """
-    # Import here to avoid circular dependencies
-    import sys
-    import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    fix = location_ingestor.record(
+        current_delivery_partner.id,
+        location_data.latitude,
+        location_data.longitude,
+        order_id=location_data.order_id,
+        accuracy=location_data.accuracy,
+        bearing=location_data.bearing,
+        speed=location_data.speed
+    )
     
-    # Create a simple location tracking record in-memory or use a separate table
-    # For now, we'll store it in a simple way
-    from sqlalchemy import text
+    if current_delivery_partner.is_online and current_delivery_partner.is_active:
+        partner_index.set_online(current_delivery_partner.id, location_data.latitude, location_data.longitude)
     
-    try:
-        # Store location in database
-        query = text("""
-            INSERT INTO delivery_partner_locations 
-            (delivery_partner_id, order_id, latitude, longitude, accuracy, bearing, speed, created_at, updated_at)
-            VALUES (:partner_id, :order_id, :lat, :lng, :accuracy, :bearing, :speed, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-        """)
-        
-        db.execute(query, {
-            "partner_id": current_delivery_partner.id,
-            "order_id": location_data.order_id,
-            "lat": location_data.latitude,
-            "lng": location_data.longitude,
-            "accuracy": location_data.accuracy,
-            "bearing": location_data.bearing,
-            "speed": location_data.speed
-        })
-        db.commit()
-        
-        return APIResponse(
-            success=True,
-            message="Location updated successfully",
-            data={
-                "latitude": location_data.latitude,
-                "longitude": location_data.longitude,
-                "timestamp": get_ist_now().isoformat()
-            }
-        )
-    except Exception as e:
-        # If table doesn't exist yet, return success anyway
-        # Location tracking is optional
-        return APIResponse(
-            success=True,
-            message="Location update received",
-            data={
-                "latitude": location_data.latitude,
-                "longitude": location_data.longitude,
-                "timestamp": get_ist_now().isoformat(),
-                "note": "Location tracking table will be created in next migration"
-            }
-        )
+    return APIResponse(
+        success=True,
+        message="Location updated successfully",
+        data={
+            "latitude": location_data.latitude,
+            "longitude": location_data.longitude,
+            "timestamp": fix["created_at"].isoformat()
+        }
+    )
 
 
 @router.get("/location/current", response_model=APIResponse)
@@ -1177,6 +877,21 @@ async def get_current_location(
     """Get delivery partner's most recent location."""
     from sqlalchemy import text
     
+    latest = location_ingestor.latest(current_delivery_partner.id)
+    if latest:
+        return APIResponse(
+            success=True,
+            message="Location retrieved successfully",
+            data={
+                "latitude": latest["latitude"],
+                "longitude": latest["longitude"],
+                "accuracy": latest["accuracy"],
+                "bearing": latest["bearing"],
+                "speed": latest["speed"],
+                "updated_at": latest["updated_at"].isoformat()
+            }
+        )
+    
     try:
         query = text("""
             SELECT latitude, longitude, accuracy, bearing, speed, updated_at
@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from typing import List, Optional
 from app.database import get_db
+from app.services import catalog_events
+from app.services.category_cache import category_cache
 from app.dependencies import get_current_restaurant
 from app.schemas import (
     MenuItemCreate, MenuItemUpdate, MenuItemResponse, APIResponse, MenuItemAvailability,
@@ -19,16 +21,10 @@ def get_menu_categories(
     db: Session = Depends(get_db)
 ):
     """Get all active menu categories"""
-    categories = db.query(Category).filter(
-        Category.is_active == True
-    ).order_by(Category.display_order, Category.name).all()
-    
-    category_list = [CategoryResponse.from_orm(cat).dict() for cat in categories]
-    
     return APIResponse(
         success=True,
         message="Menu categories retrieved successfully",
-        data={"categories": category_list}
+        data={"categories": category_cache.active(db)}
     )
 
 
@@ -60,60 +56,36 @@ def get_menu_items_grouped(
     restaurant: Restaurant = Depends(get_current_restaurant),
     db: Session = Depends(get_db)
 ):
-    """Get menu items grouped by categories (for UI display)"""
-    from collections import defaultdict
-    
-    # Check if categories exist, if not, try to seed them (Auto-Healing)
-    category_count = db.query(Category).count()
-    if category_count == 0:
-        try:
-            # Basic seed if table is empty
-            default_cats = [
-                "Starters", "Main Course", "Breads", "Rice & Biryani", 
-                "Desserts", "Beverages", "Snacks", "Combos"
-            ]
-            for i, name in enumerate(default_cats):
-                db.add(Category(name=name, display_order=i+1, is_active=True))
-            db.commit()
-        except Exception:
-            db.rollback() # Ignore errors if seeding fails (e.g. concurrent request)
-
-    # Get all menu items for this restaurant
-    items = db.query(MenuItem).filter(
+    """Get menu items grouped by categories (for UI display), in category display order"""
+    # One query: items with their category, already in group order
+    items = db.query(MenuItem).outerjoin(
+        Category, Category.id == MenuItem.category_id
+    ).options(
+        contains_eager(MenuItem.category)
+    ).filter(
         MenuItem.restaurant_id == restaurant.id
+    ).order_by(
+        Category.display_order, Category.name, MenuItem.id
     ).all()
     
-    # Group items by category
-    grouped_items = defaultdict(list)
+    categories_with_items = []
     uncategorized_items = []
     
     for item in items:
-        # Robust check: Ensure category_id is valid and category exists
-        if item.category_id:
-            # We fetch category name eagerly or fallback to "Unknown"
-            # Ideally, we should join, but for now let's be safe
-            if item.category:
-                 category_key = item.category.name
-                 grouped_items[category_key].append(MenuItemResponse.from_orm(item).dict())
-            else:
-                 # Category ID exists but record missing (Foreign Key issue?)
-                 uncategorized_items.append(MenuItemResponse.from_orm(item).dict())
-        else:
-            uncategorized_items.append(MenuItemResponse.from_orm(item).dict())
-    
-    # Build response with category groups
-    categories_with_items = []
-    
-    # Get all categories that have items
-    for category_name, category_items in sorted(grouped_items.items()):
-        # Get category details
-        category = db.query(Category).filter(Category.name == category_name).first()
-        
-        categories_with_items.append({
-            "category": CategoryResponse.from_orm(category).dict() if category else {"id": 0, "name": category_name, "is_active": True, "display_order": 0},
-            "items": category_items,
-            "item_count": len(category_items)
-        })
+        item_data = MenuItemResponse.from_orm(item).dict()
+        if item.category is None:
+            # No category, or category_id pointing at a missing row
+            uncategorized_items.append(item_data)
+            continue
+        if not categories_with_items or categories_with_items[-1]["category"]["id"] != item.category_id:
+            categories_with_items.append({
+                "category": category_cache.get(db, item.category_id) or item_data["category"],
+                "items": [],
+                "item_count": 0
+            })
+        group = categories_with_items[-1]
+        group["items"].append(item_data)
+        group["item_count"] += 1
     
     # Add uncategorized items if any
     if uncategorized_items:
@@ -168,6 +140,7 @@ def add_menu_item(
         db.add(menu_item)
         db.commit()
         db.refresh(menu_item)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -222,6 +195,7 @@ def update_menu_item(
         
         db.commit()
         db.refresh(menu_item)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -262,6 +236,7 @@ def delete_menu_item(
         
         db.delete(menu_item)
         db.commit()
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -301,6 +276,7 @@ def update_item_availability(
         menu_item.is_available = availability.is_available
         db.commit()
         db.refresh(menu_item)
+        catalog_events.restaurant_changed(restaurant.id)
         
         status_text = "available" if availability.is_available else "unavailable"
         
@@ -341,6 +317,7 @@ def mark_item_out_of_stock(
         menu_item.is_available = False
         db.commit()
         db.refresh(menu_item)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -393,6 +370,7 @@ def duplicate_menu_item(
         db.add(duplicate_item)
         db.commit()
         db.refresh(duplicate_item)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
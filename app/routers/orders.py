@@ -1,41 +1,134 @@
 from fastapi import APIRouter, Depends, HTTPException, status, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from collections import OrderedDict
 from datetime import datetime
 from app.database import get_db
 from app.dependencies import get_current_restaurant
 from app.schemas import OrderResponse, OrderStatusUpdate, APIResponse, OrderSummaryResponse, AcceptOrderRequest, RejectOrderRequest, CancelOrderRequest
 from app.models import Restaurant, Order, OrderStatusEnum
-from app.utils.timezone import get_ist_now
+from app.services.live_orders_bus import LiveOrdersBus
+from app.services.order_state_machine import OrderStateMachine, TRANSITIONS
+from app.config import get_settings
 # from app.socket_manager import emit_order_update
 import json
+import asyncio
+import logging
 
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class LiveConnection:
+    """
+    One live-orders socket with its own bounded outbound queue.
+
+    A writer task drains the queue so a slow socket never holds up the
+    others. Messages with the same key (an order id) replace the stale
+    snapshot still waiting in the queue; when the queue is full the oldest
+    message is dropped. A send that errors or exceeds the timeout evicts
+    the socket.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_evict,
+        max_pending: Optional[int] = None,
+        send_timeout: Optional[float] = None
+    ):
+        self.websocket = websocket
+        self.max_pending = max_pending if max_pending is not None else settings.LIVE_MAX_PENDING_MESSAGES
+        self.send_timeout = send_timeout if send_timeout is not None else settings.LIVE_SEND_TIMEOUT_SECONDS
+        self.dropped = 0
+        self.closed = False
+        self._on_evict = on_evict
+        self._pending: "OrderedDict[object, str]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._writer = asyncio.create_task(self._drain())
+
+    def enqueue(self, message: str, key: Optional[str] = None):
+        if self.closed:
+            return
+        if key is None:
+            key = object()  # never coalesced
+        elif key in self._pending:
+            del self._pending[key]
+            self.dropped += 1
+        self._pending[key] = message
+        while len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._wakeup.set()
+
+    async def _drain(self):
+        while not self.closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending and not self.closed:
+                _, message = self._pending.popitem(last=False)
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(message), timeout=self.send_timeout)
+                except Exception as e:
+                    logger.warning(f"Evicting live orders socket: {e!r}")
+                    await self.close()
+                    self._on_evict(self)
+                    return
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        self._wakeup.set()
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        try:
+            await asyncio.wait_for(self.websocket.close(), timeout=1)
+        except Exception:
+            pass
 
 
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: dict[int, List[WebSocket]] = {}
+        self.active_connections: dict[int, List[LiveConnection]] = {}
+        # Broadcasts go through pub/sub so every worker reaches its own sockets
+        self.bus = LiveOrdersBus(self.deliver_local)
     
-    async def connect(self, websocket: WebSocket, restaurant_id: int):
+    async def connect(self, websocket: WebSocket, restaurant_id: int) -> LiveConnection:
         await websocket.accept()
+        connection = LiveConnection(websocket, on_evict=lambda conn: self._remove(conn, restaurant_id))
         if restaurant_id not in self.active_connections:
             self.active_connections[restaurant_id] = []
-        self.active_connections[restaurant_id].append(websocket)
+        self.active_connections[restaurant_id].append(connection)
+        return connection
+    
+    async def disconnect(self, websocket: WebSocket, restaurant_id: int):
+        for connection in list(self.active_connections.get(restaurant_id, [])):
+            if connection.websocket is websocket:
+                self._remove(connection, restaurant_id)
+                await connection.close()
     
-    def disconnect(self, websocket: WebSocket, restaurant_id: int):
-        if restaurant_id in self.active_connections:
-            self.active_connections[restaurant_id].remove(websocket)
+    def _remove(self, connection: LiveConnection, restaurant_id: int):
+        connections = self.active_connections.get(restaurant_id)
+        if connections and connection in connections:
+            connections.remove(connection)
+            if not connections:
+                del self.active_connections[restaurant_id]
     
     async def send_to_restaurant(self, restaurant_id: int, message: dict):
-        if restaurant_id in self.active_connections:
-            for connection in self.active_connections[restaurant_id]:
-                try:
-                    await connection.send_json(message)
-                except:
-                    pass
+        order = message.get("order") or {}
+        key = f"order:{order['id']}" if order.get("id") is not None else None
+        await self.bus.publish(restaurant_id, json.dumps(jsonable_encoder(message)), key)
+    
+    async def deliver_local(self, restaurant_id: int, message: str, key: Optional[str] = None):
+        """Queue an already serialized message on every socket held by this process"""
+        for connection in list(self.active_connections.get(restaurant_id, [])):
+            connection.enqueue(message, key)
 
 
 manager = ConnectionManager()
@@ -165,7 +258,22 @@ def fetch_orders(
         )
 
 
-from app.services.notification_service import NotificationService
+# Restaurant-side status -> order_state_machine transition
+STATUS_TRANSITIONS = {
+    OrderStatusEnum.ACCEPTED: "accept",
+    OrderStatusEnum.PREPARING: "preparing",
+    OrderStatusEnum.READY: "ready",
+    OrderStatusEnum.HANDED_OVER: "handed_over",
+    OrderStatusEnum.PICKED_UP: "picked_up",
+    OrderStatusEnum.DELIVERED: "delivered",
+    OrderStatusEnum.REJECTED: "reject",
+    OrderStatusEnum.CANCELLED: "cancel",
+}
+
+
+def _order_data(order: Order) -> dict:
+    return OrderResponse.from_orm(order).dict()
+
 
 # Helper to handle status updates
 async def update_order_status_helper(
@@ -173,55 +281,24 @@ async def update_order_status_helper(
     new_status: OrderStatusEnum,
     restaurant_id: int,
     db: Session,
-    timestamp_field: str = None
+    values: dict = None
 ):
-    order = db.query(Order).filter(
-        Order.id == order_id,
-        Order.restaurant_id == restaurant_id
-    ).first()
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Order not found"
-        )
-    
-    # Update status (ensure lowercase string for DB consistency)
-    order.status = new_status.value if hasattr(new_status, 'value') else str(new_status).lower()
-    
-    # Update timestamp if specified
-    if timestamp_field:
-        setattr(order, timestamp_field, get_ist_now())
-        
-    # Special case for delivered
-    if new_status == OrderStatusEnum.DELIVERED:
-        order.completed_at = get_ist_now()
-        
-    db.commit()
-    db.refresh(order)
-    
-    # Broadcast to restaurant WebSocket
-    await broadcast_new_order(restaurant_id, order)
-    
-    # Send FCM notification and save to DB
-    await NotificationService.send_order_update(
-        db=db,
-        order_id=order.id,
-        status=new_status.value,
-        customer_id=order.customer_id,
-        owner_id=order.restaurant.owner_id if order.restaurant else None,
-        delivery_partner_id=order.delivery_partner_id
+    """
+    Move one of the restaurant's orders to new_status.
+    One conditional UPDATE; the live broadcast and notifications go out via the outbox.
+    """
+    result = OrderStateMachine.apply(
+        db,
+        STATUS_TRANSITIONS[new_status],
+        order_id,
+        restaurant_id=restaurant_id,
+        values=values,
+        render=_order_data
     )
-    
-    # Broadcast to Socket.IO
-    # from app.schemas import OrderResponse
-    # order_data = OrderResponse.from_orm(order).dict()
-    # await emit_order_update(order_data, event_type=f"order_{new_status.value}")
-    
     return APIResponse(
         success=True,
-        message=f"Order marked as {new_status.value}",
-        data=OrderResponse.from_orm(order).dict()
+        message=TRANSITIONS[STATUS_TRANSITIONS[new_status]].message,
+        data=result.data
     )
 
 
@@ -236,9 +313,8 @@ async def accept_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.ACCEPTED, 
-        restaurant.id, 
-        db, 
-        "accepted_at"
+        restaurant.id,
+        db
     )
 
 
@@ -253,9 +329,8 @@ async def accept_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.ACCEPTED, 
-        restaurant.id, 
-        db, 
-        "accepted_at"
+        restaurant.id,
+        db
     )
 
 
@@ -270,9 +345,8 @@ async def preparing_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.PREPARING, 
-        restaurant.id, 
-        db, 
-        "preparing_at"
+        restaurant.id,
+        db
     )
 
 
@@ -287,9 +361,8 @@ async def preparing_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.PREPARING, 
-        restaurant.id, 
-        db, 
-        "preparing_at"
+        restaurant.id,
+        db
     )
 
 
@@ -304,9 +377,8 @@ async def ready_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.READY, 
-        restaurant.id, 
-        db, 
-        "ready_at"
+        restaurant.id,
+        db
     )
 
 
@@ -321,9 +393,8 @@ async def ready_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.READY, 
-        restaurant.id, 
-        db, 
-        "ready_at"
+        restaurant.id,
+        db
     )
 
 
@@ -340,9 +411,8 @@ async def pickedup_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.PICKED_UP, 
-        restaurant.id, 
-        db, 
-        "pickedup_at"
+        restaurant.id,
+        db
     )
 
 
@@ -359,9 +429,8 @@ async def pickedup_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.PICKED_UP, 
-        restaurant.id, 
-        db, 
-        "pickedup_at"
+        restaurant.id,
+        db
     )
 
 
@@ -376,9 +445,8 @@ async def delivered_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.DELIVERED, 
-        restaurant.id, 
-        db, 
-        "delivered_at"
+        restaurant.id,
+        db
     )
 
 
@@ -393,9 +461,8 @@ async def delivered_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.DELIVERED, 
-        restaurant.id, 
-        db, 
-        "delivered_at"
+        restaurant.id,
+        db
     )
 
 
@@ -412,9 +479,8 @@ async def handover_order_json(
     return await update_order_status_helper(
         request.order_id, 
         OrderStatusEnum.HANDED_OVER, 
-        restaurant.id, 
-        db, 
-        "handed_over_at"
+        restaurant.id,
+        db
     )
 
 
@@ -431,9 +497,8 @@ async def handover_order(
     return await update_order_status_helper(
         order_id, 
         OrderStatusEnum.HANDED_OVER, 
-        restaurant.id, 
-        db, 
-        "handed_over_at"
+        restaurant.id,
+        db
     )
 
 
@@ -457,48 +522,13 @@ async def reject_order(
     db: Session = Depends(get_db)
 ):
     """Reject an order"""
-    try:
-        order = db.query(Order).filter(
-            Order.id == order_id,
-            Order.restaurant_id == restaurant.id
-        ).first()
-        
-        if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found"
-            )
-        
-        order.status = OrderStatusEnum.REJECTED
-        order.rejected_at = get_ist_now()
-        order.rejection_reason = status_update.rejection_reason
-        db.commit()
-        db.refresh(order)
-        
-        # Send notification to customer
-        await NotificationService.send_order_update(
-            db=db,
-            order_id=order.id,
-            status="rejected",
-            customer_id=order.customer_id
-        )
-        
-        # Broadcast update
-        await broadcast_new_order(restaurant.id, order)
-        
-        return APIResponse(
-            success=True,
-            message="Order rejected successfully",
-            data=OrderResponse.from_orm(order).dict()
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to reject order: {str(e)}"
-        )
+    return await update_order_status_helper(
+        order_id,
+        OrderStatusEnum.REJECTED,
+        restaurant.id,
+        db,
+        values={"rejection_reason": status_update.rejection_reason}
+    )
 
 
 @router.post("/cancel", response_model=APIResponse)
@@ -520,47 +550,12 @@ async def cancel_order(
     db: Session = Depends(get_db)
 ):
     """Cancel an order"""
-    try:
-        order = db.query(Order).filter(
-            Order.id == order_id,
-            Order.restaurant_id == restaurant.id
-        ).first()
-        
-        if not order:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Order not found"
-            )
-        
-        order.status = OrderStatusEnum.CANCELLED
-        order.rejected_at = get_ist_now() # Use rejected_at as generic terminal stamp if cancelled_at not present
-        db.commit()
-        db.refresh(order)
-        
-        # Send notification to customer
-        await NotificationService.send_order_update(
-            db=db,
-            order_id=order.id,
-            status="cancelled",
-            customer_id=order.customer_id
-        )
-        
-        # Broadcast update
-        await broadcast_new_order(restaurant.id, order)
-        
-        return APIResponse(
-            success=True,
-            message="Order cancelled successfully",
-            data=OrderResponse.from_orm(order).dict()
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to cancel order: {str(e)}"
-        )
+    return await update_order_status_helper(
+        order_id,
+        OrderStatusEnum.CANCELLED,
+        restaurant.id,
+        db
+    )
 
 
 @router.get("/{order_id}", response_model=APIResponse)
@@ -669,19 +664,21 @@ async def websocket_live_orders(
             return
         
         # Connect to WebSocket
-        await manager.connect(websocket, restaurant.id)
+        connection = await manager.connect(websocket, restaurant.id)
         
         try:
             while True:
                 # Wait for messages (keep connection alive)
                 data = await websocket.receive_text()
                 
-                # Handle ping/pong
+                # Handle ping/pong (queued so it never races the writer task)
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    connection.enqueue("pong")
         
         except WebSocketDisconnect:
-            manager.disconnect(websocket, restaurant.id)
+            pass
+        finally:
+            await manager.disconnect(websocket, restaurant.id)
     
     except Exception as e:
         print(f"WebSocket error: {e}")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.services import catalog_events
 from app.dependencies import get_current_owner, get_current_restaurant
 from app.schemas import (
     RestaurantCreate, RestaurantUpdate, RestaurantResponse, APIResponse,
@@ -16,6 +17,7 @@ from app.models import (
 )
 from app.services.s3_service import s3_service
 from app.services.verification_service import VerificationService
+from app.services.menu_snapshot import build_menu_details
 import uuid
 
 router = APIRouter(prefix="/restaurant", tags=["Restaurant"])
@@ -152,6 +154,7 @@ def create_restaurant_details(
         
         db.commit()
         db.refresh(restaurant)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -190,6 +193,7 @@ def update_restaurant_details(
         
         db.commit()
         db.refresh(restaurant)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -215,6 +219,7 @@ def update_restaurant_status(
         restaurant.is_open = is_open
         db.commit()
         db.refresh(restaurant)
+        catalog_events.restaurant_changed(restaurant.id)
         
         status_msg = "opened" if is_open else "closed"
         return APIResponse(
@@ -236,46 +241,11 @@ def get_restaurant_details(
     db: Session = Depends(get_db)
 ):
     """Get restaurant details"""
-    # Serialize basic info manually to avoid Pydantic validation errors on missing relationships
-    restaurant_data = RestaurantResponse.from_orm(restaurant).dict()
-    
-    # Safely handle Address
-    if restaurant.address:
-        restaurant_data["address"] = AddressResponse.from_orm(restaurant.address).dict()
-    else:
-        restaurant_data["address"] = None
-        
-    # Safely handle Cuisines
-    if restaurant.cuisines_rel:
-        restaurant_data["cuisines"] = [rc.cuisine.name for rc in restaurant.cuisines_rel if rc.cuisine]
-    else:
-        restaurant_data["cuisines"] = []
-        
-    # Safely handle Menu Items
-    # (Optional: usually fetched separately, but included in full details)
-    if restaurant.menu_items:
-        restaurant_data["menu"] = [MenuItemResponse.from_orm(item).dict() for item in restaurant.menu_items if item.is_available]
-    else:
-        restaurant_data["menu"] = []
-        
-    # Safely handle Reviews
-    if restaurant.reviews:
-        # Limit to recent 5 reviews
-        reviews = sorted(restaurant.reviews, key=lambda r: r.created_at, reverse=True)[:5]
-        review_list = []
-        for review in reviews:
-            review_dict = ReviewResponse.from_orm(review).dict()
-            if review.customer:
-                review_dict["customer_name"] = review.customer.full_name or "Anonymous"
-            review_list.append(review_dict)
-        restaurant_data["reviews"] = review_list
-    else:
-        restaurant_data["reviews"] = []
-    
+    # Built fresh (no snapshot) so owners see their own edits from any worker
     return APIResponse(
         success=True,
         message="Restaurant details retrieved successfully",
-        data=restaurant_data
+        data=build_menu_details(db, restaurant.id)
     )
 
 
@@ -322,6 +292,7 @@ def add_restaurant_cuisines(
             db.add(restaurant_cuisine)
         
         db.commit()
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -380,6 +351,7 @@ def create_restaurant_address(
         
         db.commit()
         db.refresh(address)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -433,6 +405,7 @@ def update_restaurant_address(
         
         db.commit()
         db.refresh(address)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -531,6 +504,7 @@ def confirm_document_upload(
             db.add(document)
         
         db.commit()
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
@@ -556,6 +530,7 @@ def submit_kyc(
     """Submit restaurant for KYC verification"""
     try:
         VerificationService.submit_for_verification(db, restaurant.id)
+        catalog_events.restaurant_changed(restaurant.id)
         
         return APIResponse(
             success=True,
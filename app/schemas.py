@@ -386,11 +386,25 @@ class OrderResponse(BaseModel):
     created_at: datetime
     items: List[OrderItemResponse] = []
     restaurant: Optional[RestaurantResponse] = None
-    
+
     class Config:
         from_attributes = True
 
 
+class RestaurantSummaryResponse(BaseModel):
+    """Just enough restaurant for an order card"""
+    id: int
+    restaurant_name: str
+    image_url: Optional[str] = None
+    average_rating: Decimal
+    is_open: bool
+
+
+class OrderHistoryResponse(OrderResponse):
+    """Customer order history entry: the order with a compact restaurant"""
+    restaurant: Optional[RestaurantSummaryResponse] = None
+
+
 class OrderStatusUpdate(BaseModel):
     status: str
     rejection_reason: Optional[str] = None
@@ -474,6 +488,7 @@ class OrderCreateRequest(BaseModel):
     restaurant_id: int
     address_id: int
     payment_method: str
+    promo_code: Optional[str] = None
     items: Optional[List[dict]] = None # Optional if using cart
 
 
@@ -572,8 +587,11 @@ class CartResponse(BaseModel):
     # Bill Details
     item_total: Decimal
     delivery_fee: Decimal
+    surge_multiplier: Decimal = Decimal("1.0")
     tax_amount: Decimal
     discount_amount: Decimal = Decimal("0.0")
+    promo_code: Optional[str] = None  # Applied code
+    promo_error: Optional[str] = None  # Why a requested code was not applied
     total_amount: Decimal
     
     class Config:
@@ -0,0 +1,128 @@
+"""
+First-wins assignment of delivery partners to orders.
+
+A READY order is offered to every online partner nearby, and they all race
+to accept it. The winner is decided by the state machine's conditional
+UPDATE (delivery_partner_id IS NULL in the WHERE clause): exactly one
+request matches the row, every other one updates nothing and gets a 409.
+
+On top of that:
+- Taken orders are remembered for ASSIGNMENT_TAKEN_TTL_SECONDS (a few
+  seconds), so the burst of late accepts that follows every offer is
+  answered with a 409 without touching the database. Only "must be
+  unassigned" transitions (partner_accept) use this shortcut; everything
+  else always goes to the state machine.
+- As soon as the winner's transaction commits, the other partners who were
+  offered the order get a silent "order_taken" push, so their apps drop it
+  from the available list without polling.
+
+The taken-order memory is per process and is not shared: a release
+forgets the order only in the worker that handled it. Another worker that
+saw the order taken can keep answering 409 for a released (READY,
+unassigned) order until its entry expires, which is why the TTL is kept
+short rather than the release being broadcast to every worker. A worker
+that has not seen the assignment still gets the right answer from the
+conditional UPDATE.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.services.notification_service import NotificationService
+from app.services.order_state_machine import (
+    ORDER_TAKEN_DETAIL, PARTNER_UNASSIGNED, TRANSITIONS, OrderStateMachine, TransitionResult
+)
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+CACHE_LIMIT = 20000
+UNKNOWN_PARTNER = 0  # Taken, but the 409 didn't say by whom
+
+
+class AssignmentService:
+    def __init__(self, ttl_seconds: float = settings.ASSIGNMENT_TAKEN_TTL_SECONDS, limit: int = CACHE_LIMIT):
+        self.ttl_seconds = ttl_seconds
+        self.limit = limit
+        self._taken: "OrderedDict[int, tuple]" = OrderedDict()  # order_id -> (partner_id, expires_at)
+        self._lock = threading.Lock()
+        self.fast_rejections = 0
+
+    def taken_by(self, order_id: int) -> Optional[int]:
+        """Partner known to hold the order (UNKNOWN_PARTNER if only known to be taken), else None"""
+        with self._lock:
+            entry = self._taken.get(order_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._taken[order_id]
+                return None
+            return entry[0]
+
+    def mark_taken(self, order_id: int, partner_id: int):
+        with self._lock:
+            self._taken.pop(order_id, None)
+            self._taken[order_id] = (partner_id, time.monotonic() + self.ttl_seconds)
+            while len(self._taken) > self.limit:
+                self._taken.popitem(last=False)
+
+    def forget(self, order_id: int):
+        with self._lock:
+            self._taken.pop(order_id, None)
+
+    def accept(self, db: Session, order_id: int, partner_id: int, transition: str = "partner_accept") -> TransitionResult:
+        """
+        Assign the order to partner_id ("partner_accept", or "partner_reached"
+        which also claims an unassigned order).
+
+        Raises:
+            HTTPException: 409 if another partner already has the order, plus
+                the state machine's errors
+        """
+        winner = self.taken_by(order_id)
+        # Only a transition that needs an unassigned order is refused from memory
+        if TRANSITIONS[transition].partner == PARTNER_UNASSIGNED and winner not in (None, partner_id):
+            self.fast_rejections += 1
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_TAKEN_DETAIL)
+
+        try:
+            result = OrderStateMachine.apply(db, transition, order_id, partner_id=partner_id)
+        except HTTPException as e:
+            if e.status_code == status.HTTP_409_CONFLICT and e.detail == ORDER_TAKEN_DETAIL:
+                self.mark_taken(order_id, UNKNOWN_PARTNER)
+            raise
+
+        self.mark_taken(order_id, partner_id)
+        # A partner_reached on an order the partner already holds offered it to nobody
+        if result.assigned:
+            self.retract(db, order_id, partner_id)
+        return result
+
+    def release(self, db: Session, order_id: int, partner_id: int) -> TransitionResult:
+        """
+        Give the order back to the pool. It can be accepted again straight
+        away through this worker; others may refuse it until their
+        taken-order entry expires (ASSIGNMENT_TAKEN_TTL_SECONDS).
+        """
+        result = OrderStateMachine.apply(db, "partner_release", order_id, partner_id=partner_id)
+        self.forget(order_id)
+        return result
+
+    @staticmethod
+    def retract(db: Session, order_id: int, partner_id: int):
+        """Best effort: the assignment is committed whether or not the push goes out"""
+        try:
+            sent = NotificationService.retract_available_order(db, order_id, taken_by=partner_id)
+            logger.info("Order %s taken by partner %s; retracted from %s devices", order_id, partner_id, sent)
+        except Exception:
+            logger.exception("Failed to retract order %s from other partners", order_id)
+
+
+assignment_service = AssignmentService()
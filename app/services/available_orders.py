@@ -0,0 +1,203 @@
+"""
+The pool of orders waiting for a delivery partner (/delivery-partner/orders/available).
+
+An order is available while it is READY or HANDED_OVER and unassigned.
+Riders poll the list constantly, so:
+- the pool is read with one query that joins the restaurant name and
+  position, prefiltered in SQL to a bounding box around the rider;
+- rows are cached per geocell (AVAILABLE_ORDERS_CELL_KM square). A cell's
+  entry holds every available order whose restaurant is within radius of
+  any point in the cell, so riders in the same cell share one query and the
+  exact distance is computed per rider in Python;
+- results are sorted by (distance, order id) and paged with a keyset cursor.
+
+The state machine calls order_pool_changed() after any transition that moves
+an order into or out of the pool. Only the cells around that restaurant are
+dropped, or every cell if the restaurant's position is not known yet.
+Invalidation is per process, so entries also expire after
+AVAILABLE_ORDERS_CACHE_SECONDS to pick up changes made by other workers.
+
+Riders with no known position see the whole pool, newest first, the same
+way online partners without coordinates are still notified of every order.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Address, Order, OrderStatusEnum
+from app.services.location_store import location_store
+from app.services.notification_service import NEARBY_PARTNER_RADIUS_KM
+from app.services.order_projections import order_list_query, to_order_list_item
+from app.utils.geo import KM_PER_DEGREE_LAT, bounding_box, haversine_km
+from app.utils.pagination import decode_cursor, encode_cursor, position_after
+
+settings = get_settings()
+
+AVAILABLE_STATUSES = (OrderStatusEnum.READY.value, OrderStatusEnum.HANDED_OVER.value)
+CACHE_LIMIT = 5000
+
+Box = Tuple[float, float, float, float]
+
+
+def _available_rows(db: Session, *filters) -> List[dict]:
+    """Available orders with restaurant name and position, one query"""
+    rows = order_list_query(db, Address.latitude, Address.longitude).outerjoin(
+        Address, Address.restaurant_id == Order.restaurant_id
+    ).filter(
+        Order.status.in_(AVAILABLE_STATUSES),
+        Order.delivery_partner_id == None,
+        *filters
+    ).all()
+    return [
+        dict(
+            to_order_list_item(row),
+            latitude=float(row.latitude) if row.latitude is not None else None,
+            longitude=float(row.longitude) if row.longitude is not None else None
+        )
+        for row in rows
+    ]
+
+
+class AvailableOrderPool:
+    def __init__(
+        self,
+        radius_km: float = NEARBY_PARTNER_RADIUS_KM,
+        cell_size_km: Optional[float] = None,
+        ttl_seconds: Optional[float] = None,
+        limit: int = CACHE_LIMIT
+    ):
+        self.radius_km = radius_km
+        self.cell_size_km = cell_size_km if cell_size_km is not None else settings.AVAILABLE_ORDERS_CELL_KM
+        self.cell_deg = self.cell_size_km / KM_PER_DEGREE_LAT
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.AVAILABLE_ORDERS_CACHE_SECONDS
+        self.limit = limit
+        # cell (None for unlocated riders) -> (box, expires_at, rows)
+        self._cells: "OrderedDict[Optional[tuple], tuple]" = OrderedDict()
+        self._restaurants: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # Bumped by invalidate(); a load that raced one is not cached
+        self.queries = 0
+
+    def _cell(self, lat: float, lng: float) -> tuple:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def _cell_box(self, cell: tuple) -> Box:
+        """Box holding every restaurant within radius of some point in the cell"""
+        center_lat = (cell[0] + 0.5) * self.cell_deg
+        center_lng = (cell[1] + 0.5) * self.cell_deg
+        # A cell is cell_deg on each side, so no point in it is more than cell_size_km from the center
+        return bounding_box(center_lat, center_lng, self.radius_km + self.cell_size_km)
+
+    def _rows(self, db: Session, cell: Optional[tuple]) -> List[dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cells.get(cell)
+            if entry is not None and entry[1] > now:
+                self._cells.move_to_end(cell)
+                return entry[2]
+            generation = self._generation
+
+        box = None
+        if cell is None:
+            rows = _available_rows(db)
+        else:
+            box = self._cell_box(cell)
+            min_lat, max_lat, min_lng, max_lng = box
+            rows = _available_rows(
+                db,
+                Address.latitude.between(min_lat, max_lat),
+                Address.longitude.between(min_lng, max_lng)
+            )
+        self.queries += 1
+
+        with self._lock:
+            if generation == self._generation:
+                self._cells[cell] = (box, now + self.ttl_seconds, rows)
+                self._cells.move_to_end(cell)
+                while len(self._cells) > self.limit:
+                    self._cells.popitem(last=False)
+            for row in rows:
+                if row["latitude"] is not None:
+                    self._restaurants[row["restaurant_id"]] = (row["latitude"], row["longitude"])
+        return rows
+
+    def invalidate(self, restaurant_id: Optional[int] = None):
+        """Drop the cells that can see this restaurant's orders (all cells if None or unknown)"""
+        with self._lock:
+            self._generation += 1
+            position = self._restaurants.get(restaurant_id) if restaurant_id is not None else None
+            if position is None:
+                self._cells.clear()
+                return
+            lat, lng = position
+            for cell, (box, _, _) in list(self._cells.items()):
+                if box is None or (box[0] <= lat <= box[1] and box[2] <= lng <= box[3]):
+                    del self._cells[cell]
+
+    def page(
+        self,
+        db: Session,
+        lat: Optional[float],
+        lng: Optional[float],
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        One page of available orders with distance_km, nearest first, and
+        the cursor for the next page (None on the last page).
+
+        Raises:
+            ValueError: if the cursor is invalid
+        """
+        after = decode_cursor(cursor, 2)
+        if lat is None or lng is None:
+            rows = self._rows(db, None)
+            # Newest first; the first sort-key component is unused
+            matches = sorted((((0.0, -row["id"]), None, row) for row in rows), key=lambda match: match[0])
+        else:
+            lat, lng = float(lat), float(lng)
+            matches = []
+            for row in self._rows(db, self._cell(lat, lng)):
+                if row["latitude"] is None:
+                    continue
+                distance = haversine_km(lat, lng, row["latitude"], row["longitude"])
+                if distance <= self.radius_km:
+                    matches.append(((round(distance, 6), row["id"]), distance, row))
+            matches.sort(key=lambda match: match[0])
+
+        start = 0
+        if after is not None:
+            try:
+                last = (float(after[0]), int(after[1]))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            start = position_after(matches, last, key=lambda match: match[0])
+        page = matches[start:start + limit]
+        next_cursor = encode_cursor(*page[-1][0]) if start + limit < len(matches) else None
+
+        orders = [
+            dict(row, distance_km=round(distance, 2) if distance is not None else None)
+            for _, distance, row in page
+        ]
+        return orders, next_cursor
+
+    def for_partner(self, db: Session, partner, limit: int = 50, cursor: Optional[str] = None):
+        """page() around the partner's latest GPS fix, or their last saved position"""
+        fix = location_store.get(partner.id)
+        if fix is not None:
+            return self.page(db, fix["latitude"], fix["longitude"], limit, cursor)
+        return self.page(db, partner.latitude, partner.longitude, limit, cursor)
+
+
+available_order_pool = AvailableOrderPool()
+
+
+def order_pool_changed(restaurant_id: Optional[int] = None):
+    """Called after an order enters or leaves the pool"""
+    available_order_pool.invalidate(restaurant_id)
@@ -0,0 +1,132 @@
+"""
+Cart pricing: item total, distance-based delivery fee, surge, tax, promo.
+
+Pricing runs on every cart add/update/remove and again when an order is
+placed, so it is kept to two statements: one loads the cart with its lines,
+menu items (and their categories) and the restaurant address, one resolves
+the customer's delivery coordinate. Fee, surge, tax and promo rules come
+from the in-memory rulebook (see pricing_rules).
+"""
+
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from sqlalchemy import inspect, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload
+
+from app.models import Cart, CartItem, CustomerAddress, CustomerLocation, MenuItem, Restaurant
+from app.schemas import CartItemResponse, CartResponse, MenuItemResponse
+from app.services.pricing_rules import pricing_rules
+from app.utils.geo import haversine_km
+
+def load_cart(db: Session, cart_id: int) -> Optional[Cart]:
+    """Cart, lines, menu items, categories, restaurant and its address in one statement"""
+    return db.query(Cart).options(
+        joinedload(Cart.items).joinedload(CartItem.menu_item).joinedload(MenuItem.category),
+        joinedload(Cart.restaurant).joinedload(Restaurant.address)
+    ).filter(
+        Cart.id == cart_id
+    ).populate_existing().first()
+
+
+def _first_point(priority: int, model, *criteria, order_by):
+    best = select(
+        literal(priority).label("priority"),
+        model.latitude.label("latitude"),
+        model.longitude.label("longitude")
+    ).where(
+        *criteria,
+        model.latitude.isnot(None),
+        model.longitude.isnot(None)
+    ).order_by(*order_by).limit(1).subquery()
+    return select(best)
+
+
+def resolve_delivery_point(db: Session, customer_id: int, address_id: int = None) -> Optional[Tuple[float, float]]:
+    """
+    Customer coordinate used for the delivery fee.
+
+    With address_id: that address (if it belongs to the customer).
+    Otherwise the first of: default address, any saved address, latest
+    live location. Resolved in a single prioritized UNION query.
+    """
+    if address_id:
+        candidates = [
+            _first_point(0, CustomerAddress, CustomerAddress.id == address_id,
+                         CustomerAddress.customer_id == customer_id, order_by=[CustomerAddress.id])
+        ]
+    else:
+        candidates = [
+            _first_point(1, CustomerAddress, CustomerAddress.customer_id == customer_id,
+                         CustomerAddress.is_default == True, order_by=[CustomerAddress.id]),
+            _first_point(2, CustomerAddress, CustomerAddress.customer_id == customer_id,
+                         order_by=[CustomerAddress.id]),
+            _first_point(3, CustomerLocation, CustomerLocation.customer_id == customer_id,
+                         order_by=[CustomerLocation.created_at.desc(), CustomerLocation.id.desc()])
+        ]
+
+    query = union_all(*candidates).subquery()
+    row = db.execute(
+        select(query.c.latitude, query.c.longitude).order_by(query.c.priority).limit(1)
+    ).first()
+    if row is None:
+        return None
+    return float(row.latitude), float(row.longitude)
+
+
+def line_price(menu_item: MenuItem) -> Decimal:
+    """Discount price when set, otherwise the list price"""
+    if menu_item.discount_price and menu_item.discount_price > 0:
+        return menu_item.discount_price
+    return menu_item.price
+
+
+class CartPricingService:
+    @staticmethod
+    def price(db: Session, cart: Cart, address_id: int = None, promo_code: str = None) -> CartResponse:
+        # Identity key rather than cart.id: reading an expired attribute would cost a refresh query
+        identity = inspect(cart).identity
+        cart = load_cart(db, identity[0] if identity else cart.id) or cart
+
+        lines = sorted(cart.items, key=lambda line: line.id)
+        prices = [line_price(item.menu_item) for item in lines]
+        items_response = [
+            CartItemResponse(
+                id=item.id,
+                menu_item_id=item.menu_item_id,
+                menu_item=MenuItemResponse.from_orm(item.menu_item),
+                quantity=item.quantity,
+                price=price
+            )
+            for item, price in zip(lines, prices)
+        ]
+
+        address = cart.restaurant.address if cart.restaurant else None
+        distance_km = None
+        if lines and address and address.latitude is not None and address.longitude is not None and cart.customer_id:
+            point = resolve_delivery_point(db, cart.customer_id, address_id)
+            if point is not None:
+                distance_km = haversine_km(float(address.latitude), float(address.longitude), *point)
+
+        quote = pricing_rules.ensure_fresh(db).quote(
+            zip(prices, (item.quantity for item in lines)),
+            restaurant_id=cart.restaurant_id,
+            city=address.city if address else None,
+            distance_km=distance_km,
+            promo_code=promo_code
+        )
+
+        return CartResponse(
+            id=cart.id,
+            restaurant_id=cart.restaurant_id,
+            restaurant_name=cart.restaurant.restaurant_name if cart.restaurant else None,
+            items=items_response,
+            item_total=quote.item_total,
+            delivery_fee=quote.delivery_fee,
+            surge_multiplier=quote.surge_multiplier,
+            tax_amount=quote.tax_amount,
+            discount_amount=quote.discount_amount,
+            promo_code=quote.promo_code,
+            promo_error=quote.promo_error,
+            total_amount=quote.total_amount
+        )
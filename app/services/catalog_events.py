@@ -0,0 +1,38 @@
+"""
+In-process notifications for changes to the customer-facing catalog.
+
+Write endpoints (restaurant profile and status, cuisines, documents, menu
+items, verification) call restaurant_changed() after they commit. Caches
+derived from the catalog subscribe a listener and refresh only what changed.
+A listener receives the restaurant id, or None when everything is affected
+(e.g. categories were seeded).
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_listeners: List[Callable[[Optional[int]], None]] = []
+
+
+def subscribe(listener: Callable[[Optional[int]], None]):
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def _emit(restaurant_id: Optional[int]):
+    for listener in list(_listeners):
+        try:
+            listener(restaurant_id)
+        except Exception:
+            # A broken cache must never fail the write that triggered it
+            logger.exception("Catalog listener %r failed", listener)
+
+
+def restaurant_changed(restaurant_id: int):
+    _emit(restaurant_id)
+
+
+def catalog_changed():
+    _emit(None)
@@ -0,0 +1,90 @@
+"""
+Process-wide cache of the menu category table.
+
+Categories are a small, shared lookup that every menu screen needs, so the
+table is read once and kept as CategoryResponse dicts, in display order.
+Category writes (seeding) report catalog_events.catalog_changed(), which
+drops the cache; per-restaurant catalog events leave it alone. Another
+worker sees a change when CATEGORY_CACHE_TTL_SECONDS expires.
+
+seed_default_categories() fills an empty table at startup (see main.py).
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Category
+from app.schemas import CategoryResponse
+from app.services import catalog_events
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATEGORIES = [
+    "Starters", "Main Course", "Breads", "Rice & Biryani",
+    "Desserts", "Beverages", "Snacks", "Combos"
+]
+
+
+def seed_default_categories(db: Session) -> int:
+    """Add DEFAULT_CATEGORIES if the table is empty; returns how many were added"""
+    if db.query(Category.id).first() is not None:
+        return 0
+    try:
+        for i, name in enumerate(DEFAULT_CATEGORIES):
+            db.add(Category(name=name, display_order=i + 1, is_active=True))
+        db.commit()
+    except IntegrityError:
+        # Another worker seeded first
+        db.rollback()
+        return 0
+    catalog_events.catalog_changed()
+    logger.info("Seeded %s default menu categories", len(DEFAULT_CATEGORIES))
+    return len(DEFAULT_CATEGORIES)
+
+
+class CategoryCache:
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.CATEGORY_CACHE_TTL_SECONDS
+        self._categories: Optional[List[dict]] = None
+        self._by_id: Dict[int, dict] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def invalidate(self, restaurant_id: Optional[int] = None):
+        """Drop the cache on catalog-wide changes (restaurant_id None)"""
+        if restaurant_id is None:
+            with self._lock:
+                self._categories = None
+
+    def all(self, db: Session) -> List[dict]:
+        """Every category as a CategoryResponse dict, by display_order then name"""
+        with self._lock:
+            if self._categories is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+                return self._categories
+        categories = [
+            CategoryResponse.from_orm(category).dict()
+            for category in db.query(Category).order_by(Category.display_order, Category.name)
+        ]
+        with self._lock:
+            self._categories = categories
+            self._by_id = {category["id"]: category for category in categories}
+            self._loaded_at = time.monotonic()
+        return categories
+
+    def active(self, db: Session) -> List[dict]:
+        return [category for category in self.all(db) if category["is_active"]]
+
+    def get(self, db: Session, category_id: int) -> Optional[dict]:
+        self.all(db)
+        return self._by_id.get(category_id)
+
+
+category_cache = CategoryCache()
+catalog_events.subscribe(category_cache.invalidate)
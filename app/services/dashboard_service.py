@@ -1,8 +1,37 @@
+"""
+Restaurant dashboard numbers.
+
+Current counts (pending, ongoing) and today's numbers come from one
+conditional-aggregation query over the restaurant's recent and open orders.
+All-time numbers come from the restaurant_daily_stats rollup (see
+restaurant_stats), so neither summary grows with the order history.
+"""
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, case
 from datetime import datetime, timedelta
 from decimal import Decimal
 from app.models import Order, OrderStatusEnum, Restaurant
+from app.services.restaurant_stats import RestaurantStatsService
+
+ONGOING_STATUSES = [
+    OrderStatusEnum.ACCEPTED.value,
+    OrderStatusEnum.PREPARING.value,
+    OrderStatusEnum.READY.value
+]
+OPEN_STATUSES = [OrderStatusEnum.PENDING.value] + ONGOING_STATUSES
+
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _open_order_counts(*columns):
+    """Pending / ongoing counts, followed by any extra aggregate columns"""
+    return (
+        _count_if(Order.status == OrderStatusEnum.PENDING.value).label("new_orders_count"),
+        _count_if(Order.status.in_(ONGOING_STATUSES)).label("ongoing_orders_count"),
+    ) + columns
 
 
 class DashboardService:
@@ -11,58 +40,30 @@ class DashboardService:
         """Get today's dashboard summary"""
         today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         today_end = today_start + timedelta(days=1)
-        
-        # Get restaurant
-        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-        
-        # Total orders today
-        total_orders = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.created_at >= today_start,
-                Order.created_at < today_end
-            )
-        ).scalar() or 0
-        
-        # Total earnings today (only from delivered orders)
-        total_earnings = db.query(func.sum(Order.total_amount)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.created_at >= today_start,
-                Order.created_at < today_end,
-                Order.status == OrderStatusEnum.DELIVERED.value
-            )
-        ).scalar() or Decimal('0.00')
-        
-        # Pending orders count (awaiting restaurant acceptance)
-        new_orders_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.PENDING.value
-            )
-        ).scalar() or 0
-        
-        # Ongoing orders count (accepted, preparing, ready - restaurant's active orders)
-        ongoing_orders_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status.in_([
-                    OrderStatusEnum.ACCEPTED.value,
-                    OrderStatusEnum.PREPARING.value,
-                    OrderStatusEnum.READY.value
-                ])
-            )
-        ).scalar() or 0
-        
-        # Yesterday's orders for growth calculation
         yesterday_start = today_start - timedelta(days=1)
-        yesterday_orders = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.created_at >= yesterday_start,
-                Order.created_at < today_start
-            )
-        ).scalar() or 0
+        
+        # Get restaurant (usually already loaded by the auth dependency)
+        restaurant = db.get(Restaurant, restaurant_id)
+        
+        created_today = and_(Order.created_at >= today_start, Order.created_at < today_end)
+        created_yesterday = and_(Order.created_at >= yesterday_start, Order.created_at < today_start)
+        
+        # One pass over yesterday's and today's orders plus the open ones
+        row = db.query(*_open_order_counts(
+            _count_if(created_today).label("total_orders"),
+            # Earnings only from delivered orders
+            func.sum(case(
+                (and_(created_today, Order.status == OrderStatusEnum.DELIVERED.value), Order.total_amount),
+                else_=0
+            )).label("total_earnings"),
+            _count_if(created_yesterday).label("yesterday_orders")
+        )).filter(
+            Order.restaurant_id == restaurant_id,
+            or_(Order.created_at >= yesterday_start, Order.status.in_(OPEN_STATUSES))
+        ).one()
+        
+        total_orders = int(row.total_orders or 0)
+        yesterday_orders = int(row.yesterday_orders or 0)
         
         today_growth = 0.0
         if yesterday_orders > 0:
@@ -72,12 +73,12 @@ class DashboardService:
             
         return {
             "total_orders": total_orders,
-            "total_earnings": total_earnings,
+            "total_earnings": Decimal(row.total_earnings or 0).quantize(Decimal('0.00')),
             "avg_rating": restaurant.average_rating if restaurant else Decimal('0.00'),
             "today_growth": round(today_growth, 2),
             "quick_action": DashboardService.get_quick_actions(),
-            "new_orders_count": new_orders_count,
-            "ongoing_orders_count": ongoing_orders_count
+            "new_orders_count": int(row.new_orders_count or 0),
+            "ongoing_orders_count": int(row.ongoing_orders_count or 0)
         }
     
     @staticmethod
@@ -113,65 +114,20 @@ class DashboardService:
     @staticmethod
     def get_total_summary(db: Session, restaurant_id: int) -> dict:
         """Get all-time (total) dashboard summary"""
-        # Get restaurant
-        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-        
-        # Total orders (all time)
-        total_orders = db.query(func.count(Order.id)).filter(
-            Order.restaurant_id == restaurant_id
-        ).scalar() or 0
-        
-        # Total earnings (all time - only delivered orders)
-        total_earnings = db.query(func.sum(Order.total_amount)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.DELIVERED.value
-            )
-        ).scalar() or Decimal('0.00')
-        
-        # Total delivered orders
-        delivered_orders = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.DELIVERED.value
-            )
-        ).scalar() or 0
-        
-        # Total rejected orders
-        rejected_orders = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.REJECTED.value
-            )
-        ).scalar() or 0
-        
-        # Total cancelled orders
-        cancelled_orders = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.CANCELLED.value
-            )
-        ).scalar() or 0
+        # Get restaurant (usually already loaded by the auth dependency)
+        restaurant = db.get(Restaurant, restaurant_id)
         
-        # Pending orders count (current)
-        new_orders_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status == OrderStatusEnum.PENDING.value
-            )
-        ).scalar() or 0
+        # All-time counters from the daily rollup
+        totals = RestaurantStatsService.totals(db, restaurant_id)
+        total_orders = totals["orders"]
+        total_earnings = totals["delivered_amount"]
+        delivered_orders = totals["delivered"]
         
-        # Ongoing orders count (current - restaurant's active orders)
-        ongoing_orders_count = db.query(func.count(Order.id)).filter(
-            and_(
-                Order.restaurant_id == restaurant_id,
-                Order.status.in_([
-                    OrderStatusEnum.ACCEPTED.value,
-                    OrderStatusEnum.PREPARING.value,
-                    OrderStatusEnum.READY.value
-                ])
-            )
-        ).scalar() or 0
+        # Current pending / ongoing counts
+        current = db.query(*_open_order_counts()).filter(
+            Order.restaurant_id == restaurant_id,
+            Order.status.in_(OPEN_STATUSES)
+        ).one()
         
         # Average order value
         avg_order_value = Decimal('0.00')
@@ -187,11 +143,11 @@ class DashboardService:
             "total_orders": total_orders,
             "total_earnings": total_earnings,
             "delivered_orders": delivered_orders,
-            "rejected_orders": rejected_orders,
-            "cancelled_orders": cancelled_orders,
+            "rejected_orders": totals["rejected"],
+            "cancelled_orders": totals["cancelled"],
             "avg_order_value": round(avg_order_value, 2),
             "success_rate": round(success_rate, 2),
             "avg_rating": restaurant.average_rating if restaurant else Decimal('0.00'),
-            "new_orders_count": new_orders_count,
-            "ongoing_orders_count": ongoing_orders_count
+            "new_orders_count": int(current.new_orders_count or 0),
+            "ongoing_orders_count": int(current.ongoing_orders_count or 0)
         }
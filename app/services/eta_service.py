@@ -0,0 +1,238 @@
+"""
+ETA estimation for orders that have a delivery partner.
+
+The leg depends on the order status: before pickup the rider is heading to
+the restaurant, afterwards to the customer. Distance is the great-circle
+distance scaled by ROAD_DISTANCE_FACTOR, and speed is an exponentially
+weighted average over the rider's recent pings (fed by location ingestion).
+Results are cached per order until the rider's next ping or a status change.
+"""
+
+import threading
+from collections import deque
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Address, CustomerAddress, DeliveryPartner, Order, OrderStatusEnum
+from app.models_location import CustomerLocation
+from app.services.location_store import location_store
+from app.utils.geo import haversine_km
+from app.utils.timezone import get_ist_now
+
+# City roads are longer than the straight line between two points
+ROAD_DISTANCE_FACTOR = 1.3
+
+DEFAULT_SPEED_KMH = 20.0
+MIN_SPEED_KMH = 8.0     # Waiting at a signal should not push the ETA to hours
+MAX_SPEED_KMH = 60.0
+SPEED_WINDOW = 10       # Pings kept per rider
+SPEED_ALPHA = 0.3       # Weight of the newest sample in the moving average
+CACHE_LIMIT = 20000
+
+TO_RESTAURANT_STATUSES = {
+    OrderStatusEnum.ACCEPTED.value,
+    OrderStatusEnum.PREPARING.value,
+    OrderStatusEnum.READY.value,
+    OrderStatusEnum.ASSIGNED.value,
+    OrderStatusEnum.REACHED_RESTAURANT.value,
+}
+TO_CUSTOMER_STATUSES = {
+    OrderStatusEnum.HANDED_OVER.value,
+    OrderStatusEnum.PICKED_UP.value,
+}
+
+
+class SpeedTracker:
+    """Smoothed speed per rider over a short window of recent pings"""
+
+    def __init__(self, window: int = SPEED_WINDOW, alpha: float = SPEED_ALPHA):
+        self.window = window
+        self.alpha = alpha
+        self._pings: Dict[int, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, fix: dict):
+        partner_id = fix["delivery_partner_id"]
+        with self._lock:
+            pings = self._pings.get(partner_id)
+            if pings is None:
+                pings = self._pings[partner_id] = deque(maxlen=self.window)
+            pings.append((fix["created_at"], fix["latitude"], fix["longitude"], fix.get("speed")))
+
+    def speed_kmh(self, partner_id: int) -> Optional[float]:
+        with self._lock:
+            pings = list(self._pings.get(partner_id, ()))
+
+        samples = []
+        for previous, current in zip([None] + pings[:-1], pings):
+            reported = current[3]
+            if reported is not None and reported >= 0:
+                samples.append(reported * 3.6)
+            elif previous is not None:
+                hours = (current[0] - previous[0]).total_seconds() / 3600
+                if hours > 0:
+                    samples.append(haversine_km(previous[1], previous[2], current[1], current[2]) / hours)
+
+        if not samples:
+            return None
+        smoothed = samples[0]
+        for sample in samples[1:]:
+            smoothed = self.alpha * sample + (1 - self.alpha) * smoothed
+        return smoothed
+
+
+speed_tracker = SpeedTracker()
+
+
+class EtaService:
+    _cache: Dict[int, tuple] = {}
+
+    @staticmethod
+    def for_order(db: Session, order_id: int, fix: Optional[dict] = None) -> Optional[dict]:
+        """ETA for one order; None if it has no rider or isn't in a trackable status"""
+        results = EtaService._compute(db, [Order.id == order_id], fixes={} if fix is None else {order_id: fix})
+        return results[0] if results else None
+
+    @staticmethod
+    def for_active_orders(db: Session) -> List[dict]:
+        """ETAs for every order currently out with a rider, computed in one pass"""
+        return EtaService._compute(
+            db, [Order.status.in_(TO_RESTAURANT_STATUSES | TO_CUSTOMER_STATUSES)], fixes={}
+        )
+
+    @staticmethod
+    def _compute(db: Session, filters, fixes: Dict[int, dict]) -> List[dict]:
+        rows = db.query(
+            Order.id.label("order_id"),
+            Order.status,
+            Order.customer_id,
+            Order.delivery_partner_id,
+            Address.latitude.label("restaurant_lat"),
+            Address.longitude.label("restaurant_lng"),
+            DeliveryPartner.latitude.label("partner_lat"),
+            DeliveryPartner.longitude.label("partner_lng")
+        ).outerjoin(
+            Address, Address.restaurant_id == Order.restaurant_id
+        ).join(
+            DeliveryPartner, DeliveryPartner.id == Order.delivery_partner_id
+        ).filter(*filters).all()
+
+        rows = [row for row in rows if row.status in TO_RESTAURANT_STATUSES | TO_CUSTOMER_STATUSES]
+        if not rows:
+            return []
+
+        destinations = EtaService._destinations(db, rows)
+        now = get_ist_now()
+        results = []
+        for row in rows:
+            fix = fixes.get(row.order_id) or location_store.get(row.delivery_partner_id)
+            destination = destinations.get(row.order_id)
+            cache_key = (fix["created_at"], row.status, destination) if fix else None
+            cached = EtaService._cache.get(row.order_id)
+            if cache_key and cached and cached[0] == cache_key:
+                results.append(cached[1])
+                continue
+
+            if fix:
+                position = (fix["latitude"], fix["longitude"])
+            elif row.partner_lat is not None and row.partner_lng is not None:
+                position = (float(row.partner_lat), float(row.partner_lng))
+            else:
+                continue
+
+            restaurant = (
+                (float(row.restaurant_lat), float(row.restaurant_lng))
+                if row.restaurant_lat is not None and row.restaurant_lng is not None else None
+            )
+            result = EtaService._estimate(row, position, restaurant, destination, fix, now)
+            if result is None:
+                continue
+            if cache_key:
+                if len(EtaService._cache) >= CACHE_LIMIT:
+                    EtaService._cache.clear()
+                EtaService._cache[row.order_id] = (cache_key, result)
+            results.append(result)
+
+        return results
+
+    @staticmethod
+    def _estimate(row, position, restaurant, destination, fix, now) -> Optional[dict]:
+        speed = speed_tracker.speed_kmh(row.delivery_partner_id)
+        if speed is None and fix and fix.get("speed") is not None:
+            speed = fix["speed"] * 3.6
+        speed = min(max(speed if speed is not None else DEFAULT_SPEED_KMH, MIN_SPEED_KMH), MAX_SPEED_KMH)
+
+        if row.status in TO_RESTAURANT_STATUSES:
+            if restaurant is None:
+                return None
+            leg = "to_restaurant"
+            distance_km = haversine_km(*position, *restaurant) * ROAD_DISTANCE_FACTOR
+            remaining_km = distance_km
+            if destination is not None:
+                remaining_km += haversine_km(*restaurant, *destination) * ROAD_DISTANCE_FACTOR
+            else:
+                remaining_km = None
+        else:
+            if destination is None:
+                return None
+            leg = "to_customer"
+            distance_km = haversine_km(*position, *destination) * ROAD_DISTANCE_FACTOR
+            remaining_km = distance_km
+
+        eta_minutes = int(round(distance_km / speed * 60))
+        delivery_eta_minutes = int(round(remaining_km / speed * 60)) if remaining_km is not None else None
+        return {
+            "order_id": row.order_id,
+            "delivery_partner_id": row.delivery_partner_id,
+            "order_status": row.status,
+            "leg": leg,
+            "distance_km": round(distance_km, 2),
+            "speed_kmh": round(speed, 1),
+            "eta_minutes": eta_minutes,
+            "delivery_eta_minutes": delivery_eta_minutes,
+            "estimated_delivery_at": (
+                (now + timedelta(minutes=delivery_eta_minutes)).isoformat()
+                if delivery_eta_minutes is not None else None
+            )
+        }
+
+    @staticmethod
+    def _destinations(db: Session, rows) -> Dict[int, tuple]:
+        """
+        Drop-off point per order: the customer's latest live location for the
+        order, otherwise their default (or most recent) saved address.
+        """
+        order_ids = [row.order_id for row in rows]
+        destinations = {}
+
+        latest_ids = db.query(func.max(CustomerLocation.id)).filter(
+            CustomerLocation.order_id.in_(order_ids)
+        ).group_by(CustomerLocation.order_id)
+        live = db.query(
+            CustomerLocation.order_id,
+            CustomerLocation.latitude,
+            CustomerLocation.longitude
+        ).filter(CustomerLocation.id.in_(latest_ids)).all()
+        for location in live:
+            destinations[location.order_id] = (float(location.latitude), float(location.longitude))
+
+        customer_ids = {row.customer_id for row in rows if row.order_id not in destinations and row.customer_id}
+        if customer_ids:
+            saved = {}
+            addresses = db.query(
+                CustomerAddress.customer_id,
+                CustomerAddress.latitude,
+                CustomerAddress.longitude
+            ).filter(
+                CustomerAddress.customer_id.in_(customer_ids)
+            ).order_by(CustomerAddress.is_default, CustomerAddress.id).all()
+            for address in addresses:
+                saved[address.customer_id] = (float(address.latitude), float(address.longitude))
+            for row in rows:
+                if row.order_id not in destinations and row.customer_id in saved:
+                    destinations[row.order_id] = saved[row.customer_id]
+
+        return destinations
@@ -0,0 +1,170 @@
+"""
+Materialized snapshot of the customer /home feed.
+
+The feed (categories, restaurant cards, offers) is identical for every
+customer, so it is built once and served as pre-serialized JSON bytes with
+an ETag. Each restaurant card is kept serialized on its own; when a catalog
+write reports a change (see catalog_events) only that restaurant's card is
+reloaded and the body is re-assembled from the cached pieces.
+
+Invalidations are per process: another worker picks up a change on its own
+next write or, at the latest, when HOME_FEED_TTL_SECONDS expires and it does
+a full rebuild. The last HOME_FEED_MAX_VERSIONS snapshots are retained.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Set
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Category, Restaurant
+from app.schemas import CategoryResponse
+from app.services import catalog_events
+from app.services.restaurant_cards import build_restaurant_cards
+from app.utils.http_cache import make_etag
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+HOME_MESSAGE = "Home data fetched successfully"
+HOME_OFFERS = [
+    {
+        "id": 1,
+        "title": "Weekend Special",
+        "description": "Flat 30% off on all orders",
+        "image_url": "https://images.unsplash.com/photo-1504674900247-0877df9cc836?ixlib=rb-1.2.1&auto=format&fit=crop&w=1350&q=80",
+        "code": "WEEKEND30"
+    }
+]
+
+# Same JSON encoding FastAPI applies to APIResponse (Decimal as string, ISO datetimes)
+_dump_json = TypeAdapter(Any).dump_json
+
+
+class HomeFeedSnapshot(NamedTuple):
+    version: int
+    etag: str
+    body: bytes
+    restaurant_count: int
+
+
+class HomeFeedCache:
+    def __init__(self, ttl_seconds: Optional[int] = None, max_versions: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.HOME_FEED_TTL_SECONDS
+        self.max_versions = max_versions if max_versions is not None else settings.HOME_FEED_MAX_VERSIONS
+        self._cards: Dict[int, bytes] = {}
+        self._categories = b"[]"
+        self._versions: "OrderedDict[int, HomeFeedSnapshot]" = OrderedDict()
+        self._current: Optional[HomeFeedSnapshot] = None
+        self._built_at = 0.0
+        self._dirty: Set[int] = set()
+        self._full = True
+        self._state_lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._counters = {"hits": 0, "full_rebuilds": 0, "incremental_rebuilds": 0, "cards_rebuilt": 0}
+
+    def invalidate(self, restaurant_id: Optional[int] = None):
+        """Mark one restaurant's card (or, with None, the whole feed) stale"""
+        with self._state_lock:
+            if restaurant_id is None:
+                self._full = True
+            else:
+                self._dirty.add(restaurant_id)
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._current is not None
+            and not self._full
+            and not self._dirty
+            and time.monotonic() - self._built_at < self.ttl_seconds
+        )
+
+    def get(self, db: Session) -> HomeFeedSnapshot:
+        if self._is_fresh():
+            self._counters["hits"] += 1
+            return self._current
+
+        # One request rebuilds; concurrent ones wait and reuse its result
+        with self._build_lock:
+            if self._is_fresh():
+                self._counters["hits"] += 1
+                return self._current
+
+            with self._state_lock:
+                full = self._full or self._current is None or time.monotonic() - self._built_at >= self.ttl_seconds
+                dirty, self._dirty, self._full = self._dirty, set(), False
+
+            try:
+                if full:
+                    self._rebuild_all(db)
+                else:
+                    self._rebuild_cards(db, dirty)
+            except Exception:
+                # Leave the work pending for the next request
+                with self._state_lock:
+                    self._full = self._full or full
+                    self._dirty |= dirty
+                raise
+            return self._publish()
+
+    def snapshot(self, version: int) -> Optional[HomeFeedSnapshot]:
+        return self._versions.get(version)
+
+    def stats(self) -> dict:
+        current = self._current
+        return {
+            **self._counters,
+            "version": current.version if current else None,
+            "etag": current.etag if current else None,
+            "restaurants": len(self._cards),
+            "body_bytes": len(current.body) if current else 0,
+            "retained_versions": list(self._versions),
+            "pending_cards": len(self._dirty),
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if current else None
+        }
+
+    def _rebuild_all(self, db: Session):
+        categories = db.query(Category).filter(Category.is_active == True).order_by(Category.display_order).all()
+        self._categories = _dump_json([CategoryResponse.from_orm(c).dict() for c in categories])
+        self._cards = {card["id"]: _dump_json(card) for card in build_restaurant_cards(db, Restaurant.is_active == True)}
+        self._counters["full_rebuilds"] += 1
+
+    def _rebuild_cards(self, db: Session, restaurant_ids: Set[int]):
+        if not restaurant_ids:
+            return
+        for restaurant_id in restaurant_ids:
+            self._cards.pop(restaurant_id, None)
+        cards = build_restaurant_cards(db, Restaurant.id.in_(restaurant_ids), Restaurant.is_active == True)
+        self._cards.update((card["id"], _dump_json(card)) for card in cards)
+        self._counters["incremental_rebuilds"] += 1
+        self._counters["cards_rebuilt"] += len(restaurant_ids)
+
+    def _publish(self) -> HomeFeedSnapshot:
+        restaurants = b",".join(self._cards[restaurant_id] for restaurant_id in sorted(self._cards))
+        body = b"".join((
+            b'{"success":true,"message":', _dump_json(HOME_MESSAGE),
+            b',"data":{"categories":', self._categories,
+            b',"restaurants":[', restaurants, b']',
+            b',"offers":', _dump_json(HOME_OFFERS), b'}}'
+        ))
+        self._built_at = time.monotonic()
+
+        etag = make_etag(body)
+        if self._current is not None and self._current.etag == etag:
+            return self._current
+
+        version = self._current.version + 1 if self._current else 1
+        self._current = HomeFeedSnapshot(version, etag, body, len(self._cards))
+        self._versions[version] = self._current
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+        return self._current
+
+
+home_feed_cache = HomeFeedCache()
+catalog_events.subscribe(home_feed_cache.invalidate)
@@ -0,0 +1,140 @@
+"""
+Index advisor for the hot order queries.
+
+Each query shape replays a read path from the routers and services (the
+restaurant order lists, the dashboard, the rider lists, available orders
+and customer history) against a real session, captures the SELECTs it
+sends, and runs EXPLAIN on each one (EXPLAIN QUERY PLAN on SQLite). Any
+full scan of a watched table is reported.
+
+index_advisor.py runs it against the configured database and
+tests/test_index_advisor.py runs it against the SQLite schema as a
+regression guard for the composite indexes on orders.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Callable, List, NamedTuple, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Customer, DeliveryPartner, Restaurant
+from app.routers import customer as customer_router
+from app.routers import delivery_partner as delivery_partner_router
+from app.routers import orders as orders_router
+from app.services.available_orders import _available_rows
+from app.services.dashboard_service import DashboardService
+
+logger = logging.getLogger(__name__)
+
+WATCHED_TABLES = ("orders",)
+
+# MySQL join types that read the whole table or the whole index
+MYSQL_FULL_SCAN_TYPES = ("ALL", "index")
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+
+
+class Probe(NamedTuple):
+    """The signed-in restaurant, partner and customer the shapes run as"""
+    restaurant: Restaurant
+    partner: DeliveryPartner
+    customer: Customer
+
+
+class QueryShape(NamedTuple):
+    name: str
+    run: Callable[[Session, Probe], object]
+
+
+QUERY_SHAPES = (
+    QueryShape("restaurant_new_orders", lambda db, p: orders_router.get_new_orders(p.restaurant, db)),
+    QueryShape("restaurant_ongoing_orders", lambda db, p: orders_router.get_ongoing_orders(p.restaurant, db)),
+    QueryShape("restaurant_completed_orders", lambda db, p: orders_router.get_completed_orders(p.restaurant, db)),
+    QueryShape("restaurant_orders_by_status", lambda db, p: orders_router.fetch_orders("rejected", p.restaurant, db)),
+    QueryShape("dashboard_today", lambda db, p: DashboardService.get_today_summary(db, p.restaurant.id)),
+    QueryShape("dashboard_total", lambda db, p: DashboardService.get_total_summary(db, p.restaurant.id)),
+    QueryShape("rider_active_orders",
+               lambda db, p: asyncio.run(delivery_partner_router.get_active_orders(p.partner, db))),
+    QueryShape("rider_completed_orders",
+               lambda db, p: asyncio.run(delivery_partner_router.get_completed_orders(Response(), 50, None,
+                                                                                      p.partner, db))),
+    QueryShape("rider_available_orders", lambda db, p: _available_rows(db)),
+    QueryShape("customer_order_history",
+               lambda db, p: customer_router.get_order_history(Response(), 20, None, db, p.customer)),
+)
+
+
+def load_probe(
+    db: Session,
+    restaurant_id: Optional[int] = None,
+    partner_id: Optional[int] = None,
+    customer_id: Optional[int] = None
+) -> Probe:
+    """Load the probe accounts, defaulting to the first row of each table"""
+    def _load(model, row_id):
+        row = db.get(model, row_id) if row_id else db.query(model).order_by(model.id).first()
+        if row is None:
+            raise ValueError(f"No {model.__tablename__} row to run the query shapes as")
+        return row
+
+    return Probe(_load(Restaurant, restaurant_id), _load(DeliveryPartner, partner_id), _load(Customer, customer_id))
+
+
+def capture_selects(db: Session, call: Callable[[], object]) -> List[tuple]:
+    """Run `call` and return the (statement, parameters) of every SELECT it sent"""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        call()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+        db.rollback()
+    return statements
+
+
+def explain(db: Session, statement: str, parameters, tables: Sequence[str] = WATCHED_TABLES) -> dict:
+    """Plan lines for one captured statement and the full scans of `tables` among them"""
+    connection = db.connection()
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        plan = [row[3] for row in rows]
+        scans = [line for line in plan if (match := SQLITE_SCAN.match(line)) and match.group(1) in tables]
+    else:
+        rows = connection.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+        plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+        scans = [line for row, line in zip(rows, plan)
+                 if row["table"] in tables and row["type"] in MYSQL_FULL_SCAN_TYPES]
+    return {"statement": statement, "plan": plan, "full_scans": scans}
+
+
+class IndexAdvisor:
+    @staticmethod
+    def review(
+        db: Session,
+        probe: Probe,
+        shapes: Sequence[QueryShape] = QUERY_SHAPES,
+        tables: Sequence[str] = WATCHED_TABLES
+    ) -> List[dict]:
+        """
+        Replay each shape and explain what it ran. Returns one entry per
+        shape: {"shape", "queries": [explain() results], "full_scans"}.
+        """
+        report = []
+        for shape in shapes:
+            statements = capture_selects(db, lambda: shape.run(db, probe))
+            queries = [explain(db, statement, parameters, tables) for statement, parameters in statements]
+            full_scans = [scan for query in queries for scan in query["full_scans"]]
+            if full_scans:
+                logger.warning("Query shape %s scans %s", shape.name, full_scans)
+            report.append({"shape": shape.name, "queries": queries, "full_scans": full_scans})
+        db.rollback()
+        return report
@@ -0,0 +1,119 @@
+"""
+Pub/sub transport for the restaurant /orders/live WebSocket.
+
+Every worker process subscribes to one Redis channel. A broadcast is
+published once by the process that handled the request, and each
+subscriber delivers it only to the sockets connected to that process.
+If Redis is disabled or unreachable, messages are delivered in-process
+(correct for a single worker).
+"""
+
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Optional
+
+import redis.asyncio as aioredis
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Called with (restaurant_id, serialized_message, coalesce_key) to reach local sockets
+DeliverFn = Callable[[int, str, Optional[str]], Awaitable[None]]
+
+RECONNECT_DELAY_SECONDS = 1.0
+
+
+class LiveOrdersBus:
+    def __init__(
+        self,
+        deliver: DeliverFn,
+        backend: Optional[str] = None,
+        redis_url: Optional[str] = None,
+        channel: Optional[str] = None
+    ):
+        self._deliver = deliver
+        self.backend = backend or settings.LIVE_ORDERS_PUBSUB
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.channel = channel or settings.LIVE_ORDERS_CHANNEL
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def uses_redis(self) -> bool:
+        return self._redis is not None
+
+    async def start(self):
+        """Connect and subscribe; falls back to in-process delivery on failure"""
+        if self.backend != "redis" or self._redis is not None:
+            return
+        try:
+            client = aioredis.from_url(self.redis_url)
+            await client.ping()
+        except Exception as e:
+            logger.warning(f"Redis unavailable for live orders ({e}); using in-process delivery")
+            return
+
+        self._redis = client
+        ready = asyncio.Event()
+        self._listener = asyncio.create_task(self._listen(ready))
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=5)
+            logger.info(f"Live orders subscribed to Redis channel '{self.channel}'")
+        except asyncio.TimeoutError:
+            logger.warning(f"Live orders subscription to '{self.channel}' still pending")
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def publish(self, restaurant_id: int, message: str, key: Optional[str] = None):
+        """
+        Send a serialized message to the restaurant's sockets on every worker.
+        Messages sharing a `key` may be coalesced by slow sockets.
+        """
+        if self._redis is not None:
+            envelope = json.dumps({"restaurant_id": restaurant_id, "message": message, "key": key})
+            try:
+                await self._redis.publish(self.channel, envelope)
+                return
+            except Exception as e:
+                logger.error(f"Redis publish failed, delivering locally only: {e}")
+        await self._deliver(restaurant_id, message, key)
+
+    async def _listen(self, ready: asyncio.Event):
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                ready.set()
+                async for item in pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        envelope = json.loads(item["data"])
+                        await self._deliver(
+                            int(envelope["restaurant_id"]), envelope["message"], envelope.get("key")
+                        )
+                    except Exception as e:
+                        logger.error(f"Bad live order message: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Live orders subscription dropped ({e}); reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
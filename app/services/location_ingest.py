@@ -0,0 +1,234 @@
+"""
+Write-behind ingestion of delivery partner GPS pings.
+
+Pings are applied to the latest-position store (app/services/location_store.py)
+immediately and buffered for the database. A background task flushes the buffer every
+LOCATION_FLUSH_INTERVAL_MS (or sooner once LOCATION_FLUSH_BATCH_SIZE rows
+are waiting) with one multi-row INSERT into delivery_partner_locations and
+one batched UPDATE of delivery_partners.latitude/longitude.
+
+The buffer is bounded by LOCATION_BUFFER_LIMIT; when the database cannot
+keep up the oldest breadcrumbs are dropped and counted in stats().
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from sqlalchemy import insert, update
+
+from app.config import get_settings
+from app.services.location_store import LatestLocationStore, location_store
+from app.services.eta_service import speed_tracker
+from app.utils.timezone import get_ist_now
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class LocationIngestor:
+    def __init__(
+        self,
+        flush_interval_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        buffer_limit: Optional[int] = None,
+        session_factory=None,
+        store: Optional[LatestLocationStore] = None
+    ):
+        self.flush_interval = (
+            flush_interval_ms if flush_interval_ms is not None else settings.LOCATION_FLUSH_INTERVAL_MS
+        ) / 1000
+        self.batch_size = batch_size if batch_size is not None else settings.LOCATION_FLUSH_BATCH_SIZE
+        self.buffer_limit = buffer_limit if buffer_limit is not None else settings.LOCATION_BUFFER_LIMIT
+        self._session_factory = session_factory
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.store = store if store is not None else location_store
+        self._buffer: deque = deque()
+        self._dirty_positions: Dict[int, tuple] = {}
+
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.received = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.last_flush_ms = 0.0
+        self.last_flush_rows = 0
+
+    # ---------- Writes ----------
+
+    def record(
+        self,
+        partner_id: int,
+        latitude: float,
+        longitude: float,
+        order_id: Optional[int] = None,
+        accuracy: Optional[float] = None,
+        bearing: Optional[float] = None,
+        speed: Optional[float] = None
+    ) -> dict:
+        """Accept one ping; returns the stored latest-position entry"""
+        now = get_ist_now()
+        fix = {
+            "delivery_partner_id": partner_id,
+            "order_id": order_id,
+            "latitude": float(latitude),
+            "longitude": float(longitude),
+            "accuracy": accuracy,
+            "bearing": bearing,
+            "speed": speed,
+            "created_at": now,
+            "updated_at": now
+        }
+        with self._lock:
+            self.received += 1
+            self.store.put(fix)
+            speed_tracker.observe(fix)
+            self._dirty_positions[partner_id] = (fix["latitude"], fix["longitude"])
+            self._buffer.append((time.monotonic(), fix))
+            while len(self._buffer) > self.buffer_limit:
+                self._buffer.popleft()
+                self.dropped += 1
+            should_wake = len(self._buffer) >= self.batch_size
+
+        if should_wake and self._wake is not None:
+            self._wake.set()
+        return fix
+
+    # ---------- Reads ----------
+
+    def latest(self, partner_id: int) -> Optional[dict]:
+        """Most recent ping for a partner"""
+        return self.store.get(partner_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            oldest_age_ms = (time.monotonic() - self._buffer[0][0]) * 1000 if self._buffer else 0.0
+            return {
+                "received": self.received,
+                "written": self.written,
+                "dropped": self.dropped,
+                "buffered": len(self._buffer),
+                "buffer_limit": self.buffer_limit,
+                "buffer_utilization": round(len(self._buffer) / self.buffer_limit, 4) if self.buffer_limit else 0.0,
+                "oldest_buffered_age_ms": round(oldest_age_ms, 1),
+                "pending_position_updates": len(self._dirty_positions),
+                "tracked_partners": len(self.store),
+                "flushes": self.flushes,
+                "failed_flushes": self.failed_flushes,
+                "last_flush_rows": self.last_flush_rows,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "flush_interval_ms": int(self.flush_interval * 1000),
+                "flush_batch_size": self.batch_size,
+                "running": self._task is not None and not self._task.done()
+            }
+
+    # ---------- Flushing ----------
+
+    def flush(self) -> int:
+        """Write buffered pings to the database; safe to call from any thread"""
+        from app.models import DeliveryPartner
+        from app.models_location import DeliveryPartnerLocation
+
+        with self._flush_lock:
+            with self._lock:
+                rows = [fix for _, fix in self._buffer]
+                stamps = list(self._buffer)
+                self._buffer.clear()
+                positions = self._dirty_positions
+                self._dirty_positions = {}
+
+            if not rows and not positions:
+                return 0
+
+            started = time.perf_counter()
+            if positions:
+                self.store.mirror_many(
+                    fix for fix in (self.store.get_local(pid) for pid in positions) if fix
+                )
+
+            db = self._new_session()
+            try:
+                if rows:
+                    # Core insert keeps every row in one executemany (multi-row VALUES on MySQL)
+                    db.execute(insert(DeliveryPartnerLocation.__table__), rows)
+                if positions:
+                    db.execute(
+                        update(DeliveryPartner),
+                        [
+                            {"id": partner_id, "latitude": lat, "longitude": lng}
+                            for partner_id, (lat, lng) in positions.items()
+                        ]
+                    )
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self._requeue(stamps, positions)
+                self.failed_flushes += 1
+                logger.error(f"Location flush of {len(rows)} rows failed: {e}")
+                return 0
+            finally:
+                db.close()
+
+            self.flushes += 1
+            self.written += len(rows)
+            self.last_flush_rows = len(rows)
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+            return len(rows)
+
+    def _requeue(self, stamps, positions):
+        """Put a failed batch back in front of newer pings, within the buffer limit"""
+        with self._lock:
+            self._buffer.extendleft(reversed(stamps))
+            while len(self._buffer) > self.buffer_limit:
+                self._buffer.popleft()
+                self.dropped += 1
+            for partner_id, position in positions.items():
+                self._dirty_positions.setdefault(partner_id, position)
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ---------- Lifecycle ----------
+
+    async def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.error(f"Location flush loop error: {e}")
+
+
+location_ingestor = LocationIngestor()
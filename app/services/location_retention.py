@@ -0,0 +1,185 @@
+"""
+Retention for delivery_partner_locations (GPS breadcrumbs).
+
+- compact_delivered_orders: replaces the breadcrumbs of delivered orders with
+  one DeliveryRouteSummary row holding a downsampled encoded polyline.
+- purge_expired: deletes raw points older than LOCATION_RETENTION_DAYS. On
+  MySQL, where the table is partitioned by day (see the
+  partition_delivery_partner_locations migration), whole partitions are
+  dropped; elsewhere rows are deleted in batches.
+- maintain_partitions: creates the next LOCATION_PARTITION_DAYS_AHEAD daily
+  partitions on MySQL.
+
+Run daily via location_retention.py.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Order, OrderStatusEnum
+from app.models_location import DeliveryPartnerLocation, DeliveryRouteSummary
+from app.utils.geo import downsample, encode_polyline, path_length_km
+from app.utils.timezone import get_ist_now
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+TABLE = "delivery_partner_locations"
+FUTURE_PARTITION = "p_future"
+
+
+def _is_mysql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+class LocationRetentionService:
+    @staticmethod
+    def compact_delivered_orders(db: Session, batch_size: int = 200, min_step_meters: Optional[int] = None) -> dict:
+        """Summarize and delete breadcrumbs of delivered orders that have no summary yet"""
+        min_step_km = (min_step_meters or settings.ROUTE_SUMMARY_MIN_STEP_METERS) / 1000
+        compacted = raw_deleted = 0
+
+        while True:
+            order_ids = [row.id for row in db.query(Order.id).filter(
+                Order.status == OrderStatusEnum.DELIVERED.value,
+                db.query(DeliveryPartnerLocation.id).filter(
+                    DeliveryPartnerLocation.order_id == Order.id
+                ).exists(),
+                ~db.query(DeliveryRouteSummary.id).filter(
+                    DeliveryRouteSummary.order_id == Order.id
+                ).exists()
+            ).order_by(Order.id).limit(batch_size)]
+            if not order_ids:
+                break
+
+            points = db.query(
+                DeliveryPartnerLocation.order_id,
+                DeliveryPartnerLocation.delivery_partner_id,
+                DeliveryPartnerLocation.latitude,
+                DeliveryPartnerLocation.longitude,
+                DeliveryPartnerLocation.created_at
+            ).filter(
+                DeliveryPartnerLocation.order_id.in_(order_ids)
+            ).order_by(
+                DeliveryPartnerLocation.order_id,
+                DeliveryPartnerLocation.created_at,
+                DeliveryPartnerLocation.id
+            ).all()
+
+            by_order = {}
+            for point in points:
+                by_order.setdefault(point.order_id, []).append(point)
+
+            summaries = []
+            for order_id, route in by_order.items():
+                path = [(point.latitude, point.longitude) for point in route]
+                kept = downsample(path, min_step_km)
+                summaries.append({
+                    "order_id": order_id,
+                    "delivery_partner_id": route[-1].delivery_partner_id,
+                    "polyline": encode_polyline(kept),
+                    "raw_point_count": len(route),
+                    "point_count": len(kept),
+                    "distance_km": round(path_length_km(path), 3),
+                    "started_at": route[0].created_at,
+                    "ended_at": route[-1].created_at,
+                    "created_at": get_ist_now()
+                })
+
+            db.execute(DeliveryRouteSummary.__table__.insert(), summaries)
+            raw_deleted += db.query(DeliveryPartnerLocation).filter(
+                DeliveryPartnerLocation.order_id.in_(list(by_order))
+            ).delete(synchronize_session=False)
+            db.commit()
+            compacted += len(summaries)
+
+        logger.info(f"Compacted {compacted} routes, removed {raw_deleted} breadcrumbs")
+        return {"routes_compacted": compacted, "breadcrumbs_removed": raw_deleted}
+
+    @staticmethod
+    def purge_expired(db: Session, retention_days: Optional[int] = None, batch_size: int = 5000) -> dict:
+        """Delete breadcrumbs older than the retention window"""
+        retention_days = retention_days if retention_days is not None else settings.LOCATION_RETENTION_DAYS
+        cutoff = get_ist_now() - timedelta(days=retention_days)
+
+        dropped_partitions = []
+        if _is_mysql(db) and LocationRetentionService._partitions(db):
+            dropped_partitions = LocationRetentionService._drop_partitions_before(db, cutoff.date())
+
+        # Batched deletes cover unpartitioned tables and the edge of the oldest kept partition
+        deleted = 0
+        while True:
+            ids = [row.id for row in db.query(DeliveryPartnerLocation.id).filter(
+                DeliveryPartnerLocation.created_at < cutoff
+            ).order_by(DeliveryPartnerLocation.id).limit(batch_size)]
+            if not ids:
+                break
+            deleted += db.query(DeliveryPartnerLocation).filter(
+                DeliveryPartnerLocation.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+
+        logger.info(f"Purged {deleted} breadcrumbs and {len(dropped_partitions)} partitions older than {cutoff}")
+        return {"cutoff": cutoff.isoformat(), "rows_deleted": deleted, "partitions_dropped": dropped_partitions}
+
+    @staticmethod
+    def maintain_partitions(db: Session, days_ahead: Optional[int] = None) -> List[str]:
+        """Split daily partitions off p_future for today and the next few days (MySQL only)"""
+        if not _is_mysql(db):
+            return []
+        existing = LocationRetentionService._partitions(db)
+        if not existing:
+            return []
+
+        days_ahead = days_ahead if days_ahead is not None else settings.LOCATION_PARTITION_DAYS_AHEAD
+        today = get_ist_now().date()
+        created = []
+        for offset in range(days_ahead + 1):
+            day = today + timedelta(days=offset)
+            name = partition_name(day)
+            if name in existing:
+                continue
+            db.execute(text(
+                f"ALTER TABLE {TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO ("
+                f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1)}')), "
+                f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE)"
+            ))
+            created.append(name)
+        return created
+
+    @staticmethod
+    def _partitions(db: Session) -> List[str]:
+        rows = db.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+        ), {"table": TABLE}).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _drop_partitions_before(db: Session, cutoff_day: date) -> List[str]:
+        """Drop daily partitions whose whole day is before the cutoff"""
+        to_drop = []
+        for name in LocationRetentionService._partitions(db):
+            day = partition_day(name)
+            if day is not None and day < cutoff_day:
+                to_drop.append(name)
+        if to_drop:
+            db.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {', '.join(to_drop)}"))
+        return to_drop
+
+
+def partition_name(day: date) -> str:
+    return f"p{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """Day covered by a daily partition (None for p_history / p_future)"""
+    try:
+        return date(int(name[1:5]), int(name[5:7]), int(name[7:9]))
+    except (ValueError, IndexError):
+        return None
@@ -0,0 +1,109 @@
+"""
+Latest known position of each delivery partner, keyed by partner id.
+
+Written by the GPS ingestion path and read by customer tracking in O(1).
+Entries live in process memory; with LOCATION_STORE_REDIS_MIRROR enabled
+they are also mirrored to Redis (on every ingest flush) so that a worker
+can serve positions reported to another worker. Reads return whichever
+copy is newer.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import redis
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "dp:loc:"
+
+
+class LatestLocationStore:
+    def __init__(self, mirror: Optional[bool] = None, redis_url: Optional[str] = None, ttl_seconds: Optional[int] = None):
+        self.mirror = settings.LOCATION_STORE_REDIS_MIRROR if mirror is None else mirror
+        self.redis_url = redis_url or settings.REDIS_URL
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.LOCATION_STORE_TTL_SECONDS
+        self._local: Dict[int, dict] = {}
+        self._redis = None
+        self._redis_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    def put(self, fix: dict):
+        """Store a fix (dict with delivery_partner_id, latitude, longitude, created_at, ...)"""
+        self._local[fix["delivery_partner_id"]] = fix
+
+    def get_local(self, partner_id: int) -> Optional[dict]:
+        """This process's copy only (no Redis round trip)"""
+        return self._local.get(partner_id)
+
+    def get(self, partner_id: int) -> Optional[dict]:
+        local = self._local.get(partner_id)
+        if not self.mirror:
+            return local
+
+        remote = self._get_remote(partner_id)
+        if remote is None:
+            return local
+        if local is None or remote["created_at"] > local["created_at"]:
+            return remote
+        return local
+
+    def mirror_many(self, fixes: Iterable[dict]):
+        """Push fixes to Redis in one pipeline; errors are logged, never raised"""
+        if not self.mirror:
+            return
+        client = self._client()
+        if client is None:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for fix in fixes:
+                pipe.set(
+                    f"{REDIS_KEY_PREFIX}{fix['delivery_partner_id']}",
+                    json.dumps(fix, default=lambda value: value.isoformat()),
+                    ex=self.ttl_seconds or None  # 0 keeps the key without expiry
+                )
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to mirror partner locations to Redis: {e}")
+
+    def _get_remote(self, partner_id: int) -> Optional[dict]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(f"{REDIS_KEY_PREFIX}{partner_id}")
+        except Exception as e:
+            logger.error(f"Failed to read partner location from Redis: {e}")
+            return None
+        if not raw:
+            return None
+        fix = json.loads(raw)
+        for field in ("created_at", "updated_at"):
+            if fix.get(field):
+                fix[field] = datetime.fromisoformat(fix[field])
+        return fix
+
+    def _client(self):
+        if self._redis is None:
+            with self._redis_lock:
+                if self._redis is None:
+                    try:
+                        self._redis = redis.Redis.from_url(
+                            self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+                        )
+                    except Exception as e:
+                        logger.error(f"Invalid Redis URL for location store: {e}")
+                        return None
+        return self._redis
+
+
+location_store = LatestLocationStore()
@@ -0,0 +1,143 @@
+"""
+Per-restaurant menu snapshots for the restaurant details screen.
+
+The details payload (restaurant card, address, cuisines, available menu
+items, recent reviews) is read on every restaurant tap but changes rarely,
+so it is built once and kept as pre-serialized JSON bytes with an ETag.
+
+Each restaurant has a version counter. Catalog writes (menu item add /
+update / delete / availability / out-of-stock / duplicate, and profile,
+cuisine and document changes) report through catalog_events, which bumps
+the counter; a snapshot built for an older version is rebuilt on the next
+read. Counters are per process, so another worker picks up a change on its
+own next write to that restaurant or when MENU_SNAPSHOT_TTL_SECONDS expires.
+At most MENU_SNAPSHOT_CACHE_SIZE snapshots are kept, least recently read
+evicted first.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import get_settings
+from app.models import MenuItem, Restaurant, Review
+from app.schemas import AddressResponse, MenuItemResponse, ReviewResponse
+from app.services import catalog_events
+from app.services.restaurant_cards import restaurant_card_query, to_card
+from app.utils.http_cache import make_etag
+
+settings = get_settings()
+
+RECENT_REVIEWS = 5
+
+# Same JSON encoding FastAPI applies to APIResponse (Decimal as string, ISO datetimes)
+_dump_json = TypeAdapter(Any).dump_json
+
+
+class MenuSnapshot(NamedTuple):
+    restaurant_id: int
+    version: int
+    etag: str
+    data: bytes
+    built_at: float
+
+    def body(self, message: str) -> bytes:
+        """The APIResponse JSON around the snapshot data"""
+        return b"".join((b'{"success":true,"message":', _dump_json(message), b',"data":', self.data, b'}'))
+
+
+def build_menu_details(db: Session, restaurant_id: int) -> Optional[dict]:
+    """Restaurant details with menu and recent reviews in four queries, or None"""
+    row = restaurant_card_query(db).options(
+        joinedload(Restaurant.address)
+    ).filter(Restaurant.id == restaurant_id).first()
+    if row is None:
+        return None
+    restaurant = row[0]
+
+    data = to_card(*row)
+    data["address"] = AddressResponse.from_orm(restaurant.address).dict() if restaurant.address else None
+
+    items = db.query(MenuItem).options(joinedload(MenuItem.category)).filter(
+        MenuItem.restaurant_id == restaurant_id,
+        MenuItem.is_available == True
+    ).order_by(MenuItem.id).all()
+    data["menu"] = [MenuItemResponse.from_orm(item).dict() for item in items]
+
+    reviews = db.query(Review).options(joinedload(Review.customer)).filter(
+        Review.restaurant_id == restaurant_id
+    ).order_by(Review.created_at.desc()).limit(RECENT_REVIEWS).all()
+    data["reviews"] = []
+    for review in reviews:
+        review_dict = ReviewResponse.from_orm(review).dict()
+        if review.customer:
+            review_dict["customer_name"] = review.customer.full_name or "Anonymous"
+        data["reviews"].append(review_dict)
+    return data
+
+
+class MenuSnapshotCache:
+    def __init__(self, ttl_seconds: Optional[int] = None, limit: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.MENU_SNAPSHOT_TTL_SECONDS
+        self.limit = limit if limit is not None else settings.MENU_SNAPSHOT_CACHE_SIZE
+        self._snapshots: "OrderedDict[int, MenuSnapshot]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        # Bumped by catalog-wide changes; part of every restaurant's version
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "builds": 0, "evictions": 0}
+
+    def version(self, restaurant_id: int) -> int:
+        return self._epoch + self._versions.get(restaurant_id, 0)
+
+    def invalidate(self, restaurant_id: Optional[int] = None):
+        """Bump one restaurant's version (or, with None, every restaurant's)"""
+        with self._lock:
+            if restaurant_id is None:
+                self._epoch += 1
+                self._snapshots.clear()
+            else:
+                self._versions[restaurant_id] = self._versions.get(restaurant_id, 0) + 1
+                self._snapshots.pop(restaurant_id, None)
+
+    def get(self, db: Session, restaurant_id: int) -> Optional[MenuSnapshot]:
+        """The current snapshot, built if missing or stale; None if there is no such restaurant"""
+        with self._lock:
+            snapshot = self._snapshots.get(restaurant_id)
+            if (
+                snapshot is not None
+                and snapshot.version == self.version(restaurant_id)
+                and time.monotonic() - snapshot.built_at < self.ttl_seconds
+            ):
+                self._snapshots.move_to_end(restaurant_id)
+                self._counters["hits"] += 1
+                return snapshot
+            # Read before building: a write during the build leaves this snapshot stale
+            version = self.version(restaurant_id)
+
+        data = build_menu_details(db, restaurant_id)
+        if data is None:
+            return None
+        body = _dump_json(data)
+        snapshot = MenuSnapshot(restaurant_id, version, make_etag(body), body, time.monotonic())
+
+        with self._lock:
+            self._counters["builds"] += 1
+            if version == self.version(restaurant_id):
+                self._snapshots[restaurant_id] = snapshot
+                self._snapshots.move_to_end(restaurant_id)
+                while len(self._snapshots) > self.limit:
+                    self._snapshots.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return snapshot
+
+    def stats(self) -> dict:
+        return {**self._counters, "snapshots": len(self._snapshots), "epoch": self._epoch}
+
+
+menu_snapshot_cache = MenuSnapshotCache()
+catalog_events.subscribe(menu_snapshot_cache.invalidate)
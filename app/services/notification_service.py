@@ -1,11 +1,15 @@
-import firebase_admin
-from firebase_admin import credentials, messaging
-import os
+from collections import defaultdict
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session
 from app.models import Notification, DeviceToken
 from typing import Optional, List
 
 from app.services.firebase_service import FirebaseService
+from app.services.push_dispatcher import push_dispatcher
+from app.services.spatial_index import partner_index
+
+# Only partners this close to the restaurant are alerted about new orders
+NEARBY_PARTNER_RADIUS_KM = 5.0
 
 def _initialize_firebase():
     return FirebaseService.initialize()
@@ -54,96 +58,47 @@ class NotificationService:
             owner_title = f"Order #{order_id} Update"
             owner_message = f"Order status changed to {status}"
 
-        # Save to database for each relevant user
+        # Collect every recipient so rows are inserted and pushed in one batch
+        recipients = []
         if customer_id:
-            await NotificationService.create_notification(
-                db, 
+            recipients.append(dict(
                 customer_id=customer_id,
                 title=title,
                 message=message,
-                notification_type="order_update",
-                order_id=order_id,
-                status=status
-            )
-            
+                notification_type="order_update"
+            ))
+
         if owner_id:
-            await NotificationService.create_notification(
-                db, 
+            recipients.append(dict(
                 owner_id=owner_id,
                 title=owner_title,
                 message=owner_message,
-                notification_type=owner_notification_type,
-                order_id=order_id,
-                status=status
-            )
+                notification_type=owner_notification_type
+            ))
 
         if delivery_partner_id:
-            await NotificationService.create_notification(
-                db,
+            recipients.append(dict(
                 delivery_partner_id=delivery_partner_id,
                 title=title,
                 message=message,
-                notification_type="order_update",
-                order_id=order_id,
-                status=status
-            )
-        
+                notification_type="order_update"
+            ))
+
         # Notify nearby online delivery partners if order is available for pickup
         if status in ["new", "accepted", "preparing", "ready", "handed_over"] and not delivery_partner_id:
-            from app.models import DeliveryPartner, Order, Address
-            import math
-
-            # 1. Get Restaurant Location
-            order = db.query(Order).filter(Order.id == order_id).first()
-            restaurant_location = None
-            if order:
-                restaurant_address = db.query(Address).filter(Address.restaurant_id == order.restaurant_id).first()
-                if restaurant_address and restaurant_address.latitude and restaurant_address.longitude:
-                    restaurant_location = (float(restaurant_address.latitude), float(restaurant_address.longitude))
-
-            # 2. Get all online partners
-            online_partners = db.query(DeliveryPartner).filter(
-                DeliveryPartner.is_online == True,
-                DeliveryPartner.is_active == True
-            ).all()
-            
-            for partner in online_partners:
-                should_notify = True # Default to True if coordinates missing for backward compatibility
-                
-                # 3. Calculate Distance if both have coordinates
-                if restaurant_location and partner.latitude and partner.longitude:
-                    partner_loc = (float(partner.latitude), float(partner.longitude))
-                    
-                    # Haversine formula for distance calculation (in kilometers)
-                    R = 6371.0 # Earth radius
-                    lat1, lon1 = math.radians(restaurant_location[0]), math.radians(restaurant_location[1])
-                    lat2, lon2 = math.radians(partner_loc[0]), math.radians(partner_loc[1])
-                    
-                    dlat = lat2 - lat1
-                    dlon = lon2 - lon1
-                    
-                    a = math.sin(dlat / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2)**2
-                    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-                    distance = R * c
-                    
-                    # Only notify if within 5.0 KM
-                    if distance > 5.0:
-                        should_notify = False
-                
-                if should_notify:
-                    await NotificationService.create_notification(
-                        db,
-                        delivery_partner_id=partner.id,
-                        title=f"New Order #{order_id} Available!",
-                        message="A new order is available nearby. Tap to see details.",
-                        notification_type="new_available_order",
-                        order_id=order_id,
-                        status=status
-                    )
-        
+            for partner_id in NotificationService._nearby_partner_ids(db, order_id):
+                recipients.append(dict(
+                    delivery_partner_id=partner_id,
+                    title=f"New Order #{order_id} Available!",
+                    message="A new order is available nearby. Tap to see details.",
+                    notification_type="new_available_order"
+                ))
+
+        NotificationService.create_notifications(db, recipients, order_id=order_id, status=status)
+
         # BROADCAST TO ADMINS (via FCM Topic)
         # Any admin app subscribed to 'admin_updates' will receive this
-        await NotificationService._broadcast_to_topic(
+        NotificationService._broadcast_to_topic(
             topic="admin_updates",
             title=f"Order #{order_id}: {status}",
             message=f"Order {order_id} has moved to {status}",
@@ -157,6 +112,100 @@ class NotificationService:
         print(f"Notifications sent for Order #{order_id} - Status: {status}")
         return True
 
+    @staticmethod
+    def _nearby_partner_ids(db: Session, order_id: int) -> List[int]:
+        """
+        Online partners to alert about an available order, nearest first.
+        Partners without coordinates are always included (backward compatibility),
+        and everyone online is alerted if the restaurant has no coordinates.
+        """
+        from app.models import Order, Address
+
+        partner_index.ensure_fresh(db)
+
+        restaurant_location = db.query(Address.latitude, Address.longitude).join(
+            Order, Order.restaurant_id == Address.restaurant_id
+        ).filter(Order.id == order_id).first()
+
+        if not restaurant_location or not restaurant_location.latitude or not restaurant_location.longitude:
+            return partner_index.online_ids()
+
+        nearby = partner_index.nearby(
+            float(restaurant_location.latitude),
+            float(restaurant_location.longitude),
+            NEARBY_PARTNER_RADIUS_KM
+        )
+        return [partner_id for partner_id, _ in nearby] + partner_index.unlocated_ids()
+
+    @staticmethod
+    def retract_available_order(db: Session, order_id: int, taken_by: Optional[int] = None) -> int:
+        """
+        Tell the partners who were offered an order that it is gone.
+
+        Sends a silent "order_taken" data message to the devices of every
+        partner that got the order's new_available_order notification, except
+        the one who took it, so apps drop it from their available list without
+        polling. One query; the push itself is queued. Returns the number of tokens.
+        """
+        if not _initialize_firebase():
+            return 0
+
+        offered = db.query(Notification.delivery_partner_id).filter(
+            Notification.order_id == order_id,
+            Notification.notification_type == "new_available_order",
+            Notification.delivery_partner_id.isnot(None)
+        )
+        if taken_by is not None:
+            offered = offered.filter(Notification.delivery_partner_id != taken_by)
+
+        tokens = [
+            row.token for row in db.query(DeviceToken.token).filter(
+                DeviceToken.is_active == True,
+                DeviceToken.delivery_partner_id.in_(offered.scalar_subquery())
+            ).distinct()
+        ]
+        if tokens:
+            push_dispatcher.send_data(tokens, {
+                "notification_type": "order_taken",
+                "order_id": str(order_id)
+            })
+        return len(tokens)
+
+    @staticmethod
+    def create_notifications(
+        db: Session,
+        recipients: List[dict],
+        order_id: Optional[int] = None,
+        status: Optional[str] = None
+    ) -> int:
+        """
+        Save notifications for many recipients and queue their pushes.
+
+        Each recipient dict carries title, message, notification_type and one of
+        owner_id / customer_id / delivery_partner_id. All rows go in with a single
+        INSERT and one commit; pushes are sent in the background.
+        """
+        if not recipients:
+            return 0
+
+        rows = [
+            {
+                "owner_id": recipient.get("owner_id"),
+                "customer_id": recipient.get("customer_id"),
+                "delivery_partner_id": recipient.get("delivery_partner_id"),
+                "title": recipient["title"],
+                "message": recipient["message"],
+                "notification_type": recipient["notification_type"],
+                "order_id": order_id
+            }
+            for recipient in recipients
+        ]
+        db.execute(insert(Notification), rows)
+        db.commit()
+
+        NotificationService._queue_fcm_pushes(db, recipients, order_id=order_id, status=status)
+        return len(rows)
+
     @staticmethod
     async def create_notification(
         db: Session,
@@ -182,23 +231,22 @@ class NotificationService:
         db.add(notification)
         db.commit()
         db.refresh(notification)
-        
-        # 2. Trigger FCM Push
-        await NotificationService._send_fcm_push(
-            db=db,
-            title=title,
-            message=message,
-            owner_id=owner_id,
-            customer_id=customer_id,
-            delivery_partner_id=delivery_partner_id,
-            data={
-                "notification_type": notification_type,
-                "order_id": str(order_id) if order_id else "",
-                "status": status or "",
-                "click_action": "FLUTTER_NOTIFICATION_CLICK"
-            }
+
+        # 2. Queue FCM Push (sent from the background dispatcher)
+        NotificationService._queue_fcm_pushes(
+            db,
+            [dict(
+                owner_id=owner_id,
+                customer_id=customer_id,
+                delivery_partner_id=delivery_partner_id,
+                title=title,
+                message=message,
+                notification_type=notification_type
+            )],
+            order_id=order_id,
+            status=status
         )
-        
+
         return notification
 
     @staticmethod
@@ -232,87 +280,81 @@ class NotificationService:
         return notification
 
     @staticmethod
-    async def _send_fcm_push(
+    def _queue_fcm_pushes(
         db: Session,
-        title: str,
-        message: str,
-        owner_id: Optional[int] = None,
-        customer_id: Optional[int] = None,
-        delivery_partner_id: Optional[int] = None,
-        data: Optional[dict] = None
+        recipients: List[dict],
+        order_id: Optional[int] = None,
+        status: Optional[str] = None
     ):
-        """Internal method to send push via Firebase"""
+        """Resolve device tokens for all recipients in one query and hand pushes to the dispatcher"""
         if not _initialize_firebase():
             return
 
-        # Query active device tokens
-        query = db.query(DeviceToken).filter(DeviceToken.is_active == True)
-        if owner_id:
-            query = query.filter(DeviceToken.owner_id == owner_id)
-        elif customer_id:
-            query = query.filter(DeviceToken.customer_id == customer_id)
-        elif delivery_partner_id:
-            query = query.filter(DeviceToken.delivery_partner_id == delivery_partner_id)
-        else:
-            return
+        owner_ids = {r["owner_id"] for r in recipients if r.get("owner_id")}
+        customer_ids = {r["customer_id"] for r in recipients if r.get("customer_id")}
+        partner_ids = {r["delivery_partner_id"] for r in recipients if r.get("delivery_partner_id")}
 
-        tokens = [t.token for t in query.all()]
-        if not tokens:
-            print(f"No active device tokens found for user")
+        conditions = []
+        if owner_ids:
+            conditions.append(DeviceToken.owner_id.in_(owner_ids))
+        if customer_ids:
+            conditions.append(DeviceToken.customer_id.in_(customer_ids))
+        if partner_ids:
+            conditions.append(DeviceToken.delivery_partner_id.in_(partner_ids))
+        if not conditions:
             return
 
-        try:
-            # Construct standard notification
-            fcm_notification = messaging.Notification(
-                title=title,
-                body=message
-            )
-            
-            # Use multicast for multiple tokens
-            response = messaging.send_each_for_multicast(
-                messaging.MulticastMessage(
-                    notification=fcm_notification,
-                    tokens=tokens,
-                    data=data or {}
-                )
+        token_rows = db.query(
+            DeviceToken.token,
+            DeviceToken.owner_id,
+            DeviceToken.customer_id,
+            DeviceToken.delivery_partner_id
+        ).filter(
+            DeviceToken.is_active == True,
+            or_(*conditions)
+        ).all()
+
+        tokens_by_user = defaultdict(list)
+        for row in token_rows:
+            if row.owner_id:
+                tokens_by_user[("owner", row.owner_id)].append(row.token)
+            if row.customer_id:
+                tokens_by_user[("customer", row.customer_id)].append(row.token)
+            if row.delivery_partner_id:
+                tokens_by_user[("delivery_partner", row.delivery_partner_id)].append(row.token)
+
+        # Recipients sharing the same payload go out as one multicast
+        tokens_by_payload = defaultdict(list)
+        for recipient in recipients:
+            if recipient.get("owner_id"):
+                key = ("owner", recipient["owner_id"])
+            elif recipient.get("customer_id"):
+                key = ("customer", recipient["customer_id"])
+            else:
+                key = ("delivery_partner", recipient.get("delivery_partner_id"))
+
+            payload = (recipient["title"], recipient["message"], recipient["notification_type"])
+            tokens_by_payload[payload].extend(tokens_by_user.get(key, []))
+
+        for (title, message, notification_type), tokens in tokens_by_payload.items():
+            if not tokens:
+                continue
+            push_dispatcher.send_multicast(
+                list(dict.fromkeys(tokens)),
+                title,
+                message,
+                data={
+                    "notification_type": notification_type,
+                    "order_id": str(order_id) if order_id else "",
+                    "status": status or "",
+                    "click_action": "FLUTTER_NOTIFICATION_CLICK"
+                }
             )
-            print(f"✅ Successfully sent {response.success_count} FCM messages")
-            if response.failure_count > 0:
-                print(f"❌ Failed to send {response.failure_count} FCM messages")
-                # Clean up dead tokens
-                tokens_to_deactivate = []
-                for idx, resp in enumerate(response.responses):
-                    if not resp.success:
-                        error_msg = str(resp.exception)
-                        print(f"   - Error for token {tokens[idx][:20]}...: {error_msg}")
-                        # If token is invalid or not found, mark it as inactive
-                        if "not-found" in error_msg.lower() or "invalid-registration" in error_msg.lower() or "Requested entity was not found" in error_msg:
-                            tokens_to_deactivate.append(tokens[idx])
-                
-                if tokens_to_deactivate:
-                    db.query(DeviceToken).filter(DeviceToken.token.in_(tokens_to_deactivate)).update({"is_active": False}, synchronize_session=False)
-                    db.commit()
-                    print(f"   - Deactivated {len(tokens_to_deactivate)} dead tokens from database")
-
-        except Exception as e:
-            print(f"❌ Error during FCM multicast send: {e}")
 
     @staticmethod
-    async def _broadcast_to_topic(topic: str, title: str, message: str, data: dict = None):
+    def _broadcast_to_topic(topic: str, title: str, message: str, data: dict = None):
         """Send FCM notification to all devices subscribed to a topic (e.g., admins)"""
         if not _initialize_firebase():
             return
-        
-        try:
-            fcm_message = messaging.Message(
-                notification=messaging.Notification(
-                    title=title,
-                    body=message
-                ),
-                topic=topic,
-                data=data or {}
-            )
-            response = messaging.send(fcm_message)
-            print(f"✅ Successfully broadcasted to topic '{topic}': {response}")
-        except Exception as e:
-            print(f"❌ Error during topic broadcast: {e}")
+
+        push_dispatcher.send_topic(topic, title, message, data)
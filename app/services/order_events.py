@@ -0,0 +1,67 @@
+"""
+Outbox handler for order side effects.
+
+Every order write (placement, each status transition) adds one
+"order.changed" event in its own transaction via enqueue_order_event(). The
+outbox dispatcher then, after commit:
+
+1. sends the restaurant's /orders/live WebSocket message (coalesced per
+   order, so a retry only repeats the latest snapshot), and
+2. calls NotificationService.send_order_update for the requested recipients:
+   notification rows and FCM pushes, nearby partner fan-out for unassigned
+   orders, and the admin topic broadcast.
+
+Recipient ids are read from the order row when the event is dispatched.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models import Order
+from app.models_orders import OutboxEvent
+from app.services import outbox
+from app.services.notification_service import NotificationService
+
+ORDER_CHANGED = "order.changed"
+
+RECIPIENTS = ("customer", "owner", "partner")
+
+
+def enqueue_order_event(
+    db: Session,
+    order_id: int,
+    status: str,
+    recipients: Iterable[str] = RECIPIENTS,
+    live_event_type: Optional[str] = None
+) -> OutboxEvent:
+    """Queue the live broadcast and notifications for an order change in the caller's transaction"""
+    return outbox.enqueue(db, ORDER_CHANGED, order_id, {
+        "status": status,
+        "recipients": list(recipients),
+        "event_type": live_event_type
+    })
+
+
+@outbox.handler(ORDER_CHANGED)
+async def fan_out(db: Session, event: OutboxEvent):
+    from app.routers.orders import broadcast_new_order
+
+    payload = event.payload or {}
+    order = db.query(Order).options(
+        selectinload(Order.items), joinedload(Order.restaurant)
+    ).filter(Order.id == event.order_id).first()
+    if order is None:
+        return
+
+    await broadcast_new_order(order.restaurant_id, order, payload.get("event_type"))
+
+    recipients = set(payload.get("recipients") or ())
+    await NotificationService.send_order_update(
+        db=db,
+        order_id=order.id,
+        status=payload["status"],
+        customer_id=order.customer_id if "customer" in recipients else None,
+        owner_id=order.restaurant.owner_id if "owner" in recipients and order.restaurant else None,
+        delivery_partner_id=order.delivery_partner_id if "partner" in recipients else None
+    )
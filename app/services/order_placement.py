@@ -0,0 +1,203 @@
+"""
+Order placement: cart -> order, exactly once.
+
+The customer's cart row is locked (SELECT ... FOR UPDATE) for the length of
+the transaction, so concurrent taps on "Place order" run one after another.
+The first one turns the cart into an order. The others find the cart empty,
+or, when they send the same Idempotency-Key, find the key and get the same
+order back. The key lookup is a locking read: on MySQL REPEATABLE READ the
+request's read view was opened before it waited on the cart lock (loading
+the customer), and a plain SELECT would not see the key the first request
+just committed. The key row is written in the same transaction as the
+order, which means a failed placement leaves neither behind and can simply
+be retried.
+
+Order lines go in with one multi-row INSERT. Cart lines are removed with a
+conditional DELETE whose row count must match the lines that were priced,
+which catches a cart that changed underneath on databases without row locks.
+
+Notifications and the restaurant's live broadcast are queued in the outbox
+as part of the same transaction; the request does not wait for them.
+"""
+
+import hashlib
+import json
+import logging
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import Cart, CartItem, Customer, CustomerAddress, Order, OrderItem, OrderStatusEnum, Restaurant
+from app.models_orders import IdempotencyKey
+from app.schemas import OrderCreateRequest
+from app.services.cart_pricing import CartPricingService
+from app.services.order_events import enqueue_order_event
+from app.services.restaurant_stats import RestaurantStatsService
+from app.utils.ids import new_ulid
+
+logger = logging.getLogger(__name__)
+
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+FALLBACK_DELIVERY_ADDRESS = "123 MG Road, Bangalore, Karnataka 560001"
+
+
+class PlacedOrder(NamedTuple):
+    order_id: int
+    order_number: str
+    replayed: bool  # True when an earlier request with the same Idempotency-Key placed it
+
+
+def generate_order_number() -> str:
+    """Unique, time-sortable order number (see utils.ids)"""
+    return new_ulid()
+
+
+def request_fingerprint(request: OrderCreateRequest) -> str:
+    body = json.dumps(request.dict(), sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(existing: IdempotencyKey, fingerprint: str) -> PlacedOrder:
+    if existing.request_hash != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different order request")
+    return PlacedOrder(existing.order_id, existing.order_number, True)
+
+
+def _find_key(db: Session, customer_id: int, key: str) -> Optional[IdempotencyKey]:
+    # Locking read: sees the latest committed row, not the transaction's snapshot
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.customer_id == customer_id,
+        IdempotencyKey.key == key
+    ).with_for_update().first()
+
+
+class OrderPlacementService:
+    @staticmethod
+    def place(
+        db: Session,
+        customer: Customer,
+        request: OrderCreateRequest,
+        idempotency_key: Optional[str] = None
+    ) -> PlacedOrder:
+        """
+        Turn the customer's cart into an order and empty the cart.
+
+        Raises:
+            HTTPException: 400 for an empty cart, restaurant mismatch, offline
+                restaurant or invalid promo code; 409 if the cart changed
+                while placing; 422 if the Idempotency-Key was used for a
+                different request
+        """
+        if idempotency_key is not None:
+            idempotency_key = idempotency_key.strip()
+            if not idempotency_key or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                raise HTTPException(status_code=400, detail="Invalid Idempotency-Key header")
+        fingerprint = request_fingerprint(request)
+        customer_id = customer.id
+
+        # 1. Lock the cart: concurrent placements for this customer queue here
+        cart = db.query(Cart).filter(Cart.customer_id == customer_id).with_for_update().first()
+
+        # 2. A retry of a request that already went through gets the same order
+        if idempotency_key:
+            existing = _find_key(db, customer_id, idempotency_key)
+            if existing:
+                return _replay(existing, fingerprint)
+
+        if cart is None:
+            raise HTTPException(status_code=400, detail="Cart is empty")
+
+        # 3. Price the cart (loads lines, menu items and restaurant)
+        totals = CartPricingService.price(db, cart, request.address_id, request.promo_code)
+        if not totals.items:
+            raise HTTPException(status_code=400, detail="Cart is empty")
+        if totals.restaurant_id != request.restaurant_id:
+            raise HTTPException(status_code=400, detail="Cart restaurant mismatch")
+        if totals.promo_error:
+            raise HTTPException(status_code=400, detail=totals.promo_error)
+
+        restaurant = db.get(Restaurant, request.restaurant_id)
+        if not restaurant or not restaurant.is_active or not restaurant.is_open:
+            raise HTTPException(status_code=400, detail="Restaurant is currently offline and not accepting orders")
+
+        address = db.query(CustomerAddress).filter(
+            CustomerAddress.id == request.address_id,
+            CustomerAddress.customer_id == customer_id
+        ).first()
+        if not address:
+            delivery_address_str = FALLBACK_DELIVERY_ADDRESS
+        else:
+            delivery_address_str = f"{address.address_line_1}, {address.city}, {address.pincode}"
+
+        # 4. Order and its lines
+        order = Order(
+            order_number=generate_order_number(),
+            restaurant_id=request.restaurant_id,
+            customer_id=customer_id,
+            customer_name=customer.full_name or "Guest",
+            customer_phone=customer.phone_number,
+            delivery_address=delivery_address_str,
+            status=OrderStatusEnum.PENDING.value,
+            total_amount=totals.total_amount,
+            delivery_fee=totals.delivery_fee,
+            tax_amount=totals.tax_amount,
+            discount_amount=totals.discount_amount,
+            payment_method=request.payment_method,
+            payment_status="success"
+        )
+        db.add(order)
+        db.flush()
+        placed = PlacedOrder(order.id, order.order_number, False)
+
+        db.execute(insert(OrderItem), [
+            {
+                "order_id": placed.order_id,
+                "menu_item_id": item.menu_item_id,
+                "quantity": item.quantity,
+                "price": item.price
+            }
+            for item in totals.items
+        ])
+
+        # 5. Empty the cart; the row count proves nobody changed it since pricing
+        removed = db.query(CartItem).filter(
+            CartItem.cart_id == totals.id
+        ).delete(synchronize_session=False)
+        if removed != len(totals.items):
+            db.rollback()
+            # A request with the same key may have emptied the cart first
+            existing = _find_key(db, customer_id, idempotency_key) if idempotency_key else None
+            if existing:
+                return _replay(existing, fingerprint)
+            raise HTTPException(status_code=409, detail="Cart changed while placing the order, please try again")
+        cart.restaurant_id = None
+
+        RestaurantStatsService.record_placed(db, request.restaurant_id)
+
+        # Pushes, partner fan-out and the live broadcast go out after commit (see order_events)
+        enqueue_order_event(db, placed.order_id, "new", recipients=("owner",), live_event_type="new_order")
+
+        if idempotency_key:
+            db.add(IdempotencyKey(
+                customer_id=customer_id,
+                key=idempotency_key,
+                request_hash=fingerprint,
+                order_id=placed.order_id,
+                order_number=placed.order_number
+            ))
+
+        try:
+            db.commit()
+        except IntegrityError:
+            # Same key committed by a concurrent request that did not wait on the cart lock
+            db.rollback()
+            existing = _find_key(db, customer_id, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return _replay(existing, fingerprint)
+
+        logger.info("Placed order %s (%s) for customer %s", placed.order_id, placed.order_number, customer_id)
+        return placed
@@ -0,0 +1,207 @@
+"""
+Column projections for order lists (rider available / active / history).
+
+order_list_query() selects just the columns OrderListResponse needs, with the
+restaurant name from one outer join, so a list costs one statement and no
+ORM objects are hydrated. keyset_page() pages such a query newest first on
+a timestamp column (created_at, delivered_at) with the order id as
+tie-breaker; the cursor carries the last row's (timestamp, id), so deep
+pages cost the same as the first one.
+
+customer_order_page() does the same for customer order history, with a
+compact restaurant summary in the order row and the page's items fetched
+in one more statement.
+"""
+
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session
+
+from app.models import DEFAULT_RESTAURANT_IMAGE_URL, Order, OrderItem, Restaurant
+from app.services.restaurant_cards import cover_photo_column
+from app.utils.pagination import decode_cursor, encode_cursor
+
+ORDER_LIST_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.restaurant_id,
+    Order.customer_name,
+    Order.customer_phone,
+    Order.delivery_address,
+    Order.total_amount,
+    Order.status,
+    Order.created_at,
+    Order.estimated_delivery_time,
+    Restaurant.restaurant_name
+)
+
+
+def order_list_query(db: Session, *extra_columns) -> Query:
+    """Order list rows joined with the restaurant name; extra_columns are appended"""
+    return db.query(*ORDER_LIST_COLUMNS, *extra_columns).outerjoin(
+        Restaurant, Restaurant.id == Order.restaurant_id
+    )
+
+
+def to_order_list_item(row) -> dict:
+    """OrderListResponse fields (plus restaurant_id) from an order_list_query row"""
+    return {
+        "id": row.id,
+        "order_number": row.order_number,
+        "restaurant_id": row.restaurant_id,
+        "restaurant_name": row.restaurant_name or "Unknown",
+        "customer_name": row.customer_name,
+        "customer_phone": row.customer_phone,
+        "delivery_address": row.delivery_address,
+        "total_amount": row.total_amount,
+        "status": row.status,
+        "created_at": row.created_at,
+        "estimated_delivery_time": row.estimated_delivery_time
+    }
+
+
+def _after(column, value: Optional[datetime], order_id: int):
+    """Rows after (value, order_id) in `column DESC, id DESC` order, NULL timestamps last"""
+    if value is None:
+        return and_(column.is_(None), Order.id < order_id)
+    return or_(
+        column < value,
+        and_(column == value, Order.id < order_id),
+        column.is_(None)
+    )
+
+
+def keyset_page(
+    query: Query,
+    column,
+    limit: int,
+    cursor: Optional[str] = None,
+    to_item: Callable = to_order_list_item
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of a projection query (rows need an `id`), newest first by
+    `column`, converted with `to_item`, and the cursor for the next page
+    (None on the last page).
+
+    Raises:
+        ValueError: if the cursor is invalid
+    """
+    after = decode_cursor(cursor, 2)
+    if after is not None:
+        try:
+            value = datetime.fromisoformat(after[0]) if after[0] is not None else None
+            query = query.filter(_after(column, value, int(after[1])))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+
+    # MySQL and SQLite put NULLs last in DESC order, which _after() relies on
+    rows = query.add_columns(column.label("sort_key")).order_by(
+        column.desc(), Order.id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.sort_key.isoformat() if last.sort_key else None, last.id)
+    return [to_item(row) for row in rows], next_cursor
+
+
+CUSTOMER_ORDER_COLUMNS = (
+    Order.id,
+    Order.order_number,
+    Order.restaurant_id,
+    Order.customer_name,
+    Order.customer_phone,
+    Order.delivery_address,
+    Order.status,
+    Order.total_amount,
+    Order.delivery_fee,
+    Order.tax_amount,
+    Order.discount_amount,
+    Order.payment_method,
+    Order.payment_status,
+    Order.special_instructions,
+    Order.estimated_delivery_time,
+    Order.created_at,
+    Restaurant.restaurant_name,
+    Restaurant.average_rating,
+    Restaurant.is_open
+)
+
+
+def customer_order_query(db: Session) -> Query:
+    """OrderHistoryResponse columns with the restaurant summary from one outer join"""
+    return db.query(*CUSTOMER_ORDER_COLUMNS, cover_photo_column()).outerjoin(
+        Restaurant, Restaurant.id == Order.restaurant_id
+    )
+
+
+def to_customer_order(row) -> dict:
+    """OrderHistoryResponse fields (items still empty) from a customer_order_query row"""
+    restaurant = None
+    if row.restaurant_name is not None:
+        restaurant = {
+            "id": row.restaurant_id,
+            "restaurant_name": row.restaurant_name,
+            "image_url": row.cover_photo or DEFAULT_RESTAURANT_IMAGE_URL,
+            "average_rating": row.average_rating,
+            "is_open": row.is_open
+        }
+    return {
+        "id": row.id,
+        "order_number": row.order_number,
+        "customer_name": row.customer_name,
+        "customer_phone": row.customer_phone,
+        "delivery_address": row.delivery_address,
+        "status": row.status,
+        "total_amount": row.total_amount,
+        "delivery_fee": row.delivery_fee,
+        "tax_amount": row.tax_amount,
+        "discount_amount": row.discount_amount,
+        "payment_method": row.payment_method,
+        "payment_status": row.payment_status,
+        "special_instructions": row.special_instructions,
+        "estimated_delivery_time": row.estimated_delivery_time,
+        "created_at": row.created_at,
+        "items": [],
+        "restaurant": restaurant
+    }
+
+
+def customer_order_page(
+    db: Session,
+    customer_id: int,
+    limit: int,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of a customer's orders, newest first on (created_at, id), with
+    their items batch-loaded: two statements per page.
+
+    Raises:
+        ValueError: if the cursor is invalid
+    """
+    query = customer_order_query(db).filter(Order.customer_id == customer_id)
+    orders, next_cursor = keyset_page(query, Order.created_at, limit, cursor, to_item=to_customer_order)
+    if orders:
+        by_id = {order["id"]: order for order in orders}
+        items = db.query(
+            OrderItem.id,
+            OrderItem.order_id,
+            OrderItem.menu_item_id,
+            OrderItem.quantity,
+            OrderItem.price,
+            OrderItem.special_instructions
+        ).filter(OrderItem.order_id.in_(by_id)).order_by(OrderItem.id).all()
+        for item in items:
+            by_id[item.order_id]["items"].append({
+                "id": item.id,
+                "menu_item_id": item.menu_item_id,
+                "quantity": item.quantity,
+                "price": item.price,
+                "special_instructions": item.special_instructions
+            })
+    return orders, next_cursor
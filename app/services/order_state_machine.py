@@ -0,0 +1,265 @@
+"""
+Order status transitions.
+
+TRANSITIONS declares, for every status change a restaurant or delivery
+partner can make:
+- the statuses it may start from and the status each one moves to;
+- the timestamp columns it stamps;
+- how it treats order.delivery_partner_id;
+- who is notified.
+
+OrderStateMachine.apply() turns a transition into a single conditional
+statement:
+
+    UPDATE orders SET status = CASE status WHEN ... END, <stamps>
+     WHERE id = :id AND status IN (...) [AND restaurant/partner guards]
+    RETURNING *
+
+The guard in the WHERE clause makes a transition compare-and-set. Of two
+concurrent requests (two riders accepting the same order, a restaurant
+cancelling while a rider picks up) exactly one matches the row; the other
+updates nothing and gets an error. On databases without UPDATE ... RETURNING
+(MySQL), the updated row is read back by primary key in the same
+transaction. A claim is guarded on the acting partner first and, if that
+matches nothing, retried once guarded on an unassigned order, so the result
+can tell whether this call assigned it.
+
+One "order.changed" outbox event is written in the same transaction, which
+drives the live broadcast and notifications (see order_events). Final
+statuses also update the restaurant's daily stats and, for deliveries, the
+partner's earnings rollup in that transaction. Transitions
+that move an order into or out of the available pool also refresh the
+riders' available-orders cache after commit.
+"""
+
+import logging
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.models import Order, OrderStatusEnum
+from app.services.available_orders import AVAILABLE_STATUSES, order_pool_changed
+from app.services.order_events import RECIPIENTS, enqueue_order_event
+from app.services.outbox import outbox_dispatcher
+from app.services.restaurant_stats import RestaurantStatsService
+from app.services.rider_earnings import RiderEarningsService
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+S = OrderStatusEnum
+
+ORDER_TAKEN_DETAIL = "Order has already been accepted by another delivery partner"
+
+# How a transition treats order.delivery_partner_id (partner transitions only)
+PARTNER_UNASSIGNED = "unassigned"  # must be unassigned; becomes the acting partner
+PARTNER_CLAIM = "claim"            # unassigned or already the acting partner; becomes the acting partner
+PARTNER_ASSIGNED = "assigned"      # must be the acting partner
+PARTNER_RELEASE = "release"        # must be the acting partner; becomes unassigned
+
+
+class Transition(NamedTuple):
+    name: str
+    targets: Dict[S, S]                     # from status -> new status
+    stamps: Tuple[str, ...] = ()            # columns set to now
+    partner: Optional[str] = None           # None for restaurant transitions
+    notify_status: Optional[str] = None     # status sent to NotificationService (default: new status)
+    recipients: Tuple[str, ...] = RECIPIENTS
+    message: str = ""
+
+
+class TransitionResult(NamedTuple):
+    order_id: int
+    restaurant_id: int
+    status: str
+    delivery_partner_id: Optional[int]
+    data: Optional[dict]  # render(order) output, taken before commit
+    assigned: bool = False  # this transition gave the order to the acting partner
+
+
+def _to(new_status: S, *from_statuses: S) -> Dict[S, S]:
+    return {old: new_status for old in from_statuses}
+
+
+HANDED_OVER_STATES = (S.HANDED_OVER, S.RELEASED)
+
+TRANSITIONS: Dict[str, Transition] = {t.name: t for t in (
+    # ----- Restaurant -----
+    Transition("accept", _to(S.ACCEPTED, S.PENDING), ("accepted_at",),
+               message="Order marked as accepted"),
+    Transition("preparing", _to(S.PREPARING, S.PENDING, S.ACCEPTED), ("preparing_at",),
+               message="Order marked as preparing"),
+    Transition("ready", _to(S.READY, S.ACCEPTED, S.PREPARING), ("ready_at",),
+               message="Order marked as ready"),
+    Transition("handed_over", _to(S.HANDED_OVER, S.READY, S.ASSIGNED, S.REACHED_RESTAURANT), ("handed_over_at",),
+               message="Order marked as handed_over"),
+    Transition("picked_up", _to(S.PICKED_UP, S.READY, S.ASSIGNED, S.REACHED_RESTAURANT, *HANDED_OVER_STATES),
+               ("pickedup_at",), message="Order marked as picked_up"),
+    Transition("delivered", _to(S.DELIVERED, S.ASSIGNED, S.REACHED_RESTAURANT, S.PICKED_UP, *HANDED_OVER_STATES),
+               ("delivered_at", "completed_at"), message="Order marked as delivered"),
+    Transition("reject", _to(S.REJECTED, S.PENDING, S.ACCEPTED, S.PREPARING), ("rejected_at",),
+               recipients=("customer",), message="Order rejected successfully"),
+    # rejected_at doubles as the terminal stamp for cancellations
+    Transition("cancel", _to(S.CANCELLED, S.PENDING, S.ACCEPTED, S.PREPARING, S.READY, S.ASSIGNED,
+                             S.REACHED_RESTAURANT), ("rejected_at",),
+               recipients=("customer",), message="Order cancelled successfully"),
+
+    # ----- Delivery partner -----
+    Transition("partner_accept", {S.READY: S.ASSIGNED, S.HANDED_OVER: S.HANDED_OVER, S.RELEASED: S.RELEASED},
+               ("assigned_at",), partner=PARTNER_UNASSIGNED,
+               message="Order accepted for delivery successfully"),
+    Transition("partner_reached", _to(S.REACHED_RESTAURANT, S.READY, S.ASSIGNED, *HANDED_OVER_STATES),
+               ("reached_restaurant_at",), partner=PARTNER_CLAIM, notify_status="delivery_partner_reached",
+               message="Reached restaurant successfully"),
+    Transition("partner_picked_up", _to(S.PICKED_UP, S.ASSIGNED, S.REACHED_RESTAURANT, *HANDED_OVER_STATES),
+               ("pickedup_at",), partner=PARTNER_ASSIGNED, notify_status="order_picked_up",
+               message="Order picked up successfully"),
+    # Released orders go back to the pool of available (READY / HANDED_OVER) orders
+    Transition("partner_release", {S.ASSIGNED: S.READY, S.REACHED_RESTAURANT: S.READY, S.READY: S.READY,
+                                   S.HANDED_OVER: S.HANDED_OVER, S.RELEASED: S.RELEASED},
+               partner=PARTNER_RELEASE, notify_status="partner_released", recipients=("customer", "owner"),
+               message="Order released successfully. Other partners can now accept it."),
+    Transition("partner_delivered", _to(S.DELIVERED, S.PICKED_UP), ("delivered_at", "completed_at"),
+               partner=PARTNER_ASSIGNED, notify_status="delivered",
+               message="Order marked as delivered successfully"),
+)}
+
+
+def _moves_pool(transition: Transition) -> bool:
+    """Whether the transition can move an order into or out of the available pool"""
+    if transition.partner in (PARTNER_UNASSIGNED, PARTNER_CLAIM, PARTNER_RELEASE):
+        return True
+    return any(s.value in AVAILABLE_STATUSES for pair in transition.targets.items() for s in pair)
+
+
+POOL_TRANSITIONS = {name for name, transition in TRANSITIONS.items() if _moves_pool(transition)}
+
+
+class OrderStateMachine:
+    @staticmethod
+    def apply(
+        db: Session,
+        name: str,
+        order_id: int,
+        restaurant_id: Optional[int] = None,
+        partner_id: Optional[int] = None,
+        values: Optional[dict] = None,
+        render: Optional[Callable[[Order], dict]] = None
+    ) -> TransitionResult:
+        """
+        Apply a transition as one conditional UPDATE, queue its event and commit.
+
+        restaurant_id scopes restaurant transitions to that restaurant's
+        orders; partner_id is the acting delivery partner. values are extra
+        columns to set (e.g. rejection_reason). render runs on the updated
+        order before commit (relationships can still lazy-load).
+
+        Raises:
+            HTTPException: 404 if the order is not visible to the actor, 403
+                if it belongs to another partner, 400 if the current status
+                does not allow the transition, 409 if another partner already
+                has it or a concurrent change won
+        """
+        transition = TRANSITIONS[name]
+        now = get_ist_now()
+
+        criteria = [Order.id == order_id, Order.status.in_([s.value for s in transition.targets])]
+        changes = {column: now for column in transition.stamps}
+        changes.update(values or {})
+
+        new_statuses = set(transition.targets.values())
+        if len(new_statuses) == 1:
+            changes["status"] = next(iter(new_statuses)).value
+        else:
+            changes["status"] = case(
+                {old.value: new.value for old, new in transition.targets.items()},
+                value=Order.status
+            )
+
+        if restaurant_id is not None:
+            criteria.append(Order.restaurant_id == restaurant_id)
+        if transition.partner == PARTNER_UNASSIGNED:
+            criteria.append(Order.delivery_partner_id.is_(None))
+            changes["delivery_partner_id"] = partner_id
+        elif transition.partner in (PARTNER_CLAIM, PARTNER_ASSIGNED):
+            criteria.append(Order.delivery_partner_id == partner_id)
+        elif transition.partner == PARTNER_RELEASE:
+            criteria.append(Order.delivery_partner_id == partner_id)
+            changes["delivery_partner_id"] = None
+            changes["assigned_at"] = None
+
+        order = OrderStateMachine._update(db, order_id, criteria, changes)
+        assigned = order is not None and transition.partner == PARTNER_UNASSIGNED
+        if order is None and transition.partner == PARTNER_CLAIM:
+            # Not the acting partner's (yet): claim it if it is unassigned
+            criteria[-1] = Order.delivery_partner_id.is_(None)
+            changes.update(delivery_partner_id=partner_id, assigned_at=now)
+            order = OrderStateMachine._update(db, order_id, criteria, changes)
+            assigned = order is not None
+
+        if order is None:
+            db.rollback()
+            raise OrderStateMachine._rejection(db, transition, order_id, restaurant_id, partner_id)
+
+        result = TransitionResult(
+            order_id=order.id,
+            restaurant_id=order.restaurant_id,
+            status=order.status,
+            delivery_partner_id=order.delivery_partner_id,
+            data=render(order) if render else None,
+            assigned=assigned
+        )
+        if result.status == S.DELIVERED.value:
+            RiderEarningsService.record_delivery(db, order)
+        RestaurantStatsService.record_status(db, result.restaurant_id, result.status, order.total_amount)
+        enqueue_order_event(db, order_id, transition.notify_status or result.status, transition.recipients)
+        db.commit()
+        outbox_dispatcher.wake()
+        if name in POOL_TRANSITIONS:
+            order_pool_changed(result.restaurant_id)
+        logger.info("Order %s: %s -> %s", order_id, name, result.status)
+        return result
+
+    @staticmethod
+    def _update(db: Session, order_id: int, criteria: list, changes: dict) -> Optional[Order]:
+        """Run the conditional UPDATE; the updated order, or None if no row matched"""
+        statement = update(Order).where(*criteria).values(**changes).execution_options(synchronize_session=False)
+        if db.get_bind().dialect.update_returning:
+            return db.execute(
+                statement.returning(Order).execution_options(populate_existing=True)
+            ).scalars().first()
+        if db.execute(statement).rowcount:
+            return db.query(Order).populate_existing().filter(Order.id == order_id).first()
+        return None
+
+    @staticmethod
+    def _rejection(
+        db: Session,
+        transition: Transition,
+        order_id: int,
+        restaurant_id: Optional[int],
+        partner_id: Optional[int]
+    ) -> HTTPException:
+        """Explain why the conditional UPDATE matched nothing (only runs on failure)"""
+        row = db.query(Order.status, Order.restaurant_id, Order.delivery_partner_id).filter(Order.id == order_id).first()
+        if row is None or (restaurant_id is not None and row.restaurant_id != restaurant_id):
+            return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+
+        if transition.partner == PARTNER_UNASSIGNED and row.delivery_partner_id is not None:
+            return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_TAKEN_DETAIL)
+        if transition.partner == PARTNER_CLAIM and row.delivery_partner_id not in (None, partner_id):
+            return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=ORDER_TAKEN_DETAIL)
+        if transition.partner in (PARTNER_ASSIGNED, PARTNER_RELEASE) and row.delivery_partner_id != partner_id:
+            return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="This order is not assigned to you")
+
+        allowed = [s.value for s in transition.targets]
+        if row.status not in allowed:
+            return HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot apply '{transition.name}' to an order in status {row.status}. "
+                       f"Allowed from: {', '.join(allowed)}"
+            )
+        return HTTPException(status_code=status.HTTP_409_CONFLICT,
+                             detail="Order was updated by another request, please retry")
@@ -0,0 +1,297 @@
+"""
+Transactional outbox for order side effects.
+
+Writes that should notify someone (FCM pushes, the restaurant's live
+WebSocket, the admin topic, nearby delivery partners) add an outbox_events row
+with enqueue() in the same transaction as the order change. The request then
+returns without waiting on any of it.
+
+OutboxDispatcher drains the table in the background:
+- Each pass claims up to OUTBOX_BATCH_SIZE due events. Claiming pushes their
+  available_at forward by OUTBOX_LEASE_SECONDS. On PostgreSQL/MySQL the rows
+  are selected with FOR UPDATE SKIP LOCKED, so several workers can share the
+  table.
+- Each event runs the handler registered for its type. Successful events are
+  marked done in one UPDATE.
+- A failing event is retried with exponential backoff. After
+  OUTBOX_MAX_ATTEMPTS attempts it is marked failed.
+- A worker that dies mid-batch leaves its events claimed until the lease
+  runs out. Another pass then picks them up again.
+
+Delivery is at least once, so handlers must tolerate being run twice.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models_orders import OutboxEvent
+from app.utils.timezone import get_ist_now
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Called with (db, event); raising schedules a retry
+Handler = Callable[[Session, OutboxEvent], Awaitable[None]]
+
+MAX_RETRY_DELAY_SECONDS = 300
+MAX_ERROR_LENGTH = 1000
+
+_handlers: Dict[str, Handler] = {}
+
+
+def register(event_type: str, handler: Handler):
+    """Register the coroutine that carries out events of a type"""
+    _handlers[event_type] = handler
+
+
+def handler(event_type: str):
+    """Decorator form of register()"""
+    def wrap(fn: Handler) -> Handler:
+        register(event_type, fn)
+        return fn
+    return wrap
+
+
+def enqueue(db: Session, event_type: str, order_id: Optional[int] = None, payload: Optional[dict] = None) -> OutboxEvent:
+    """Add an event to the caller's transaction; nothing is sent until it commits"""
+    event = OutboxEvent(
+        event_type=event_type,
+        order_id=order_id,
+        payload=payload or {},
+        status="pending",
+        attempts=0,
+        available_at=get_ist_now()
+    )
+    db.add(event)
+    return event
+
+
+def retry_delay_seconds(attempts: int, base_seconds: float) -> float:
+    return min(base_seconds * (2 ** max(attempts - 1, 0)), MAX_RETRY_DELAY_SECONDS)
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        poll_interval_ms: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        lease_seconds: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        session_factory=None
+    ):
+        self.poll_interval = (
+            poll_interval_ms if poll_interval_ms is not None else settings.OUTBOX_POLL_INTERVAL_MS
+        ) / 1000
+        self.batch_size = batch_size if batch_size is not None else settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts if max_attempts is not None else settings.OUTBOX_MAX_ATTEMPTS
+        self.lease_seconds = lease_seconds if lease_seconds is not None else settings.OUTBOX_LEASE_SECONDS
+        self.retry_base_seconds = (
+            retry_base_seconds if retry_base_seconds is not None else settings.OUTBOX_RETRY_BASE_SECONDS
+        )
+        self._session_factory = session_factory
+
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.processed = 0
+        self.retried = 0
+        self.failed = 0
+        self.passes = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    # ---------- Producer side ----------
+
+    def wake(self):
+        """
+        Run a pass now instead of at the next poll (call after committing
+        events). Safe to call from any thread, e.g. a sync endpoint running
+        in the threadpool: asyncio.Event is not thread-safe, so off the
+        dispatcher's loop the set is handed to that loop.
+        """
+        wake, loop = self._wake, self._loop
+        if wake is None or loop is None:
+            return
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            wake.set()
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(wake.set)
+
+    # ---------- Draining ----------
+
+    def _claim(self) -> List[int]:
+        """Lease due events to this worker; returns their ids, oldest first"""
+        db = self._new_session()
+        try:
+            now = get_ist_now()
+            ids = [
+                row.id for row in db.query(OutboxEvent.id).filter(
+                    OutboxEvent.status == "pending",
+                    OutboxEvent.available_at <= now
+                ).order_by(OutboxEvent.id).limit(self.batch_size).with_for_update(skip_locked=True)
+            ]
+            if ids:
+                db.execute(
+                    update(OutboxEvent).where(OutboxEvent.id.in_(ids)).values(
+                        attempts=OutboxEvent.attempts + 1,
+                        available_at=now + timedelta(seconds=self.lease_seconds)
+                    ).execution_options(synchronize_session=False)
+                )
+            db.commit()
+            return ids
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    async def dispatch_once(self) -> int:
+        """Claim and run one batch; returns the number of events handled successfully"""
+        ids = await asyncio.to_thread(self._claim)
+        self.passes += 1
+        self.last_batch_size = len(ids)
+        if not ids:
+            return 0
+
+        started = time.perf_counter()
+        done: List[int] = []
+        failures: Dict[int, tuple] = {}
+        db = self._new_session()
+        try:
+            events = db.query(OutboxEvent).filter(OutboxEvent.id.in_(ids)).order_by(OutboxEvent.id).all()
+            for event in events:
+                event_id, event_type, attempts = event.id, event.event_type, event.attempts
+                fn = _handlers.get(event_type)
+                try:
+                    if fn is None:
+                        raise LookupError(f"No outbox handler for {event_type}")
+                    await fn(db, event)
+                    done.append(event_id)
+                except Exception as e:
+                    db.rollback()
+                    failures[event_id] = (attempts, f"{type(e).__name__}: {e}"[:MAX_ERROR_LENGTH])
+                    logger.warning(f"Outbox event {event_id} ({event_type}) attempt {attempts} failed: {e}")
+        finally:
+            db.close()
+
+        await asyncio.to_thread(self._finish, done, failures)
+        self.processed += len(done)
+        self.last_batch_ms = (time.perf_counter() - started) * 1000
+        return len(done)
+
+    def _finish(self, done: List[int], failures: Dict[int, tuple]):
+        db = self._new_session()
+        try:
+            now = get_ist_now()
+            if done:
+                db.execute(
+                    update(OutboxEvent).where(OutboxEvent.id.in_(done)).values(
+                        status="done", processed_at=now, last_error=None
+                    ).execution_options(synchronize_session=False)
+                )
+            for event_id, (attempts, error) in failures.items():
+                if attempts >= self.max_attempts:
+                    values = {"status": "failed", "last_error": error, "processed_at": now}
+                    self.failed += 1
+                else:
+                    delay = retry_delay_seconds(attempts, self.retry_base_seconds)
+                    values = {"last_error": error, "available_at": now + timedelta(seconds=delay)}
+                    self.retried += 1
+                db.execute(
+                    update(OutboxEvent).where(OutboxEvent.id == event_id).values(**values)
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+        except Exception as e:
+            # Leases expire on their own, so unfinished events are simply retried
+            db.rollback()
+            logger.error(f"Failed to record outbox results: {e}")
+        finally:
+            db.close()
+
+    async def drain(self, max_passes: int = 100) -> int:
+        """Dispatch until nothing is due (or max_passes); returns events handled"""
+        handled = 0
+        for _ in range(max_passes):
+            count = await self.dispatch_once()
+            handled += count
+            if self.last_batch_size < self.batch_size:
+                break
+        return handled
+
+    def stats(self) -> dict:
+        db = self._new_session()
+        try:
+            counts = dict(
+                db.query(OutboxEvent.status, func.count(OutboxEvent.id)).group_by(OutboxEvent.status).all()
+            )
+        finally:
+            db.close()
+        return {
+            "pending": counts.get("pending", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "processed": self.processed,
+            "retried": self.retried,
+            "gave_up": self.failed,
+            "passes": self.passes,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_ms, 2),
+            "batch_size": self.batch_size,
+            "poll_interval_ms": int(self.poll_interval * 1000),
+            "running": self._task is not None and not self._task.done()
+        }
+
+    def _new_session(self):
+        if self._session_factory is None:
+            from app.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    # ---------- Lifecycle ----------
+
+    async def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wake = None
+        self._loop = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.drain()
+            except Exception as e:
+                logger.error(f"Outbox dispatch loop error: {e}")
+
+
+outbox_dispatcher = OutboxDispatcher()
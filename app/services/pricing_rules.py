@@ -0,0 +1,352 @@
+"""
+Delivery fee, surge and promo code rules, compiled for in-memory pricing.
+
+Rules live in delivery_fee_slabs, surge_windows and promo_codes. They are
+compiled into a Rulebook (plain dicts and tuples indexed by restaurant id,
+city and code) so that quoting a cart touches no database: the cost is one
+pass over the cart lines plus a few dict lookups.
+
+The active Rulebook is replaced atomically when the rules change: admin
+writes call pricing_rules.load(), and every PRICING_RULES_REFRESH_SECONDS
+one fingerprint query (row counts and last update per table) tells a worker
+whether another process changed them. With no rules in the database the
+built-in defaults apply: 40 base + 7/km above 3 km, no surge.
+"""
+
+import logging
+import math
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models_pricing import DeliveryFeeSlab, PromoCode, SurgeWindow
+from app.utils.timezone import IST, get_ist_now
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.0")
+ONE = Decimal("1.0")
+CENTS = Decimal("0.01")
+
+
+class FeeSlab(NamedTuple):
+    min_km: float
+    max_km: float
+    base_fee: Decimal
+    per_km_fee: float
+
+
+class Surge(NamedTuple):
+    days: frozenset
+    start_minute: int
+    end_minute: int
+    multiplier: Decimal
+
+
+class Promo(NamedTuple):
+    code: str
+    discount_type: str
+    discount_value: Decimal
+    max_discount: Optional[Decimal]
+    min_order_amount: Decimal
+    restaurant_id: Optional[int]
+    city: Optional[str]
+    valid_from: Optional[datetime]
+    valid_until: Optional[datetime]
+
+
+class Quote(NamedTuple):
+    item_total: Decimal
+    delivery_fee: Decimal
+    surge_multiplier: Decimal
+    tax_amount: Decimal
+    discount_amount: Decimal
+    total_amount: Decimal
+    promo_code: Optional[str]
+    promo_error: Optional[str]
+
+
+# 40 base up to 3 km, then +7 per km (the original hardcoded fee)
+DEFAULT_SLABS = (
+    FeeSlab(0.0, 3.0, Decimal("40.0"), 0.0),
+    FeeSlab(3.0, math.inf, Decimal("40.0"), 7.0),
+)
+
+
+def _city_key(city: Optional[str]) -> Optional[str]:
+    return city.strip().lower() if city else None
+
+
+def _minute_of_day(value: str) -> int:
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes; they were written in IST
+    if value is not None and value.tzinfo is None:
+        return IST.localize(value)
+    return value
+
+
+class SlabTable:
+    """Slabs of one scope, sorted by min_km for bisection"""
+
+    __slots__ = ("slabs", "starts")
+
+    def __init__(self, slabs: Iterable[FeeSlab]):
+        self.slabs = sorted(slabs, key=lambda slab: slab.min_km)
+        self.starts = [slab.min_km for slab in self.slabs]
+
+    def find(self, distance_km: float) -> Optional[FeeSlab]:
+        position = bisect_right(self.starts, distance_km) - 1
+        if position < 0:
+            return None
+        slab = self.slabs[position]
+        return slab if distance_km < slab.max_km else None
+
+
+class Rulebook:
+    """Immutable, compiled pricing rules"""
+
+    def __init__(
+        self,
+        slabs: Iterable[Tuple[Optional[int], Optional[str], FeeSlab]] = (),
+        surges: Iterable[Tuple[Optional[int], Optional[str], Surge]] = (),
+        promos: Iterable[Promo] = (),
+        tax_rate: Optional[Decimal] = None,
+        version: int = 0
+    ):
+        grouped: Dict[Tuple[str, object], List[FeeSlab]] = {}
+        for restaurant_id, city, slab in slabs:
+            grouped.setdefault(self._scope(restaurant_id, city), []).append(slab)
+        self._slabs = {scope: SlabTable(rows) for scope, rows in grouped.items()}
+        self._default_slabs = self._slabs.pop(("default", None), SlabTable(DEFAULT_SLABS))
+
+        self._surges: Dict[Tuple[str, object], List[Surge]] = {}
+        for restaurant_id, city, surge in surges:
+            self._surges.setdefault(self._scope(restaurant_id, city), []).append(surge)
+
+        self._promos = {promo.code: promo for promo in promos}
+        self.tax_rate = tax_rate if tax_rate is not None else Decimal(str(settings.PRICING_TAX_RATE))
+        self.version = version
+
+    @staticmethod
+    def _scope(restaurant_id: Optional[int], city: Optional[str]) -> Tuple[str, object]:
+        if restaurant_id is not None:
+            return ("restaurant", restaurant_id)
+        if city:
+            return ("city", _city_key(city))
+        return ("default", None)
+
+    def summary(self) -> dict:
+        return {
+            "version": self.version,
+            "fee_slab_scopes": len(self._slabs) + 1,
+            "surge_scopes": len(self._surges),
+            "promo_codes": len(self._promos),
+            "tax_rate": str(self.tax_rate)
+        }
+
+    def delivery_fee(self, restaurant_id: Optional[int], city: Optional[str], distance_km: Optional[float]) -> Decimal:
+        """Fee from the most specific slab table covering the distance (unknown distance = 0 km)"""
+        distance = distance_km or 0.0
+        for scope in (("restaurant", restaurant_id), ("city", city)):
+            table = self._slabs.get(scope)
+            if table is not None:
+                slab = table.find(distance)
+                if slab is not None:
+                    break
+        else:
+            slab = self._default_slabs.find(distance) or DEFAULT_SLABS[-1]
+
+        if not slab.per_km_fee or distance <= slab.min_km:
+            return slab.base_fee
+        return slab.base_fee + Decimal(str(round((distance - slab.min_km) * slab.per_km_fee, 2)))
+
+    def surge_multiplier(self, restaurant_id: Optional[int], city: Optional[str], at: datetime) -> Decimal:
+        if not self._surges:
+            return ONE
+        weekday = at.weekday()
+        minute = at.hour * 60 + at.minute
+        multiplier = ONE
+        for scope in (("restaurant", restaurant_id), ("city", city), ("default", None)):
+            for surge in self._surges.get(scope, ()):
+                if weekday not in surge.days:
+                    continue
+                if surge.start_minute <= surge.end_minute:
+                    active = surge.start_minute <= minute < surge.end_minute
+                else:
+                    active = minute >= surge.start_minute or minute < surge.end_minute
+                if active and surge.multiplier > multiplier:
+                    multiplier = surge.multiplier
+        return multiplier
+
+    def discount(
+        self,
+        code: str,
+        restaurant_id: Optional[int],
+        city: Optional[str],
+        item_total: Decimal,
+        delivery_fee: Decimal,
+        at: datetime
+    ) -> Tuple[Decimal, Optional[str]]:
+        """(discount_amount, error message or None)"""
+        promo = self._promos.get(code.strip().upper())
+        if promo is None:
+            return ZERO, "Invalid promo code"
+        if (promo.valid_from and at < promo.valid_from) or (promo.valid_until and at >= promo.valid_until):
+            return ZERO, "Promo code has expired"
+        if promo.restaurant_id is not None and promo.restaurant_id != restaurant_id:
+            return ZERO, "Promo code is not valid for this restaurant"
+        if promo.city and promo.city != city:
+            return ZERO, "Promo code is not valid in this city"
+        if item_total < promo.min_order_amount:
+            return ZERO, f"Add items worth {promo.min_order_amount - item_total} more to use this code"
+
+        if promo.discount_type == "free_delivery":
+            amount = delivery_fee
+        elif promo.discount_type == "flat":
+            amount = min(promo.discount_value, item_total)
+        else:
+            amount = (item_total * promo.discount_value / 100).quantize(CENTS)
+        if promo.max_discount is not None and amount > promo.max_discount:
+            amount = promo.max_discount
+        return amount, None
+
+    def quote(
+        self,
+        lines: Iterable[Tuple[Decimal, int]],
+        restaurant_id: Optional[int] = None,
+        city: Optional[str] = None,
+        distance_km: Optional[float] = None,
+        promo_code: Optional[str] = None,
+        at: Optional[datetime] = None
+    ) -> Quote:
+        """
+        Price a cart from its (unit_price, quantity) lines.
+        An empty cart has no delivery fee, tax or discount.
+        """
+        item_total = ZERO
+        for price, quantity in lines:
+            item_total += price * quantity
+        if item_total <= 0:
+            return Quote(item_total, ZERO, ONE, ZERO, ZERO, item_total, None, None)
+
+        at = at or get_ist_now()
+        city = _city_key(city)
+        multiplier = self.surge_multiplier(restaurant_id, city, at)
+        delivery_fee = self.delivery_fee(restaurant_id, city, distance_km)
+        if multiplier != ONE:
+            delivery_fee = (delivery_fee * multiplier).quantize(CENTS)
+        tax_amount = item_total * self.tax_rate
+
+        discount_amount, promo_error = ZERO, None
+        if promo_code:
+            discount_amount, promo_error = self.discount(promo_code, restaurant_id, city, item_total, delivery_fee, at)
+
+        return Quote(
+            item_total=item_total,
+            delivery_fee=delivery_fee,
+            surge_multiplier=multiplier,
+            tax_amount=tax_amount,
+            discount_amount=discount_amount,
+            total_amount=item_total + delivery_fee + tax_amount - discount_amount,
+            promo_code=promo_code.strip().upper() if promo_code and promo_error is None else None,
+            promo_error=promo_error
+        )
+
+
+def compile_rulebook(db: Session, version: int = 0) -> Rulebook:
+    """Read the active rules (three queries) and compile them"""
+    slabs = [
+        (row.restaurant_id, row.city, FeeSlab(
+            float(row.min_km or 0),
+            float(row.max_km) if row.max_km is not None else math.inf,
+            Decimal(row.base_fee),
+            float(row.per_km_fee or 0)
+        ))
+        for row in db.query(DeliveryFeeSlab).filter(DeliveryFeeSlab.is_active == True)
+    ]
+    surges = [
+        (row.restaurant_id, row.city, Surge(
+            frozenset(int(day) for day in row.days),
+            _minute_of_day(row.start_time),
+            _minute_of_day(row.end_time),
+            Decimal(row.multiplier)
+        ))
+        for row in db.query(SurgeWindow).filter(SurgeWindow.is_active == True)
+    ]
+    promos = [
+        Promo(
+            code=row.code.strip().upper(),
+            discount_type=row.discount_type,
+            discount_value=Decimal(row.discount_value or 0),
+            max_discount=Decimal(row.max_discount) if row.max_discount is not None else None,
+            min_order_amount=Decimal(row.min_order_amount or 0),
+            restaurant_id=row.restaurant_id,
+            city=_city_key(row.city),
+            valid_from=_aware(row.valid_from),
+            valid_until=_aware(row.valid_until)
+        )
+        for row in db.query(PromoCode).filter(PromoCode.is_active == True)
+    ]
+    return Rulebook(slabs, surges, promos, version=version)
+
+
+def _fingerprint(db: Session) -> tuple:
+    """Row counts and latest change time of the rule tables, in one statement"""
+    columns = []
+    for model in (DeliveryFeeSlab, SurgeWindow, PromoCode):
+        changed = func.coalesce(model.updated_at, model.created_at)
+        columns.append(select(func.count(model.id)).scalar_subquery())
+        columns.append(select(func.max(changed)).scalar_subquery())
+    return tuple(db.execute(select(*columns)).one())
+
+
+class PricingRules:
+    """Holder of the active Rulebook for this process"""
+
+    def __init__(self, refresh_seconds: Optional[int] = None):
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else settings.PRICING_RULES_REFRESH_SECONDS
+        )
+        self._rulebook = Rulebook()
+        self._fingerprint: Optional[tuple] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def rulebook(self) -> Rulebook:
+        return self._rulebook
+
+    def load(self, db: Session) -> Rulebook:
+        """Compile the rules now (startup, and after admin changes)"""
+        with self._lock:
+            fingerprint = _fingerprint(db)
+            self._rulebook = compile_rulebook(db, version=self._rulebook.version + 1)
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            logger.info("Pricing rules compiled: %s", self._rulebook.summary())
+            return self._rulebook
+
+    def ensure_fresh(self, db: Session) -> Rulebook:
+        """Recompile if another process changed the rules (checked at most every refresh_seconds)"""
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._rulebook
+        if self._checked_at is None or _fingerprint(db) != self._fingerprint:
+            return self.load(db)
+        self._checked_at = time.monotonic()
+        return self._rulebook
+
+
+# Process-wide pricing rules
+pricing_rules = PricingRules()
@@ -0,0 +1,109 @@
+"""
+Background delivery of FCM pushes.
+
+firebase_admin's messaging calls are blocking HTTP requests, so they are
+handed to a small thread pool instead of running on the event loop.
+Multicasts are split into chunks of FCM_MULTICAST_LIMIT tokens.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from firebase_admin import messaging
+
+logger = logging.getLogger(__name__)
+
+# Hard limit imposed by FCM on send_each_for_multicast
+FCM_MULTICAST_LIMIT = 500
+
+DEAD_TOKEN_MARKERS = ("not-found", "invalid-registration", "requested entity was not found")
+
+
+class PushDispatcher:
+    def __init__(self, max_workers: int = 4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fcm-push")
+
+    def send_multicast(self, tokens: List[str], title: str, message: str, data: Optional[Dict[str, str]] = None):
+        """Queue a push to many devices; returns immediately"""
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            chunk = tokens[start:start + FCM_MULTICAST_LIMIT]
+            self._executor.submit(self._send_chunk, chunk, title, message, data or {})
+
+    def send_data(self, tokens: List[str], data: Dict[str, str]):
+        """Queue a silent data-only message (no banner) to many devices; returns immediately"""
+        for start in range(0, len(tokens), FCM_MULTICAST_LIMIT):
+            chunk = tokens[start:start + FCM_MULTICAST_LIMIT]
+            self._executor.submit(self._send_chunk, chunk, None, None, data)
+
+    def send_topic(self, topic: str, title: str, message: str, data: Optional[Dict[str, str]] = None):
+        """Queue a push to every device subscribed to a topic"""
+        self._executor.submit(self._send_topic, topic, title, message, data or {})
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _send_chunk(tokens: List[str], title: Optional[str], message: Optional[str], data: Dict[str, str]):
+        # No title: data-only message, handled by the app without showing a notification
+        notification = messaging.Notification(title=title, body=message) if title is not None else None
+        try:
+            response = messaging.send_each_for_multicast(
+                messaging.MulticastMessage(
+                    notification=notification,
+                    tokens=tokens,
+                    data=data
+                )
+            )
+        except Exception as e:
+            logger.error(f"FCM multicast failed for {len(tokens)} tokens: {e}")
+            return
+
+        logger.info(f"Sent {response.success_count}/{len(tokens)} FCM messages")
+        if response.failure_count == 0:
+            return
+
+        dead_tokens = []
+        for token, resp in zip(tokens, response.responses):
+            if not resp.success:
+                error_msg = str(resp.exception).lower()
+                if any(marker in error_msg for marker in DEAD_TOKEN_MARKERS):
+                    dead_tokens.append(token)
+
+        if dead_tokens:
+            PushDispatcher._deactivate_tokens(dead_tokens)
+
+    @staticmethod
+    def _deactivate_tokens(tokens: List[str]):
+        from app.database import SessionLocal
+        from app.models import DeviceToken
+
+        db = SessionLocal()
+        try:
+            db.query(DeviceToken).filter(DeviceToken.token.in_(tokens)).update(
+                {"is_active": False}, synchronize_session=False
+            )
+            db.commit()
+            logger.info(f"Deactivated {len(tokens)} dead device tokens")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to deactivate dead device tokens: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def _send_topic(topic: str, title: str, message: str, data: Dict[str, str]):
+        try:
+            response = messaging.send(
+                messaging.Message(
+                    notification=messaging.Notification(title=title, body=message),
+                    topic=topic,
+                    data=data
+                )
+            )
+            logger.info(f"Broadcasted to topic '{topic}': {response}")
+        except Exception as e:
+            logger.error(f"Topic broadcast to '{topic}' failed: {e}")
+
+
+push_dispatcher = PushDispatcher()
@@ -0,0 +1,78 @@
+"""
+Restaurant cards for customer listings (/customer/home and friends).
+
+RestaurantResponse.from_orm reads the image_url, cuisines and isPureVeg
+properties, which lazy-load documents, cuisines and every menu item per
+restaurant. Here the cover photo and the pure-veg flag are computed in SQL
+as correlated subqueries and cuisines are fetched with one selectin query,
+so a listing costs a fixed number of statements however many restaurants
+it contains.
+"""
+
+from typing import List
+
+from sqlalchemy import and_, case, exists, or_, select
+from sqlalchemy.orm import Query, Session, selectinload
+
+from app.models import (
+    DEFAULT_RESTAURANT_IMAGE_URL, Document, MenuItem, Restaurant, RestaurantCuisine
+)
+from app.schemas import RestaurantResponse
+
+
+def cover_photo_column():
+    return select(Document.file_url).where(
+        Document.restaurant_id == Restaurant.id,
+        Document.document_type == 'restaurant_photo'
+    ).order_by(Document.id).limit(1).correlate(Restaurant).scalar_subquery().label("cover_photo")
+
+
+def _pure_veg_column():
+    """True when the restaurant has menu items and all of them are vegetarian"""
+    has_items = exists().where(MenuItem.restaurant_id == Restaurant.id)
+    has_non_veg = exists().where(
+        MenuItem.restaurant_id == Restaurant.id,
+        or_(MenuItem.is_vegetarian == False, MenuItem.is_vegetarian.is_(None))
+    )
+    return case((and_(has_items, ~has_non_veg), True), else_=False).label("pure_veg")
+
+
+def restaurant_card_query(db: Session) -> Query:
+    """(Restaurant, cover_photo, pure_veg) rows with cuisines eagerly loaded"""
+    return db.query(
+        Restaurant,
+        cover_photo_column(),
+        _pure_veg_column()
+    ).options(
+        selectinload(Restaurant.cuisines_rel).joinedload(RestaurantCuisine.cuisine)
+    )
+
+
+def to_card(restaurant: Restaurant, cover_photo, pure_veg) -> dict:
+    """Same output as RestaurantResponse.from_orm(restaurant).dict(), without lazy loads"""
+    image_url = cover_photo or DEFAULT_RESTAURANT_IMAGE_URL
+    return RestaurantResponse(
+        id=restaurant.id,
+        restaurant_name=restaurant.restaurant_name,
+        restaurant_type=restaurant.restaurant_type,
+        fssai_license_number=restaurant.fssai_license_number,
+        opening_time=restaurant.opening_time,
+        closing_time=restaurant.closing_time,
+        description=restaurant.description,
+        cost_for_two=restaurant.cost_for_two,
+        is_active=restaurant.is_active,
+        is_open=restaurant.is_open,
+        average_rating=restaurant.average_rating,
+        image_url=image_url,
+        coverImage=image_url,
+        cuisines=[rc.cuisine.name for rc in restaurant.cuisines_rel if rc.cuisine],
+        offer=restaurant.offer,
+        isPureVeg=bool(pure_veg),
+        verification_status=restaurant.verification_status,
+        created_at=restaurant.created_at
+    ).dict()
+
+
+def build_restaurant_cards(db: Session, *filters) -> List[dict]:
+    rows = restaurant_card_query(db).filter(*filters).order_by(Restaurant.id).all()
+    return [to_card(*row) for row in rows]
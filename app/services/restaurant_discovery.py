@@ -0,0 +1,174 @@
+"""
+Location-aware restaurant discovery for customers.
+
+Active restaurants with an address are kept in a grid index (see
+spatial_index.GridIndex). A radius query only looks at the cells overlapping
+the search circle, so its cost follows the number of restaurants near the
+customer rather than the size of the catalog. Cards are then built for the
+requested page only.
+
+The index is reloaded every RESTAURANT_INDEX_REFRESH_SECONDS and, for single
+restaurants, whenever a catalog write reports a change. With
+DISCOVERY_GRID_INDEX disabled, candidates come from a bounding-box query on
+the indexed addresses.latitude/longitude columns instead.
+"""
+
+import time
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Address, Restaurant
+from app.services import catalog_events
+from app.services.restaurant_cards import build_restaurant_cards
+from app.services.spatial_index import GridIndex
+from app.utils.geo import bounding_box, haversine_km
+from app.utils.pagination import decode_cursor, encode_cursor, position_after
+
+settings = get_settings()
+
+
+def _located_restaurants(db: Session, *filters):
+    """(restaurant_id, latitude, longitude) of active restaurants with an address"""
+    return db.query(
+        Address.restaurant_id,
+        Address.latitude,
+        Address.longitude
+    ).join(
+        Restaurant, Restaurant.id == Address.restaurant_id
+    ).filter(
+        Restaurant.is_active == True,
+        *filters
+    ).all()
+
+
+def nearby_from_db(db: Session, lat: float, lng: float, radius_km: float) -> List[Tuple[int, float]]:
+    """Bounding-box prefilter in SQL, exact distance in Python; nearest first"""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    rows = _located_restaurants(
+        db,
+        Address.latitude.between(min_lat, max_lat),
+        Address.longitude.between(min_lng, max_lng)
+    )
+    matches = []
+    for restaurant_id, r_lat, r_lng in rows:
+        distance = haversine_km(lat, lng, float(r_lat), float(r_lng))
+        if distance <= radius_km:
+            matches.append((restaurant_id, distance))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches
+
+
+class RestaurantSpatialIndex(GridIndex):
+    """Positions of active restaurants, keyed by restaurant id"""
+
+    def __init__(self, cell_size_km: float = 2.0, refresh_seconds: Optional[int] = None):
+        super().__init__(cell_size_km)
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else settings.RESTAURANT_INDEX_REFRESH_SECONDS
+        )
+        self._pending: Set[int] = set()
+        self._reload_all = False
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self, restaurant_id: Optional[int] = None):
+        """Re-read one restaurant (or, with None, all of them) on next use"""
+        with self._lock:
+            if restaurant_id is None:
+                self._reload_all = True
+            else:
+                self._pending.add(restaurant_id)
+
+    def load(self, db: Session):
+        rows = _located_restaurants(db)
+        with self._lock:
+            self.replace_all(rows)
+            self._pending = set()
+            self._reload_all = False
+            self._loaded_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session):
+        """Load on first use and periodically; apply pending single-restaurant changes"""
+        if (
+            self._loaded_at is None
+            or self._reload_all
+            or time.monotonic() - self._loaded_at >= self.refresh_seconds
+        ):
+            self.load(db)
+            return
+
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if not pending:
+            return
+        rows = _located_restaurants(db, Address.restaurant_id.in_(pending))
+        with self._lock:
+            for restaurant_id in pending:
+                self._discard(restaurant_id)
+            for restaurant_id, lat, lng in rows:
+                self.upsert(restaurant_id, lat, lng)
+
+
+class RestaurantDiscoveryService:
+    @staticmethod
+    def nearby(db: Session, lat: float, lng: float, radius_km: float) -> List[Tuple[int, float]]:
+        """(restaurant_id, distance_km) within radius, ordered by (distance, id)"""
+        if settings.DISCOVERY_GRID_INDEX:
+            restaurant_index.ensure_fresh(db)
+            return restaurant_index.nearby(lat, lng, radius_km)
+        return nearby_from_db(db, lat, lng, radius_km)
+
+    @staticmethod
+    def discover(
+        db: Session,
+        lat: float,
+        lng: float,
+        radius_km: Optional[float] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> dict:
+        """
+        One page of restaurant cards (with distance_km), nearest first.
+        radius_km defaults to DISCOVERY_RADIUS_KM.
+
+        Raises:
+            ValueError: if the cursor is invalid
+        """
+        radius_km = radius_km or settings.DISCOVERY_RADIUS_KM
+        after = decode_cursor(cursor, 2)
+        matches = RestaurantDiscoveryService.nearby(db, lat, lng, radius_km)
+        total = len(matches)
+
+        start = 0
+        if after is not None:
+            try:
+                last = (float(after[0]), int(after[1]))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            start = position_after(matches, last, key=lambda match: (match[1], match[0]))
+        page = matches[start:start + limit]
+        has_more = start + limit < total
+
+        restaurants = []
+        if page:
+            cards = {
+                card["id"]: card
+                for card in build_restaurant_cards(db, Restaurant.id.in_([rid for rid, _ in page]), Restaurant.is_active == True)
+            }
+            restaurants = [
+                dict(cards[restaurant_id], distance_km=round(distance, 2))
+                for restaurant_id, distance in page if restaurant_id in cards
+            ]
+
+        return {
+            "restaurants": restaurants,
+            "next_cursor": encode_cursor(page[-1][1], page[-1][0]) if has_more else None,
+            "radius_km": radius_km,
+            "total_in_radius": total
+        }
+
+
+# Process-wide index used by discovery
+restaurant_index = RestaurantSpatialIndex()
+catalog_events.subscribe(restaurant_index.invalidate)
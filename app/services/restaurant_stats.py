@@ -0,0 +1,142 @@
+"""
+Per-restaurant daily order counters (restaurant_daily_stats).
+
+Order placement counts the new order and the state machine counts final
+statuses (delivered, rejected, cancelled), each in the same transaction as
+the order write. The dashboard's all-time numbers are then a sum over the
+restaurant's day rows instead of several scans of its whole order history.
+backfill() rebuilds the table from orders (see backfill_restaurant_stats.py,
+run once after deploying the add_restaurant_daily_stats migration).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import Order, OrderStatusEnum
+from app.models_orders import RestaurantDailyStats
+from app.utils.rollup import increment, increment_many
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+# Final status -> counter column
+FINAL_STATUS_COUNTERS = {
+    OrderStatusEnum.DELIVERED.value: "delivered",
+    OrderStatusEnum.REJECTED.value: "rejected",
+    OrderStatusEnum.CANCELLED.value: "cancelled",
+}
+
+
+def _add(db: Session, restaurant_id: int, day: date, **deltas):
+    increment(db, RestaurantDailyStats, {"restaurant_id": restaurant_id, "day": day}, deltas)
+
+
+class RestaurantStatsService:
+    @staticmethod
+    def record_placed(db: Session, restaurant_id: int):
+        """Count a new order (caller commits)"""
+        _add(db, restaurant_id, get_ist_now().date(), orders=1)
+
+    @staticmethod
+    def record_status(db: Session, restaurant_id: int, status: str, total_amount: Optional[Decimal]):
+        """Count an order reaching `status` if it is a final one (caller commits)"""
+        counter = FINAL_STATUS_COUNTERS.get(status)
+        if counter is None:
+            return
+        deltas = {counter: 1}
+        if counter == "delivered":
+            deltas["delivered_amount"] = total_amount or ZERO
+        _add(db, restaurant_id, get_ist_now().date(), **deltas)
+
+    @staticmethod
+    def totals(db: Session, restaurant_id: int) -> dict:
+        """All-time counters, one query over the restaurant's day rows"""
+        row = db.query(
+            func.sum(RestaurantDailyStats.orders).label("orders"),
+            func.sum(RestaurantDailyStats.delivered).label("delivered"),
+            func.sum(RestaurantDailyStats.rejected).label("rejected"),
+            func.sum(RestaurantDailyStats.cancelled).label("cancelled"),
+            func.sum(RestaurantDailyStats.delivered_amount).label("delivered_amount")
+        ).filter(RestaurantDailyStats.restaurant_id == restaurant_id).one()
+        return {
+            "orders": int(row.orders or 0),
+            "delivered": int(row.delivered or 0),
+            "rejected": int(row.rejected or 0),
+            "cancelled": int(row.cancelled or 0),
+            "delivered_amount": Decimal(row.delivered_amount or 0).quantize(ZERO)
+        }
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 5000, until: Optional[datetime] = None) -> dict:
+        """
+        Rebuild the table from orders, streaming them in id order.
+
+        Orders count on the day they were placed, final statuses on the day
+        they were stamped (delivered_at / rejected_at, else the placement day).
+        Existing rows are cleared first and orders placed at or after `until`
+        (default: now) are skipped, so run it while no orders are being placed
+        or finished if the table is already in use.
+        """
+        until = until or get_ist_now()
+        db.query(RestaurantDailyStats).delete(synchronize_session=False)
+        db.commit()
+
+        # Totals are kept per (restaurant, day), so memory follows the number of day rows
+        totals = defaultdict(lambda: defaultdict(int))
+        last_id = 0
+        orders = 0
+        while True:
+            rows = db.query(
+                Order.id,
+                Order.restaurant_id,
+                Order.status,
+                Order.total_amount,
+                Order.created_at,
+                Order.delivered_at,
+                Order.rejected_at
+            ).filter(
+                Order.id > last_id,
+                Order.created_at < until
+            ).order_by(Order.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            for row in rows:
+                placed_on = row.created_at.date()
+                totals[(row.restaurant_id, placed_on)]["orders"] += 1
+                counter = FINAL_STATUS_COUNTERS.get(row.status)
+                if counter is None:
+                    continue
+                finished_at = row.delivered_at if counter == "delivered" else row.rejected_at
+                day_totals = totals[(row.restaurant_id, finished_at.date() if finished_at else placed_on)]
+                day_totals[counter] += 1
+                if counter == "delivered":
+                    day_totals["delivered_amount"] += row.total_amount or ZERO
+
+            last_id = rows[-1].id
+            orders += len(rows)
+            logger.info("Restaurant stats backfill: %s orders so far", orders)
+
+        increment_many(db, RestaurantDailyStats, ("restaurant_id", "day"), [
+            {
+                "restaurant_id": restaurant_id,
+                "day": day,
+                "orders": day_totals["orders"],
+                "delivered": day_totals["delivered"],
+                "rejected": day_totals["rejected"],
+                "cancelled": day_totals["cancelled"],
+                "delivered_amount": day_totals["delivered_amount"] or ZERO
+            }
+            for (restaurant_id, day), day_totals in totals.items()
+        ])
+        db.commit()
+
+        return {"orders": orders, "day_rows": db.query(func.count(RestaurantDailyStats.id)).scalar()}
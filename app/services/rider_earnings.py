@@ -0,0 +1,122 @@
+"""
+Delivery partner earnings, kept as a per-day rollup (rider_earnings_daily).
+
+The delivered transition calls record_delivery() in its own transaction, so
+a partner's day row always agrees with their delivered orders. The earnings
+screen then reads at most one row per day of the partner's history instead
+of scanning orders on every open. backfill() rebuilds the table from
+existing orders (see backfill_rider_earnings.py).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.models import Order, OrderStatusEnum
+from app.models_orders import RiderEarningsDaily
+from app.utils.rollup import increment, increment_many
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0.00")
+
+
+def _add(db: Session, partner_id: int, day: date, deliveries: int, earnings: Decimal):
+    """Add to a partner's day row, creating it if needed (no commit)"""
+    increment(
+        db, RiderEarningsDaily,
+        {"delivery_partner_id": partner_id, "day": day},
+        {"deliveries": deliveries, "earnings": earnings}
+    )
+
+
+class RiderEarningsService:
+    @staticmethod
+    def record_delivery(db: Session, order: Order):
+        """Count a just-delivered order in its partner's day (caller commits)"""
+        if order.delivery_partner_id is None:
+            return
+        delivered_at = order.delivered_at or get_ist_now()
+        _add(db, order.delivery_partner_id, delivered_at.date(), 1, order.delivery_fee or ZERO)
+
+    @staticmethod
+    def summary(db: Session, partner_id: int, today: Optional[date] = None) -> dict:
+        """Today / this week (from Monday) / this month earnings and lifetime deliveries, one query"""
+        today = today or get_ist_now().date()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+
+        def since(start: date):
+            return func.sum(case((RiderEarningsDaily.day >= start, RiderEarningsDaily.earnings), else_=0))
+
+        row = db.query(
+            since(today).label("today"),
+            since(week_start).label("week"),
+            since(month_start).label("month"),
+            func.sum(RiderEarningsDaily.deliveries).label("deliveries")
+        ).filter(RiderEarningsDaily.delivery_partner_id == partner_id).one()
+
+        return {
+            "today_earnings": Decimal(row.today or 0).quantize(ZERO),
+            "week_earnings": Decimal(row.week or 0).quantize(ZERO),
+            "month_earnings": Decimal(row.month or 0).quantize(ZERO),
+            "total_deliveries": int(row.deliveries or 0)
+        }
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 5000, until: Optional[datetime] = None) -> dict:
+        """
+        Rebuild the rollup from delivered orders, streaming them in id order.
+
+        Existing rows are cleared first. Orders delivered at or after `until`
+        (default: now) are left to the live transition. Run it while nobody
+        is delivering if the table is already in use, because a delivery
+        committed during the rebuild could be counted twice.
+        """
+        until = until or get_ist_now()
+        db.query(RiderEarningsDaily).delete(synchronize_session=False)
+        db.commit()
+
+        # Legacy rows without delivered_at are filed under the day they were placed
+        delivered_at = func.coalesce(Order.delivered_at, Order.created_at)
+        # Totals are kept per (partner, day), so memory follows the number of day rows
+        totals = defaultdict(lambda: [0, ZERO])
+        last_id = 0
+        orders = 0
+        while True:
+            rows = db.query(
+                Order.id,
+                Order.delivery_partner_id,
+                delivered_at.label("delivered_at"),
+                Order.delivery_fee
+            ).filter(
+                Order.id > last_id,
+                Order.status == OrderStatusEnum.DELIVERED.value,
+                Order.delivery_partner_id.isnot(None),
+                delivered_at < until
+            ).order_by(Order.id).limit(batch_size).all()
+            if not rows:
+                break
+
+            for row in rows:
+                total = totals[(row.delivery_partner_id, row.delivered_at.date())]
+                total[0] += 1
+                total[1] += row.delivery_fee or ZERO
+
+            last_id = rows[-1].id
+            orders += len(rows)
+            logger.info("Rider earnings backfill: %s orders so far", orders)
+
+        increment_many(db, RiderEarningsDaily, ("delivery_partner_id", "day"), [
+            {"delivery_partner_id": partner_id, "day": day, "deliveries": count, "earnings": amount}
+            for (partner_id, day), (count, amount) in totals.items()
+        ])
+        db.commit()
+
+        return {"orders": orders, "day_rows": db.query(func.count(RiderEarningsDaily.id)).scalar()}
@@ -0,0 +1,195 @@
+"""
+In-process grid index of point positions.
+
+Positions are bucketed into fixed-size lat/lng cells so that a radius query
+only has to look at the handful of cells overlapping the search circle
+instead of every tracked point.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.utils.geo import KM_PER_DEGREE_LAT, bounding_box, haversine_km
+
+settings = get_settings()
+
+Cell = Tuple[int, int]
+
+
+class GridIndex:
+    """Grid-bucket spatial index keyed by integer ids"""
+
+    def __init__(self, cell_size_km: float = 1.0):
+        self.cell_deg = cell_size_km / KM_PER_DEGREE_LAT
+        self._cells: Dict[Cell, Dict[int, Tuple[float, float]]] = {}
+        self._positions: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.RLock()
+
+    def _cell(self, lat: float, lng: float) -> Cell:
+        return (math.floor(lat / self.cell_deg), math.floor(lng / self.cell_deg))
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._positions
+
+    def position(self, item_id: int) -> Optional[Tuple[float, float]]:
+        return self._positions.get(item_id)
+
+    def upsert(self, item_id: int, lat: float, lng: float):
+        """Insert or move a point"""
+        lat, lng = float(lat), float(lng)
+        with self._lock:
+            self._discard(item_id)
+            self._positions[item_id] = (lat, lng)
+            self._cells.setdefault(self._cell(lat, lng), {})[item_id] = (lat, lng)
+
+    def remove(self, item_id: int):
+        with self._lock:
+            self._discard(item_id)
+
+    def _discard(self, item_id: int):
+        old = self._positions.pop(item_id, None)
+        if old is None:
+            return
+        cell = self._cell(*old)
+        bucket = self._cells.get(cell)
+        if bucket is not None:
+            bucket.pop(item_id, None)
+            if not bucket:
+                del self._cells[cell]
+
+    def replace_all(self, points: Iterable[Tuple[int, float, float]]):
+        """Atomically swap the index contents for a fresh snapshot"""
+        cells: Dict[Cell, Dict[int, Tuple[float, float]]] = {}
+        positions: Dict[int, Tuple[float, float]] = {}
+        for item_id, lat, lng in points:
+            lat, lng = float(lat), float(lng)
+            positions[item_id] = (lat, lng)
+            cells.setdefault(self._cell(lat, lng), {})[item_id] = (lat, lng)
+        with self._lock:
+            self._cells = cells
+            self._positions = positions
+
+    def nearby(
+        self,
+        lat: float,
+        lng: float,
+        radius_km: float,
+        limit: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Points within `radius_km` of (lat, lng), nearest first.
+
+        Returns:
+            List of (id, distance_km) tuples
+        """
+        lat, lng = float(lat), float(lng)
+        min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+        min_cell = self._cell(min_lat, min_lng)
+        max_cell = self._cell(max_lat, max_lng)
+
+        matches = []
+        with self._lock:
+            cells = self._cells
+            for cx in range(min_cell[0], max_cell[0] + 1):
+                for cy in range(min_cell[1], max_cell[1] + 1):
+                    bucket = cells.get((cx, cy))
+                    if not bucket:
+                        continue
+                    for item_id, (p_lat, p_lng) in bucket.items():
+                        distance = haversine_km(lat, lng, p_lat, p_lng)
+                        if distance <= radius_km:
+                            matches.append((item_id, distance))
+
+        matches.sort(key=lambda match: (match[1], match[0]))
+        if limit is not None:
+            return matches[:limit]
+        return matches
+
+
+class PartnerSpatialIndex(GridIndex):
+    """
+    Positions of online, active delivery partners.
+
+    Kept current by the status toggle and location endpoints, and rebuilt
+    from the database every PARTNER_INDEX_REFRESH_SECONDS so that changes
+    handled by other worker processes are picked up.
+    Online partners without coordinates are tracked separately because
+    they are still notified (backward compatibility with older apps).
+    """
+
+    def __init__(self, cell_size_km: float = 1.0, refresh_seconds: Optional[int] = None):
+        super().__init__(cell_size_km)
+        self.refresh_seconds = (
+            refresh_seconds if refresh_seconds is not None else settings.PARTNER_INDEX_REFRESH_SECONDS
+        )
+        self._unlocated: Set[int] = set()
+        self._loaded_at: Optional[float] = None
+
+    def set_online(self, partner_id: int, lat=None, lng=None):
+        """Track a partner as online at the given position (if known)"""
+        with self._lock:
+            if lat is not None and lng is not None:
+                self._unlocated.discard(partner_id)
+                self.upsert(partner_id, lat, lng)
+            else:
+                self._discard(partner_id)
+                self._unlocated.add(partner_id)
+
+    def set_offline(self, partner_id: int):
+        with self._lock:
+            self._discard(partner_id)
+            self._unlocated.discard(partner_id)
+
+    def sync_partner(self, partner):
+        """Mirror a DeliveryPartner row's online state and position"""
+        if partner.is_online and partner.is_active:
+            self.set_online(partner.id, partner.latitude, partner.longitude)
+        else:
+            self.set_offline(partner.id)
+
+    def online_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._positions.keys()) + list(self._unlocated)
+
+    def unlocated_ids(self) -> List[int]:
+        with self._lock:
+            return list(self._unlocated)
+
+    def load(self, db: Session):
+        """Rebuild the index from the delivery_partners table"""
+        from app.models import DeliveryPartner
+
+        rows = db.query(
+            DeliveryPartner.id,
+            DeliveryPartner.latitude,
+            DeliveryPartner.longitude
+        ).filter(
+            DeliveryPartner.is_online == True,
+            DeliveryPartner.is_active == True
+        ).all()
+
+        located = [(row.id, row.latitude, row.longitude) for row in rows
+                   if row.latitude is not None and row.longitude is not None]
+        unlocated = {row.id for row in rows if row.latitude is None or row.longitude is None}
+
+        with self._lock:
+            self.replace_all(located)
+            self._unlocated = unlocated
+            self._loaded_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session):
+        """Load on first use and periodically thereafter"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self.load(db)
+
+
+# Process-wide index used by notification fan-out
+partner_index = PartnerSpatialIndex()
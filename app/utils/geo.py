@@ -0,0 +1,111 @@
+"""
+Geographic helpers shared by delivery-partner matching, pricing and tracking.
+All distances are in kilometres and all coordinates in decimal degrees.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0
+
+# Length of one degree of latitude in kilometres (roughly constant)
+KM_PER_DEGREE_LAT = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance between two points.
+
+    Args:
+        lat1, lon1: first point in degrees
+        lat2, lon2: second point in degrees
+
+    Returns:
+        Distance in kilometres
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lon2 - lon1)
+
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def bounding_box(lat, lon, radius_km):
+    """
+    Lat/lng box that fully contains the circle of `radius_km` around a point.
+
+    Returns:
+        (min_lat, max_lat, min_lon, max_lon)
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(lat)), 0.01)
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
+def downsample(points, min_step_km):
+    """
+    Drop points closer than `min_step_km` to the last kept point.
+    The first and last points are always kept.
+
+    Args:
+        points: sequence of (lat, lon)
+    """
+    if len(points) <= 2:
+        return list(points)
+
+    kept = [points[0]]
+    for point in points[1:-1]:
+        if haversine_km(kept[-1][0], kept[-1][1], point[0], point[1]) >= min_step_km:
+            kept.append(point)
+    kept.append(points[-1])
+    return kept
+
+
+def path_length_km(points):
+    return sum(
+        haversine_km(a[0], a[1], b[0], b[1])
+        for a, b in zip(points, points[1:])
+    )
+
+
+def encode_polyline(points, precision=5):
+    """Encode (lat, lon) points with Google's encoded polyline algorithm"""
+    factor = 10 ** precision
+    chunks = []
+    prev_lat = prev_lon = 0
+    for lat, lon in points:
+        lat_i = int(round(lat * factor))
+        lon_i = int(round(lon * factor))
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(chunks)
+
+
+def decode_polyline(encoded, precision=5):
+    """Inverse of encode_polyline; returns a list of (lat, lon)"""
+    factor = 10 ** precision
+    points = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        points.append((lat / factor, lon / factor))
+    return points
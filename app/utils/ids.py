@@ -0,0 +1,60 @@
+"""
+Time-sortable identifiers (ULID layout).
+
+26 Crockford base32 characters: 48 bits of millisecond timestamp followed by
+80 random bits. Identifiers sort by creation time as plain strings. Within a
+process, ids made in the same millisecond reuse the random part incremented
+by one, so they never repeat and still sort in creation order. Across
+processes, a collision would need two 80-bit random draws to match in the same
+millisecond.
+"""
+
+import secrets
+import threading
+import time
+
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+RANDOM_BITS = 80
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[index])
+    return "".join(reversed(chars))
+
+
+class UlidGenerator:
+    """Monotonic ULID source; safe to share between threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def __call__(self, now_ms: int = None) -> str:
+        if now_ms is None:
+            now_ms = time.time_ns() // 1_000_000
+        with self._lock:
+            if now_ms <= self._last_ms:
+                # Same millisecond (or clock stepped back): stay on the last timestamp and count up
+                now_ms = self._last_ms
+                self._last_random = (self._last_random + 1) % (1 << RANDOM_BITS)
+            else:
+                self._last_ms = now_ms
+                self._last_random = secrets.randbits(RANDOM_BITS)
+            random_part = self._last_random
+        return _encode(now_ms, 10) + _encode(random_part, 16)
+
+
+def ulid_timestamp_ms(value: str) -> int:
+    """Millisecond timestamp stored in the first 10 characters"""
+    timestamp = 0
+    for char in value[:10].upper():
+        timestamp = timestamp * 32 + CROCKFORD_ALPHABET.index(char)
+    return timestamp
+
+
+# Process-wide generator
+new_ulid = UlidGenerator()
@@ -0,0 +1,58 @@
+"""Counter rollup tables (one row per key, e.g. per partner per day)"""
+
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def _upsert(db: Session, model, key_columns, delta_columns):
+    """
+    INSERT ... that adds the row's deltas to an existing row with the same
+    key instead of failing on the unique constraint over `key_columns`.
+    """
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update({
+            **{column: table.c[column] + statement.inserted[column] for column in delta_columns},
+            "updated_at": func.now()
+        })
+    if dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={
+                **{column: table.c[column] + statement.excluded[column] for column in delta_columns},
+                "updated_at": func.now()
+            }
+        )
+    raise NotImplementedError(f"No upsert for the {dialect} dialect")
+
+
+def increment(db: Session, model, keys: dict, deltas: dict):
+    """
+    Add `deltas` to the row of `model` identified by `keys`, creating it if
+    needed. Runs in the caller's transaction (no commit).
+
+    One native upsert (INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON
+    CONFLICT DO UPDATE on SQLite/PostgreSQL) against the unique constraint
+    on the key columns. Unlike UPDATE-then-INSERT it takes no gap lock
+    before inserting, so two transactions creating the same day row do not
+    deadlock on MySQL; the second one waits and adds to the first one's row.
+    """
+    db.execute(_upsert(db, model, keys, deltas), {**keys, **deltas})
+
+
+def increment_many(db: Session, model, key_columns, rows, chunk_size: int = 1000):
+    """
+    Apply many increments (dicts holding the key columns and the deltas,
+    all with the same columns), e.g. when rebuilding a rollup, as one
+    batched upsert per chunk. Runs in the caller's transaction (no commit).
+    """
+    if not rows:
+        return
+    delta_columns = [column for column in rows[0] if column not in key_columns]
+    statement = _upsert(db, model, key_columns, delta_columns)
+    for start in range(0, len(rows), chunk_size):
+        db.execute(statement, rows[start:start + chunk_size])
@@ -0,0 +1,42 @@
+"""
+Build restaurant_daily_stats from existing orders.
+
+Streams orders in id order, batch by batch, and rewrites the per-restaurant
+daily counters the dashboard totals are read from. Safe to re-run: the
+table is cleared first. Run it once right after the release that adds the
+add_restaurant_daily_stats migration is live (until then every restaurant's
+all-time dashboard shows 0), ideally while no orders are being placed or
+finished.
+
+Usage:
+    python backfill_restaurant_stats.py [--batch-size 5000]
+"""
+import argparse
+import sys
+
+# Add app to path
+sys.path.append('.')
+
+from app.database import SessionLocal
+from app.services.restaurant_stats import RestaurantStatsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the restaurant daily stats rollup")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = RestaurantStatsService.backfill(db, batch_size=args.batch_size)
+        print(f"✅ Rolled up {result['orders']} orders into {result['day_rows']} restaurant-days")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Restaurant stats backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Build rider_earnings_daily from existing delivered orders.
+
+Streams delivered orders in id order, batch by batch, and rewrites the
+per-partner daily totals. Safe to re-run: the table is cleared first.
+Run it once after the add_rider_earnings_daily migration, ideally while no
+orders are being delivered.
+
+Usage:
+    python backfill_rider_earnings.py [--batch-size 5000]
+"""
+import argparse
+import sys
+
+# Add app to path
+sys.path.append('.')
+
+from app.database import SessionLocal
+from app.services.rider_earnings import RiderEarningsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the rider earnings daily rollup")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = RiderEarningsService.backfill(db, batch_size=args.batch_size)
+        print(f"✅ Rolled up {result['orders']} delivered orders into {result['day_rows']} partner-days")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Earnings backfill failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
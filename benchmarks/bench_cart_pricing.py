@@ -0,0 +1,124 @@
+"""
+Benchmark: cart pricing cost vs. cart size.
+
+Prices carts of 1 to 50 lines with the previous per-line lazy-loading
+implementation (reproduced below as legacy_totals) and with
+app/services/cart_pricing.py, reporting statements and time per call.
+The customer has no saved address, so the legacy code walks its whole
+address/location fallback chain. In-memory SQLite makes a statement almost
+free; against a networked database every statement adds a round trip.
+
+Usage:
+    python benchmarks/bench_cart_pricing.py [--repeats 200]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import (
+    Address, Cart, CartItem, Category, Customer, CustomerAddress, CustomerLocation, MenuItem, Owner, Restaurant,
+    RestaurantTypeEnum
+)
+from app.schemas import CartItemResponse, MenuItemResponse
+from app.services.cart_pricing import CartPricingService
+from app.utils.geo import haversine_km
+from app.utils.timezone import get_ist_now
+
+LINE_COUNTS = (1, 5, 10, 25, 50)
+
+
+def legacy_totals(cart, db):
+    """The pre-cart_pricing calculate_cart_totals (fee/response tail trimmed)"""
+    item_total = Decimal("0.0")
+    items = []
+    for item in cart.items:
+        price = item.menu_item.discount_price if item.menu_item.discount_price and item.menu_item.discount_price > 0 else item.menu_item.price
+        item_total += price * item.quantity
+        items.append(CartItemResponse(id=item.id, menu_item_id=item.menu_item_id,
+                                      menu_item=MenuItemResponse.from_orm(item.menu_item),
+                                      quantity=item.quantity, price=price))
+
+    distance_km = None
+    restaurant = db.query(Restaurant).filter(Restaurant.id == cart.restaurant_id).first()
+    if restaurant and restaurant.address:
+        r_lat, r_lng = float(restaurant.address.latitude), float(restaurant.address.longitude)
+        addr = db.query(CustomerAddress).filter(
+            CustomerAddress.customer_id == cart.customer_id, CustomerAddress.is_default == True).first()
+        if not addr:
+            addr = db.query(CustomerAddress).filter(CustomerAddress.customer_id == cart.customer_id).first()
+        point = (float(addr.latitude), float(addr.longitude)) if addr else None
+        if point is None:
+            loc = db.query(CustomerLocation).filter(CustomerLocation.customer_id == cart.customer_id).order_by(
+                CustomerLocation.created_at.desc()).first()
+            point = (float(loc.latitude), float(loc.longitude)) if loc else None
+        if point:
+            distance_km = haversine_km(r_lat, r_lng, *point)
+    return item_total, distance_km
+
+
+def build(db, lines):
+    owner = Owner(full_name="Bench", email=f"bench{lines}@example.com", phone_number=f"90000000{lines:02d}")
+    category = Category(name=f"Mains {lines}", display_order=1)
+    db.add_all([owner, category])
+    db.flush()
+    restaurant = Restaurant(owner_id=owner.id, restaurant_name="Bench Kitchen", restaurant_type=RestaurantTypeEnum.RESTAURANT,
+                            fssai_license_number=f"BENCH{lines}", opening_time="00:00", closing_time="23:59")
+    customer = Customer(full_name="Bench", phone_number=f"80000000{lines:02d}")
+    db.add_all([restaurant, customer])
+    db.flush()
+    db.add(Address(restaurant_id=restaurant.id, latitude=12.97, longitude=77.59, address_line_1="Street",
+                   city="Bengaluru", state="KA", pincode="560001"))
+    db.add_all([CustomerLocation(customer_id=customer.id, latitude=12.9 + i * 0.001, longitude=77.6, address="Pin",
+                                 created_at=get_ist_now() - timedelta(minutes=i)) for i in range(20)])
+    items = [MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {i}", price=100 + i)
+             for i in range(lines)]
+    cart = Cart(customer_id=customer.id, restaurant_id=restaurant.id)
+    db.add_all(items + [cart])
+    db.flush()
+    db.add_all([CartItem(cart_id=cart.id, menu_item_id=item.id, quantity=1) for item in items])
+    db.commit()
+    return cart.id
+
+
+def measure(db, statements, cart_id, fn, repeats):
+    total_statements = 0
+    started = time.perf_counter()
+    for _ in range(repeats):
+        db.expire_all()
+        cart = db.get(Cart, cart_id)
+        del statements[:]
+        fn(cart)
+        total_statements += len(statements)
+    return total_statements / repeats, (time.perf_counter() - started) * 1000 / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    carts = {lines: build(db, lines) for lines in LINE_COUNTS}
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    for lines, cart_id in carts.items():
+        legacy_q, legacy_ms = measure(db, statements, cart_id, lambda cart: legacy_totals(cart, db), args.repeats)
+        new_q, new_ms = measure(db, statements, cart_id, lambda cart: CartPricingService.price(db, cart), args.repeats)
+        print(f"{lines:>3} lines | legacy {legacy_q:5.1f} statements {legacy_ms:7.3f} ms | "
+              f"cart_pricing {new_q:4.1f} statements {new_ms:7.3f} ms | speedup {legacy_ms / new_ms:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: restaurant dashboard summaries, per-status COUNT/SUM queries vs.
+one conditional aggregation plus the restaurant_daily_stats rollup.
+
+Seeds an order history with seed_orders.create_bulk_orders, which also
+builds the rollup. A few open orders are added for today. The benchmark then
+times both summaries for the busiest restaurant:
+- legacy: the previous DashboardService, with 6 (today) and 8 (total)
+  separate queries over orders.
+- current: app/services/dashboard_service.py.
+
+Both modes run with the composite order indexes from the models. Each mode
+reports p50 and query counts.
+
+Usage:
+    python benchmarks/bench_dashboard.py [--orders 1000000] [--restaurants 50] [--runs 20]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, create_engine, event, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Order, OrderStatusEnum, Owner, Restaurant, RestaurantTypeEnum
+from app.services.dashboard_service import DashboardService
+from seed_orders import create_bulk_orders
+
+ONGOING = [OrderStatusEnum.ACCEPTED.value, OrderStatusEnum.PREPARING.value, OrderStatusEnum.READY.value]
+
+
+def count(db, *filters):
+    return db.query(func.count(Order.id)).filter(and_(*filters)).scalar() or 0
+
+
+def legacy_today(db, restaurant_id):
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    today_end = today_start + timedelta(days=1)
+    mine = Order.restaurant_id == restaurant_id
+    db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    count(db, mine, Order.created_at >= today_start, Order.created_at < today_end)
+    db.query(func.sum(Order.total_amount)).filter(
+        mine, Order.created_at >= today_start, Order.created_at < today_end,
+        Order.status == OrderStatusEnum.DELIVERED.value
+    ).scalar()
+    count(db, mine, Order.status == OrderStatusEnum.PENDING.value)
+    count(db, mine, Order.status.in_(ONGOING))
+    count(db, mine, Order.created_at >= today_start - timedelta(days=1), Order.created_at < today_start)
+
+
+def legacy_total(db, restaurant_id):
+    mine = Order.restaurant_id == restaurant_id
+    db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    count(db, mine)
+    db.query(func.sum(Order.total_amount)).filter(mine, Order.status == OrderStatusEnum.DELIVERED.value).scalar()
+    for status in (OrderStatusEnum.DELIVERED, OrderStatusEnum.REJECTED, OrderStatusEnum.CANCELLED,
+                   OrderStatusEnum.PENDING):
+        count(db, mine, Order.status == status.value)
+    count(db, mine, Order.status.in_(ONGOING))
+
+
+def build(engine, orders, restaurants):
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    owner = Owner(full_name="Bench", email="bench@example.com", phone_number="9000000000")
+    db.add(owner)
+    db.flush()
+    db.add_all([Restaurant(owner_id=owner.id, restaurant_name=f"Kitchen {i}", restaurant_type=RestaurantTypeEnum.RESTAURANT,
+                           fssai_license_number=f"BENCH{i}", opening_time="00:00", closing_time="23:59")
+                for i in range(restaurants)])
+    db.commit()
+    restaurant_ids = [r.id for r in db.query(Restaurant.id)]
+    create_bulk_orders(db, restaurant_ids, orders, batch_size=20000)
+
+    busiest = db.query(Order.restaurant_id).group_by(Order.restaurant_id).order_by(func.count().desc()).first()[0]
+    db.add_all([Order(order_number=f"OPEN{i}", restaurant_id=busiest, customer_name="C", customer_phone="9999999999",
+                      delivery_address="Home", total_amount=Decimal(200),
+                      status=random.choice([OrderStatusEnum.PENDING.value] + ONGOING)) for i in range(20)])
+    db.commit()
+    db.close()
+    return busiest
+
+
+def measure(Session, fn, restaurant_id, runs, statements):
+    timings = []
+    for _ in range(runs):
+        db = Session()
+        restaurant = db.get(Restaurant, restaurant_id)  # Held by the auth dependency in the app
+        del statements[:]
+        started = time.perf_counter()
+        fn(db, restaurant_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        del restaurant
+        db.close()
+    return sorted(timings)[len(timings) // 2], len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1000000)
+    parser.add_argument("--restaurants", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'dashboard.db')}")
+        started = time.perf_counter()
+        restaurant_id = build(engine, args.orders, args.restaurants)
+        print(f"seeded {args.orders} orders in {time.perf_counter() - started:.1f} s")
+
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+        Session = sessionmaker(bind=engine)
+        for name, fn in (("legacy today", legacy_today), ("current today", DashboardService.get_today_summary),
+                         ("legacy total", legacy_total), ("current total", DashboardService.get_total_summary)):
+            p50, queries = measure(Session, fn, restaurant_id, args.runs, statements)
+            print(f"{name:>13} | {queries:2d} queries | p50 {p50:9.3f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
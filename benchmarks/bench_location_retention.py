@@ -0,0 +1,147 @@
+"""
+Benchmark: tracking-query latency before and after breadcrumb retention.
+
+Builds a SQLite database with N days of GPS pings for a rider fleet, times
+the tracking queries, runs compaction + purge from
+app/services/location_retention.py and times them again.
+
+Usage:
+    python benchmarks/bench_location_retention.py [--riders 100] [--days 14] [--retention-days 2]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import DeliveryPartner, Order, Owner, Restaurant, RestaurantTypeEnum
+from app.models_location import DeliveryPartnerLocation
+from app.services.location_retention import LocationRetentionService
+from app.utils.timezone import get_ist_now
+
+LATEST_QUERY = text("""
+    SELECT latitude, longitude, accuracy, bearing, speed, created_at
+    FROM delivery_partner_locations
+    WHERE delivery_partner_id = :partner_id
+    AND (order_id = :order_id OR order_id IS NULL)
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+HISTORY_QUERY = text("""
+    SELECT latitude, longitude, speed, created_at
+    FROM delivery_partner_locations
+    WHERE order_id = :order_id AND delivery_partner_id = :partner_id
+    ORDER BY created_at DESC
+    LIMIT 50
+""")
+
+
+def build(db, riders, days, orders_per_day, pings_per_order, rng):
+    owner = Owner(full_name="Bench", email="bench@example.com", phone_number="9000000000")
+    db.add(owner)
+    db.flush()
+    restaurant = Restaurant(owner_id=owner.id, restaurant_name="Bench Kitchen",
+                            restaurant_type=RestaurantTypeEnum.RESTAURANT, fssai_license_number="BENCH",
+                            opening_time="00:00", closing_time="23:59")
+    db.add(restaurant)
+    partners = [DeliveryPartner(full_name=f"Rider {i}", phone_number=f"8{i:09d}") for i in range(riders)]
+    db.add_all(partners)
+    db.flush()
+
+    now = get_ist_now()
+    orders, active = [], []
+    for day in range(days, -1, -1):
+        for partner in partners:
+            for n in range(orders_per_day):
+                is_active = day == 0 and n == orders_per_day - 1
+                orders.append(dict(
+                    order_number=f"B{partner.id}-{day}-{n}", restaurant_id=restaurant.id,
+                    delivery_partner_id=partner.id, customer_name="C", customer_phone="9", delivery_address="A",
+                    total_amount=100, status="picked_up" if is_active else "delivered",
+                    created_at=now - timedelta(days=day, hours=n)
+                ))
+    db.execute(Order.__table__.insert(), orders)
+    db.commit()
+
+    rows = db.query(Order.id, Order.delivery_partner_id, Order.created_at, Order.status).all()
+    batch = []
+    for order in rows:
+        if order.status != "delivered":
+            active.append((order.id, order.delivery_partner_id))
+        lat, lng = 12.9 + rng.uniform(-0.1, 0.1), 77.6 + rng.uniform(-0.1, 0.1)
+        for i in range(pings_per_order):
+            lat += rng.uniform(-0.0005, 0.0005)
+            lng += rng.uniform(-0.0005, 0.0005)
+            batch.append(dict(delivery_partner_id=order.delivery_partner_id, order_id=order.id,
+                              latitude=lat, longitude=lng, speed=rng.uniform(0, 12),
+                              created_at=order.created_at + timedelta(seconds=5 * i)))
+        if len(batch) >= 50_000:
+            db.execute(DeliveryPartnerLocation.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.execute(DeliveryPartnerLocation.__table__.insert(), batch)
+    db.commit()
+    return active
+
+
+def time_queries(db, active, repeats):
+    timings = {}
+    for name, query in (("latest", LATEST_QUERY), ("history", HISTORY_QUERY)):
+        started = time.perf_counter()
+        for _ in range(repeats):
+            for order_id, partner_id in active:
+                db.execute(query, {"order_id": order_id, "partner_id": partner_id}).fetchall()
+        timings[name] = (time.perf_counter() - started) * 1000 / (repeats * len(active))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--riders", type=int, default=100)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--orders-per-day", type=int, default=6)
+    parser.add_argument("--pings-per-order", type=int, default=120)
+    parser.add_argument("--retention-days", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench_retention.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    started = time.perf_counter()
+    active = build(db, args.riders, args.days, args.orders_per_day, args.pings_per_order, random.Random(args.seed))
+    total = db.query(DeliveryPartnerLocation).count()
+    print(f"Built {total:,} breadcrumbs in {time.perf_counter() - started:.1f}s "
+          f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    before = time_queries(db, active, args.repeats)
+
+    started = time.perf_counter()
+    compacted = LocationRetentionService.compact_delivered_orders(db, batch_size=500)
+    purged = LocationRetentionService.purge_expired(db, args.retention_days)
+    db.execute(text("VACUUM"))
+    remaining = db.query(DeliveryPartnerLocation).count()
+    print(f"Retention: {compacted['routes_compacted']:,} routes compacted, "
+          f"{compacted['breadcrumbs_removed'] + purged['rows_deleted']:,} rows removed in "
+          f"{time.perf_counter() - started:.1f}s; {remaining:,} rows left "
+          f"({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    after = time_queries(db, active, args.repeats)
+    for name in before:
+        print(f"{name:>8} query: before {before[name]:8.3f} ms | after {after[name]:8.3f} ms | "
+              f"speedup {before[name] / max(after[name], 1e-9):6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: order placement latency with side effects inline vs. outboxed.
+
+Places orders for many customers and times the request-path work:
+- inline: placement followed by the old awaited
+  NotificationService.send_order_update. That means notification rows for
+  the owner and every nearby online partner, plus partner fan-out lookups.
+- outbox: app/services/order_placement.py alone, which queues two outbox
+  events in the order transaction.
+
+p50/p99 are reported per mode. Firebase is not configured here, so the
+inline numbers leave out the FCM round trips a real worker also waited on.
+
+Usage:
+    python benchmarks/bench_order_placement.py [--orders 300] [--partners 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import (
+    Address, Cart, CartItem, Category, Customer, CustomerAddress, DeliveryPartner, MenuItem, Owner, Restaurant,
+    RestaurantTypeEnum
+)
+from app.schemas import OrderCreateRequest
+from app.services.notification_service import NotificationService
+from app.services.order_placement import OrderPlacementService
+from app.services.pricing_rules import pricing_rules
+
+
+def build(db, customers, partners):
+    owner = Owner(full_name="Bench", email="bench@example.com", phone_number="9000000000")
+    category = Category(name="Mains", display_order=1)
+    db.add_all([owner, category])
+    db.flush()
+    restaurant = Restaurant(owner_id=owner.id, restaurant_name="Bench Kitchen", restaurant_type=RestaurantTypeEnum.RESTAURANT,
+                            fssai_license_number="BENCH", opening_time="00:00", closing_time="23:59", is_open=True)
+    db.add(restaurant)
+    db.flush()
+    db.add(Address(restaurant_id=restaurant.id, latitude=12.97, longitude=77.59, address_line_1="Street",
+                   city="Bengaluru", state="KA", pincode="560001"))
+    db.add_all([DeliveryPartner(full_name=f"Rider {i}", phone_number=f"70000{i:05d}", is_online=True,
+                                latitude=12.97 + (i % 20) * 0.001, longitude=77.59) for i in range(partners)])
+    items = [MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {i}", price=100 + i)
+             for i in range(5)]
+    people = [Customer(full_name=f"Bench {i}", phone_number=f"80000{i:05d}") for i in range(customers)]
+    db.add_all(items + people)
+    db.flush()
+    requests = []
+    for person in people:
+        address = CustomerAddress(customer_id=person.id, latitude=12.98, longitude=77.6, is_default=True,
+                                  address_line_1="Home", city="Bengaluru", state="KA", pincode="560001")
+        cart = Cart(customer_id=person.id, restaurant_id=restaurant.id)
+        db.add_all([address, cart])
+        db.flush()
+        db.add_all([CartItem(cart_id=cart.id, menu_item_id=item.id, quantity=1) for item in items])
+        requests.append((person.id, OrderCreateRequest(restaurant_id=restaurant.id, address_id=address.id,
+                                                       payment_method="upi")))
+    db.commit()
+    pricing_rules.load(db)
+    return requests, owner.id
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(Session, requests, owner_id, inline):
+    timings = []
+    for customer_id, request in requests:
+        db = Session()
+        started = time.perf_counter()
+        placed = OrderPlacementService.place(db, db.get(Customer, customer_id), request)
+        if inline:
+            await NotificationService.send_order_update(db=db, order_id=placed.order_id, status="new", owner_id=owner_id)
+        timings.append((time.perf_counter() - started) * 1000)
+        db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=300)
+    parser.add_argument("--partners", type=int, default=200)
+    args = parser.parse_args()
+
+    for mode in ("inline", "outbox"):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        db = Session()
+        requests, owner_id = build(db, args.orders, args.partners)
+        db.close()
+
+        timings = asyncio.run(run(Session, requests, owner_id, inline=mode == "inline"))
+        print(f"{mode:>6} | {len(timings)} orders | p50 {percentile(timings, 0.5):7.3f} ms | "
+              f"p99 {percentile(timings, 0.99):7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
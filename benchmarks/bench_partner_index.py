@@ -0,0 +1,80 @@
+"""
+Benchmark: nearby delivery partner lookup.
+
+Compares the old full scan (haversine over every online partner) against
+the grid index in app/services/spatial_index.py for 1k, 10k and 100k
+partners spread over a ~40 km metro area.
+
+Usage:
+    python benchmarks/bench_partner_index.py [--queries 200] [--radius 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.spatial_index import GridIndex
+from app.utils.geo import haversine_km
+
+CENTER = (12.9716, 77.5946)  # Bengaluru
+SPREAD_DEG = 0.18            # ~20 km each way
+
+
+def random_point(rng):
+    return (
+        CENTER[0] + rng.uniform(-SPREAD_DEG, SPREAD_DEG),
+        CENTER[1] + rng.uniform(-SPREAD_DEG, SPREAD_DEG)
+    )
+
+
+def full_scan(partners, lat, lng, radius_km):
+    matches = []
+    for partner_id, p_lat, p_lng in partners:
+        distance = haversine_km(lat, lng, p_lat, p_lng)
+        if distance <= radius_km:
+            matches.append((partner_id, distance))
+    matches.sort(key=lambda match: (match[1], match[0]))
+    return matches
+
+
+def run(count, queries, radius_km, rng):
+    partners = [(i, *random_point(rng)) for i in range(count)]
+    restaurants = [random_point(rng) for _ in range(queries)]
+
+    index = GridIndex()
+    started = time.perf_counter()
+    index.replace_all(partners)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    scan_results = [full_scan(partners, lat, lng, radius_km) for lat, lng in restaurants]
+    scan_ms = (time.perf_counter() - started) * 1000 / queries
+
+    started = time.perf_counter()
+    index_results = [index.nearby(lat, lng, radius_km) for lat, lng in restaurants]
+    index_ms = (time.perf_counter() - started) * 1000 / queries
+
+    assert scan_results == index_results, "index and full scan disagree"
+    avg_matches = sum(len(r) for r in index_results) / queries
+    print(f"{count:>8} partners | build {build_ms:8.1f} ms | full scan {scan_ms:8.3f} ms/query | "
+          f"index {index_ms:7.3f} ms/query | speedup {scan_ms / index_ms:6.1f}x | "
+          f"avg matches {avg_matches:.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--radius", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    for count in (1_000, 10_000, 100_000):
+        run(count, args.queries, args.radius, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: cart quoting throughput with a compiled pricing rulebook.
+
+Compiles a rulebook with per-city and per-restaurant fee slabs, surge
+windows and promo codes (app/services/pricing_rules.py), then quotes random
+carts of 1-10 lines on a single core. Quoting never touches the database;
+the target is at least 50k carts/second.
+
+Usage:
+    python benchmarks/bench_pricing_rules.py [--carts 200000] [--cities 100] [--restaurants 5000]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pricing_rules import FeeSlab, Promo, Rulebook, Surge
+from app.utils.timezone import IST
+
+TARGET_PER_SECOND = 50_000
+
+
+def build_rulebook(cities, restaurants, rng):
+    slabs, surges, promos = [], [], []
+    for city in cities:
+        slabs.append((None, city, FeeSlab(0.0, 4.0, Decimal("30"), 0.0)))
+        slabs.append((None, city, FeeSlab(4.0, math.inf, Decimal("30"), 6.0)))
+        surges.append((None, city, Surge(frozenset(range(7)), 19 * 60, 22 * 60, Decimal("1.25"))))
+    for restaurant_id in rng.sample(range(1, restaurants + 1), restaurants // 10):
+        slabs.append((restaurant_id, None, FeeSlab(0.0, 8.0, Decimal("20"), 4.0)))
+    for i in range(500):
+        promos.append(Promo(f"CODE{i}", rng.choice(["percent", "flat", "free_delivery"]), Decimal(rng.choice([10, 20, 50])),
+                            Decimal("100"), Decimal(rng.choice([0, 199, 499])), None, None, None, None))
+    return Rulebook(slabs, surges, promos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--carts", type=int, default=200_000)
+    parser.add_argument("--cities", type=int, default=100)
+    parser.add_argument("--restaurants", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cities = [f"city {i}" for i in range(args.cities)]
+    rulebook = build_rulebook(cities, args.restaurants, rng)
+    at = IST.localize(datetime(2026, 10, 20, 20, 30))
+    prices = [Decimal(p) for p in ("49.00", "99.00", "149.00", "199.00", "249.50", "329.00")]
+
+    carts = []
+    for _ in range(10_000):
+        lines = [(rng.choice(prices), rng.randint(1, 3)) for _ in range(rng.randint(1, 10))]
+        carts.append((lines, rng.randint(1, args.restaurants), rng.choice(cities), rng.uniform(0.3, 15.0),
+                      f"CODE{rng.randrange(600)}" if rng.random() < 0.5 else None))
+
+    started = time.perf_counter()
+    for n in range(args.carts):
+        lines, restaurant_id, city, distance, promo = carts[n % len(carts)]
+        rulebook.quote(lines, restaurant_id, city, distance, promo, at)
+    elapsed = time.perf_counter() - started
+
+    rate = args.carts / elapsed
+    print(f"{rulebook.summary()}")
+    print(f"Quoted {args.carts:,} carts in {elapsed:.2f}s: {rate:,.0f} carts/s "
+          f"({elapsed / args.carts * 1e6:.1f} us/cart) - target {TARGET_PER_SECOND:,}/s "
+          f"{'met' if rate >= TARGET_PER_SECOND else 'NOT met'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: restaurant discovery latency vs. catalog size.
+
+Seeds a SQLite database with restaurants spread over 30 city centres and
+times one page of /customer/restaurants/discover (grid index and bounding-box
+SQL variants from app/services/restaurant_discovery.py) against building the
+unsorted full list that /home returns.
+
+Usage:
+    python benchmarks/bench_restaurant_discovery.py [--queries 50] [--radius 10] [--limit 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Address, Owner, Restaurant, RestaurantTypeEnum
+from app.services.restaurant_cards import build_restaurant_cards
+from app.services import restaurant_discovery
+from app.services.restaurant_discovery import RestaurantDiscoveryService, nearby_from_db, restaurant_index
+
+CITY_COUNT = 30
+CITY_SPREAD_DEG = 0.15   # ~15 km each way
+
+
+def seed(db, count, cities, rng):
+    db.execute(Owner.__table__.insert(), [
+        dict(full_name="Bench", email="bench@example.com", phone_number="9000000000")
+    ])
+    db.execute(Restaurant.__table__.insert(), [
+        dict(owner_id=1, restaurant_name=f"Kitchen {i}", restaurant_type=RestaurantTypeEnum.RESTAURANT.name,
+             fssai_license_number=f"F{i}", opening_time="09:00", closing_time="22:00", is_active=True,
+             is_open=True, verification_status="APPROVED")
+        for i in range(count)
+    ])
+    addresses = []
+    for i in range(count):
+        lat, lng = rng.choice(cities)
+        addresses.append(dict(
+            restaurant_id=i + 1, address_line_1="Street", city="City", state="State", pincode="000000",
+            latitude=lat + rng.uniform(-CITY_SPREAD_DEG, CITY_SPREAD_DEG),
+            longitude=lng + rng.uniform(-CITY_SPREAD_DEG, CITY_SPREAD_DEG)
+        ))
+    db.execute(Address.__table__.insert(), addresses)
+    db.commit()
+
+
+def timed(fn, queries):
+    started = time.perf_counter()
+    results = [fn(lat, lng) for lat, lng in queries]
+    return results, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def run(count, args, rng):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    cities = [(rng.uniform(10, 28), rng.uniform(72, 88)) for _ in range(CITY_COUNT)]
+    seed(db, count, cities, rng)
+    queries = [(lat + rng.uniform(-0.05, 0.05), lng + rng.uniform(-0.05, 0.05))
+               for lat, lng in (rng.choice(cities) for _ in range(args.queries))]
+
+    started = time.perf_counter()
+    build_restaurant_cards(db, Restaurant.is_active == True)
+    full_ms = (time.perf_counter() - started) * 1000
+
+    restaurant_index.load(db)
+    settings = restaurant_discovery.settings
+
+    settings.DISCOVERY_GRID_INDEX = True
+    grid, grid_ms = timed(lambda lat, lng: RestaurantDiscoveryService.discover(
+        db, lat, lng, args.radius, args.limit), queries)
+    settings.DISCOVERY_GRID_INDEX = False
+    bbox, bbox_ms = timed(lambda lat, lng: RestaurantDiscoveryService.discover(
+        db, lat, lng, args.radius, args.limit), queries)
+    settings.DISCOVERY_GRID_INDEX = True
+
+    assert [[r["id"] for r in page["restaurants"]] for page in grid] == \
+           [[r["id"] for r in page["restaurants"]] for page in bbox], "grid and bounding box disagree"
+    assert all(nearby_from_db(db, lat, lng, args.radius) == restaurant_index.nearby(lat, lng, args.radius)
+               for lat, lng in queries[:5])
+    in_radius = sum(page["total_in_radius"] for page in grid) / len(grid)
+    print(f"{count:>7} restaurants | full list {full_ms:9.1f} ms | discover grid {grid_ms:7.2f} ms | "
+          f"discover bbox {bbox_ms:7.2f} ms | avg in radius {in_radius:6.0f}")
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--radius", type=float, default=10.0)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for count in (300, 3_000, 30_000):
+        run(count, args, random.Random(args.seed))
+
+
+if __name__ == "__main__":
+    main()
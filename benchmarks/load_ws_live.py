@@ -0,0 +1,206 @@
+"""
+Load test: restaurant /orders/live WebSocket fan-out across workers.
+
+Holds N concurrent restaurant sockets against a multi-worker server, then
+publishes probe messages on the live orders Redis channel and checks that
+every socket of each probed restaurant receives it, whichever worker
+it landed on.
+
+Setup:
+    ulimit -n 65535
+    LIVE_ORDERS_PUBSUB=redis uvicorn app.main:app --workers 4 --port 8000
+    python benchmarks/load_ws_live.py --seed 2500          # once, creates test restaurants
+
+Usage:
+    python benchmarks/load_ws_live.py [--connections 10000] [--probes 200]
+    python benchmarks/load_ws_live.py --cleanup
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis.asyncio as aioredis
+import websockets
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import Owner, Restaurant, RestaurantTypeEnum
+from app.services.jwt_service import create_access_token
+
+settings = get_settings()
+LOADTEST_PREFIX = "loadtest-ws"
+
+
+def seed(count):
+    db = SessionLocal()
+    try:
+        existing = db.query(Owner).filter(Owner.email.like(f"{LOADTEST_PREFIX}-%")).count()
+        owners = [
+            Owner(
+                full_name=f"Load Test Owner {i}",
+                email=f"{LOADTEST_PREFIX}-{i}@example.com",
+                phone_number=f"7{i:09d}"
+            )
+            for i in range(existing, count)
+        ]
+        db.add_all(owners)
+        db.flush()
+        db.add_all([
+            Restaurant(
+                owner_id=owner.id,
+                restaurant_name=f"Load Test Kitchen {owner.id}",
+                restaurant_type=RestaurantTypeEnum.RESTAURANT,
+                fssai_license_number=f"{LOADTEST_PREFIX}-{owner.id}",
+                opening_time="00:00",
+                closing_time="23:59"
+            )
+            for owner in owners
+        ])
+        db.commit()
+        print(f"Seeded {len(owners)} owners/restaurants ({count} total)")
+    finally:
+        db.close()
+
+
+def cleanup():
+    db = SessionLocal()
+    try:
+        owner_ids = [row.id for row in db.query(Owner.id).filter(Owner.email.like(f"{LOADTEST_PREFIX}-%"))]
+        db.query(Restaurant).filter(Restaurant.owner_id.in_(owner_ids)).delete(synchronize_session=False)
+        db.query(Owner).filter(Owner.id.in_(owner_ids)).delete(synchronize_session=False)
+        db.commit()
+        print(f"Removed {len(owner_ids)} load test owners/restaurants")
+    finally:
+        db.close()
+
+
+def load_targets():
+    """(restaurant_id, owner token) for every seeded restaurant"""
+    db = SessionLocal()
+    try:
+        rows = db.query(Restaurant.id, Restaurant.owner_id).join(
+            Owner, Owner.id == Restaurant.owner_id
+        ).filter(Owner.email.like(f"{LOADTEST_PREFIX}-%")).all()
+        return [(row.id, create_access_token({"owner_id": row.owner_id})) for row in rows]
+    finally:
+        db.close()
+
+
+class Client:
+    def __init__(self, restaurant_id, token):
+        self.restaurant_id = restaurant_id
+        self.token = token
+        self.received = {}
+
+    async def run(self, url, connected, stop):
+        try:
+            async with websockets.connect(f"{url}?token={self.token}", open_timeout=60,
+                                          ping_interval=None, max_queue=None) as ws:
+                connected.append(self)
+                while not stop.is_set():
+                    try:
+                        raw = await asyncio.wait_for(ws.recv(), timeout=1)
+                    except asyncio.TimeoutError:
+                        continue
+                    if raw == "pong":
+                        continue
+                    message = json.loads(raw)
+                    if message.get("type") == "load_probe":
+                        self.received[message["probe_id"]] = time.time()
+        except Exception as e:
+            print(f"socket for restaurant {self.restaurant_id} failed: {e}")
+
+
+async def run_load(args):
+    targets = load_targets()
+    if not targets:
+        sys.exit("No load test restaurants found; run with --seed first")
+
+    clients = [Client(*targets[i % len(targets)]) for i in range(args.connections)]
+    by_restaurant = defaultdict(list)
+    for client in clients:
+        by_restaurant[client.restaurant_id].append(client)
+
+    connected, stop = [], asyncio.Event()
+    started = time.perf_counter()
+    tasks = []
+    for start in range(0, len(clients), args.ramp_batch):
+        for client in clients[start:start + args.ramp_batch]:
+            tasks.append(asyncio.create_task(client.run(args.url, connected, stop)))
+        await asyncio.sleep(args.ramp_delay)
+    while len(connected) < len(clients) and time.perf_counter() - started < args.connect_timeout:
+        await asyncio.sleep(0.5)
+    print(f"Connected {len(connected)}/{len(clients)} sockets in {time.perf_counter() - started:.1f}s")
+
+    redis = aioredis.from_url(args.redis_url)
+    rng = random.Random(args.random_seed)
+    restaurant_ids = list(by_restaurant)
+    probes = {}
+    for probe_id in range(args.probes):
+        restaurant_id = rng.choice(restaurant_ids)
+        message = json.dumps({"type": "load_probe", "probe_id": probe_id})
+        probes[probe_id] = (restaurant_id, time.time())
+        await redis.publish(settings.LIVE_ORDERS_CHANNEL,
+                            json.dumps({"restaurant_id": restaurant_id, "message": message}))
+        await asyncio.sleep(args.probe_interval)
+
+    await asyncio.sleep(args.settle)
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await redis.close()
+
+    live = set(map(id, connected))
+    expected = delivered = 0
+    latencies = []
+    for probe_id, (restaurant_id, sent_at) in probes.items():
+        for client in by_restaurant[restaurant_id]:
+            if id(client) not in live:
+                continue
+            expected += 1
+            if probe_id in client.received:
+                delivered += 1
+                latencies.append((client.received[probe_id] - sent_at) * 1000)
+
+    print(f"Delivered {delivered}/{expected} probe messages "
+          f"({100 * delivered / max(expected, 1):.2f}%)")
+    if latencies:
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+        print(f"Latency ms: p50 {statistics.median(latencies):.1f} | p95 {pct(0.95):.1f} | "
+              f"p99 {pct(0.99):.1f} | max {latencies[-1]:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://localhost:8000/orders/live")
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    parser.add_argument("--ramp-batch", type=int, default=500)
+    parser.add_argument("--ramp-delay", type=float, default=0.5)
+    parser.add_argument("--connect-timeout", type=float, default=120)
+    parser.add_argument("--settle", type=float, default=3)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--seed", type=int, metavar="RESTAURANTS", help="create load test restaurants and exit")
+    parser.add_argument("--cleanup", action="store_true", help="delete load test restaurants and exit")
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    elif args.cleanup:
+        cleanup()
+    else:
+        asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
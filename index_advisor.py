@@ -0,0 +1,57 @@
+"""
+Explain the hot order queries and flag full table scans.
+
+Replays the read paths in app/services/index_advisor.py (restaurant order
+lists, dashboard, rider lists, available orders, customer history) as one
+restaurant, delivery partner and customer, then runs EXPLAIN on every
+SELECT they send. Exits with status 1 if any of them scans a watched table.
+
+Usage:
+    python index_advisor.py [--restaurant-id N] [--partner-id N] [--customer-id N] [--tables orders] [--verbose]
+"""
+import argparse
+import sys
+
+# Add app to path
+sys.path.append('.')
+
+from app.database import SessionLocal
+from app.services.index_advisor import IndexAdvisor, WATCHED_TABLES, load_probe
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag full scans in the hot order queries")
+    parser.add_argument("--restaurant-id", type=int)
+    parser.add_argument("--partner-id", type=int)
+    parser.add_argument("--customer-id", type=int)
+    parser.add_argument("--tables", nargs="+", default=list(WATCHED_TABLES), help="tables that must not be scanned")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        probe = load_probe(db, args.restaurant_id, args.partner_id, args.customer_id)
+        report = IndexAdvisor.review(db, probe, tables=args.tables)
+        for entry in report:
+            mark = "❌" if entry["full_scans"] else "✅"
+            print(f"{mark} {entry['shape']}: {len(entry['queries'])} queries")
+            for query in entry["queries"]:
+                if args.verbose or query["full_scans"]:
+                    print(f"    {' '.join(query['statement'].split())[:200]}")
+                    for line in query["plan"]:
+                        print(f"      {line}")
+        scanning = [entry["shape"] for entry in report if entry["full_scans"]]
+        if scanning:
+            print(f"❌ Full scans in: {', '.join(scanning)}")
+            sys.exit(1)
+        print("✅ No full scans")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Index advisor failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
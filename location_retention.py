@@ -0,0 +1,68 @@
+"""
+Daily retention job for delivery partner GPS breadcrumbs.
+
+1. Creates upcoming daily partitions (MySQL)
+2. Compacts delivered orders' breadcrumbs into route summaries
+3. Purges raw breadcrumbs older than LOCATION_RETENTION_DAYS
+
+Usage:
+    python location_retention.py [--retention-days 7] [--skip-compaction] [--dry-run]
+
+Schedule it once a day, e.g. cron: 15 3 * * * cd /app && python location_retention.py
+"""
+import argparse
+import sys
+
+# Add app to path
+sys.path.append('.')
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.location_retention import LocationRetentionService
+from app.models_location import DeliveryPartnerLocation, DeliveryRouteSummary
+from app.utils.timezone import get_ist_now
+from datetime import timedelta
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Compact and purge delivery partner breadcrumbs")
+    parser.add_argument("--retention-days", type=int, default=settings.LOCATION_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--skip-compaction", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be removed")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            cutoff = get_ist_now() - timedelta(days=args.retention_days)
+            expired = db.query(DeliveryPartnerLocation).filter(DeliveryPartnerLocation.created_at < cutoff).count()
+            total = db.query(DeliveryPartnerLocation).count()
+            summaries = db.query(DeliveryRouteSummary).count()
+            print(f"📊 {total} breadcrumbs, {expired} older than {args.retention_days} days, {summaries} route summaries")
+            return
+
+        created = LocationRetentionService.maintain_partitions(db)
+        if created:
+            print(f"✅ Created partitions: {', '.join(created)}")
+
+        if not args.skip_compaction:
+            result = LocationRetentionService.compact_delivered_orders(db)
+            print(f"✅ Compacted {result['routes_compacted']} delivered routes "
+                  f"({result['breadcrumbs_removed']} breadcrumbs removed)")
+
+        result = LocationRetentionService.purge_expired(db, args.retention_days, args.batch_size)
+        print(f"✅ Purged {result['rows_deleted']} breadcrumbs older than {result['cutoff']}")
+        if result["partitions_dropped"]:
+            print(f"✅ Dropped partitions: {', '.join(result['partitions_dropped'])}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Retention job failed: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 """
 Seed realistic orders for testing the FastFoodie order flow
+
+Usage:
+    python seed_orders.py                      # a handful of orders in every status
+    python seed_orders.py --bulk 1000000       # a large order history for load tests
 """
+import argparse
 import sys
 import random
 from datetime import datetime, timedelta
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 # Add app to path
@@ -12,6 +18,7 @@ sys.path.append('.')
 
 from app.database import SessionLocal
 from app.models import Order, OrderItem, Restaurant, MenuItem, OrderStatusEnum
+from app.services.restaurant_stats import RestaurantStatsService
 
 # Sample customer data
 CUSTOMERS = [
@@ -407,7 +414,82 @@ def create_specific_customer_orders(db: Session, restaurant_id: int, menu_items:
     return orders_created
 
 
+# Final statuses of a bulk-seeded history (weights roughly match production)
+BULK_STATUSES = [
+    (OrderStatusEnum.DELIVERED.value, 85),
+    (OrderStatusEnum.CANCELLED.value, 8),
+    (OrderStatusEnum.REJECTED.value, 7),
+]
+
+
+def create_bulk_orders(db: Session, restaurant_ids: list, count: int, batch_size: int = 10000, days: int = 365):
+    """
+    Insert `count` historical orders (no line items) spread over the last
+    `days` days, with multi-row INSERTs committed every `batch_size` rows,
+    then rebuild the restaurant dashboard rollup from them.
+    """
+    print(f"\n📦 Bulk inserting {count} orders across {len(restaurant_ids)} restaurants...")
+    statuses = [status for status, _ in BULK_STATUSES]
+    weights = [weight for _, weight in BULK_STATUSES]
+    prefix = f"BULK{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    now = datetime.now()
+
+    for start in range(0, count, batch_size):
+        rows = []
+        for i in range(start, min(start + batch_size, count)):
+            status = random.choices(statuses, weights)[0]
+            created_at = now - timedelta(days=1) - timedelta(seconds=random.randint(0, days * 86400))
+            finished_at = created_at + timedelta(minutes=random.randint(20, 60))
+            customer = random.choice(CUSTOMERS)
+            rows.append({
+                "order_number": f"{prefix}{i:09d}",
+                "restaurant_id": random.choice(restaurant_ids),
+                "customer_name": customer['name'],
+                "customer_phone": customer['phone'],
+                "delivery_address": random.choice(ADDRESSES),
+                "status": status,
+                "total_amount": Decimal(random.randint(150, 1500)),
+                "delivery_fee": Decimal('30.00'),
+                "payment_method": random.choice(PAYMENT_METHODS),
+                "payment_status": "paid",
+                "created_at": created_at,
+                "delivered_at": finished_at if status == OrderStatusEnum.DELIVERED.value else None,
+                "completed_at": finished_at if status == OrderStatusEnum.DELIVERED.value else None,
+                "rejected_at": finished_at if status != OrderStatusEnum.DELIVERED.value else None
+            })
+        db.execute(insert(Order), rows)
+        db.commit()
+        print(f"  ✅ {min(start + batch_size, count)}/{count}")
+
+    result = RestaurantStatsService.backfill(db, batch_size=batch_size)
+    print(f"  ✅ Dashboard rollup rebuilt: {result['day_rows']} restaurant-days")
+    return count
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Seed orders for testing the order flow")
+    parser.add_argument("--bulk", type=int, default=0,
+                        help="insert this many historical orders across all active restaurants instead")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--days", type=int, default=365, help="history length for --bulk")
+    args = parser.parse_args()
+
+    if args.bulk:
+        db = SessionLocal()
+        try:
+            restaurant_ids = [r.id for r in db.query(Restaurant.id).filter(Restaurant.is_active == True)]
+            if not restaurant_ids:
+                print("❌ No active restaurant found. Please create a restaurant first.")
+                return
+            create_bulk_orders(db, restaurant_ids, args.bulk, args.batch_size, args.days)
+        except Exception as e:
+            print(f"\n❌ Error: {e}")
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        return
+
     print("=" * 60)
     print("🍽️  FastFoodie Order Seeder")
     print("=" * 60)
@@ -444,6 +526,7 @@ def main():
         new_orders = create_new_orders(db, restaurant.id, menu_items, count=5)
         ongoing_orders = create_ongoing_orders(db, restaurant.id, menu_items, count=8)
         completed_orders = create_completed_orders(db, restaurant.id, menu_items, count=15)
+        RestaurantStatsService.backfill(db)
         
         print("\n" + "=" * 60)
         print("✅ Order Seeding Complete!")
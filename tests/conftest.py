@@ -0,0 +1,141 @@
+import sys
+import os
+from itertools import count
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from app.database import Base
+from app.models import Address, Customer, DeliveryPartner, Order, Owner, Restaurant, RestaurantTypeEnum
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite with every table; all sessions and threads share its one connection"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """SQLite file with a connection per session, for tests that race many transactions"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"timeout": 60}, poolclass=NullPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL run on the engine from here on; clear it before the part being counted"""
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+@pytest.fixture
+def owner(db):
+    owner = Owner(full_name="Owner", email="o@example.com", phone_number="9000000001")
+    db.add(owner)
+    db.flush()
+    return owner
+
+
+# The factories below add and flush one row; the test commits once its data is in place
+
+@pytest.fixture
+def make_restaurant(db, owner):
+    """Restaurant named `name` (also its FSSAI number); with `point`, an address at that (lat, lng)"""
+    def make(name="Kitchen", point=None, **columns):
+        columns.setdefault("fssai_license_number", name)
+        restaurant = Restaurant(owner_id=owner.id, restaurant_name=name, restaurant_type=RestaurantTypeEnum.RESTAURANT,
+                                opening_time="09:00", closing_time="22:00", **columns)
+        db.add(restaurant)
+        db.flush()
+        if point is not None:
+            db.add(Address(restaurant_id=restaurant.id, latitude=point[0], longitude=point[1],
+                           address_line_1="Street", city="Bengaluru", state="KA", pincode="560001"))
+            db.flush()
+        return restaurant
+    return make
+
+
+@pytest.fixture
+def make_partner(db):
+    phones = count(8000000001)
+
+    def make(name="Rider", **columns):
+        columns.setdefault("phone_number", str(next(phones)))
+        partner = DeliveryPartner(full_name=name, **columns)
+        db.add(partner)
+        db.flush()
+        return partner
+    return make
+
+
+@pytest.fixture
+def make_customer(db):
+    phones = count(9999999999, -1)
+
+    def make(name="Customer", **columns):
+        columns.setdefault("phone_number", str(next(phones)))
+        customer = Customer(full_name=name, **columns)
+        db.add(customer)
+        db.flush()
+        return customer
+    return make
+
+
+@pytest.fixture
+def make_order(db):
+    numbers = count(1)
+
+    def make(restaurant_id, **columns):
+        fields = dict(order_number=f"ORD{next(numbers)}", customer_name="C", customer_phone="9999999999",
+                      delivery_address="Home", total_amount=100)
+        fields.update(columns)
+        order = Order(restaurant_id=restaurant_id, **fields)
+        db.add(order)
+        db.flush()
+        return order
+    return make
+
+
+@pytest.fixture
+def restaurant(db, make_restaurant):
+    restaurant = make_restaurant()
+    db.commit()
+    return restaurant
+
+
+@pytest.fixture
+def partner(db, make_partner):
+    partner = make_partner()
+    db.commit()
+    return partner
+
+
+@pytest.fixture
+def customer(db, make_customer):
+    customer = make_customer()
+    db.commit()
+    return customer
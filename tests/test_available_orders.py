@@ -0,0 +1,106 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import app.services.available_orders as available_orders
+from app.models import OrderStatusEnum
+from app.services.available_orders import AvailableOrderPool
+from app.services.order_state_machine import OrderStateMachine
+
+RIDER = (12.9716, 77.5946)
+
+# (name, km north of the rider)
+RESTAURANTS = [("Near", 0.5), ("Mid", 2.0), ("Edge", 4.5), ("Far", 8.0)]
+
+
+@pytest.fixture
+def restaurants(db, make_restaurant):
+    ids = {name: make_restaurant(name, point=(RIDER[0] + km_north / 111.32, RIDER[1])).id
+           for name, km_north in RESTAURANTS}
+    db.commit()
+    return ids
+
+
+@pytest.fixture
+def rider(db, make_partner):
+    rider = make_partner(latitude=RIDER[0], longitude=RIDER[1])
+    db.commit()
+    return rider
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = AvailableOrderPool(radius_km=5.0, cell_size_km=1.0, ttl_seconds=60)
+    monkeypatch.setattr(available_orders, "available_order_pool", pool)
+    return pool
+
+
+@pytest.fixture
+def add_order(db, make_order):
+    def add(restaurant_id, number, status=OrderStatusEnum.READY.value, partner_id=None):
+        order = make_order(restaurant_id, order_number=number, status=status, delivery_partner_id=partner_id)
+        db.commit()
+        return order.id
+    return add
+
+
+def test_nearby_orders_sorted_by_distance_in_one_query(db, restaurants, rider, pool, add_order, statements):
+    for name in ("Far", "Edge", "Near", "Mid"):
+        add_order(restaurants[name], f"ORD-{name}")
+    add_order(restaurants["Near"], "ORD-taken", partner_id=rider.id)
+    add_order(restaurants["Near"], "ORD-pending", status=OrderStatusEnum.PENDING.value)
+    del statements[:]
+
+    orders, next_cursor = pool.page(db, *RIDER)
+
+    assert [o["order_number"] for o in orders] == ["ORD-Near", "ORD-Mid", "ORD-Edge"]
+    assert [o["restaurant_name"] for o in orders] == ["Near", "Mid", "Edge"]
+    assert orders[0]["distance_km"] == pytest.approx(0.5, abs=0.01)
+    assert next_cursor is None
+    assert len(statements) == 1
+
+    # A second rider in the same cell is served from the cache
+    pool.page(db, RIDER[0] - 0.001, RIDER[1] + 0.001)
+    assert len(statements) == 1 and pool.queries == 1
+
+
+def test_cursor_pages_through_the_pool(db, restaurants, pool, add_order):
+    for i in range(5):
+        for name in ("Near", "Mid"):
+            add_order(restaurants[name], f"ORD-{name}-{i}")
+
+    seen, cursor = [], None
+    while True:
+        orders, cursor = pool.page(db, *RIDER, limit=3, cursor=cursor)
+        seen.extend(o["id"] for o in orders)
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 10
+    with pytest.raises(ValueError):
+        pool.page(db, *RIDER, cursor="not-a-cursor")
+
+
+def test_transitions_in_and_out_of_the_pool_refresh_the_cache(db, restaurants, rider, pool, add_order):
+    order_id = add_order(restaurants["Near"], "ORD1", status=OrderStatusEnum.PREPARING.value)
+    assert pool.page(db, *RIDER)[0] == []
+
+    OrderStateMachine.apply(db, "ready", order_id, restaurant_id=restaurants["Near"])
+    assert [o["id"] for o in pool.page(db, *RIDER)[0]] == [order_id]
+
+    OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=rider.id)
+    assert pool.page(db, *RIDER)[0] == []
+    assert pool.queries == 3
+
+
+def test_unlocated_rider_sees_the_whole_pool_newest_first(db, restaurants, pool, add_order):
+    ids = [add_order(restaurants[name], f"ORD-{name}") for name in ("Near", "Far")]
+
+    orders, _ = pool.page(db, None, None)
+
+    assert [o["id"] for o in orders] == ids[::-1]
+    assert orders[0]["distance_km"] is None
@@ -0,0 +1,92 @@
+import sys
+import os
+from datetime import timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import Cart, CartItem, Category, CustomerAddress, CustomerLocation, MenuItem
+from app.services.cart_pricing import CartPricingService, resolve_delivery_point
+from app.services.pricing_rules import pricing_rules
+from app.utils.geo import haversine_km
+from app.utils.timezone import get_ist_now
+
+RESTAURANT_POINT = (12.9716, 77.5946)
+
+
+@pytest.fixture
+def make_cart(db, make_restaurant, make_customer):
+    """A customer's cart with `lines` menu items, two of each"""
+    def make(lines):
+        category = Category(name="Mains", display_order=1)
+        db.add(category)
+        restaurant = make_restaurant(point=RESTAURANT_POINT)
+        customer = make_customer()
+        items = [MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {i}", price=100 + i,
+                          discount_price=90 if i % 2 else None) for i in range(lines)]
+        cart = Cart(customer_id=customer.id, restaurant_id=restaurant.id)
+        db.add_all(items + [cart])
+        db.flush()
+        db.add_all([CartItem(cart_id=cart.id, menu_item_id=item.id, quantity=2) for item in items])
+        db.commit()
+        # Rules are compiled once (startup), not per pricing call
+        pricing_rules.load(db)
+        return cart, customer
+    return make
+
+
+def _address(db, customer, lng_offset, is_default=False):
+    address = CustomerAddress(customer_id=customer.id, latitude=RESTAURANT_POINT[0],
+                              longitude=RESTAURANT_POINT[1] + lng_offset, is_default=is_default,
+                              address_line_1="Home", city="Bengaluru", state="KA", pincode="560001")
+    db.add(address)
+    db.commit()
+    return address
+
+
+@pytest.mark.parametrize("lines", [1, 20])
+def test_pricing_uses_two_statements_whatever_the_cart_size(db, make_cart, statements, lines):
+    cart, customer = make_cart(lines)
+    _address(db, customer, 0.1)
+    del statements[:]
+    totals = CartPricingService.price(db, cart)
+    assert len(statements) == 2, statements
+    assert len(totals.items) == lines
+    assert totals.items[0].menu_item.category.name == "Mains"
+    expected_items = sum(((Decimal(90) if i % 2 else Decimal(100 + i)) * 2 for i in range(lines)), Decimal(0))
+    assert totals.item_total == expected_items
+    assert totals.tax_amount == expected_items * Decimal("0.05")
+    assert totals.total_amount == totals.item_total + totals.delivery_fee + totals.tax_amount
+
+
+def test_delivery_point_priority(db, make_cart):
+    cart, customer = make_cart(1)
+    assert resolve_delivery_point(db, customer.id) is None
+    assert CartPricingService.price(db, cart).delivery_fee == Decimal("40.0")
+
+    db.add(CustomerLocation(customer_id=customer.id, latitude=1.0, longitude=1.0, address="Old", created_at=get_ist_now() - timedelta(hours=1)))
+    db.add(CustomerLocation(customer_id=customer.id, latitude=2.0, longitude=2.0, address="New", created_at=get_ist_now()))
+    db.commit()
+    assert resolve_delivery_point(db, customer.id) == (2.0, 2.0)
+
+    first = _address(db, customer, 0.01)
+    assert resolve_delivery_point(db, customer.id)[1] == float(first.longitude)
+    default = _address(db, customer, 0.05, is_default=True)
+    assert resolve_delivery_point(db, customer.id)[1] == float(default.longitude)
+    assert resolve_delivery_point(db, customer.id, first.id)[1] == float(first.longitude)
+    assert resolve_delivery_point(db, customer.id + 1, first.id) is None
+
+
+def test_default_fee_by_distance(db, make_cart):
+    cart, customer = make_cart(1)
+    _address(db, customer, 0.01)
+    assert CartPricingService.price(db, cart).delivery_fee == Decimal("40.0")
+
+    db.query(CustomerAddress).update({"longitude": RESTAURANT_POINT[1] + 0.1})
+    db.commit()
+    distance = haversine_km(*RESTAURANT_POINT, RESTAURANT_POINT[0], RESTAURANT_POINT[1] + 0.1)
+    fee = CartPricingService.price(db, cart).delivery_fee
+    assert fee == Decimal("40.0") + Decimal(str(round((distance - 3.0) * 7.0, 2)))
@@ -0,0 +1,94 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models import (
+    Category, DEFAULT_RESTAURANT_IMAGE_URL, Document, MenuItem, Order, OrderItem, OrderStatusEnum
+)
+from app.routers.customer import get_order_history
+
+ORDERS = 400
+
+
+@pytest.fixture
+def history(db, make_restaurant, make_customer, make_order):
+    """ORDERS delivered orders with two lines each for one customer, one order for another"""
+    category = Category(name="Mains", display_order=1)
+    db.add(category)
+    restaurants = [make_restaurant(f"Kitchen {i}", is_open=True) for i in range(2)]
+    customer, other = make_customer(), make_customer("Other")
+    db.add(Document(restaurant_id=restaurants[0].id, document_type="restaurant_photo",
+                    file_url="https://cdn.example.com/kitchen0.jpg", file_name="kitchen0.jpg"))
+    dishes = [MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {i}", price=100 + i)
+              for i, restaurant in enumerate(restaurants * 5)]
+    db.add_all(dishes)
+    db.flush()
+
+    start = datetime(2026, 1, 1, 12, 0)
+    orders = [
+        make_order(restaurants[i % 2].id, customer_id=customer.id, total_amount=Decimal(200 + i),
+                   status=OrderStatusEnum.DELIVERED.value,
+                   # Consecutive pairs share a timestamp
+                   created_at=start + timedelta(minutes=i // 2))
+        for i in range(ORDERS)
+    ]
+    orders.append(make_order(restaurants[0].id, customer_id=other.id, customer_name="O",
+                             customer_phone="9999999998", delivery_address="Away", created_at=start))
+    db.add_all([OrderItem(order_id=order.id, menu_item_id=dishes[(order.id + n) % len(dishes)].id, quantity=n + 1,
+                          price=Decimal(100)) for order in orders for n in range(2)])
+    db.commit()
+    db.refresh(customer)
+    return customer
+
+
+def test_history_pages_in_at_most_three_queries(db, history, statements):
+    customer = history
+    expected = [
+        order.id for order in sorted(
+            db.query(Order).filter(Order.customer_id == customer.id),
+            key=lambda order: (order.created_at, order.id), reverse=True
+        )
+    ]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        del statements[:]
+        response = Response()
+        page = get_order_history(response, 50, cursor, db, customer).data
+        assert len(statements) <= 3
+        for order in page:
+            assert [item["quantity"] for item in order["items"]] == [1, 2]
+            assert set(order["restaurant"]) == {"id", "restaurant_name", "image_url", "average_rating", "is_open"}
+        seen.extend(order["id"] for order in page)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == ORDERS // 50
+
+
+def test_history_entry_matches_the_order(db, history):
+    first, second = get_order_history(Response(), 2, None, db, history).data
+    order = db.get(Order, first["id"])
+
+    assert first["order_number"] == order.order_number
+    assert first["total_amount"] == order.total_amount
+    assert [item["id"] for item in first["items"]] == [item.id for item in order.items]
+    assert first["restaurant"]["restaurant_name"] == order.restaurant.restaurant_name
+    images = {first["restaurant"]["image_url"], second["restaurant"]["image_url"]}
+    assert images == {"https://cdn.example.com/kitchen0.jpg", DEFAULT_RESTAURANT_IMAGE_URL}
+
+
+def test_invalid_cursor_is_rejected(db, history):
+    with pytest.raises(HTTPException) as error:
+        get_order_history(Response(), 20, "not-a-cursor", db, history)
+    assert error.value.status_code == 400
@@ -0,0 +1,108 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import OrderStatusEnum
+from app.models_orders import RestaurantDailyStats
+from app.services.dashboard_service import DashboardService
+from app.services.order_state_machine import OrderStateMachine
+from app.services.restaurant_stats import RestaurantStatsService
+
+S = OrderStatusEnum
+
+
+@pytest.fixture
+def restaurants(db, make_restaurant):
+    restaurants = [make_restaurant(f"Kitchen {i}") for i in range(2)]
+    db.commit()
+    return restaurants
+
+
+@pytest.fixture
+def add_order(db, make_order):
+    def add(restaurant_id, status, created_at, amount="100.00", **columns):
+        order = make_order(restaurant_id, status=status.value, created_at=created_at, total_amount=Decimal(amount),
+                           **columns)
+        db.commit()
+        return order.id
+    return add
+
+
+def _history(add_order, restaurant_id, other_id):
+    """Orders over the last few days, today's, and some open ones"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in range(1, 5):
+        placed = today - timedelta(days=day, hours=-10)
+        add_order(restaurant_id, S.DELIVERED, placed, "150.00", delivered_at=placed + timedelta(minutes=40))
+        add_order(restaurant_id, S.REJECTED, placed, rejected_at=placed + timedelta(minutes=5))
+        add_order(restaurant_id, S.CANCELLED, placed)
+    add_order(restaurant_id, S.DELIVERED, today + timedelta(minutes=5), "80.50",
+              delivered_at=today + timedelta(minutes=45))
+    add_order(restaurant_id, S.PENDING, today + timedelta(minutes=10))
+    add_order(restaurant_id, S.PREPARING, today - timedelta(days=3))  # Still open from days ago
+    add_order(restaurant_id, S.READY, today + timedelta(minutes=15))
+    add_order(other_id, S.DELIVERED, today + timedelta(minutes=5), "999.00", delivered_at=today)
+
+
+def test_total_summary_from_the_rollup(db, restaurants, add_order, statements):
+    restaurant, other = restaurants
+    _history(add_order, restaurant.id, other.id)
+    result = RestaurantStatsService.backfill(db, batch_size=4)
+    assert result["orders"] == 17
+
+    db.refresh(restaurant)  # Loaded by the auth dependency in the app
+    del statements[:]
+    summary = DashboardService.get_total_summary(db, restaurant.id)
+    assert len(statements) == 2
+
+    assert summary["total_orders"] == 16
+    assert summary["total_earnings"] == Decimal("680.50")
+    assert (summary["delivered_orders"], summary["rejected_orders"], summary["cancelled_orders"]) == (5, 4, 4)
+    assert summary["avg_order_value"] == Decimal("136.10")
+    assert summary["success_rate"] == 31.25
+    assert (summary["new_orders_count"], summary["ongoing_orders_count"]) == (1, 2)
+
+
+def test_today_summary_is_one_query(db, restaurants, add_order, statements):
+    restaurant, other = restaurants
+    _history(add_order, restaurant.id, other.id)
+
+    db.refresh(restaurant)  # Loaded by the auth dependency in the app
+    del statements[:]
+    summary = DashboardService.get_today_summary(db, restaurant.id)
+    assert len(statements) == 1
+
+    assert summary["total_orders"] == 3
+    assert summary["total_earnings"] == Decimal("80.50")
+    assert summary["today_growth"] == 0.0  # 3 yesterday, 3 today
+    assert (summary["new_orders_count"], summary["ongoing_orders_count"]) == (1, 2)
+
+
+def test_placement_and_final_transitions_update_the_rollup(db, restaurants, add_order):
+    restaurant = restaurants[0]
+    now = datetime.utcnow()
+    order_ids = []
+    for _ in range(3):
+        order_ids.append(add_order(restaurant.id, S.PENDING, now, "120.00"))
+        RestaurantStatsService.record_placed(db, restaurant.id)
+        db.commit()
+
+    OrderStateMachine.apply(db, "reject", order_ids[0], restaurant_id=restaurant.id)
+    OrderStateMachine.apply(db, "cancel", order_ids[1], restaurant_id=restaurant.id)
+    for name in ("accept", "preparing", "ready", "picked_up", "delivered"):
+        OrderStateMachine.apply(db, name, order_ids[2], restaurant_id=restaurant.id)
+
+    row = db.query(RestaurantDailyStats).one()
+    assert (row.orders, row.delivered, row.rejected, row.cancelled) == (3, 1, 1, 1)
+    assert row.delivered_amount == Decimal("120.00")
+
+    # A rebuild from the orders gives the same totals
+    live = RestaurantStatsService.totals(db, restaurant.id)
+    RestaurantStatsService.backfill(db)
+    assert RestaurantStatsService.totals(db, restaurant.id) == live
@@ -0,0 +1,92 @@
+import sys
+import os
+from datetime import timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import CustomerAddress
+from app.services import eta_service
+from app.services.eta_service import EtaService, SpeedTracker
+from app.services.location_store import LatestLocationStore
+from app.utils.timezone import get_ist_now
+
+RESTAURANT = (12.9716, 77.5946)
+CUSTOMER = (12.9716, 77.6346)   # ~4.3 km east of the restaurant
+
+
+def _fix(partner_id, lat, lng, seconds=0, speed=None):
+    stamp = get_ist_now() + timedelta(seconds=seconds)
+    return {"delivery_partner_id": partner_id, "order_id": None, "latitude": lat, "longitude": lng,
+            "accuracy": None, "bearing": None, "speed": speed, "created_at": stamp, "updated_at": stamp}
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(eta_service, "location_store", LatestLocationStore(mirror=False))
+    monkeypatch.setattr(eta_service, "speed_tracker", SpeedTracker())
+    monkeypatch.setattr(EtaService, "_cache", {})
+
+
+@pytest.fixture
+def make_orders(db, make_restaurant, make_customer, make_partner, make_order):
+    """One order per status, each with its own rider ~2.2 km south of the restaurant"""
+    def make(statuses):
+        restaurant = make_restaurant(point=RESTAURANT)
+        person = make_customer()
+        db.add(CustomerAddress(customer_id=person.id, latitude=CUSTOMER[0], longitude=CUSTOMER[1], is_default=True,
+                               address_line_1="2 Park St", city="Bengaluru", state="KA", pincode="560002"))
+        orders = []
+        for i, order_status in enumerate(statuses):
+            partner = make_partner(f"Rider {i}", latitude=RESTAURANT[0] - 0.02, longitude=RESTAURANT[1])
+            orders.append(make_order(restaurant.id, customer_id=person.id, delivery_partner_id=partner.id,
+                                     delivery_address="2 Park St", status=order_status))
+        db.commit()
+        return orders
+    return make
+
+
+def test_speed_is_smoothed_over_recent_pings():
+    tracker = SpeedTracker(alpha=0.5)
+    for i, speed in enumerate([10.0, 0.0, 10.0]):   # m/s
+        tracker.observe(_fix(1, 12.9, 77.6, seconds=i * 5, speed=speed))
+    # samples 36, 0, 36 km/h -> 18 -> 27
+    assert round(tracker.speed_kmh(1), 1) == 27.0
+
+    derived = SpeedTracker()
+    derived.observe(_fix(2, 12.9000, 77.6, seconds=0))
+    derived.observe(_fix(2, 12.9010, 77.6, seconds=10))   # ~111 m in 10 s
+    assert 38 < derived.speed_kmh(2) < 42
+
+
+def test_leg_follows_order_status(db, make_orders):
+    before, after = make_orders(["assigned", "picked_up"])
+
+    to_restaurant = EtaService.for_order(db, before.id)
+    assert to_restaurant["leg"] == "to_restaurant"
+    assert 2.8 < to_restaurant["distance_km"] < 3.0           # ~2.2 km * 1.3
+    assert to_restaurant["delivery_eta_minutes"] > to_restaurant["eta_minutes"]
+
+    to_customer = EtaService.for_order(db, after.id)
+    assert to_customer["leg"] == "to_customer"
+    assert to_customer["eta_minutes"] == to_customer["delivery_eta_minutes"]
+
+
+def test_active_orders_in_one_pass_and_cached_until_next_ping(monkeypatch, db, make_orders, statements):
+    orders = make_orders(["assigned", "picked_up", "ready", "picked_up", "delivered"])
+    store = eta_service.location_store
+    for order in orders:
+        store.put(_fix(order.delivery_partner_id, RESTAURANT[0] - 0.01, RESTAURANT[1], speed=5.0))
+
+    del statements[:]
+    first = EtaService.for_active_orders(db)
+    assert len(first) == 4
+    assert len(statements) <= 3
+
+    monkeypatch.setattr(EtaService, "_estimate", staticmethod(lambda *args: {"recomputed": True}))
+    assert EtaService.for_active_orders(db) == first
+
+    store.put(_fix(orders[0].delivery_partner_id, RESTAURANT[0], RESTAURANT[1], seconds=5, speed=5.0))
+    assert {"recomputed": True} in EtaService.for_active_orders(db)
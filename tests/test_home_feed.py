@@ -0,0 +1,85 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+import pytest
+
+from app.models import Document, MenuItem, Restaurant
+from app.services import catalog_events
+from app.services.home_feed import HomeFeedCache
+from app.utils.http_cache import etag_matches
+
+
+@pytest.fixture
+def restaurants(db, make_restaurant):
+    restaurants = [make_restaurant(f"Kitchen {i}", is_active=True) for i in range(3)]
+    db.commit()
+    return restaurants
+
+
+def _restaurants(snapshot):
+    return {r["id"]: r for r in json.loads(snapshot.body)["data"]["restaurants"]}
+
+
+def test_snapshot_is_reused_until_invalidated(db, restaurants, statements):
+    cache = HomeFeedCache(ttl_seconds=300, max_versions=2)
+
+    first = cache.get(db)
+    built = len(statements)
+    assert cache.get(db) is first
+    assert len(statements) == built
+    assert json.loads(first.body)["success"] is True
+
+    # Nothing changed: same bytes, same version
+    cache.invalidate()
+    assert cache.get(db).version == first.version
+
+
+def test_changed_restaurant_is_rebuilt_alone(db, restaurants, statements):
+    cache = HomeFeedCache(ttl_seconds=300)
+    catalog_events.subscribe(cache.invalidate)
+    first = cache.get(db)
+    assert _restaurants(first)[2]["isPureVeg"] is False
+
+    db.add(MenuItem(restaurant_id=2, name="Paneer", price=100, is_vegetarian=True))
+    db.add(Document(restaurant_id=2, document_type="restaurant_photo", file_url="https://cdn/2.jpg", file_name="2.jpg"))
+    db.query(Restaurant).filter(Restaurant.id == 3).update({"is_active": False})
+    db.commit()
+    catalog_events.restaurant_changed(2)
+    catalog_events.restaurant_changed(3)
+
+    del statements[:]
+    second = cache.get(db)
+    cards = _restaurants(second)
+    assert second.version == first.version + 1 and second.etag != first.etag
+    assert sorted(cards) == [1, 2]
+    assert cards[2]["isPureVeg"] is True and cards[2]["image_url"] == "https://cdn/2.jpg"
+    assert cards[1] == _restaurants(first)[1]
+    # restaurant cards + cuisines, no categories reload
+    assert len(statements) == 2, statements
+    assert all("restaurants.id IN" in s for s in statements[:1])
+    assert cache.stats()["cards_rebuilt"] == 2
+
+
+def test_versions_are_bounded(db, restaurants):
+    cache = HomeFeedCache(ttl_seconds=300, max_versions=2)
+    for i in range(4):
+        db.query(Restaurant).update({"restaurant_name": f"Kitchen v{i}"})
+        db.commit()
+        cache.invalidate(1)
+        snapshot = cache.get(db)
+    assert snapshot.version == 4
+    assert cache.stats()["retained_versions"] == [3, 4]
+    assert cache.snapshot(1) is None and cache.snapshot(4) is snapshot
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
@@ -0,0 +1,88 @@
+import gc
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.dependencies import get_current_customer
+from app.models import Category, Cuisine, Document, MenuItem, Restaurant, RestaurantCuisine
+from app.routers import customer as customer_router
+from app.schemas import APIResponse, RestaurantResponse
+from app.services.home_feed import home_feed_cache
+
+# /home may issue at most this many statements, whatever the restaurant count
+MAX_HOME_STATEMENTS = 4
+
+
+@pytest.fixture
+def make_client(db, session_factory, make_restaurant, make_customer):
+    """Client for /customer/home over `restaurant_count` restaurants with mixed cuisines, photos and menus"""
+    def make(restaurant_count):
+        cuisines = [Cuisine(name=f"Cuisine {i}") for i in range(5)]
+        db.add_all(cuisines + [Category(name=f"Category {i}", display_order=i) for i in range(3)])
+        db.flush()
+        for i in range(restaurant_count):
+            restaurant = make_restaurant(f"Kitchen {i}", is_active=True, is_open=i % 2 == 0)
+            db.add_all([RestaurantCuisine(restaurant_id=restaurant.id, cuisine_id=cuisines[(i + k) % 5].id)
+                        for k in range(2)])
+            if i % 3 == 0:
+                db.add(Document(restaurant_id=restaurant.id, document_type="restaurant_photo",
+                                file_url=f"https://cdn.example.com/{i}.jpg", file_name=f"{i}.jpg"))
+            # every 4th restaurant has no menu, odd ones serve meat
+            if i % 4:
+                db.add_all([MenuItem(restaurant_id=restaurant.id, name=f"Dish {k}", price=100,
+                                     is_vegetarian=not (i % 2 and k == 1)) for k in range(3)])
+        person = make_customer()
+        db.commit()
+
+        app = FastAPI()
+        app.include_router(customer_router.router)
+        app.dependency_overrides[get_db] = lambda: session_factory()
+        app.dependency_overrides[get_current_customer] = lambda: person
+
+        # Finalize sessions left over by earlier tests here rather than in the client's worker thread
+        gc.collect()
+        # Each test has its own database; drop the snapshot built from the previous one
+        home_feed_cache.invalidate()
+        return TestClient(app)
+    return make
+
+
+@pytest.mark.parametrize("restaurant_count", [5, 60])
+def test_home_statement_count_is_constant(make_client, statements, restaurant_count):
+    client = make_client(restaurant_count)
+    del statements[:]
+    response = client.get("/customer/home")
+    assert response.status_code == 200
+    assert len(response.json()["data"]["restaurants"]) == restaurant_count
+    assert len(statements) <= MAX_HOME_STATEMENTS, statements
+
+
+def test_home_cards_match_orm_serialization(db, make_client):
+    client = make_client(12)
+    cards = client.get("/customer/home").json()["data"]["restaurants"]
+
+    expected = [
+        RestaurantResponse.from_orm(r).dict()
+        for r in db.query(Restaurant).filter(Restaurant.is_active == True).order_by(Restaurant.id)
+    ]
+    # Serialize the same way the endpoint does
+    assert cards == APIResponse(success=True, message="", data={"r": expected}).model_dump(mode="json")["data"]["r"]
+
+
+def test_home_revalidation_returns_304(make_client, statements):
+    client = make_client(5)
+    first = client.get("/customer/home")
+    etag = first.headers["etag"]
+
+    del statements[:]
+    second = client.get("/customer/home", headers={"If-None-Match": etag})
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["etag"] == etag
+    assert statements == []
@@ -0,0 +1,38 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+
+from app.models import OrderStatusEnum
+from app.services.index_advisor import QUERY_SHAPES, IndexAdvisor, load_probe
+
+
+@pytest.fixture(autouse=True)
+def orders(db, restaurant, partner, customer, make_order):
+    """One order in every status so each list has rows to load"""
+    for status in OrderStatusEnum:
+        make_order(restaurant.id, customer_id=customer.id, status=status.value,
+                   delivery_partner_id=None if status == OrderStatusEnum.READY else partner.id)
+    db.commit()
+
+
+def test_hot_order_queries_use_an_index(db):
+    report = IndexAdvisor.review(db, load_probe(db))
+
+    assert [entry["shape"] for entry in report] == [shape.name for shape in QUERY_SHAPES]
+    assert all(entry["queries"] for entry in report)
+    assert {entry["shape"]: entry["full_scans"] for entry in report if entry["full_scans"]} == {}
+
+
+def test_a_missing_index_is_flagged(db, engine):
+    with engine.begin() as connection:
+        connection.execute(text("DROP INDEX ix_orders_customer_id_created_at"))
+
+    report = IndexAdvisor.review(db, load_probe(db))
+    scanning = {entry["shape"]: entry["full_scans"] for entry in report if entry["full_scans"]}
+    assert list(scanning) == ["customer_order_history"]
+    assert scanning["customer_order_history"][0].startswith("SCAN orders")
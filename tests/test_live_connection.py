@@ -0,0 +1,83 @@
+import sys
+import os
+import asyncio
+import json
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routers.orders import ConnectionManager, LiveConnection
+from app.services.live_orders_bus import LiveOrdersBus
+
+
+class FakeSocket:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.received = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(self.delay)
+        self.received.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+def _manager():
+    manager = ConnectionManager()
+    manager.bus = LiveOrdersBus(manager.deliver_local, backend="memory")
+    return manager
+
+
+def test_stalled_socket_is_evicted_without_delaying_others():
+    async def scenario():
+        manager = _manager()
+        fast, stalled, broken = FakeSocket(), FakeSocket(delay=10), FakeSocket(fail=True)
+        for socket in (fast, stalled, broken):
+            await manager.connect(socket, 1)
+        for connection in manager.active_connections[1]:
+            connection.send_timeout = 0.05
+
+        await manager.send_to_restaurant(1, {"type": "new_order", "order": {"id": 1}})
+        await asyncio.sleep(0.01)
+        fast_after_first = list(fast.received)
+        await asyncio.sleep(0.1)
+        remaining = [conn.websocket for conn in manager.active_connections.get(1, [])]
+        return fast_after_first, remaining, stalled.closed, broken.closed
+
+    fast_received, remaining, stalled_closed, broken_closed = asyncio.run(scenario())
+    assert fast_received == [{"type": "new_order", "order": {"id": 1}}]
+    assert len(remaining) == 1
+    assert stalled_closed and broken_closed
+
+
+def test_queue_coalesces_snapshots_of_the_same_order_and_stays_bounded():
+    async def scenario():
+        socket = FakeSocket(delay=0.01)
+        connection = LiveConnection(socket, on_evict=lambda conn: None, max_pending=3)
+        # The first message is picked up by the writer immediately
+        connection.enqueue(json.dumps({"order": 1, "status": "pending"}), "order:1")
+        await asyncio.sleep(0)
+        for status in ("accepted", "preparing", "ready"):
+            connection.enqueue(json.dumps({"order": 1, "status": status}), "order:1")
+        for order_id in (2, 3, 4, 5):
+            connection.enqueue(json.dumps({"order": order_id}), f"order:{order_id}")
+        await asyncio.sleep(0.2)
+        await connection.close()
+        return socket.received, connection.dropped
+
+    received, dropped = asyncio.run(scenario())
+    assert received == [
+        {"order": 1, "status": "pending"},
+        {"order": 3},
+        {"order": 4},
+        {"order": 5},
+    ]
+    assert dropped == 4
@@ -0,0 +1,96 @@
+import sys
+import os
+import asyncio
+import json
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routers.orders import ConnectionManager
+from app.services.live_orders_bus import LiveOrdersBus
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379")
+
+
+class FakeSocket:
+    def __init__(self):
+        self.received = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.received.append(json.loads(text))
+
+    async def close(self):
+        pass
+
+
+def _manager(backend):
+    manager = ConnectionManager()
+    manager.bus = LiveOrdersBus(manager.deliver_local, backend=backend, redis_url=REDIS_URL)
+    return manager
+
+
+def test_memory_backend_delivers_to_local_sockets_only():
+    async def scenario():
+        manager = _manager("memory")
+        await manager.bus.start()
+        mine, other = FakeSocket(), FakeSocket()
+        await manager.connect(mine, 1)
+        await manager.connect(other, 2)
+
+        await manager.send_to_restaurant(1, {"type": "new_order", "order": {"id": 10}})
+        await asyncio.sleep(0.01)
+        return mine.received, other.received
+
+    mine, other = asyncio.run(scenario())
+    assert mine == [{"type": "new_order", "order": {"id": 10}}]
+    assert other == []
+
+
+def test_unreachable_redis_falls_back_to_local_delivery():
+    async def scenario():
+        manager = ConnectionManager()
+        manager.bus = LiveOrdersBus(manager.deliver_local, backend="redis", redis_url="redis://127.0.0.1:1")
+        await manager.bus.start()
+        socket = FakeSocket()
+        await manager.connect(socket, 1)
+        await manager.send_to_restaurant(1, {"type": "ready"})
+        await asyncio.sleep(0.01)
+        return manager.bus.uses_redis, socket.received
+
+    uses_redis, received = asyncio.run(scenario())
+    assert uses_redis is False
+    assert received == [{"type": "ready"}]
+
+
+def test_redis_backend_reaches_sockets_on_other_workers():
+    async def scenario():
+        worker_a, worker_b = _manager("redis"), _manager("redis")
+        await worker_a.bus.start()
+        await worker_b.bus.start()
+        if not (worker_a.bus.uses_redis and worker_b.bus.uses_redis):
+            return None
+
+        on_a, on_b = FakeSocket(), FakeSocket()
+        await worker_a.connect(on_a, 5)
+        await worker_b.connect(on_b, 5)
+
+        # Published once by worker A; each worker delivers to its own socket
+        await worker_a.send_to_restaurant(5, {"type": "preparing"})
+        for _ in range(50):
+            if on_a.received and on_b.received:
+                break
+            await asyncio.sleep(0.02)
+
+        await worker_a.bus.stop()
+        await worker_b.bus.stop()
+        return on_a.received, on_b.received
+
+    result = asyncio.run(scenario())
+    if result is None:
+        pytest.skip("Redis not available")
+    assert result == ([{"type": "preparing"}], [{"type": "preparing"}])
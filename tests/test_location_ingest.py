@@ -0,0 +1,76 @@
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import DeliveryPartner
+from app.models_location import DeliveryPartnerLocation
+from app.services.location_ingest import LocationIngestor
+
+
+@pytest.fixture(autouse=True)
+def partners(db, make_partner):
+    for partner_id in (1, 2):
+        make_partner(f"Rider {partner_id}", id=partner_id)
+    db.commit()
+
+
+def test_flush_writes_one_insert_and_latest_positions(session_factory, statements):
+    ingestor = LocationIngestor(flush_interval_ms=1000, batch_size=100, buffer_limit=1000,
+                                session_factory=session_factory)
+
+    for i in range(50):
+        ingestor.record(1, 12.90 + i * 0.001, 77.60, order_id=None, speed=5.0)
+        ingestor.record(2, 13.00, 77.70 + i * 0.001)
+    assert ingestor.latest(1)["latitude"] == 12.90 + 49 * 0.001
+
+    statements.clear()
+    assert ingestor.flush() == 100
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+
+    db = session_factory()
+    assert db.query(DeliveryPartnerLocation).count() == 100
+    partner = db.get(DeliveryPartner, 1)
+    assert float(partner.latitude) == 12.949
+    assert ingestor.stats()["written"] == 100
+    assert ingestor.flush() == 0
+
+
+def test_buffer_is_bounded_and_counts_drops(session_factory):
+    ingestor = LocationIngestor(flush_interval_ms=1000, batch_size=100, buffer_limit=10,
+                                session_factory=session_factory)
+    for i in range(25):
+        ingestor.record(1, 12.9, 77.6 + i * 0.001)
+
+    stats = ingestor.stats()
+    assert stats["buffered"] == 10
+    assert stats["dropped"] == 15
+    assert stats["received"] == 25
+
+
+def test_background_task_flushes_on_batch_size_and_on_stop(session_factory):
+
+    async def scenario():
+        ingestor = LocationIngestor(flush_interval_ms=60000, batch_size=5, buffer_limit=100,
+                                    session_factory=session_factory)
+        await ingestor.start()
+        for i in range(5):
+            ingestor.record(1, 12.9, 77.6 + i * 0.001)
+        for _ in range(50):
+            if ingestor.stats()["written"] == 5:
+                break
+            await asyncio.sleep(0.02)
+        written_by_batch = ingestor.stats()["written"]
+
+        ingestor.record(2, 13.0, 77.7)
+        await ingestor.stop()
+        return written_by_batch, ingestor.stats()["written"]
+
+    by_batch, total = asyncio.run(scenario())
+    assert by_batch == 5
+    assert total == 6
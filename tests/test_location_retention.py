@@ -0,0 +1,59 @@
+import sys
+import os
+from datetime import timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models_location import DeliveryPartnerLocation, DeliveryRouteSummary
+from app.services.location_retention import LocationRetentionService
+from app.utils.geo import decode_polyline, downsample, encode_polyline
+from app.utils.timezone import get_ist_now
+
+
+def test_polyline_round_trip():
+    points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline(encode_polyline(points)) == points
+
+
+def test_downsample_keeps_endpoints_and_drops_jitter():
+    path = [(12.9, 77.6 + i * 0.00001) for i in range(100)]   # ~1 m steps
+    kept = downsample(path, 0.025)
+    assert kept[0] == path[0] and kept[-1] == path[-1]
+    assert len(kept) < 10
+
+
+def test_compaction_and_purge(db, restaurant, partner, make_order):
+    delivered = make_order(restaurant.id, delivery_partner_id=partner.id, status="delivered")
+    active = make_order(restaurant.id, delivery_partner_id=partner.id, status="picked_up")
+
+    now = get_ist_now()
+    for i in range(60):
+        db.add(DeliveryPartnerLocation(delivery_partner_id=partner.id, order_id=delivered.id,
+                                       latitude=12.90 + i * 0.001, longitude=77.60,
+                                       created_at=now - timedelta(hours=2, seconds=-5 * i)))
+        db.add(DeliveryPartnerLocation(delivery_partner_id=partner.id, order_id=active.id,
+                                       latitude=12.95, longitude=77.60 + i * 0.001,
+                                       created_at=now - timedelta(seconds=5 * i)))
+    # Idle pings from ten days ago
+    for i in range(10):
+        db.add(DeliveryPartnerLocation(delivery_partner_id=partner.id, latitude=12.9, longitude=77.6,
+                                       created_at=now - timedelta(days=10, seconds=i)))
+    db.commit()
+
+    result = LocationRetentionService.compact_delivered_orders(db, batch_size=10)
+    assert result == {"routes_compacted": 1, "breadcrumbs_removed": 60}
+    summary = db.query(DeliveryRouteSummary).filter_by(order_id=delivered.id).one()
+    assert summary.raw_point_count == 60
+    route = decode_polyline(summary.polyline)
+    assert route[0] == (12.9, 77.6) and route[-1] == (12.959, 77.6)
+    assert 6.4 < summary.distance_km < 6.7
+
+    # Running again is a no-op
+    assert LocationRetentionService.compact_delivered_orders(db)["routes_compacted"] == 0
+
+    purged = LocationRetentionService.purge_expired(db, retention_days=7, batch_size=3)
+    assert purged["rows_deleted"] == 10
+    assert db.query(DeliveryPartnerLocation).count() == 60
+    assert db.query(DeliveryPartnerLocation).filter_by(order_id=active.id).count() == 60
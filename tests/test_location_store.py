@@ -0,0 +1,70 @@
+import sys
+import os
+from datetime import timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.dependencies import get_current_customer
+from app.models import Customer
+from app.routers import customer as customer_router
+from app.services.location_store import LatestLocationStore
+from app.utils.timezone import get_ist_now
+
+
+def _fix(partner_id, lat, lng, age_seconds=0):
+    stamp = get_ist_now() - timedelta(seconds=age_seconds)
+    return {"delivery_partner_id": partner_id, "order_id": None, "latitude": lat, "longitude": lng,
+            "accuracy": None, "bearing": None, "speed": 4.0, "created_at": stamp, "updated_at": stamp}
+
+
+def test_store_keeps_latest_and_survives_unreachable_mirror():
+    store = LatestLocationStore(mirror=False)
+    store.put(_fix(1, 12.9, 77.6, age_seconds=10))
+    store.put(_fix(1, 12.95, 77.65))
+    assert store.get(1)["latitude"] == 12.95
+    assert store.get(2) is None
+
+    mirrored = LatestLocationStore(mirror=True, redis_url="redis://127.0.0.1:1")
+    mirrored.put(_fix(3, 13.0, 77.7))
+    mirrored.mirror_many([mirrored.get_local(3)])
+    assert mirrored.get(3)["latitude"] == 13.0
+
+
+def test_tracking_reads_store_and_only_queries_breadcrumbs_on_request(
+    monkeypatch, db, session_factory, statements, make_restaurant, make_customer, make_partner, make_order
+):
+    restaurant = make_restaurant()
+    person = make_customer()
+    partner = make_partner(latitude=12.8, longitude=77.5)
+    order = make_order(restaurant.id, customer_id=person.id, delivery_partner_id=partner.id, status="picked_up")
+    db.commit()
+    customer_id, partner_id, order_id = person.id, partner.id, order.id
+
+    store = LatestLocationStore(mirror=False)
+    monkeypatch.setattr(customer_router, "location_store", store)
+
+    app = FastAPI()
+    app.include_router(customer_router.router)
+    app.dependency_overrides[get_db] = lambda: session_factory()
+    app.dependency_overrides[get_current_customer] = lambda: db.get(Customer, customer_id)
+    client = TestClient(app)
+
+    # No ping yet: falls back to the partner row
+    data = client.get(f"/customer/orders/{order_id}/track-location").json()["data"]
+    assert data["location"]["latitude"] == 12.8
+
+    store.put(_fix(partner_id, 12.95, 77.65))
+    statements.clear()
+    data = client.get(f"/customer/orders/{order_id}/track-location").json()["data"]
+    assert data["location"]["latitude"] == 12.95
+    assert "history" not in data
+    assert not any("delivery_partner_locations" in s for s in statements)
+
+    data = client.get(f"/customer/orders/{order_id}/track-location?include_history=true").json()["data"]
+    assert data["history"] == []
+    assert any("delivery_partner_locations" in s for s in statements)
@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import Category, MenuItem
+from app.routers.menu import get_menu_categories, get_menu_items_grouped
+from app.services import catalog_events
+from app.services.category_cache import DEFAULT_CATEGORIES, category_cache, seed_default_categories
+
+
+@pytest.fixture
+def menu_restaurant(db, make_restaurant):
+    """A restaurant whose menu mixes categories, uncategorized items and a dangling category id"""
+    assert seed_default_categories(db) == len(DEFAULT_CATEGORIES)
+    assert seed_default_categories(db) == 0
+
+    restaurant, other = make_restaurant("Kitchen 0"), make_restaurant("Kitchen 1")
+    ids = {category.name: category.id for category in db.query(Category)}
+    for n, name in enumerate(["Desserts", "Starters", "Desserts", None, "Beverages", "Starters"]):
+        db.add(MenuItem(restaurant_id=restaurant.id, category_id=ids.get(name), name=f"Dish {n}", price=100 + n))
+    db.add(MenuItem(restaurant_id=restaurant.id, category_id=999, name="Orphan", price=50))
+    db.add(MenuItem(restaurant_id=other.id, category_id=ids["Breads"], name="Elsewhere", price=10))
+    db.commit()
+    db.refresh(restaurant)
+    return restaurant
+
+
+def test_grouped_menu_is_one_query_in_display_order(db, menu_restaurant, statements):
+    restaurant = menu_restaurant
+    category_cache.invalidate()
+    category_cache.all(db)
+
+    del statements[:]
+    data = get_menu_items_grouped(restaurant, db).data
+    assert len(statements) == 1
+
+    groups = [(group["category"]["name"] if group["category"] else None,
+               [item["name"] for item in group["items"]], group["item_count"])
+              for group in data["categories"]]
+    assert groups == [
+        ("Starters", ["Dish 1", "Dish 5"], 2),
+        ("Desserts", ["Dish 0", "Dish 2"], 2),
+        ("Beverages", ["Dish 4"], 1),
+        (None, ["Dish 3", "Orphan"], 2),
+    ]
+    assert (data["total_categories"], data["total_items"]) == (4, 7)
+    assert data["categories"][0]["items"][0]["category"]["name"] == "Starters"
+
+
+def test_category_cache_is_dropped_only_by_catalog_wide_changes(db, menu_restaurant, statements):
+    restaurant = menu_restaurant
+    category_cache.invalidate()
+    assert [c["name"] for c in get_menu_categories(db).data["categories"]] == DEFAULT_CATEGORIES
+
+    del statements[:]
+    catalog_events.restaurant_changed(restaurant.id)
+    get_menu_categories(db)
+    assert statements == []
+
+    db.query(Category).filter(Category.name == "Combos").update({"is_active": False})
+    db.commit()
+    catalog_events.catalog_changed()
+    assert "Combos" not in [c["name"] for c in get_menu_categories(db).data["categories"]]
@@ -0,0 +1,120 @@
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.models import Category, Cuisine, Document, MenuItem, Restaurant, RestaurantCuisine, Review
+from app.routers.customer import get_restaurant_details
+from app.routers.menu import update_item_availability
+from app.schemas import (
+    AddressResponse, MenuItemAvailability, MenuItemResponse, RestaurantResponse, ReviewResponse
+)
+from app.services.menu_snapshot import MenuSnapshotCache, _dump_json, menu_snapshot_cache
+
+
+@pytest.fixture
+def make_menus(db, make_restaurant, make_customer):
+    """Restaurants with an address, photo, cuisine, six dishes (one unavailable) and eight reviews"""
+    def make(restaurant_count=1):
+        category = Category(name="Mains", display_order=1)
+        cuisine = Cuisine(name="South Indian")
+        db.add_all([category, cuisine])
+        customer = make_customer()
+        for i in range(restaurant_count):
+            restaurant = make_restaurant(f"Kitchen {i}", point=(12.97, 77.59))
+            db.add_all([
+                Document(restaurant_id=restaurant.id, document_type="restaurant_photo",
+                         file_url=f"https://cdn.example.com/{i}.jpg", file_name=f"{i}.jpg"),
+                RestaurantCuisine(restaurant_id=restaurant.id, cuisine_id=cuisine.id),
+            ])
+            db.add_all([MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {n}",
+                                 price=100 + n, is_vegetarian=True, is_available=n != 3) for n in range(6)])
+            start = datetime(2026, 10, 1, 12, 0)
+            db.add_all([Review(customer_id=customer.id, restaurant_id=restaurant.id, rating=4,
+                               review_text=f"Review {n}", created_at=start + timedelta(hours=n)) for n in range(8)])
+        db.commit()
+    return make
+
+
+def _legacy_details(db, restaurant_id):
+    """The customer details payload as it was built from the ORM relationships"""
+    restaurant = db.get(Restaurant, restaurant_id)
+    data = RestaurantResponse.from_orm(restaurant).dict()
+    data["address"] = AddressResponse.from_orm(restaurant.address).dict()
+    data["cuisines"] = [rc.cuisine.name for rc in restaurant.cuisines_rel if rc.cuisine]
+    data["menu"] = [MenuItemResponse.from_orm(item).dict() for item in restaurant.menu_items if item.is_available]
+    reviews = db.query(Review).filter(Review.restaurant_id == restaurant_id).order_by(Review.created_at.desc()).limit(5)
+    data["reviews"] = [dict(ReviewResponse.from_orm(review).dict(), customer_name=review.customer.full_name)
+                       for review in reviews]
+    return json.loads(_dump_json(data))
+
+
+def _request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+def test_snapshot_matches_the_legacy_payload_and_is_reused(db, make_menus, statements):
+    make_menus()
+    del statements[:]
+    cache = MenuSnapshotCache(ttl_seconds=300, limit=10)
+
+    snapshot = cache.get(db, 1)
+    assert len(statements) <= 4
+    assert json.loads(snapshot.data) == _legacy_details(db, 1)
+    assert json.loads(snapshot.body("ok")) == {"success": True, "message": "ok", "data": json.loads(snapshot.data)}
+
+    del statements[:]
+    assert cache.get(db, 1) is snapshot
+    assert statements == []
+    assert cache.get(db, 99) is None
+
+
+def test_catalog_write_bumps_the_version(db, make_menus):
+    make_menus()
+    menu_snapshot_cache.invalidate()
+    first = menu_snapshot_cache.get(db, 1)
+    restaurant = db.get(Restaurant, 1)
+
+    update_item_availability(1, MenuItemAvailability(is_available=False), restaurant, db)
+    second = menu_snapshot_cache.get(db, 1)
+    assert second.version > first.version
+    assert second.etag != first.etag
+    assert [item["name"] for item in json.loads(second.data)["menu"]] == ["Dish 1", "Dish 2", "Dish 4", "Dish 5"]
+
+
+def test_lru_eviction(db, make_menus):
+    make_menus(restaurant_count=3)
+    cache = MenuSnapshotCache(ttl_seconds=300, limit=2)
+    first = cache.get(db, 1)
+    cache.get(db, 2)
+    assert cache.get(db, 1) is first  # 1 is now the most recently read
+    cache.get(db, 3)  # Evicts 2
+
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(db, 1) is first
+    assert cache.get(db, 2) is not None
+    assert cache.stats()["builds"] == 4
+
+
+def test_customer_details_endpoint_supports_if_none_match(db, make_menus):
+    make_menus()
+    menu_snapshot_cache.invalidate()
+
+    response = get_restaurant_details(1, _request(), db, None)
+    assert response.status_code == 200
+    assert json.loads(response.body)["data"]["restaurant_name"] == "Kitchen 0"
+    etag = response.headers["etag"]
+
+    assert get_restaurant_details(1, _request(etag), db, None).status_code == 304
+    assert get_restaurant_details(1, _request('"stale"'), db, None).status_code == 200
+    with pytest.raises(HTTPException) as error:
+        get_restaurant_details(99, _request(), db, None)
+    assert error.value.status_code == 404
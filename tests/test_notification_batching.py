@@ -0,0 +1,56 @@
+import sys
+import os
+import threading
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Notification, DeviceToken
+from app.services import notification_service
+from app.services.notification_service import NotificationService
+from app.services.push_dispatcher import PushDispatcher, FCM_MULTICAST_LIMIT
+
+
+def test_fan_out_uses_one_insert_and_one_token_query(monkeypatch, db, statements):
+    for partner_id in range(1, 201):
+        db.add(DeviceToken(token=f"token-{partner_id}", delivery_partner_id=partner_id, device_type="android"))
+    db.commit()
+
+    sent = []
+    monkeypatch.setattr(notification_service, "_initialize_firebase", lambda: True)
+    monkeypatch.setattr(notification_service.push_dispatcher, "send_multicast",
+                        lambda tokens, title, message, data=None: sent.append(tokens))
+
+    statements.clear()
+    recipients = [
+        dict(delivery_partner_id=partner_id, title="New Order #1 Available!",
+             message="A new order is available nearby.", notification_type="new_available_order")
+        for partner_id in range(1, 201)
+    ]
+    assert NotificationService.create_notifications(db, recipients, order_id=1, status="new") == 200
+
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    assert len(inserts) == 1
+    assert len(selects) == 1
+    assert db.query(Notification).count() == 200
+
+    # Identical payloads are merged into one multicast
+    assert len(sent) == 1
+    assert sorted(sent[0]) == sorted(f"token-{i}" for i in range(1, 201))
+
+
+def test_multicast_is_chunked(monkeypatch):
+    chunks = []
+    lock = threading.Lock()
+
+    def record(tokens, title, message, data):
+        with lock:
+            chunks.append(len(tokens))
+
+    monkeypatch.setattr(PushDispatcher, "_send_chunk", staticmethod(record))
+    dispatcher = PushDispatcher(max_workers=2)
+    dispatcher.send_multicast([f"t{i}" for i in range(1200)], "title", "body")
+    dispatcher.shutdown(wait=True)
+
+    assert sorted(chunks) == [200, FCM_MULTICAST_LIMIT, FCM_MULTICAST_LIMIT]
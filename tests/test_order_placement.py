@@ -0,0 +1,160 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+
+from app.models import Cart, CartItem, Category, Customer, CustomerAddress, MenuItem, Order, OrderItem
+from app.models_orders import IdempotencyKey, OutboxEvent
+from app.schemas import OrderCreateRequest
+from app.services.order_placement import OrderPlacementService
+from app.services.pricing_rules import pricing_rules
+from app.utils.ids import UlidGenerator, new_ulid, ulid_timestamp_ms
+
+PARALLEL_PLACEMENTS = 100
+
+
+@pytest.fixture
+def engine(file_engine):
+    """File sqlite where every transaction takes the write lock up front, like SELECT ... FOR UPDATE"""
+    @event.listens_for(file_engine, "connect")
+    def _connect(dbapi_connection, _):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(file_engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    return file_engine
+
+
+@pytest.fixture
+def make_cart(db, make_restaurant, make_customer):
+    """A customer's cart with `lines` dishes; returns the customer id and the request placing it"""
+    def make(lines=3):
+        category = Category(name="Mains", display_order=1)
+        db.add(category)
+        restaurant = make_restaurant(point=(12.9716, 77.5946), is_open=True)
+        customer = make_customer()
+        address = CustomerAddress(customer_id=customer.id, latitude=12.98, longitude=77.6, is_default=True,
+                                  address_line_1="Home", city="Bengaluru", state="KA", pincode="560001")
+        items = [MenuItem(restaurant_id=restaurant.id, category_id=category.id, name=f"Dish {i}", price=100 + i)
+                 for i in range(lines)]
+        cart = Cart(customer_id=customer.id, restaurant_id=restaurant.id)
+        db.add_all(items + [address, cart])
+        db.flush()
+        db.add_all([CartItem(cart_id=cart.id, menu_item_id=item.id, quantity=2) for item in items])
+        db.commit()
+        pricing_rules.load(db)
+        request = OrderCreateRequest(restaurant_id=restaurant.id, address_id=address.id, payment_method="upi")
+        customer_id = customer.id
+        # Release the write lock before the placements start
+        db.close()
+        return customer_id, request
+    return make
+
+
+def _place(Session, customer_id, request, key):
+    db = Session()
+    try:
+        return OrderPlacementService.place(db, db.get(Customer, customer_id), request, key)
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        db.close()
+
+
+def _fire(Session, customer_id, request, keys):
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        return list(pool.map(lambda key: _place(Session, customer_id, request, key), keys))
+
+
+def _counts(Session):
+    db = Session()
+    try:
+        return db.query(Order).count(), db.query(OrderItem).count(), db.query(CartItem).count()
+    finally:
+        db.close()
+
+
+def test_parallel_placements_with_one_key_create_one_order(session_factory, make_cart):
+    customer_id, request = make_cart()
+
+    results = _fire(session_factory, customer_id, request, ["tap-1"] * PARALLEL_PLACEMENTS)
+
+    assert all(not isinstance(result, int) for result in results), results
+    assert len({(result.order_id, result.order_number) for result in results}) == 1
+    assert sum(not result.replayed for result in results) == 1
+    assert _counts(session_factory) == (1, 3, 0)
+
+    # Notifications and the live broadcast were queued with the order, once
+    db = session_factory()
+    assert [event.event_type for event in db.query(OutboxEvent)] == ["order.changed"]
+    db.close()
+
+
+def test_parallel_placements_without_key_never_duplicate(session_factory, make_cart):
+    customer_id, request = make_cart()
+
+    results = _fire(session_factory, customer_id, request, [None] * PARALLEL_PLACEMENTS)
+
+    placed = [result for result in results if not isinstance(result, int)]
+    assert len(placed) == 1
+    assert sorted(set(result for result in results if isinstance(result, int))) == [400]
+    assert _counts(session_factory) == (1, 3, 0)
+
+
+def test_reused_key_with_different_request_is_rejected(session_factory, make_cart):
+    customer_id, request = make_cart()
+
+    first = _place(session_factory, customer_id, request, "tap-1")
+    assert not first.replayed
+    other = request.copy(update={"payment_method": "cod"})
+    assert _place(session_factory, customer_id, other, "tap-1") == 422
+    assert _place(session_factory, customer_id, request, "tap-1") == (first.order_id, first.order_number, True)
+
+    db = session_factory()
+    assert db.query(IdempotencyKey).count() == 1
+    order = db.query(Order).one()
+    assert order.order_number == first.order_number
+    assert sorted(item.price for item in order.items) == [100, 101, 102]
+    db.close()
+
+
+def test_order_lines_are_inserted_in_one_statement(session_factory, make_cart, statements):
+    customer_id, request = make_cart(lines=25)
+    del statements[:]
+
+    placed = _place(session_factory, customer_id, request, None)
+
+    assert not isinstance(placed, int)
+    assert sum(statement.startswith("INSERT INTO order_items") for statement in statements) == 1
+    assert _counts(session_factory) == (1, 25, 0)
+
+
+def test_invalid_key_is_rejected(session_factory, make_cart):
+    customer_id, request = make_cart()
+    assert _place(session_factory, customer_id, request, "   ") == 400
+    assert _place(session_factory, customer_id, request, "k" * 256) == 400
+
+
+def test_ulids_are_unique_and_time_sorted():
+    ids = [new_ulid() for _ in range(10000)]
+    assert len(set(ids)) == len(ids)
+    assert ids == sorted(ids)
+    assert all(len(value) == 26 for value in ids)
+
+    # Same millisecond and a clock stepping back both keep the sequence increasing
+    generator = UlidGenerator()
+    pinned = [generator(now_ms=1_700_000_000_000) for _ in range(3)]
+    stepped_back = generator(now_ms=1_699_999_999_000)
+    later = generator(now_ms=1_700_000_000_001)
+    assert pinned + [stepped_back, later] == sorted(pinned + [stepped_back, later])
+    assert len(set(pinned + [stepped_back])) == 4
+    assert ulid_timestamp_ms(stepped_back) == 1_700_000_000_000
+    assert ulid_timestamp_ms(later) == 1_700_000_000_001
@@ -0,0 +1,72 @@
+import sys
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.models import Order, OrderStatusEnum
+from app.routers.delivery_partner import get_active_orders, get_completed_orders
+
+DELIVERIES = 250
+
+
+@pytest.fixture
+def rider(db, restaurant, partner, make_order):
+    """A rider with DELIVERIES completed orders and one in progress"""
+    start = datetime(2026, 1, 1, 12, 0)
+    for i in range(DELIVERIES):
+        # Consecutive pairs share a timestamp; a few legacy rows have none
+        delivered_at = None if i % 50 == 0 else start + timedelta(minutes=i // 2)
+        make_order(restaurant.id, status=OrderStatusEnum.DELIVERED.value, delivery_partner_id=partner.id,
+                   delivered_at=delivered_at)
+    make_order(restaurant.id, order_number="ACTIVE", status=OrderStatusEnum.PICKED_UP.value,
+               delivery_partner_id=partner.id)
+    db.commit()
+    db.refresh(partner)
+    return partner
+
+
+def test_history_pages_cover_every_delivery_once_in_order(db, rider, statements):
+    expected = [
+        order.id for order in sorted(
+            db.query(Order).filter(Order.status == OrderStatusEnum.DELIVERED.value),
+            key=lambda order: (order.delivered_at is not None, order.delivered_at or datetime.min, order.id),
+            reverse=True
+        )
+    ]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        del statements[:]
+        response = Response()
+        page = asyncio.run(get_completed_orders(response, 40, cursor, rider, db))
+        assert len(statements) == 1
+        assert all(item.restaurant_name == "Kitchen" for item in page)
+        seen.extend(item.id for item in page)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == expected
+    assert pages == 7
+
+
+def test_active_orders_are_one_query(db, rider, statements):
+    del statements[:]
+
+    orders = asyncio.run(get_active_orders(rider, db))
+
+    assert [o.order_number for o in orders] == ["ACTIVE"]
+    assert len(statements) == 1
+
+
+def test_bad_cursor_is_rejected(db, rider):
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(get_completed_orders(Response(), 40, "garbage", rider, db))
+    assert excinfo.value.status_code == 400
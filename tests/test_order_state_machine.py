@@ -0,0 +1,125 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Order, OrderStatusEnum
+from app.models_orders import OutboxEvent
+from app.services.order_state_machine import OrderStateMachine, TRANSITIONS
+
+
+@pytest.fixture
+def restaurant_id(restaurant):
+    return restaurant.id
+
+
+@pytest.fixture
+def riders(db, make_partner):
+    riders = [make_partner(f"Rider {i}").id for i in range(2)]
+    db.commit()
+    return riders
+
+
+@pytest.fixture
+def order_id(db, restaurant, make_order):
+    order = make_order(restaurant.id, status=OrderStatusEnum.PENDING.value)
+    db.commit()
+    return order.id
+
+
+def _error(fn):
+    with pytest.raises(HTTPException) as excinfo:
+        fn()
+    return excinfo.value.status_code
+
+
+def test_transition_is_one_conditional_update_without_a_select(db, restaurant_id, order_id, statements):
+    del statements[:]
+
+    result = OrderStateMachine.apply(db, "accept", order_id, restaurant_id=restaurant_id)
+
+    assert result.status == "accepted"
+    assert [s.split()[0] for s in statements] == ["UPDATE", "INSERT"]
+    assert "RETURNING" in statements[0] and "status IN" in statements[0]
+    order = db.get(Order, order_id)
+    assert order.status == "accepted" and order.accepted_at is not None
+    # One outbox event per transition
+    assert db.query(OutboxEvent).one().payload["status"] == "accepted"
+
+
+def test_full_lifecycle_and_stamps(db, restaurant_id, riders, order_id):
+    rider, _ = riders
+
+    for name in ("accept", "preparing", "ready"):
+        OrderStateMachine.apply(db, name, order_id, restaurant_id=restaurant_id)
+    for name in ("partner_accept", "partner_reached", "partner_picked_up", "partner_delivered"):
+        result = OrderStateMachine.apply(db, name, order_id, partner_id=rider)
+
+    assert result.status == "delivered"
+    order = db.get(Order, order_id)
+    assert order.delivery_partner_id == rider
+    for column in ("accepted_at", "preparing_at", "ready_at", "assigned_at", "reached_restaurant_at",
+                   "pickedup_at", "delivered_at", "completed_at"):
+        assert getattr(order, column) is not None, column
+    assert db.query(OutboxEvent).count() == 7
+    assert [e.payload["status"] for e in db.query(OutboxEvent).order_by(OutboxEvent.id)][-3:] == [
+        "delivery_partner_reached", "order_picked_up", "delivered"
+    ]
+
+
+def test_second_rider_loses_the_accept(db, restaurant_id, riders, order_id):
+    first, second = riders
+    for name in ("accept", "ready"):
+        OrderStateMachine.apply(db, name, order_id, restaurant_id=restaurant_id)
+
+    OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=first)
+    assert _error(lambda: OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=second)) == 409
+    assert _error(lambda: OrderStateMachine.apply(db, "partner_picked_up", order_id, partner_id=second)) == 403
+    assert db.get(Order, order_id).delivery_partner_id == first
+
+
+def test_invalid_transitions_are_rejected(db, restaurant_id, riders, order_id):
+    rider, _ = riders
+
+    assert _error(lambda: OrderStateMachine.apply(db, "accept", order_id, restaurant_id=restaurant_id + 1)) == 404
+    assert _error(lambda: OrderStateMachine.apply(db, "accept", order_id + 1, restaurant_id=restaurant_id)) == 404
+    assert _error(lambda: OrderStateMachine.apply(db, "ready", order_id, restaurant_id=restaurant_id)) == 400
+    assert _error(lambda: OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=rider)) == 400
+
+    OrderStateMachine.apply(db, "reject", order_id, restaurant_id=restaurant_id, values={"rejection_reason": "Closed"})
+    order = db.get(Order, order_id)
+    assert (order.status, order.rejection_reason) == ("rejected", "Closed")
+    assert _error(lambda: OrderStateMachine.apply(db, "accept", order_id, restaurant_id=restaurant_id)) == 400
+    assert db.query(OutboxEvent).count() == 1
+
+
+def test_release_returns_the_order_to_the_pool(db, restaurant_id, riders, order_id):
+    first, second = riders
+    for name in ("accept", "ready"):
+        OrderStateMachine.apply(db, name, order_id, restaurant_id=restaurant_id)
+    OrderStateMachine.apply(db, "partner_reached", order_id, partner_id=first)
+
+    result = OrderStateMachine.apply(db, "partner_release", order_id, partner_id=first)
+
+    assert (result.status, result.delivery_partner_id) == ("ready", None)
+    assert OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=second).status == "assigned"
+
+
+def test_handed_over_orders_keep_their_status_when_accepted(db, restaurant_id, riders, order_id):
+    rider, _ = riders
+    for name in ("accept", "ready", "handed_over"):
+        OrderStateMachine.apply(db, name, order_id, restaurant_id=restaurant_id)
+
+    result = OrderStateMachine.apply(db, "partner_accept", order_id, partner_id=rider)
+
+    assert (result.status, result.delivery_partner_id) == ("handed_over", rider)
+
+
+def test_every_transition_targets_known_statuses():
+    for transition in TRANSITIONS.values():
+        assert transition.targets and transition.message
+        assert all(isinstance(s, OrderStatusEnum) for pair in transition.targets.items() for s in pair)
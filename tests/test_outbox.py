@@ -0,0 +1,137 @@
+import sys
+import os
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Notification
+from app.models_orders import OutboxEvent
+from app.services import outbox
+from app.services.order_events import ORDER_CHANGED, enqueue_order_event
+from app.services.outbox import OutboxDispatcher
+from app.utils.timezone import get_ist_now
+
+calls = []
+
+
+@outbox.handler("test.ok")
+async def _ok(db, event):
+    calls.append(("ok", event.payload["n"]))
+
+
+@outbox.handler("test.flaky")
+async def _flaky(db, event):
+    calls.append(("flaky", event.attempts))
+    raise RuntimeError("push provider down")
+
+
+def _dispatcher(Session, **kwargs):
+    options = dict(batch_size=10, max_attempts=3, lease_seconds=60, retry_base_seconds=0, session_factory=Session)
+    options.update(kwargs)
+    return OutboxDispatcher(**options)
+
+
+def _events(Session):
+    db = Session()
+    try:
+        return {event.id: (event.status, event.attempts) for event in db.query(OutboxEvent)}
+    finally:
+        db.close()
+
+
+def test_events_are_delivered_in_batches_and_marked_done(db, session_factory):
+    for n in range(25):
+        outbox.enqueue(db, "test.ok", payload={"n": n})
+    db.commit()
+    del calls[:]
+
+    dispatcher = _dispatcher(session_factory)
+    handled = asyncio.run(dispatcher.drain())
+
+    assert handled == 25
+    assert calls == [("ok", n) for n in range(25)]
+    assert dispatcher.passes == 3
+    assert set(_events(session_factory).values()) == {("done", 1)}
+    assert dispatcher.stats()["done"] == 25
+
+
+def test_failures_are_retried_then_given_up(db, session_factory):
+    outbox.enqueue(db, "test.flaky")
+    outbox.enqueue(db, "test.ok", payload={"n": 1})
+    outbox.enqueue(db, "test.unknown")
+    db.commit()
+    del calls[:]
+
+    dispatcher = _dispatcher(session_factory)
+    for _ in range(5):
+        asyncio.run(dispatcher.dispatch_once())
+
+    assert calls.count(("ok", 1)) == 1
+    assert [attempt for name, attempt in calls if name == "flaky"] == [1, 2, 3]
+    assert sorted(_events(session_factory).values()) == [("done", 1), ("failed", 3), ("failed", 3)]
+    assert "push provider down" in db.query(OutboxEvent).filter(OutboxEvent.event_type == "test.flaky").one().last_error
+
+
+def test_retry_waits_for_backoff_and_claims_respect_the_lease(db, session_factory):
+    outbox.enqueue(db, "test.flaky")
+    db.commit()
+
+    dispatcher = _dispatcher(session_factory, retry_base_seconds=30)
+    asyncio.run(dispatcher.dispatch_once())
+    # Backed off: not due again yet
+    assert dispatcher._claim() == []
+
+    db.query(OutboxEvent).update({"available_at": get_ist_now() - timedelta(seconds=1)})
+    db.commit()
+    # A claimed (leased) event is not handed to a second worker
+    assert len(dispatcher._claim()) == 1
+    assert _dispatcher(session_factory)._claim() == []
+
+
+def test_order_event_broadcasts_and_notifies_owner(monkeypatch, db, session_factory, owner, make_restaurant,
+                                                   make_order):
+    order = make_order(make_restaurant(id=7).id)
+    enqueue_order_event(db, order.id, "new", recipients=("owner",), live_event_type="new_order")
+    db.commit()
+    order_id, owner_id = order.id, owner.id
+
+    broadcasts = []
+
+    async def fake_broadcast(restaurant_id, order, event_type=None):
+        broadcasts.append((restaurant_id, order.id, event_type))
+
+    import app.routers.orders
+    monkeypatch.setattr(app.routers.orders, "broadcast_new_order", fake_broadcast)
+
+    dispatcher = _dispatcher(session_factory)
+    assert asyncio.run(dispatcher.drain()) == 1
+
+    assert broadcasts == [(7, order_id, "new_order")]
+    assert [event.event_type for event in db.query(OutboxEvent)] == [ORDER_CHANGED]
+    notification = db.query(Notification).filter(Notification.owner_id == owner_id).one()
+    assert notification.notification_type == "new_order"
+
+
+def test_wake_from_another_thread_runs_a_pass_before_the_poll(db, session_factory):
+    """Sync endpoints run in the threadpool and wake the dispatcher from there"""
+    dispatcher = _dispatcher(session_factory, poll_interval_ms=60000)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    asyncio.run_coroutine_threadsafe(dispatcher.start(), loop).result(timeout=5)
+    time.sleep(0.1)  # The loop is now idle, waiting out the poll interval
+
+    outbox.enqueue(db, "test.ok", payload={"n": 99})
+    db.commit()
+    del calls[:]
+    dispatcher.wake()
+    deadline = time.monotonic() + 2
+    while not calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    asyncio.run_coroutine_threadsafe(dispatcher.stop(), loop).result(timeout=5)
+    loop.call_soon_threadsafe(loop.stop)
+    assert calls == [("ok", 99)]
@@ -0,0 +1,119 @@
+import sys
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import DeliveryFeeSlab, PromoCode, SurgeWindow
+from app.services.pricing_rules import FeeSlab, PricingRules, Promo, Rulebook, Surge
+from app.utils.timezone import IST
+
+# A Tuesday
+NOON = IST.localize(datetime(2026, 10, 20, 12, 0))
+LINES = [(Decimal("100.00"), 2), (Decimal("50.00"), 1)]
+
+
+def _legacy_fee(distance_km):
+    if distance_km is None or distance_km < 3.0:
+        return Decimal("40.0")
+    return Decimal("40.0") + Decimal(str(round((distance_km - 3.0) * 7.0, 2)))
+
+
+def test_defaults_match_legacy_pricing():
+    rulebook = Rulebook()
+    for distance in (None, 0.0, 2.99, 3.0, 3.01, 7.345, 42.0):
+        quote = rulebook.quote(LINES, restaurant_id=1, city="Chennai", distance_km=distance, at=NOON)
+        assert quote.delivery_fee == _legacy_fee(distance)
+        assert quote.item_total == Decimal("250.00")
+        assert quote.tax_amount == Decimal("250.00") * Decimal("0.05")
+        assert quote.discount_amount == 0
+        assert quote.total_amount == quote.item_total + quote.delivery_fee + quote.tax_amount
+
+    empty = rulebook.quote([], restaurant_id=1, distance_km=10, at=NOON)
+    assert empty.delivery_fee == 0 and empty.total_amount == 0
+
+
+def test_most_specific_slab_wins():
+    rulebook = Rulebook(slabs=[
+        (None, "Chennai", FeeSlab(0.0, float("inf"), Decimal("25"), 5.0)),
+        (7, None, FeeSlab(0.0, 5.0, Decimal("10"), 0.0)),
+    ])
+    assert rulebook.quote(LINES, restaurant_id=7, city="chennai", distance_km=4, at=NOON).delivery_fee == Decimal("10")
+    # Restaurant slabs stop at 5 km: fall through to the city
+    assert rulebook.quote(LINES, restaurant_id=7, city="Chennai ", distance_km=6, at=NOON).delivery_fee == Decimal("55.0")
+    assert rulebook.quote(LINES, restaurant_id=8, city="Madurai", distance_km=6, at=NOON).delivery_fee == _legacy_fee(6)
+
+
+def test_surge_windows():
+    rulebook = Rulebook(surges=[
+        (None, None, Surge(frozenset(range(7)), 11 * 60, 14 * 60, Decimal("1.5"))),
+        (None, "chennai", Surge(frozenset([1]), 22 * 60, 2 * 60, Decimal("2.0"))),
+    ])
+    lunch = rulebook.quote(LINES, city="Chennai", distance_km=1, at=NOON)
+    assert lunch.surge_multiplier == Decimal("1.5") and lunch.delivery_fee == Decimal("60.00")
+    late = rulebook.quote(LINES, city="Chennai", distance_km=1, at=NOON.replace(hour=23))
+    assert late.surge_multiplier == Decimal("2.0")
+    assert rulebook.quote(LINES, city="Delhi", distance_km=1, at=NOON.replace(hour=23)).surge_multiplier == 1
+    # Window is Tuesdays only
+    assert rulebook.quote(LINES, city="Chennai", distance_km=1, at=NOON.replace(day=21, hour=23)).surge_multiplier == 1
+
+
+def test_promo_codes():
+    def promo(code, kind, value, **kwargs):
+        fields = dict(max_discount=None, min_order_amount=Decimal("0"), restaurant_id=None, city=None,
+                      valid_from=None, valid_until=None)
+        fields.update(kwargs)
+        return Promo(code, kind, Decimal(value), **fields)
+
+    rulebook = Rulebook(promos=[
+        promo("SAVE20", "percent", "20", max_discount=Decimal("30")),
+        promo("FLAT75", "flat", "75", min_order_amount=Decimal("300")),
+        promo("FREEDEL", "free_delivery", "0", restaurant_id=3),
+        promo("OLD", "percent", "10", valid_until=NOON - timedelta(days=1)),
+    ])
+
+    quote = rulebook.quote(LINES, restaurant_id=3, distance_km=1, promo_code="save20", at=NOON)
+    assert quote.discount_amount == Decimal("30") and quote.promo_code == "SAVE20" and quote.promo_error is None
+    assert quote.total_amount == quote.item_total + quote.delivery_fee + quote.tax_amount - Decimal("30")
+
+    assert rulebook.quote(LINES, restaurant_id=3, distance_km=1, promo_code="FREEDEL", at=NOON).discount_amount == Decimal("40.0")
+    for code, error in (("FLAT75", "Add items worth 50.00 more to use this code"),
+                        ("OLD", "Promo code has expired"),
+                        ("NOPE", "Invalid promo code")):
+        quote = rulebook.quote(LINES, restaurant_id=3, promo_code=code, at=NOON)
+        assert (quote.discount_amount, quote.promo_code, quote.promo_error) == (0, None, error)
+    assert rulebook.quote(LINES, restaurant_id=4, promo_code="FREEDEL", at=NOON).promo_error == \
+        "Promo code is not valid for this restaurant"
+
+
+def test_rules_compile_from_db_and_hot_reload(db, session_factory, statements):
+    other_worker = session_factory()
+
+    rules = PricingRules(refresh_seconds=0)
+    assert rules.ensure_fresh(db).quote(LINES, distance_km=5, at=NOON).delivery_fee == _legacy_fee(5)
+    version = rules.rulebook.version
+
+    # Unchanged tables: the fingerprint check does not recompile
+    del statements[:]
+    rules.ensure_fresh(db)
+    assert rules.rulebook.version == version and len(statements) == 1
+
+    other_worker.add_all([
+        DeliveryFeeSlab(min_km=0, base_fee=Decimal("30"), per_km_fee=Decimal("5")),
+        SurgeWindow(days="0123456", start_time="00:00", end_time="23:59", multiplier=Decimal("1.2")),
+        PromoCode(code="welcome", discount_type="flat", discount_value=Decimal("20")),
+    ])
+    other_worker.commit()
+
+    rulebook = rules.ensure_fresh(db)
+    assert rulebook.version == version + 1
+    quote = rulebook.quote(LINES, distance_km=2, promo_code="WELCOME", at=NOON)
+    assert quote.delivery_fee == Decimal("48.00")   # (30 + 2 * 5) * 1.2
+    assert quote.discount_amount == Decimal("20")
+
+    del statements[:]
+    rulebook.quote(LINES, distance_km=2, promo_code="WELCOME", at=NOON)
+    assert statements == []
+    other_worker.close()
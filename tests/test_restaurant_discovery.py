@@ -0,0 +1,98 @@
+import gc
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.dependencies import get_current_customer
+from app.models import Address, CustomerAddress, Restaurant
+from app.routers import customer as customer_router
+from app.services import catalog_events
+from app.services.restaurant_discovery import RestaurantSpatialIndex, nearby_from_db, restaurant_index
+from app.utils.geo import haversine_km
+
+ORIGIN = (12.9716, 77.5946)
+
+
+@pytest.fixture
+def seed(db, make_restaurant, make_customer):
+    """`count` restaurants spread east of the origin, ~1.1 km apart, and a customer living at the origin"""
+    def make(count):
+        for i in range(count):
+            make_restaurant(f"Kitchen {i}", point=(ORIGIN[0], ORIGIN[1] + 0.01 * (i + 1)), is_active=True)
+        person = make_customer()
+        db.add(CustomerAddress(customer_id=person.id, latitude=ORIGIN[0], longitude=ORIGIN[1],
+                               address_line_1="Home", city="Bengaluru", state="KA", pincode="560001"))
+        db.commit()
+        return person
+    return make
+
+
+@pytest.fixture
+def make_client(session_factory, seed):
+    def make(count):
+        person = seed(count)
+
+        app = FastAPI()
+        app.include_router(customer_router.router)
+        app.dependency_overrides[get_db] = lambda: session_factory()
+        app.dependency_overrides[get_current_customer] = lambda: person
+        # Fresh database for every test
+        restaurant_index.invalidate()
+        gc.collect()
+        return TestClient(app)
+    return make
+
+
+def test_pages_are_sorted_by_distance_and_complete(make_client):
+    client = make_client(25)
+    seen, cursor = [], None
+    while True:
+        params = {"address_id": 1, "radius_km": 15, "limit": 4}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/customer/restaurants/discover", params=params).json()["data"]
+        seen.extend(data["restaurants"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    # 15 km covers the first 13 restaurants
+    assert [r["id"] for r in seen] == list(range(1, 14))
+    distances = [r["distance_km"] for r in seen]
+    assert distances == sorted(distances)
+    assert data["total_in_radius"] == 13
+
+
+def test_changes_are_picked_up_and_errors(db, make_client):
+    client = make_client(3)
+    params = {"lat": ORIGIN[0], "lng": ORIGIN[1], "radius_km": 5}
+    assert [r["id"] for r in client.get("/customer/restaurants/discover", params=params).json()["data"]["restaurants"]] == [1, 2, 3]
+
+    db.query(Restaurant).filter(Restaurant.id == 1).update({"is_active": False})
+    db.query(Address).filter(Address.restaurant_id == 3).update({"longitude": ORIGIN[1] + 0.001})
+    db.commit()
+    catalog_events.restaurant_changed(1)
+    catalog_events.restaurant_changed(3)
+    assert [r["id"] for r in client.get("/customer/restaurants/discover", params=params).json()["data"]["restaurants"]] == [3, 2]
+
+    assert client.get("/customer/restaurants/discover").status_code == 400
+    assert client.get("/customer/restaurants/discover", params={"address_id": 99}).status_code == 404
+    assert client.get("/customer/restaurants/discover", params={**params, "cursor": "nope"}).status_code == 400
+
+
+def test_grid_and_bounding_box_agree(db, seed):
+    seed(40)
+
+    index = RestaurantSpatialIndex(refresh_seconds=300)
+    index.ensure_fresh(db)
+    for radius in (0.5, 3, 12, 60):
+        grid = index.nearby(*ORIGIN, radius)
+        assert grid == nearby_from_db(db, *ORIGIN, radius)
+        assert all(abs(d - haversine_km(*ORIGIN, ORIGIN[0], ORIGIN[1] + 0.01 * rid)) < 1e-9 for rid, d in grid)
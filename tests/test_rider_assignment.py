@@ -0,0 +1,140 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi import HTTPException
+
+import app.services.notification_service as notification_service
+from app.models import DeviceToken, Notification, Order, OrderStatusEnum
+from app.models_orders import OutboxEvent
+from app.services.assignment_service import AssignmentService
+
+CONCURRENT_ACCEPTS = 500
+
+
+@pytest.fixture
+def engine(file_engine):
+    # Accepts race on their own connections
+    return file_engine
+
+
+@pytest.fixture
+def make_offer(db, restaurant, make_partner, make_order):
+    """A READY order offered to `riders` online partners; returns their ids and the order id"""
+    def make(riders):
+        partner_ids = [make_partner(f"Rider {i}", is_online=True).id for i in range(riders)]
+        order_id = make_order(restaurant.id, status=OrderStatusEnum.READY.value).id
+        db.commit()
+        # Release the database before the accepts start
+        db.close()
+        return partner_ids, order_id
+    return make
+
+
+def _accept(service, Session, order_id, partner_id):
+    db = Session()
+    try:
+        return service.accept(db, order_id, partner_id).delivery_partner_id
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        db.close()
+
+
+def test_exactly_one_of_500_concurrent_accepts_wins(session_factory, make_offer):
+    partner_ids, order_id = make_offer(CONCURRENT_ACCEPTS)
+    service = AssignmentService(ttl_seconds=60)
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        results = list(pool.map(lambda pid: _accept(service, session_factory, order_id, pid), partner_ids))
+
+    winners = [r for r in results if r != 409]
+    assert len(winners) == 1 and winners[0] in partner_ids
+    assert results.count(409) == CONCURRENT_ACCEPTS - 1
+
+    db = session_factory()
+    order = db.get(Order, order_id)
+    assert (order.status, order.delivery_partner_id) == ("assigned", winners[0])
+    assert db.query(OutboxEvent).count() == 1
+    db.close()
+
+
+def test_losers_after_the_win_are_answered_without_a_query(session_factory, make_offer, statements):
+    (first, second, third), order_id = make_offer(3)
+    service = AssignmentService(ttl_seconds=60)
+    assert _accept(service, session_factory, order_id, first) == first
+
+    del statements[:]
+    assert _accept(service, session_factory, order_id, second) == 409
+    assert statements == [] and service.fast_rejections == 1
+
+    # A rider who releases the order puts it back up for grabs
+    db = session_factory()
+    service.release(db, order_id, first)
+    db.close()
+    assert _accept(service, session_factory, order_id, third) == third
+
+
+def test_release_reaches_other_workers_after_the_ttl(session_factory, make_offer):
+    (first, second, third), order_id = make_offer(3)
+    worker_a, worker_b = AssignmentService(ttl_seconds=60), AssignmentService(ttl_seconds=60)
+    assert _accept(worker_a, session_factory, order_id, first) == first
+    assert _accept(worker_b, session_factory, order_id, second) == 409
+
+    db = session_factory()
+    worker_a.release(db, order_id, first)
+    db.close()
+    # worker_b still remembers the order as taken until its entry expires...
+    assert _accept(worker_b, session_factory, order_id, second) == 409
+    # ...but only refuses partner_accept from memory, claims go to the database
+    db = session_factory()
+    assert worker_b.accept(db, order_id, third, "partner_reached").delivery_partner_id == third
+    db.close()
+
+
+def test_winner_retracts_the_offer_from_other_riders(monkeypatch, session_factory, make_offer):
+    (first, second, third), order_id = make_offer(3)
+    db = session_factory()
+    for partner_id in (first, second, third):
+        db.add(Notification(delivery_partner_id=partner_id, order_id=order_id, title="New order",
+                            message="Nearby", notification_type="new_available_order"))
+        db.add(DeviceToken(delivery_partner_id=partner_id, token=f"token-{partner_id}", device_type="android"))
+    db.commit()
+    db.close()
+
+    pushes = []
+    monkeypatch.setattr(notification_service, "_initialize_firebase", lambda: True)
+    monkeypatch.setattr(notification_service.push_dispatcher, "send_data",
+                        lambda tokens, data: pushes.append((sorted(tokens), data)))
+
+    assert _accept(AssignmentService(), session_factory, order_id, second) == second
+
+    assert pushes == [(sorted([f"token-{first}", f"token-{third}"]),
+                       {"notification_type": "order_taken", "order_id": str(order_id)})]
+
+
+def test_only_the_call_that_assigns_the_order_retracts_it(monkeypatch, session_factory, make_offer):
+    (first, second), order_id = make_offer(2)
+    retracted = []
+    monkeypatch.setattr(AssignmentService, "retract",
+                        staticmethod(lambda db, order_id, partner_id: retracted.append(partner_id)))
+    assert _accept(AssignmentService(), session_factory, order_id, first) == first
+
+    # Another worker, with no memory of the accept, sees the partner reach the restaurant
+    db = session_factory()
+    result = AssignmentService().accept(db, order_id, first, "partner_reached")
+    db.close()
+    assert (result.delivery_partner_id, result.assigned) == (first, False)
+    assert retracted == [first]
+
+    # Reaching an order nobody holds claims it, which does retract the offer
+    db = session_factory()
+    AssignmentService().release(db, order_id, first)
+    result = AssignmentService().accept(db, order_id, second, "partner_reached")
+    db.close()
+    assert (result.delivery_partner_id, result.assigned) == (second, True)
+    assert retracted == [first, second]
@@ -0,0 +1,90 @@
+import sys
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.models import OrderStatusEnum
+from app.models_orders import RiderEarningsDaily
+from app.services.order_state_machine import OrderStateMachine
+from app.services.rider_earnings import RiderEarningsService
+
+
+@pytest.fixture
+def riders(db, make_partner):
+    riders = [make_partner(f"Rider {i}").id for i in range(2)]
+    db.commit()
+    return riders
+
+
+@pytest.fixture
+def add_order(db, restaurant, make_order):
+    restaurant_id = restaurant.id
+
+    def add(fee, **columns):
+        order = make_order(restaurant_id, delivery_fee=fee, **columns)
+        db.commit()
+        return order.id
+    return add
+
+
+def test_delivered_transition_updates_the_rollup(db, riders, add_order, statements):
+    rider, other = riders
+    for fee in ("40.00", "25.50"):
+        order_id = add_order(Decimal(fee), status=OrderStatusEnum.READY.value)
+        for name in ("partner_accept", "partner_picked_up", "partner_delivered"):
+            OrderStateMachine.apply(db, name, order_id, partner_id=rider)
+
+    row = db.query(RiderEarningsDaily).one()
+    assert (row.delivery_partner_id, row.deliveries, row.earnings) == (rider, 2, Decimal("65.50"))
+
+    del statements[:]
+    summary = RiderEarningsService.summary(db, rider)
+    assert summary == {"today_earnings": Decimal("65.50"), "week_earnings": Decimal("65.50"),
+                       "month_earnings": Decimal("65.50"), "total_deliveries": 2}
+    assert len(statements) == 1
+    assert RiderEarningsService.summary(db, other)["total_deliveries"] == 0
+
+
+def test_summary_periods(db, riders):
+    rider = riders[0]
+    today = date(2026, 10, 15)  # Thursday
+    for day, amount in ((today, "10"), (today - timedelta(days=2), "20"),
+                        (today - timedelta(days=7), "40"), (today - timedelta(days=40), "80")):
+        db.add(RiderEarningsDaily(delivery_partner_id=rider, day=day, deliveries=1, earnings=Decimal(amount)))
+    db.commit()
+
+    assert RiderEarningsService.summary(db, rider, today=today) == {
+        "today_earnings": Decimal("10.00"),
+        "week_earnings": Decimal("30.00"),
+        "month_earnings": Decimal("70.00"),
+        "total_deliveries": 4
+    }
+
+
+def test_backfill_matches_orders_and_can_be_rerun(db, riders, add_order):
+    rider, other = riders
+    start = datetime(2026, 10, 1, 9, 0)
+    expected = {}
+    for i in range(30):
+        partner_id = (rider, other)[i % 2]
+        delivered_at = start + timedelta(hours=7 * i)
+        add_order(Decimal(i), status=OrderStatusEnum.DELIVERED.value,
+               delivery_partner_id=partner_id, delivered_at=delivered_at)
+        total = expected.setdefault((partner_id, delivered_at.date()), [0, Decimal("0")])
+        total[0] += 1
+        total[1] += Decimal(i)
+    # Not delivered, or delivered without a partner: not counted
+    add_order(Decimal("99"), status=OrderStatusEnum.PICKED_UP.value, delivery_partner_id=rider)
+    add_order(Decimal("99"), status=OrderStatusEnum.DELIVERED.value, delivered_at=start)
+
+    for _ in range(2):
+        result = RiderEarningsService.backfill(db, batch_size=7)
+        rollup = {(row.delivery_partner_id, row.day): [row.deliveries, row.earnings]
+                  for row in db.query(RiderEarningsDaily)}
+        assert rollup == expected
+        assert result == {"orders": 30, "day_rows": len(expected)}
@@ -0,0 +1,57 @@
+import sys
+import os
+import random
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.spatial_index import GridIndex, PartnerSpatialIndex
+from app.utils.geo import haversine_km
+
+
+def test_nearby_matches_full_scan():
+    rng = random.Random(7)
+    points = [(i, 12.9 + rng.uniform(-0.2, 0.2), 77.6 + rng.uniform(-0.2, 0.2)) for i in range(2000)]
+    index = GridIndex()
+    index.replace_all(points)
+
+    for _ in range(20):
+        lat, lng = 12.9 + rng.uniform(-0.2, 0.2), 77.6 + rng.uniform(-0.2, 0.2)
+        expected = sorted(
+            ((pid, haversine_km(lat, lng, p_lat, p_lng)) for pid, p_lat, p_lng in points
+             if haversine_km(lat, lng, p_lat, p_lng) <= 5.0),
+            key=lambda match: (match[1], match[0])
+        )
+        assert index.nearby(lat, lng, 5.0) == expected
+
+
+def test_nearby_is_nearest_first_and_respects_moves():
+    index = GridIndex()
+    index.upsert(1, 12.9716, 77.5946)
+    index.upsert(2, 12.9816, 77.5946)   # ~1.1 km north
+    index.upsert(3, 13.2000, 77.5946)   # ~25 km north
+
+    assert [pid for pid, _ in index.nearby(12.9716, 77.5946, 5.0)] == [1, 2]
+
+    index.upsert(1, 13.0100, 77.5946)   # moved ~4.3 km away
+    assert [pid for pid, _ in index.nearby(12.9716, 77.5946, 5.0)] == [2, 1]
+
+    index.remove(2)
+    assert [pid for pid, _ in index.nearby(12.9716, 77.5946, 5.0)] == [1]
+    assert len(index) == 2
+
+
+def test_partner_index_tracks_online_state():
+    index = PartnerSpatialIndex(refresh_seconds=3600)
+    index.set_online(10, 12.9716, 77.5946)
+    index.set_online(11)  # online without coordinates
+
+    assert sorted(index.online_ids()) == [10, 11]
+    assert index.unlocated_ids() == [11]
+
+    index.set_online(11, 12.9720, 77.5950)
+    assert index.unlocated_ids() == []
+    assert [pid for pid, _ in index.nearby(12.9716, 77.5946, 1.0)] == [10, 11]
+
+    index.set_offline(10)
+    assert index.online_ids() == [11]